@@ -0,0 +1,489 @@
+#!/usr/bin/env python3
+
+"""
+Build the aggregated intake tables from a raw decisions CSV in one streaming pass.
+
+The raw file has one row per decision with a label column, a binary decision
+column, optional score/split/time columns and one column per protected
+attribute. It is read in bounded chunks; each chunk is reduced to per-group
+counts, confusion cells, missingness counts and Welford score moments, and the
+partial states are merged (counts add, moments combine with Chan's update).
+With ``--jobs N`` the file is split into newline-aligned byte ranges that are
+reduced by a process pool; quoted fields must not contain embedded newlines in
+that mode.
+
+Outputs (default ``dist/local_intake``), using the tracked intake schemas:
+  - dataset_summary.csv
+  - group_summary.csv
+  - feature_missingness.csv
+  - group_confusion.csv      (confusion_by_group_TEMPLATE.csv columns)
+  - selection_rates.csv
+  - build_report.json        (rows, chunks, timings and score moments)
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+
+DATASET_SUMMARY_COLUMNS = (
+    "dataset_id",
+    "split",
+    "n",
+    "positive_rate",
+    "timeframe_start",
+    "timeframe_end",
+    "geography",
+    "notes",
+)
+GROUP_SUMMARY_COLUMNS = (
+    "dataset_id",
+    "split",
+    "group",
+    "n",
+    "positive_rate",
+    "mean_score",
+    "fpr",
+    "fnr",
+)
+FEATURE_MISSINGNESS_COLUMNS = ("feature", "split", "frac_missing")
+CONFUSION_COLUMNS = ("run_id", "split", "model_id", "attribute", "group", "TP", "FP", "TN", "FN")
+SELECTION_RATE_COLUMNS = ("run_id", "split", "model_id", "attribute", "group", "selected", "n")
+
+MISSING_GROUP = "missing"
+_GROUP_KEYS = ["split", "attribute", "group"]
+_COUNT_COLUMNS = ["n", "selected", "positives", "TP", "FP", "TN", "FN"]
+_MOMENT_COLUMNS = ["score_n", "score_mean", "score_m2"]
+
+
+def _binary(series: pd.Series, column: str) -> np.ndarray:
+    """Coerce a label/decision column to 0/1 integers, rejecting anything else."""
+
+    if series.dtype == bool:
+        return series.to_numpy(dtype=np.int64)
+    lowered = series.astype(str).str.strip().str.lower()
+    mapped = lowered.map({"1": 1, "0": 0, "true": 1, "false": 0, "1.0": 1, "0.0": 0})
+    if mapped.isna().any():
+        bad = series[mapped.isna()].iloc[0]
+        raise ValueError(f"column {column!r} must be binary (0/1); found {bad!r}")
+    return mapped.to_numpy(dtype=np.int64)
+
+
+def _empty_state() -> dict[str, pd.DataFrame]:
+    return {
+        "groups": pd.DataFrame(columns=_GROUP_KEYS + _COUNT_COLUMNS + _MOMENT_COLUMNS),
+        "splits": pd.DataFrame(columns=["split", "n", "positives", "time_min", "time_max"]),
+        "missing": pd.DataFrame(columns=["feature", "split", "missing", "n"]),
+    }
+
+
+def reduce_chunk(frame: pd.DataFrame, spec: dict[str, Any]) -> dict[str, pd.DataFrame]:
+    """Reduce one raw chunk to mergeable partial aggregates."""
+
+    missing_columns = [name for name in spec["required"] if name not in frame.columns]
+    if missing_columns:
+        raise ValueError("raw decisions CSV is missing columns: " + ", ".join(missing_columns))
+
+    label = _binary(frame[spec["label"]], spec["label"])
+    decision = _binary(frame[spec["decision"]], spec["decision"])
+    if spec["split_column"]:
+        split = frame[spec["split_column"]].fillna(MISSING_GROUP).astype(str).to_numpy()
+    else:
+        split = np.full(len(frame), spec["split"], dtype=object)
+    base = pd.DataFrame(
+        {
+            "split": split,
+            "selected": decision,
+            "positives": label,
+            "TP": (label == 1) & (decision == 1),
+            "FP": (label == 0) & (decision == 1),
+            "TN": (label == 0) & (decision == 0),
+            "FN": (label == 1) & (decision == 0),
+        }
+    )
+    if spec["score"]:
+        score = pd.to_numeric(frame[spec["score"]], errors="coerce").to_numpy(dtype=float)
+    else:
+        score = np.full(len(frame), np.nan)
+    base["score"] = score
+    base["score_n"] = ~np.isnan(score)
+
+    pieces = []
+    for attribute in spec["attributes"]:
+        values = frame[attribute].astype("string").fillna(MISSING_GROUP).to_numpy(dtype=object)
+        pieces.append(base.assign(attribute=attribute, group=values))
+    long = pd.concat(pieces, ignore_index=True)
+    grouped = long.groupby(_GROUP_KEYS, sort=False, observed=True)
+    groups = grouped[["selected", "positives", "TP", "FP", "TN", "FN", "score_n"]].sum()
+    groups.insert(0, "n", grouped.size())
+    groups["score_mean"] = grouped["score"].mean()
+    # Welford/Chan state: M2 is the sum of squared deviations from the chunk mean.
+    groups["score_m2"] = (grouped["score"].var(ddof=0) * groups["score_n"]).fillna(0.0)
+    groups = groups.reset_index()
+
+    split_group = base.groupby("split", sort=False)
+    splits = pd.DataFrame({"n": split_group.size(), "positives": split_group["positives"].sum()})
+    if spec["time_column"]:
+        stamps = frame[spec["time_column"]].astype("string").to_numpy(dtype=object)
+        times = pd.DataFrame({"split": split, "time": stamps}).dropna()
+        splits["time_min"] = times.groupby("split")["time"].min()
+        splits["time_max"] = times.groupby("split")["time"].max()
+    else:
+        splits["time_min"] = None
+        splits["time_max"] = None
+    splits = splits.reset_index()
+
+    features = spec["features"] or [
+        name for name in frame.columns if name not in spec["excluded_features"]
+    ]
+    absent = [name for name in features if name not in frame.columns]
+    if absent:
+        raise ValueError("raw decisions CSV is missing feature columns: " + ", ".join(absent))
+    missing = frame[features].isna().groupby(split, sort=False).sum()
+    missing.index.name = "split"
+    missing = missing.reset_index().melt(id_vars="split", var_name="feature", value_name="missing")
+    missing["n"] = missing["split"].map(splits.set_index("split")["n"])
+    return {"groups": groups, "splits": splits, "missing": missing[["feature", "split", "missing", "n"]]}
+
+
+def merge_states(states: Iterable[dict[str, pd.DataFrame]]) -> dict[str, pd.DataFrame]:
+    """Merge partial aggregates; counts add and score moments use Chan's update."""
+
+    states = [state for state in states if state is not None]
+    if not states:
+        return _empty_state()
+
+    groups = pd.concat([state["groups"] for state in states], ignore_index=True)
+    for column in _COUNT_COLUMNS + ["score_n"]:
+        groups[column] = groups[column].astype(np.int64)
+    for column in ("score_mean", "score_m2"):
+        groups[column] = groups[column].astype(float)
+    keys = [groups[name] for name in _GROUP_KEYS]
+    totals = groups.groupby(keys, sort=False)[_COUNT_COLUMNS + ["score_n"]].sum()
+    weighted = (groups["score_mean"].fillna(0.0) * groups["score_n"]).groupby(keys, sort=False).sum()
+    mean = weighted / totals["score_n"].where(totals["score_n"] > 0)
+    combined_mean = groups.join(mean.rename("_mean"), on=_GROUP_KEYS)["_mean"]
+    spread = groups["score_m2"] + groups["score_n"] * (groups["score_mean"] - combined_mean) ** 2
+    totals["score_mean"] = mean
+    totals["score_m2"] = spread.fillna(0.0).groupby(keys, sort=False).sum()
+    merged_groups = totals.reset_index()
+
+    splits = pd.concat([state["splits"] for state in states], ignore_index=True)
+    split_group = splits.groupby("split", sort=False)
+    merged_splits = pd.DataFrame(
+        {
+            "n": split_group["n"].sum().astype(np.int64),
+            "positives": split_group["positives"].sum().astype(np.int64),
+            "time_min": split_group["time_min"].min(),
+            "time_max": split_group["time_max"].max(),
+        }
+    ).reset_index()
+
+    missing = pd.concat([state["missing"] for state in states], ignore_index=True)
+    merged_missing = (
+        missing.groupby(["feature", "split"], sort=False)[["missing", "n"]].sum().reset_index()
+    )
+    return {"groups": merged_groups, "splits": merged_splits, "missing": merged_missing}
+
+
+def _read_chunks(source: Any, spec: dict[str, Any], **kwargs: Any) -> Iterable[pd.DataFrame]:
+    return pd.read_csv(
+        source,
+        chunksize=spec["chunksize"],
+        dtype={name: "string" for name in spec["string_columns"]},
+        keep_default_na=True,
+        **kwargs,
+    )
+
+
+def _reduce_stream(chunks: Iterable[pd.DataFrame], spec: dict[str, Any]) -> tuple[dict, int, int]:
+    state: dict[str, pd.DataFrame] | None = None
+    rows = 0
+    count = 0
+    for chunk in chunks:
+        partial = reduce_chunk(chunk, spec)
+        # Fold immediately so memory stays bounded by the number of groups.
+        state = partial if state is None else merge_states([state, partial])
+        rows += len(chunk)
+        count += 1
+    return (state if state is not None else _empty_state()), rows, count
+
+
+class _RangeReader(io.RawIOBase):
+    """Binary reader restricted to ``[start, end)`` of a file."""
+
+    def __init__(self, path: str, start: int, end: int) -> None:
+        self._handle = open(path, "rb")
+        self._handle.seek(start)
+        self._remaining = end - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        size = min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        data = self._handle.read(size)
+        buffer[: len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+    def close(self) -> None:
+        self._handle.close()
+        super().close()
+
+
+def _reduce_range(path: str, start: int, end: int, header: list[str], spec: dict[str, Any]):
+    with io.TextIOWrapper(io.BufferedReader(_RangeReader(path, start, end)), encoding="utf-8") as handle:
+        return _reduce_stream(_read_chunks(handle, spec, header=None, names=header), spec)
+
+
+def shard_offsets(path: Path, shards: int) -> tuple[list[str], list[tuple[int, int]]]:
+    """Split the data section of a CSV into newline-aligned byte ranges."""
+
+    size = path.stat().st_size
+    with path.open("rb") as handle:
+        header_line = handle.readline()
+        data_start = handle.tell()
+        boundaries = [data_start]
+        for index in range(1, shards):
+            target = data_start + (size - data_start) * index // shards
+            if target <= boundaries[-1]:
+                continue
+            handle.seek(target - 1)
+            handle.readline()
+            position = handle.tell()
+            if boundaries[-1] < position < size:
+                boundaries.append(position)
+    boundaries.append(size)
+    header = pd.read_csv(io.BytesIO(header_line), nrows=0).columns.map(str).tolist()
+    ranges = [(a, b) for a, b in zip(boundaries[:-1], boundaries[1:]) if b > a]
+    return header, ranges
+
+
+def build_state(path: Path, spec: dict[str, Any], *, jobs: int = 1) -> tuple[dict, dict[str, Any]]:
+    """Stream ``path`` and return the merged aggregate state and run statistics."""
+
+    started = time.perf_counter()
+    if jobs <= 1:
+        state, rows, chunks = _reduce_stream(_read_chunks(path, spec), spec)
+        shards = 1
+    else:
+        header, ranges = shard_offsets(path, jobs)
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [
+                pool.submit(_reduce_range, str(path), start, end, header, spec)
+                for start, end in ranges
+            ]
+            results = [future.result() for future in futures]
+        state = merge_states([result[0] for result in results])
+        rows = sum(result[1] for result in results)
+        chunks = sum(result[2] for result in results)
+        shards = len(ranges)
+    if rows == 0:
+        raise ValueError(f"raw decisions CSV has no rows: {path}")
+    stats = {
+        "rows": int(rows),
+        "chunks": int(chunks),
+        "chunksize": int(spec["chunksize"]),
+        "shards": int(shards),
+        "jobs": int(max(jobs, 1)),
+        "seconds": round(time.perf_counter() - started, 6),
+    }
+    return state, stats
+
+
+def _rate(numerator: pd.Series, denominator: pd.Series) -> pd.Series:
+    return numerator / denominator.where(denominator > 0)
+
+
+def _ordered_groups(state: dict[str, pd.DataFrame], attributes: list[str]) -> pd.DataFrame:
+    groups = state["groups"].copy()
+    groups["_attr_order"] = groups["attribute"].map({name: i for i, name in enumerate(attributes)})
+    return groups.sort_values(["split", "_attr_order", "group"], kind="mergesort").drop(
+        columns="_attr_order"
+    )
+
+
+def render_tables(
+    state: dict[str, pd.DataFrame],
+    *,
+    attributes: list[str],
+    dataset_id: str,
+    run_id: str,
+    model_id: str,
+    geography: str = "",
+    notes: str = "",
+) -> dict[str, pd.DataFrame]:
+    """Project the merged state onto the tracked intake table schemas."""
+
+    splits = state["splits"].sort_values("split", kind="mergesort")
+    dataset_summary = pd.DataFrame(
+        {
+            "dataset_id": dataset_id,
+            "split": splits["split"],
+            "n": splits["n"],
+            "positive_rate": _rate(splits["positives"], splits["n"]),
+            "timeframe_start": splits["time_min"],
+            "timeframe_end": splits["time_max"],
+            "geography": geography,
+            "notes": notes,
+        }
+    )
+
+    groups = _ordered_groups(state, attributes)
+    group_summary = pd.DataFrame(
+        {
+            "dataset_id": dataset_id,
+            "split": groups["split"],
+            "group": groups["attribute"] + ":" + groups["group"],
+            "n": groups["n"],
+            "positive_rate": _rate(groups["positives"], groups["n"]),
+            "mean_score": groups["score_mean"],
+            "fpr": _rate(groups["FP"], groups["FP"] + groups["TN"]),
+            "fnr": _rate(groups["FN"], groups["FN"] + groups["TP"]),
+        }
+    )
+
+    identity = {"run_id": run_id, "split": groups["split"], "model_id": model_id}
+    confusion = pd.DataFrame(
+        {**identity, "attribute": groups["attribute"], "group": groups["group"]}
+    ).assign(TP=groups["TP"], FP=groups["FP"], TN=groups["TN"], FN=groups["FN"])
+    selection = pd.DataFrame(
+        {**identity, "attribute": groups["attribute"], "group": groups["group"]}
+    ).assign(selected=groups["selected"], n=groups["n"])
+
+    missing = state["missing"].sort_values(["split"], kind="mergesort")
+    feature_missingness = pd.DataFrame(
+        {
+            "feature": missing["feature"],
+            "split": missing["split"],
+            "frac_missing": _rate(missing["missing"], missing["n"]),
+        }
+    )
+    return {
+        "dataset_summary.csv": dataset_summary[list(DATASET_SUMMARY_COLUMNS)],
+        "group_summary.csv": group_summary[list(GROUP_SUMMARY_COLUMNS)],
+        "feature_missingness.csv": feature_missingness[list(FEATURE_MISSINGNESS_COLUMNS)],
+        "group_confusion.csv": confusion[list(CONFUSION_COLUMNS)],
+        "selection_rates.csv": selection[list(SELECTION_RATE_COLUMNS)],
+    }
+
+
+def _score_moments(state: dict[str, pd.DataFrame]) -> list[dict[str, Any]]:
+    rows = []
+    for row in state["groups"].sort_values(_GROUP_KEYS).itertuples(index=False):
+        count = int(row.score_n)
+        rows.append(
+            {
+                "split": row.split,
+                "attribute": row.attribute,
+                "group": row.group,
+                "n": count,
+                "mean": None if count == 0 else float(row.score_mean),
+                "variance": None if count < 2 else float(row.score_m2 / (count - 1)),
+            }
+        )
+    return rows
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", required=True, help="Raw decisions/labels CSV")
+    parser.add_argument(
+        "--attribute",
+        action="append",
+        required=True,
+        help="Protected attribute column; repeat for each attribute",
+    )
+    parser.add_argument("--label-column", default="label")
+    parser.add_argument("--decision-column", default="yhat")
+    parser.add_argument("--score-column", default=None)
+    parser.add_argument("--split-column", default=None)
+    parser.add_argument("--split", default="test", help="Split name when --split-column is absent")
+    parser.add_argument("--time-column", default=None, help="ISO-8601 event time column")
+    parser.add_argument(
+        "--feature",
+        action="append",
+        default=[],
+        help="Feature column for missingness; repeat (default: all non-key columns)",
+    )
+    parser.add_argument("--dataset-id", default="local")
+    parser.add_argument("--run-id", default="local")
+    parser.add_argument("--model-id", default="local")
+    parser.add_argument("--geography", default="")
+    parser.add_argument("--notes", default="")
+    parser.add_argument("--chunksize", type=int, default=250_000)
+    parser.add_argument("--jobs", type=int, default=1, help="Process-pool shards (default: 1)")
+    parser.add_argument("--outdir", default="dist/local_intake")
+    args = parser.parse_args(argv)
+
+    path = Path(args.input)
+    try:
+        if not path.is_file():
+            raise ValueError(f"raw decisions CSV not found: {path}")
+        if args.chunksize <= 0:
+            raise ValueError("--chunksize must be positive")
+        if args.jobs <= 0 and args.jobs != -1:
+            raise ValueError("--jobs must be positive (or -1 for all CPUs)")
+        jobs = (os.cpu_count() or 1) if args.jobs == -1 else args.jobs
+        key_columns = [args.label_column, args.decision_column, *args.attribute]
+        optional = [args.score_column, args.split_column, args.time_column]
+        spec = {
+            "label": args.label_column,
+            "decision": args.decision_column,
+            "score": args.score_column,
+            "split_column": args.split_column,
+            "split": args.split,
+            "time_column": args.time_column,
+            "attributes": list(dict.fromkeys(args.attribute)),
+            "features": list(dict.fromkeys(args.feature)),
+            "excluded_features": set(key_columns + [name for name in optional if name]),
+            "required": key_columns + [name for name in optional if name],
+            "string_columns": [*args.attribute] + ([args.split_column] if args.split_column else []),
+            "chunksize": args.chunksize,
+        }
+        state, stats = build_state(path, spec, jobs=jobs)
+        tables = render_tables(
+            state,
+            attributes=spec["attributes"],
+            dataset_id=args.dataset_id,
+            run_id=args.run_id,
+            model_id=args.model_id,
+            geography=args.geography,
+            notes=args.notes,
+        )
+    except (ValueError, OSError, pd.errors.ParserError) as exc:
+        parser.error(str(exc))
+
+    outdir = Path(args.outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    for name, table in tables.items():
+        table.to_csv(outdir / name, index=False)
+    report = {
+        "input": str(path),
+        **stats,
+        "tables": sorted(tables),
+        "score_moments": _score_moments(state),
+    }
+    (outdir / "build_report.json").write_text(
+        json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+    )
+    print(f"Wrote {len(tables)} intake tables from {stats['rows']} rows to {outdir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
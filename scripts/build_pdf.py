@@ -0,0 +1,784 @@
+#!/usr/bin/env python3
+"""Build the whitepaper PDF with latexmk, optionally from a precompiled preamble format.
+
+By default this is the plain ``latexmk`` build that CI (``latex.yml``) runs.
+``--format`` and ``--minimal-passes`` are opt-in (``make pdf PDF_BUILD_FLAGS=...``):
+their LaTeX paths are only exercised with stand-in runners here, and nothing
+in CI yet compares their PDF bytes against the plain build.
+
+With ``--format`` the static part of the ``main.tex`` preamble (``\\documentclass`` up to the
+``\\csname endofdump\\endcsname`` marker: package loading and package setup) is
+dumped once into a pdfTeX format with ``mylatexformat``. Every latexmk pass
+then starts from that format instead of loading the packages again. Generated
+inputs (``includes/*.tex``, the publication profile) stay after the marker and
+are read on every pass as before.
+
+The format is keyed by the SHA-256 of the static preamble lines and the
+``pdftex --version`` banner, so an edited preamble or a TeX Live update
+rebuilds it automatically and stale formats are removed. The reproducibility
+primitives before ``\\documentclass`` still run on every pass, and
+``SOURCE_DATE_EPOCH``/``FORCE_SOURCE_DATE`` are inherited from the caller.
+
+``--minimal-passes`` replaces latexmk with a pass loop driven by
+``latex_passes``: pdflatex runs with ``-recorder``, and another pass only runs
+while a file the next pass reads back (aux, toc, out, bbl, ...) changed. Each
+pass's time and rerun triggers go to ``--passes-json`` and are appended to
+``pass_history.jsonl`` beside it.
+
+In that mode ``main.bbl`` comes from a content-addressed cache keyed by the
+``\\citation`` set and ``\\bibstyle`` in ``main.aux`` and the bytes of the
+``\\bibdata`` files: BibTeX only runs on a cache miss. A clean tree also
+starts from the last cached bibliography, so the first pass can already read
+it instead of paying for a pass that BibTeX output would invalidate.
+
+``--preview SECTION ...`` typesets only the selected ``sections/*.tex``
+inputs into ``dist/preview/main-preview.pdf``. The preview driver is
+``main.tex`` with the other section inputs dropped; its aux is seeded from the
+``main.aux`` of the last full build before the single pdflatex pass, so
+references and citation numbers into skipped sections stay those of the full
+document. Section, figure and table counters are restored before each selected
+input from the skipped sources, corrected by the full build's cleveref labels.
+
+A successful full build writes ``dist/build/build_record.json``: the SHA-256
+of ``main.pdf`` and of every file the arXiv package draws from (``main.tex``,
+``main.bbl``, ``.latexmkrc``, ``bib/``, ``figures/``, ``includes/`` and
+``sections/``). With ``--reuse-record`` a build whose record still matches the
+tree is skipped, so ``make arxiv`` after ``make pdf`` packages without another
+LaTeX run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from file_digest import digest_files, file_digest
+from latex_passes import analyze_pass, digests, parse_aux, parse_log, public_record
+
+
+FORMAT_SCHEMA = "flbsa.whitepaper_preamble_format.v1"
+PASSES_SCHEMA = "flbsa.whitepaper_build_passes.v1"
+BBL_CACHE_SCHEMA = "flbsa.whitepaper_bbl_cache.v1"
+PREVIEW_SCHEMA = "flbsa.whitepaper_preview.v1"
+BUILD_RECORD_SCHEMA = "flbsa.whitepaper_build_record.v1"
+# The arXiv source allowlist (scripts/package_arxiv_source.py).
+RECORD_FILES = (".latexmkrc", "main.bbl", "main.tex")
+RECORD_DIRECTORIES = ("bib", "figures", "includes", "sections")
+ENDOFDUMP_MARKER = r"\csname endofdump\endcsname"
+MAX_PASSES = 5
+_DOCUMENTCLASS = "\\documentclass"
+_REREAD_SEED_SUFFIXES = (".aux", ".bbl", ".lof", ".lot", ".out", ".toc")
+_SECTION_INPUT_RE = re.compile(r"^\s*\\input\{(?P<name>sections/[^}]+)\}\s*$")
+_COMMENT_RE = re.compile(r"(?<!\\)%.*")
+_LABEL_RE = re.compile(r"\\label\{([^}]+)\}")
+_COUNTER_RES = {
+    "section": re.compile(r"\\section\s*[\[{]"),
+    "figure": re.compile(r"\\begin\{figure\*?\}"),
+    "table": re.compile(r"\\begin\{table\*?\}"),
+}
+# cleveref label types mapped to the counter they number.
+_CREF_COUNTERS = {"section": "section", "appendix": "section", "figure": "figure", "table": "table"}
+_CREF_RE = re.compile(
+    r"^\{\[(?P<type>[^\]]*)\]\[(?P<value>\d+)\]\[[^\]]*\][^{}]*\}"
+    r"\{\[[^\]]*\]\[(?P<page>\d+)\]"
+)
+_LABEL_NUMBER_RE = re.compile(r"^\{(?P<number>[^{}]*)\}")
+
+Runner = Callable[..., subprocess.CompletedProcess]
+
+
+class BuildError(RuntimeError):
+    """Raised when the PDF or its preamble format cannot be built."""
+
+
+def static_preamble(source: str) -> str:
+    """Lines from ``\\documentclass`` up to (excluding) the end-of-dump marker."""
+
+    start = source.find(_DOCUMENTCLASS)
+    end = source.find(ENDOFDUMP_MARKER)
+    if start < 0 or end < 0 or end < start:
+        raise BuildError(
+            f"main document needs {_DOCUMENTCLASS} followed by {ENDOFDUMP_MARKER}"
+        )
+    line_start = source.rfind("\n", 0, start) + 1
+    return source[line_start:end]
+
+
+def tex_version(run: Runner = subprocess.run) -> str:
+    try:
+        completed = run(
+            ["pdftex", "--version"], check=False, capture_output=True, text=True
+        )
+    except OSError as exc:
+        raise BuildError(f"pdftex is not available: {exc}") from exc
+    banner = completed.stdout.splitlines()[0].strip() if completed.stdout else ""
+    if completed.returncode != 0 or not banner:
+        raise BuildError("unable to read the pdftex version banner")
+    return banner
+
+
+def preamble_key(preamble: str, version: str) -> str:
+    payload = json.dumps(
+        {"schema": FORMAT_SCHEMA, "preamble": preamble, "tex_version": version},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def format_name(main: Path, key: str) -> str:
+    return f"{main.stem}-preamble-{key[:16]}"
+
+
+def dump_command(main: Path, name: str, format_dir: Path) -> list[str]:
+    return [
+        "pdftex",
+        "-ini",
+        "-interaction=nonstopmode",
+        "-halt-on-error",
+        f"-jobname={name}",
+        f"-output-directory={format_dir}",
+        "&pdflatex",
+        "mylatexformat.ltx",
+        main.name,
+    ]
+
+
+def latexmk_command(main: Path, format_name: str | None = None) -> list[str]:
+    command = ["latexmk", "-pdf", "-interaction=nonstopmode", "-halt-on-error"]
+    if format_name is not None:
+        command.append(
+            f"-pdflatex=pdflatex -fmt={format_name} "
+            "-interaction=nonstopmode -halt-on-error %O %S"
+        )
+    command.append(main.name)
+    return command
+
+
+def format_environment(format_dir: Path) -> dict[str, str]:
+    """Search ``format_dir`` first, then the distribution's own format path."""
+
+    env = dict(os.environ)
+    env["TEXFORMATS"] = f"{format_dir.resolve()}{os.pathsep}{env.get('TEXFORMATS', '')}"
+    return env
+
+
+def ensure_format(
+    main: Path, format_dir: Path, *, run: Runner = subprocess.run
+) -> tuple[str, bool]:
+    """Return ``(format name, rebuilt)``, dumping the format when its key changed."""
+
+    preamble = static_preamble(main.read_text(encoding="utf-8"))
+    version = tex_version(run)
+    key = preamble_key(preamble, version)
+    name = format_name(main, key)
+    fmt = format_dir / f"{name}.fmt"
+    if fmt.is_file():
+        return name, False
+
+    format_dir.mkdir(parents=True, exist_ok=True)
+    for stale in format_dir.glob(f"{main.stem}-preamble-*"):
+        stale.unlink()
+    completed = run(
+        dump_command(main, name, format_dir.resolve()),
+        cwd=main.parent,
+        check=False,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0 or not fmt.is_file():
+        raise BuildError(
+            f"preamble format dump failed; see {format_dir / (name + '.log')}"
+        )
+    record: dict[str, Any] = {
+        "schema": FORMAT_SCHEMA,
+        "key": key,
+        "main": main.name,
+        "tex_version": version,
+        "preamble_sha256": hashlib.sha256(preamble.encode("utf-8")).hexdigest(),
+    }
+    (format_dir / f"{name}.json").write_text(
+        json.dumps(record, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+    )
+    return name, True
+
+
+def pdflatex_command(main: Path, format_name: str | None = None) -> list[str]:
+    command = ["pdflatex", "-interaction=nonstopmode", "-halt-on-error", "-recorder"]
+    if format_name is not None:
+        command.append(f"-fmt={format_name}")
+    command.append(main.name)
+    return command
+
+
+def bibliography_key(root: Path, aux: dict[str, Any]) -> str:
+    """Hash of the citation set, ``\\bibstyle`` and the bytes of every ``.bib`` file."""
+
+    databases = {}
+    for name in sorted(part.strip() for part in str(aux["bibdata"]).split(",")):
+        path = root / f"{name}.bib"
+        databases[name] = (
+            hashlib.sha256(path.read_bytes()).hexdigest() if path.is_file() else None
+        )
+    payload = {
+        "schema": BBL_CACHE_SCHEMA,
+        "citations": sorted(aux["citations"]),
+        "bibstyle": aux["bibstyle"],
+        "bibdata": databases,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class BblCache:
+    """Content-addressed ``.bbl`` store: ``objects/<sha256>.bbl`` plus ``keys/<key>``."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def lookup(self, key: str) -> Path | None:
+        try:
+            digest = (self.root / "keys" / key).read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            return None
+        blob = self.root / "objects" / f"{digest}.bbl"
+        return blob if blob.is_file() else None
+
+    def latest(self) -> Path | None:
+        try:
+            key = (self.root / "latest").read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            return None
+        return self.lookup(key)
+
+    def store(self, key: str, bbl: Path) -> None:
+        data = bbl.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        (self.root / "objects").mkdir(parents=True, exist_ok=True)
+        (self.root / "keys").mkdir(parents=True, exist_ok=True)
+        blob = self.root / "objects" / f"{digest}.bbl"
+        if not blob.is_file():
+            blob.write_bytes(data)
+        (self.root / "keys" / key).write_text(digest + "\n", encoding="utf-8")
+        self.remember(key)
+
+    def remember(self, key: str) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        (self.root / "latest").write_text(key + "\n", encoding="utf-8")
+
+
+def bibliography_stage(
+    root: Path,
+    jobname: str,
+    aux: dict[str, Any],
+    cache: BblCache,
+    *,
+    env: dict[str, str],
+    run: Runner = subprocess.run,
+) -> dict[str, Any]:
+    """Make ``<jobname>.bbl`` match ``aux``: keep it, restore it, or run BibTeX."""
+
+    if not aux["bibdata"]:
+        return {"status": "none"}
+    key = bibliography_key(root, aux)
+    bbl = root / f"{jobname}.bbl"
+    cached = cache.lookup(key)
+    if cached is not None:
+        if bbl.is_file() and bbl.read_bytes() == cached.read_bytes():
+            cache.remember(key)
+            return {"status": "current", "key": key}
+        shutil.copyfile(cached, bbl)
+        cache.remember(key)
+        return {"status": "restored", "key": key}
+    started = time.perf_counter()
+    completed = run(["bibtex", jobname], cwd=root, env=env, check=False, capture_output=True)
+    seconds = round(time.perf_counter() - started, 3)
+    # BibTeX exits 1 for warnings only; 2 and above are errors.
+    if completed.returncode >= 2 or not bbl.is_file():
+        raise BuildError(f"bibtex failed; see {root / (jobname + '.blg')}")
+    cache.store(key, bbl)
+    return {"status": "bibtex", "key": key, "seconds": seconds}
+
+
+def run_minimal_passes(
+    main: Path,
+    *,
+    format_name: str | None,
+    env: dict[str, str],
+    bbl_cache: Path = Path("dist/bbl_cache"),
+    run: Runner = subprocess.run,
+    max_passes: int = MAX_PASSES,
+) -> dict[str, Any]:
+    """Run pdflatex (and BibTeX) until the re-read auxiliary files are stable."""
+
+    root, jobname = main.parent, main.stem
+    cache = BblCache(bbl_cache)
+    prepass = None
+    if not (root / f"{jobname}.bbl").is_file():
+        # A clean tree: start from the bibliography of the last build so the
+        # first pass can already use it. The key check after the pass replaces
+        # it (and forces a rerun) if the citations changed since.
+        latest = cache.latest()
+        if latest is not None:
+            shutil.copyfile(latest, root / f"{jobname}.bbl")
+            prepass = "restored_latest"
+    state = digests(root, [f"{jobname}{suffix}" for suffix in _REREAD_SEED_SUFFIXES])
+    previous_aux = parse_aux(root / f"{jobname}.aux")
+    passes: list[dict[str, Any]] = []
+    started = time.perf_counter()
+    converged = False
+    for number in range(1, max_passes + 1):
+        pass_started = time.perf_counter()
+        completed = run(
+            pdflatex_command(main, format_name),
+            cwd=root,
+            env=env,
+            check=False,
+            capture_output=True,
+        )
+        seconds = time.perf_counter() - pass_started
+        if completed.returncode != 0:
+            raise BuildError(f"pdflatex pass {number} failed; see {root / (jobname + '.log')}")
+        record = analyze_pass(root, jobname, before=state, previous_aux=previous_aux)
+        entry = {"pass": number, "seconds": round(seconds, 3), **public_record(record)}
+        state = record["digests"]
+        bibliography = bibliography_stage(
+            root, jobname, record["aux"], cache, env=env, run=run
+        )
+        if bibliography["status"] != "none":
+            entry["bibliography"] = bibliography
+            bbl = f"{jobname}.bbl"
+            bbl_digest = digests(root, [bbl])[bbl]
+            if bbl_digest != state.get(bbl):
+                entry["rerun"] = True
+                entry["triggers"].append("bibliography")
+                entry["changed_files"].append(bbl)
+            state[bbl] = bbl_digest
+        passes.append(entry)
+        previous_aux = record["aux"]
+        if not entry["rerun"]:
+            converged = True
+            break
+    return {
+        "schema": PASSES_SCHEMA,
+        "main": main.name,
+        "format": format_name,
+        "source_date_epoch": env.get("SOURCE_DATE_EPOCH"),
+        "converged": converged,
+        "bibliography_prepass": prepass,
+        "total_seconds": round(time.perf_counter() - started, 3),
+        "passes": passes,
+    }
+
+
+def write_pass_report(report: dict[str, Any], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    with (path.parent / "pass_history.jsonl").open("a", encoding="utf-8") as history:
+        history.write(json.dumps(report, sort_keys=True) + "\n")
+
+
+def _sha256(path: Path) -> str:
+    return file_digest(path).sha256
+
+
+def record_inputs(root: Path) -> dict[str, str]:
+    """SHA-256 of every file in the arXiv source allowlist under ``root``."""
+
+    paths = [root / name for name in RECORD_FILES if (root / name).is_file()]
+    for directory in RECORD_DIRECTORIES:
+        paths.extend(path for path in (root / directory).rglob("*") if path.is_file())
+    digests = digest_files(sorted(paths))
+    return {path.relative_to(root).as_posix(): digest.sha256 for path, digest in digests.items()}
+
+
+def write_build_record(main: Path, path: Path, env: dict[str, str]) -> dict[str, Any]:
+    pdf = main.parent / f"{main.stem}.pdf"
+    if not pdf.is_file():
+        raise BuildError(f"no {pdf.name} after the build; nothing to record")
+    record = {
+        "schema": BUILD_RECORD_SCHEMA,
+        "main": main.name,
+        "pdf": {"path": pdf.name, "sha256": _sha256(pdf)},
+        "source_date_epoch": env.get("SOURCE_DATE_EPOCH"),
+        "inputs": record_inputs(main.parent),
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(record, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    return record
+
+
+def record_mismatches(main: Path, path: Path) -> list[str]:
+    """Why the build record at ``path`` no longer describes the tree (empty: it does)."""
+
+    try:
+        record = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return [f"no build record at {path}"]
+    except json.JSONDecodeError:
+        return [f"unreadable build record at {path}"]
+    if record.get("schema") != BUILD_RECORD_SCHEMA or record.get("main") != main.name:
+        return [f"build record at {path} is for another schema or document"]
+    pdf = main.parent / f"{main.stem}.pdf"
+    reasons = []
+    if not pdf.is_file() or _sha256(pdf) != record["pdf"]["sha256"]:
+        reasons.append(f"{pdf.name} differs from the recorded build")
+    recorded = record["inputs"]
+    current = record_inputs(main.parent)
+    for name in sorted(recorded.keys() | current.keys()):
+        if name not in current:
+            reasons.append(f"{name} removed")
+        elif name not in recorded:
+            reasons.append(f"{name} added")
+        elif recorded[name] != current[name]:
+            reasons.append(f"{name} changed")
+    return reasons
+
+
+def build(
+    main: Path,
+    format_dir: Path,
+    *,
+    use_format: bool = False,
+    minimal_passes: bool = False,
+    passes_json: Path = Path("dist/build/passes.json"),
+    bbl_cache: Path = Path("dist/bbl_cache"),
+    build_record: Path = Path("dist/build/build_record.json"),
+    reuse_record: bool = False,
+    run: Runner = subprocess.run,
+) -> int:
+    if reuse_record:
+        reasons = record_mismatches(main, build_record)
+        if not reasons:
+            print(f"{build_record} matches the tree; reusing {main.stem}.pdf and {main.stem}.bbl")
+            return 0
+        print(f"rebuilding: {'; '.join(reasons[:5])}" + (" ..." if len(reasons) > 5 else ""))
+    env = dict(os.environ)
+    name = None
+    if use_format:
+        name, rebuilt = ensure_format(main, format_dir, run=run)
+        print(f"{'Dumped' if rebuilt else 'Reusing'} preamble format {name}")
+        env = format_environment(format_dir)
+    if not minimal_passes:
+        completed = run(latexmk_command(main, name), cwd=main.parent, env=env, check=False)
+        if completed.returncode == 0:
+            write_build_record(main, build_record, env)
+        return completed.returncode
+
+    report = run_minimal_passes(
+        main, format_name=name, env=env, bbl_cache=bbl_cache, run=run
+    )
+    write_pass_report(report, passes_json)
+    for entry in report["passes"]:
+        reason = ", ".join(entry["triggers"]) or "stable"
+        print(f"pass {entry['pass']}: {entry['seconds']:.2f}s ({reason})")
+    if not report["converged"]:
+        raise BuildError(
+            f"auxiliary files still changing after {len(report['passes'])} passes; "
+            f"see {passes_json}"
+        )
+    write_build_record(main, build_record, env)
+    return 0
+
+
+def section_inputs(source: str) -> list[str]:
+    """``sections/...`` inputs of the document body, in order."""
+
+    body = source[source.find("\\begin{document}") :]
+    return [
+        match["name"]
+        for line in body.splitlines()
+        if (match := _SECTION_INPUT_RE.match(_COMMENT_RE.sub("", line)))
+    ]
+
+
+def resolve_sections(source: str, requested: Iterable[str]) -> list[str]:
+    """Map ``06_results``, ``06_results.tex`` or ``sections/06_results.tex`` to inputs."""
+
+    available = section_inputs(source)
+    selected = []
+    for item in requested:
+        name = item[: -len(".tex")] if item.endswith(".tex") else item
+        name = name if name.startswith("sections/") else f"sections/{name}"
+        if name not in available:
+            raise BuildError(
+                f"unknown section {item!r}; choose from: "
+                + ", ".join(entry.removeprefix("sections/") for entry in available)
+            )
+        if name not in selected:
+            selected.append(name)
+    return selected
+
+
+def _label_cref(aux: dict[str, Any], label: str) -> re.Match[str] | None:
+    return _CREF_RE.match(aux["labels"].get(f"{label}@cref", ""))
+
+
+def preview_counters(
+    root: Path, source: str, selected: Iterable[str], aux: dict[str, Any]
+) -> dict[str, dict[str, int]]:
+    """Counter values (and page) to set before each selected section input.
+
+    Counters are counted from the section sources the preview skips; where the
+    selected section has labels, the full build's cleveref entries for them
+    override the count (and give its first page).
+    """
+
+    wanted = set(selected)
+    counts = {name: 0 for name in _COUNTER_RES}
+    result: dict[str, dict[str, int]] = {}
+    body = source[source.find("\\begin{document}") :]
+    for line in body.splitlines():
+        line = _COMMENT_RE.sub("", line)
+        if line.strip() == "\\appendix":
+            counts["section"] = 0
+        match = _SECTION_INPUT_RE.match(line)
+        if match is None:
+            continue
+        path = root / f"{match['name']}.tex"
+        text = _COMMENT_RE.sub("", path.read_text(encoding="utf-8")) if path.is_file() else ""
+        if match["name"] in wanted:
+            state = dict(counts)
+            pages = []
+            labelled: dict[str, int] = {}
+            for label in _LABEL_RE.findall(text):
+                cref = _label_cref(aux, label)
+                if cref is None:
+                    continue
+                pages.append(int(cref["page"]))
+                counter = _CREF_COUNTERS.get(cref["type"])
+                if counter is not None:
+                    value = int(cref["value"]) - 1
+                    labelled[counter] = min(value, labelled.get(counter, value))
+            state.update(labelled)
+            if pages:
+                state["page"] = min(pages)
+            result[match["name"]] = state
+        for name, pattern in _COUNTER_RES.items():
+            counts[name] += len(pattern.findall(text))
+    return result
+
+
+def preview_source(source: str, counters: dict[str, dict[str, int]]) -> str:
+    """``source`` with only the section inputs in ``counters`` kept."""
+
+    lines = []
+    for line in source.splitlines():
+        match = _SECTION_INPUT_RE.match(_COMMENT_RE.sub("", line))
+        if match is None:
+            lines.append(line)
+            continue
+        state = counters.get(match["name"])
+        if state is None:
+            lines.append(f"% preview: skipped {match['name']}")
+            continue
+        if "page" in state:
+            lines.append(f"\\clearpage\\setcounter{{page}}{{{state['page']}}}")
+        lines.append(
+            "".join(
+                f"\\setcounter{{{name}}}{{{state[name]}}}"
+                for name in _COUNTER_RES
+                if name in state
+            )
+        )
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def _label_numbers(aux: dict[str, Any]) -> dict[str, str]:
+    numbers = {}
+    for label, value in aux["labels"].items():
+        match = _LABEL_NUMBER_RE.match(value)
+        if match and not label.endswith("@cref"):
+            numbers[label] = match["number"]
+    return numbers
+
+
+def preview_command(
+    driver: Path, jobname: str, output_dir: Path, format_name: str | None = None
+) -> list[str]:
+    command = ["pdflatex", "-interaction=nonstopmode", "-halt-on-error", "-recorder"]
+    if format_name is not None:
+        command.append(f"-fmt={format_name}")
+    command += [f"-output-directory={output_dir}", f"-jobname={jobname}", str(driver)]
+    return command
+
+
+def build_preview(
+    main: Path,
+    sections: Iterable[str],
+    format_dir: Path,
+    *,
+    preview_dir: Path = Path("dist/preview"),
+    use_format: bool = False,
+    passes_json: Path = Path("dist/build/passes.json"),
+    run: Runner = subprocess.run,
+) -> dict[str, Any]:
+    """Typeset the selected sections against the aux of the last full build."""
+
+    root, jobname = main.parent, f"{main.stem}-preview"
+    source = main.read_text(encoding="utf-8")
+    selected = resolve_sections(source, sections)
+    full_aux_path = root / f"{main.stem}.aux"
+    if not full_aux_path.is_file():
+        raise BuildError(f"no {full_aux_path.name} from a full build; run `make pdf` first")
+    full_aux = parse_aux(full_aux_path)
+    counters = preview_counters(root, source, selected, full_aux)
+
+    env = dict(os.environ)
+    name = None
+    if use_format:
+        name, rebuilt = ensure_format(main, format_dir, run=run)
+        print(f"{'Dumped' if rebuilt else 'Reusing'} preamble format {name}")
+        env = format_environment(format_dir)
+
+    output_dir = preview_dir.resolve()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    driver = output_dir / f"{jobname}.tex"
+    driver.write_text(preview_source(source, counters), encoding="utf-8")
+    # Reseed on every run: the preview pass rewrites its aux with the labels of
+    # the selected sections only.
+    shutil.copyfile(full_aux_path, output_dir / f"{jobname}.aux")
+    bbl = root / f"{main.stem}.bbl"
+    if bbl.is_file():
+        shutil.copyfile(bbl, output_dir / f"{jobname}.bbl")
+
+    started = time.perf_counter()
+    completed = run(
+        preview_command(driver, jobname, output_dir, name),
+        cwd=root,
+        env=env,
+        check=False,
+        capture_output=True,
+    )
+    seconds = time.perf_counter() - started
+    pdf = output_dir / f"{jobname}.pdf"
+    if completed.returncode != 0 or not pdf.is_file():
+        raise BuildError(f"preview pass failed; see {output_dir / (jobname + '.log')}")
+
+    log = parse_log((output_dir / f"{jobname}.log").read_text(encoding="utf-8", errors="replace"))
+    full_numbers = _label_numbers(full_aux)
+    preview_numbers = _label_numbers(parse_aux(output_dir / f"{jobname}.aux"))
+    relabelled = sorted(
+        label
+        for label, number in preview_numbers.items()
+        if label in full_numbers and full_numbers[label] != number
+    )
+    full_seconds = None
+    if passes_json.is_file():
+        full_seconds = json.loads(passes_json.read_text(encoding="utf-8")).get("total_seconds")
+    record = {
+        "schema": PREVIEW_SCHEMA,
+        "main": main.name,
+        "sections": selected,
+        "counters": counters,
+        "format": name,
+        "seed_aux_sha256": hashlib.sha256(full_aux_path.read_bytes()).hexdigest(),
+        "seconds": round(seconds, 3),
+        "full_build_seconds": full_seconds,
+        "pages": log["pages"],
+        "undefined_references": log["undefined_references"],
+        "relabelled": relabelled,
+        "pdf": str(pdf),
+    }
+    (output_dir / f"{jobname}.json").write_text(
+        json.dumps(record, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+    )
+    return record
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--main", type=Path, default=Path("main.tex"))
+    parser.add_argument("--format-dir", type=Path, default=Path("dist/texfmt"))
+    parser.add_argument(
+        "--format",
+        action="store_true",
+        help="Run every pass from the precompiled preamble format (opt-in)",
+    )
+    parser.add_argument(
+        "--format-only",
+        action="store_true",
+        help="Dump (or validate) the preamble format and stop",
+    )
+    parser.add_argument(
+        "--minimal-passes",
+        action="store_true",
+        help="Drive pdflatex/BibTeX directly and skip passes with no rerun trigger",
+    )
+    parser.add_argument("--passes-json", type=Path, default=Path("dist/build/passes.json"))
+    parser.add_argument(
+        "--bbl-cache",
+        type=Path,
+        default=Path("dist/bbl_cache"),
+        help="Content-addressed main.bbl cache used by --minimal-passes",
+    )
+    parser.add_argument(
+        "--build-record", type=Path, default=Path("dist/build/build_record.json")
+    )
+    parser.add_argument(
+        "--reuse-record",
+        action="store_true",
+        help="Skip the build when --build-record still matches main.pdf and its inputs",
+    )
+    parser.add_argument(
+        "--preview",
+        nargs="+",
+        metavar="SECTION",
+        help="Typeset only these sections/*.tex inputs against the last full main.aux",
+    )
+    parser.add_argument("--preview-dir", type=Path, default=Path("dist/preview"))
+    args = parser.parse_args(argv)
+    if args.preview and (args.format_only or args.minimal_passes):
+        parser.error("--preview cannot be combined with --format-only or --minimal-passes")
+    if not args.main.is_file():
+        parser.error(f"main document not found: {args.main}")
+    try:
+        if args.format_only:
+            name, rebuilt = ensure_format(args.main, args.format_dir)
+            print(f"{'Dumped' if rebuilt else 'Reusing'} preamble format {name}")
+            return 0
+        if args.preview:
+            record = build_preview(
+                args.main,
+                args.preview,
+                args.format_dir,
+                preview_dir=args.preview_dir,
+                use_format=args.format,
+                passes_json=args.passes_json,
+            )
+            full = record["full_build_seconds"]
+            print(
+                f"preview of {len(record['sections'])} section(s): {record['seconds']:.2f}s, "
+                f"{record['pages']} pages -> {record['pdf']}"
+                + (f" (last full build {full:.2f}s)" if full is not None else "")
+            )
+            if record["relabelled"]:
+                print(
+                    "numbered differently from the full build (main.aux may be stale): "
+                    + ", ".join(record["relabelled"])
+                )
+            return 0
+        return build(
+            args.main,
+            args.format_dir,
+            use_format=args.format,
+            minimal_passes=args.minimal_passes,
+            passes_json=args.passes_json,
+            bbl_cache=args.bbl_cache,
+            build_record=args.build_record,
+            reuse_record=args.reuse_record,
+        )
+    except BuildError as exc:
+        parser.error(str(exc))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
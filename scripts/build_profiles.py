@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""Compile every publication profile concurrently from one set of generated assets.
+
+``make profiles`` generates the TeX macros and figures once; this script then
+compiles each profile with latexmk in its own output directory under
+``dist/profiles/<name>/``, all at the same time. With ``--format`` (opt-in, as
+for ``build_pdf.py``) the preamble format is dumped or reused once first and
+every profile compiles from it. The profiles share the read-only ``includes/`` and
+``figures/`` of the checkout; the only per-profile input is the publication
+profile that ``main.tex`` otherwise reads from
+``includes/publication_profile.local.tex``, so each profile compiles a copy of
+``main.tex`` whose profile line points at its own file.
+
+Every PDF is verified in the same run with the in-process scan of
+``pdf_marker.py`` that the publication manifest uses: the ``demo`` profile
+must carry the ``DEMO / EVALUATION ONLY`` text marker and the ``unmarked``
+profile must not. Where ``pdftotext`` is installed it must agree.
+Verified PDFs are copied to ``dist/`` and summarised in
+``dist/profiles/profiles.json``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable
+
+from build_pdf import BuildError, Runner, ensure_format, format_environment, latexmk_command
+from pdf_marker import MarkerError, find_marker, pdftotext_marked_pages
+
+
+PROFILES_SCHEMA = "flbsa.whitepaper_profiles.v1"
+WATERMARK_MARKER = "DEMO / EVALUATION ONLY"
+PROFILE_INPUT = r"\InputIfFileExists{includes/publication_profile.local.tex}{}{}"
+PROFILES: dict[str, dict[str, Any]] = {
+    "demo": {"profile": "\\drafttrue\n", "watermark": True, "pdf": "whitepaper-demo.pdf"},
+    "unmarked": {"profile": "", "watermark": False, "pdf": "whitepaper.pdf"},
+}
+
+
+def profile_source(source: str, profile_tex: Path) -> str:
+    """``main.tex`` with the local publication profile replaced by ``profile_tex``."""
+
+    if source.count(PROFILE_INPUT) != 1:
+        raise BuildError(f"main document must contain exactly one {PROFILE_INPUT}")
+    return source.replace(PROFILE_INPUT, f"\\input{{{profile_tex.as_posix()}}}")
+
+
+def profile_command(driver: Path, output_dir: Path, format_name: str | None) -> list[str]:
+    # latexmk_command ends with the bare file name for a build inside the
+    # source directory; profiles build from the checkout root instead.
+    return [*latexmk_command(driver, format_name)[:-1], f"-outdir={output_dir}", str(driver)]
+
+
+def pdf_marked(pdf: Path, *, pdftotext: str = "pdftotext", run: Runner = subprocess.run) -> bool:
+    """Whether ``pdf`` shows the watermark marker, cross-checked with pdftotext if installed."""
+
+    try:
+        marked = find_marker(pdf, WATERMARK_MARKER).found
+        if not pdftotext or shutil.which(pdftotext) is None:
+            return marked
+        _, reference = pdftotext_marked_pages(pdf, WATERMARK_MARKER, pdftotext=pdftotext, run=run)
+    except MarkerError as exc:
+        raise BuildError(f"unable to inspect {pdf} text: {exc}") from exc
+    if bool(reference) != marked:
+        tool = "finds" if reference else "does not find"
+        scan = "finds" if marked else "does not find"
+        raise BuildError(
+            f"{pdftotext} {tool} the {WATERMARK_MARKER} marker in {pdf}, but the scan {scan} it"
+        )
+    return marked
+
+
+def prepare_profile(
+    main: Path, name: str, spec: dict[str, Any], profiles_dir: Path
+) -> tuple[Path, Path]:
+    """Write the profile input and driver; return ``(driver, output_dir)``.
+
+    Paths are relative to the checkout root, which is where latexmk runs.
+    """
+
+    output_dir = profiles_dir / name
+    absolute = main.parent / output_dir
+    absolute.mkdir(parents=True, exist_ok=True)
+    profile_tex = output_dir / "publication_profile.tex"
+    (main.parent / profile_tex).write_text(
+        f"% {name} publication profile\n{spec['profile']}", encoding="utf-8"
+    )
+    driver = output_dir / main.name
+    (main.parent / driver).write_text(
+        profile_source(main.read_text(encoding="utf-8"), profile_tex), encoding="utf-8"
+    )
+    return driver, output_dir
+
+
+def _compile(
+    main: Path,
+    name: str,
+    driver: Path,
+    output_dir: Path,
+    format_name: str | None,
+    env: dict[str, str],
+    run: Runner,
+) -> dict[str, Any]:
+    started = time.perf_counter()
+    completed = run(
+        profile_command(driver, output_dir, format_name),
+        cwd=main.parent,
+        env=env,
+        check=False,
+        capture_output=True,
+    )
+    return {
+        "profile": name,
+        "returncode": completed.returncode,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def build_profiles(
+    main: Path,
+    format_dir: Path,
+    *,
+    names: Iterable[str] = tuple(PROFILES),
+    profiles_dir: Path = Path("dist/profiles"),
+    dist_dir: Path = Path("dist"),
+    use_format: bool = False,
+    pdftotext: str = "pdftotext",
+    run: Runner = subprocess.run,
+) -> dict[str, Any]:
+    """Compile ``names`` concurrently, verify their markers, and record the run."""
+
+    names = list(names)
+    unknown = sorted(set(names) - set(PROFILES))
+    if unknown:
+        raise BuildError(
+            f"unknown profile(s) {', '.join(unknown)}; choose from {', '.join(PROFILES)}"
+        )
+    started = time.perf_counter()
+    env = dict(os.environ)
+    format_name = None
+    if use_format:
+        # Dump once before the concurrent compiles so they never race on it.
+        format_name, rebuilt = ensure_format(main, format_dir, run=run)
+        print(f"{'Dumped' if rebuilt else 'Reusing'} preamble format {format_name}")
+        env = format_environment(format_dir)
+
+    jobs = {name: prepare_profile(main, name, PROFILES[name], profiles_dir) for name in names}
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        futures = [
+            pool.submit(_compile, main, name, driver, output_dir, format_name, env, run)
+            for name, (driver, output_dir) in jobs.items()
+        ]
+        results = [future.result() for future in futures]
+    failed = [result["profile"] for result in results if result["returncode"] != 0]
+    if failed:
+        logs = ", ".join(str(profiles_dir / name / f"{main.stem}.log") for name in failed)
+        raise BuildError(f"profile build failed for {', '.join(failed)}; see {logs}")
+
+    pdfs = {}
+    for result in results:
+        name = result["profile"]
+        pdf = main.parent / jobs[name][1] / f"{main.stem}.pdf"
+        if not pdf.is_file():
+            raise BuildError(f"profile {name} produced no {pdf}")
+        marked = pdf_marked(pdf, pdftotext=pdftotext, run=run)
+        if marked != PROFILES[name]["watermark"]:
+            expected = "missing" if PROFILES[name]["watermark"] else "unexpectedly carries"
+            raise BuildError(f"profile {name} PDF {expected} the {WATERMARK_MARKER} marker")
+        pdfs[name] = pdf
+
+    # Publish only once every profile passed its check.
+    records = []
+    for result in results:
+        name = result["profile"]
+        target = main.parent / dist_dir / PROFILES[name]["pdf"]
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(pdfs[name], target)
+        records.append(
+            {
+                "profile": name,
+                "watermark": PROFILES[name]["watermark"],
+                "seconds": result["seconds"],
+                "pdf": str(target),
+                "sha256": hashlib.sha256(target.read_bytes()).hexdigest(),
+            }
+        )
+    report = {
+        "schema": PROFILES_SCHEMA,
+        "main": main.name,
+        "format": format_name,
+        "source_date_epoch": env.get("SOURCE_DATE_EPOCH"),
+        "wall_seconds": round(time.perf_counter() - started, 3),
+        "profiles": records,
+    }
+    path = main.parent / profiles_dir / "profiles.json"
+    path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    return report
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--main", type=Path, default=Path("main.tex"))
+    parser.add_argument("--format-dir", type=Path, default=Path("dist/texfmt"))
+    parser.add_argument(
+        "--profile",
+        action="append",
+        choices=sorted(PROFILES),
+        help="Profile to build (repeatable; default: all)",
+    )
+    parser.add_argument(
+        "--format",
+        action="store_true",
+        help="Compile from the shared precompiled preamble format (opt-in)",
+    )
+    parser.add_argument(
+        "--pdftotext",
+        default="pdftotext",
+        help="Cross-check the marker scan with this pdftotext when installed ('' to skip)",
+    )
+    args = parser.parse_args(argv)
+    if not args.main.is_file():
+        parser.error(f"main document not found: {args.main}")
+    try:
+        report = build_profiles(
+            args.main,
+            args.format_dir,
+            names=args.profile or tuple(PROFILES),
+            use_format=args.format,
+            pdftotext=args.pdftotext,
+        )
+    except BuildError as exc:
+        parser.error(str(exc))
+    for record in report["profiles"]:
+        marker = "watermarked" if record["watermark"] else "unmarked"
+        print(f"{record['profile']}: {record['seconds']:.2f}s, {marker} -> {record['pdf']}")
+    print(f"all profiles in {report['wall_seconds']:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,14 +4,16 @@
 from __future__ import annotations
 
 import argparse
-import hashlib
 import json
 import re
+import shutil
 import subprocess
 from pathlib import Path
 from typing import Any, Iterable
 
+from file_digest import file_digest, prefetch
 from intake_anchor import AnchorError, validate_anchor, validate_publication_source
+from pdf_marker import MARKER, MarkerError, find_marker, pdftotext_marked_pages
 
 
 SCHEMA_VERSION = "flbsa.whitepaper_publication_candidate.v1"
@@ -34,15 +36,15 @@ def _read_json(path: Path) -> dict[str, Any]:
 
 def _artifact(path: Path, published_name: str) -> dict[str, Any]:
     try:
-        payload = path.read_bytes()
+        digest = file_digest(path)
     except OSError as exc:
         raise AnchorError(f"unable to read publication artifact {path}: {exc}") from exc
-    if not payload:
+    if not digest.size:
         raise AnchorError(f"publication artifact is empty: {path}")
     return {
         "name": published_name,
-        "sha256": hashlib.sha256(payload).hexdigest(),
-        "size_bytes": len(payload),
+        "sha256": digest.sha256,
+        "size_bytes": digest.size,
     }
 
 
@@ -81,19 +83,23 @@ def _assert_source_checkout(repo_root: Path, whitepaper_commit: str) -> None:
 
 def _assert_pdf_marker(pdf_path: Path, pdftotext_command: str) -> None:
     try:
-        completed = subprocess.run(
-            [pdftotext_command, str(pdf_path), "-"],
-            check=False,
-            capture_output=True,
-            text=True,
-        )
-    except OSError as exc:
-        raise AnchorError(f"unable to execute {pdftotext_command}: {exc}") from exc
-    if completed.returncode != 0:
-        detail = completed.stderr.strip() or f"exit {completed.returncode}"
-        raise AnchorError(f"unable to inspect publication PDF text: {detail}")
-    if "DEMO / EVALUATION ONLY" not in completed.stdout:
+        scan = find_marker(pdf_path, MARKER)
+    except MarkerError as exc:
+        raise AnchorError(f"unable to inspect publication PDF text: {exc}") from exc
+    if not scan.found:
         raise AnchorError("publication PDF is missing DEMO / EVALUATION ONLY text marker")
+    # The in-process scan decides; pdftotext, where installed, must agree with it.
+    if not pdftotext_command or shutil.which(pdftotext_command) is None:
+        return
+    try:
+        _, marked = pdftotext_marked_pages(pdf_path, MARKER, pdftotext=pdftotext_command)
+    except MarkerError as exc:
+        raise AnchorError(f"unable to inspect publication PDF text: {exc}") from exc
+    if not marked:
+        raise AnchorError(
+            f"{pdftotext_command} finds no DEMO / EVALUATION ONLY text marker "
+            f"where the PDF scan found one on page {scan.marked_pages[0]}"
+        )
 
 
 def build_manifest(
@@ -114,6 +120,8 @@ def build_manifest(
         raise AnchorError(f"unsupported publication status: {publication_status!r}")
 
     _assert_source_checkout(repo_root, whitepaper_commit)
+    # Hash the artifacts concurrently up front; the checks below reuse the digests.
+    prefetch([intake_manifest_path, compatibility_intake_path, pdf_path, arxiv_path])
     anchor = validate_anchor(anchor_path, repo_root)
     publication_source = validate_publication_source(
         anchor, repo_root, whitepaper_commit
@@ -123,9 +131,7 @@ def build_manifest(
         raise AnchorError("current intake manifest must use schema wp-intake.v1")
     if intake_manifest.get("commit_sha") != anchor["producer"]["product_sha"]:
         raise AnchorError("current intake does not match the stable-v5 producer commit")
-    if hashlib.sha256(intake_manifest_path.read_bytes()).hexdigest() != anchor[
-        "consumer"
-    ]["manifest_sha256"]:
+    if file_digest(intake_manifest_path).sha256 != anchor["consumer"]["manifest_sha256"]:
         raise AnchorError("current intake manifest bytes do not match the stable-v5 anchor")
     producer_stamp = (intake_manifest.get("whitepaper_consumer") or {}).get(
         "producer"
@@ -207,7 +213,11 @@ def _build_parser() -> argparse.ArgumentParser:
         default="dist/stable-v5-intake-compatibility.zip",
     )
     parser.add_argument("--output", default="dist/publication-manifest.json")
-    parser.add_argument("--pdftotext", default="pdftotext")
+    parser.add_argument(
+        "--pdftotext",
+        default="pdftotext",
+        help="Cross-check the PDF marker with this pdftotext when installed ('' to skip)",
+    )
     return parser
 
 
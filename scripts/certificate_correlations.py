@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+
+"""
+Real-vs-synthetic correlation and range-violation views from quality certificates.
+
+Inputs (default: intake/certificates/*synthetic_quality_certificate.json):
+  - correlation_analysis.real_correlation_matrix / synthetic_correlation_matrix
+    (nested ``{column: {column: r}}`` objects, ``null`` for non-finite values)
+  - correlation_analysis.correlation_differences and broken_correlations
+  - statistical_comparison.range_violations
+
+Outputs per certificate (under --outdir, default dist/certificate_correlations/):
+  - <name>_correlation_difference.pdf  (heatmap of synthetic - real)
+  - <name>_top_pairs.csv / .tex        (top-k pairs by |synthetic - real|)
+  - <name>_range_violations.csv / .pdf (per-column excursion beyond the real range)
+plus summary.json with one consistency record per certificate.
+
+The column index is built once per certificate; each matrix row is placed with
+one vectorized ``Index.get_indexer`` call, broken pairs with one call per end,
+and the top-k ranking uses the upper triangle of the dense difference matrix,
+so there is no per-pair Python lookup.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+
+_PDF_METADATA = {
+    "Creator": "Equilens FL-BSA whitepaper",
+    "Producer": "Equilens FL-BSA whitepaper",
+    "CreationDate": None,
+    "ModDate": None,
+}
+_DEFAULT_GLOB = "intake/certificates/*synthetic_quality_certificate.json"
+# Tick labels are dropped above this many columns; the matrix is still drawn.
+_MAX_LABELLED_COLUMNS = 40
+TOP_PAIR_COLUMNS = (
+    "rank",
+    "column1",
+    "column2",
+    "real_correlation",
+    "synthetic_correlation",
+    "difference",
+    "abs_difference",
+    "broken",
+)
+RANGE_VIOLATION_COLUMNS = (
+    "column",
+    "real_low",
+    "real_high",
+    "synthetic_low",
+    "synthetic_high",
+    "below_fraction",
+    "above_fraction",
+)
+
+
+def _load_json(path: Path) -> dict[str, Any]:
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, UnicodeError, json.JSONDecodeError) as exc:
+        raise ValueError(f"unable to read JSON from {path}") from exc
+    if not isinstance(payload, dict):
+        raise ValueError(f"expected a JSON object in {path}")
+    return payload
+
+
+def column_index(*matrices: dict[str, Any]) -> pd.Index:
+    """Sorted union of every row and column name, built once per certificate."""
+
+    names: set[str] = set()
+    for matrix in matrices:
+        names.update(matrix)
+        for row in matrix.values():
+            if isinstance(row, dict):
+                names.update(row)
+    return pd.Index(sorted(names, key=str), dtype=object)
+
+
+def dense_matrix(matrix: dict[str, Any], index: pd.Index) -> np.ndarray:
+    """Place a nested ``{row: {column: value}}`` matrix into a dense float array.
+
+    Missing and ``null`` entries are NaN. Each row is positioned with a single
+    vectorized indexer call over its keys.
+    """
+
+    size = len(index)
+    dense = np.full((size, size), np.nan)
+    row_positions = index.get_indexer(list(matrix))
+    for position, row in zip(row_positions, matrix.values()):
+        if position < 0 or not isinstance(row, dict) or not row:
+            continue
+        columns = index.get_indexer(list(row))
+        values = np.array(list(row.values()), dtype=float)
+        valid = columns >= 0
+        dense[position, columns[valid]] = values[valid]
+    return dense
+
+
+def broken_pairs(broken: Any, index: pd.Index) -> np.ndarray:
+    """Boolean matrix of pairs the certificate lists as broken (symmetric)."""
+
+    size = len(index)
+    mask = np.zeros((size, size), dtype=bool)
+    if not isinstance(broken, list) or not broken:
+        return mask
+    frame = pd.DataFrame.from_records([item for item in broken if isinstance(item, dict)])
+    if frame.empty or not {"column1", "column2"} <= set(frame.columns):
+        return mask
+    first = index.get_indexer(frame["column1"].astype(str))
+    second = index.get_indexer(frame["column2"].astype(str))
+    valid = (first >= 0) & (second >= 0)
+    mask[first[valid], second[valid]] = True
+    mask[second[valid], first[valid]] = True
+    return mask
+
+
+def top_pairs(
+    real: np.ndarray, synthetic: np.ndarray, broken: np.ndarray, index: pd.Index, k: int
+) -> pd.DataFrame:
+    """Top-k upper-triangle pairs by |synthetic - real|, ties broken by name."""
+
+    upper_row, upper_col = np.triu_indices(len(index), k=1)
+    difference = synthetic[upper_row, upper_col] - real[upper_row, upper_col]
+    finite = np.isfinite(difference)
+    upper_row, upper_col, difference = upper_row[finite], upper_col[finite], difference[finite]
+    magnitude = np.abs(difference)
+    # Index is sorted, so positions order the names; lexsort keys are last-major.
+    order = np.lexsort((upper_col, upper_row, -magnitude))[: max(k, 0)]
+    rows, cols = upper_row[order], upper_col[order]
+    names = index.to_numpy()
+    return pd.DataFrame(
+        {
+            "rank": np.arange(1, len(order) + 1),
+            "column1": names[rows],
+            "column2": names[cols],
+            "real_correlation": real[rows, cols],
+            "synthetic_correlation": synthetic[rows, cols],
+            "difference": difference[order],
+            "abs_difference": magnitude[order],
+            "broken": broken[rows, cols],
+        },
+        columns=list(TOP_PAIR_COLUMNS),
+    )
+
+
+def range_violation_table(range_violations: Any) -> pd.DataFrame:
+    """Excursions of the synthetic range beyond the real range, as real-span fractions."""
+
+    if not isinstance(range_violations, dict) or not range_violations:
+        return pd.DataFrame(columns=list(RANGE_VIOLATION_COLUMNS))
+    columns = sorted(range_violations, key=str)
+    bounds = np.array(
+        [
+            [*range_violations[name]["real_range"], *range_violations[name]["synthetic_range"]]
+            for name in columns
+        ],
+        dtype=float,
+    )
+    real_low, real_high, synthetic_low, synthetic_high = bounds.T
+    span = real_high - real_low
+    span = np.where(span > 0, span, 1.0)
+    return pd.DataFrame(
+        {
+            "column": columns,
+            "real_low": real_low,
+            "real_high": real_high,
+            "synthetic_low": synthetic_low,
+            "synthetic_high": synthetic_high,
+            "below_fraction": np.maximum(real_low - synthetic_low, 0.0) / span,
+            "above_fraction": np.maximum(synthetic_high - real_high, 0.0) / span,
+        },
+        columns=list(RANGE_VIOLATION_COLUMNS),
+    )
+
+
+def analyze_certificate(payload: dict[str, Any], *, k: int = 10) -> dict[str, Any]:
+    analysis = payload.get("correlation_analysis")
+    if not isinstance(analysis, dict):
+        raise ValueError("certificate has no correlation_analysis object")
+    real_matrix = analysis.get("real_correlation_matrix")
+    synthetic_matrix = analysis.get("synthetic_correlation_matrix")
+    if not isinstance(real_matrix, dict) or not isinstance(synthetic_matrix, dict):
+        raise ValueError("correlation_analysis lacks real/synthetic correlation matrices")
+
+    index = column_index(real_matrix, synthetic_matrix)
+    real = dense_matrix(real_matrix, index)
+    synthetic = dense_matrix(synthetic_matrix, index)
+    difference = synthetic - real
+    broken = broken_pairs(analysis.get("broken_correlations"), index)
+
+    shipped = analysis.get("correlation_differences")
+    shipped_mismatch = None
+    if isinstance(shipped, dict) and shipped:
+        shipped_dense = dense_matrix(shipped, index)
+        comparable = np.isfinite(shipped_dense) & np.isfinite(difference)
+        if comparable.any():
+            shipped_mismatch = float(
+                np.max(np.abs(np.abs(difference[comparable]) - shipped_dense[comparable]))
+            )
+
+    upper = np.triu(np.ones_like(difference, dtype=bool), k=1)
+    finite_upper = upper & np.isfinite(difference)
+    statistical = payload.get("statistical_comparison")
+    ranges = range_violation_table(
+        statistical.get("range_violations") if isinstance(statistical, dict) else None
+    )
+    return {
+        "index": index,
+        "difference": difference,
+        "top_pairs": top_pairs(real, synthetic, broken, index, k),
+        "range_violations": ranges,
+        "summary": {
+            "columns": int(len(index)),
+            "pairs": int(upper.sum()),
+            "finite_pairs": int(finite_upper.sum()),
+            "max_abs_difference": (
+                float(np.abs(difference[finite_upper]).max()) if finite_upper.any() else None
+            ),
+            "shipped_max_correlation_difference": analysis.get("max_correlation_difference"),
+            "shipped_difference_max_deviation": shipped_mismatch,
+            "broken_pairs": int(np.triu(broken, k=1).sum()),
+            "range_violations": int(len(ranges)),
+        },
+    }
+
+
+def _latex_escape(text: str) -> str:
+    return (
+        text.replace("\\", "\\textbackslash{}")
+        .replace("&", "\\&")
+        .replace("%", "\\%")
+        .replace("$", "\\$")
+        .replace("#", "\\#")
+        .replace("_", "\\_")
+        .replace("{", "\\{")
+        .replace("}", "\\}")
+        .replace("~", "\\textasciitilde{}")
+        .replace("^", "\\textasciicircum{}")
+    )
+
+
+def write_top_pairs_table(pairs: pd.DataFrame, out_path: Path) -> None:
+    """Write the ranked pairs as a booktabs tabular; broken pairs are marked."""
+
+    with out_path.open("w", encoding="utf-8") as f:
+        f.write("\\begin{tabular}{rllrrr}\n\\toprule\n")
+        f.write("\\# & Column & Column & Real $r$ & Synthetic $r$ & $\\Delta r$\\\\\n\\midrule\n")
+        for row in pairs.itertuples(index=False):
+            marker = "$^{\\dagger}$" if row.broken else ""
+            f.write(
+                f"{row.rank}{marker} & {_latex_escape(str(row.column1))} & "
+                f"{_latex_escape(str(row.column2))} & {row.real_correlation:.3f} & "
+                f"{row.synthetic_correlation:.3f} & {row.difference:+.3f}\\\\\n"
+            )
+        f.write("\\bottomrule\n\\end{tabular}\n")
+
+
+def write_difference_heatmap(difference: np.ndarray, index: pd.Index, out_path: Path) -> bool:
+    try:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt  # type: ignore[import]
+    except Exception:
+        return False
+
+    size = len(index)
+    side = min(2.4 + 0.28 * size, 9.0)
+    finite = np.abs(difference[np.isfinite(difference)])
+    limit = float(finite.max()) if finite.size and finite.max() > 0 else 1.0
+    fig, ax = plt.subplots(figsize=(side + 1.0, side))
+    image = ax.imshow(
+        np.ma.masked_invalid(difference),
+        cmap="RdBu_r",
+        vmin=-limit,
+        vmax=limit,
+        interpolation="nearest",
+    )
+    if size <= _MAX_LABELLED_COLUMNS:
+        labels = [str(name) for name in index]
+        ax.set_xticks(range(size))
+        ax.set_xticklabels(labels, rotation=90, fontsize=7)
+        ax.set_yticks(range(size))
+        ax.set_yticklabels(labels, fontsize=7)
+    else:
+        ax.set_xlabel(f"{size} columns (sorted by name)")
+    fig.colorbar(image, ax=ax, label="Synthetic $-$ real correlation")
+    fig.tight_layout()
+    with matplotlib.rc_context({"pdf.fonttype": 42}):
+        fig.savefig(out_path, metadata=_PDF_METADATA)
+    plt.close(fig)
+    return True
+
+
+def write_range_heatmap(ranges: pd.DataFrame, out_path: Path) -> bool:
+    try:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt  # type: ignore[import]
+    except Exception:
+        return False
+
+    values = ranges[["below_fraction", "above_fraction"]].to_numpy(dtype=float)
+    fig, ax = plt.subplots(figsize=(3.2, 0.9 + 0.22 * len(ranges)))
+    image = ax.imshow(values, aspect="auto", cmap="Greys", vmin=0.0, interpolation="nearest")
+    ax.set_xticks([0, 1])
+    ax.set_xticklabels(["Below real min", "Above real max"], fontsize=7)
+    ax.set_yticks(range(len(ranges)))
+    ax.set_yticklabels(ranges["column"].astype(str).tolist(), fontsize=7)
+    fig.colorbar(image, ax=ax, label="Excursion / real range")
+    fig.tight_layout()
+    with matplotlib.rc_context({"pdf.fonttype": 42}):
+        fig.savefig(out_path, metadata=_PDF_METADATA)
+    plt.close(fig)
+    return True
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--certificate",
+        action="append",
+        default=[],
+        help=f"Quality certificate JSON; repeat for several (default: {_DEFAULT_GLOB})",
+    )
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--outdir", default="dist/certificate_correlations")
+    args = parser.parse_args(argv)
+
+    paths = [Path(p) for p in args.certificate] or sorted(Path().glob(_DEFAULT_GLOB))
+    try:
+        if args.top_k < 1:
+            raise ValueError("--top-k must be at least 1")
+        if not paths:
+            raise ValueError(f"no certificates match {_DEFAULT_GLOB}")
+        results = [(path, analyze_certificate(_load_json(path), k=args.top_k)) for path in paths]
+    except ValueError as exc:
+        parser.error(f"{exc}")
+
+    outdir = Path(args.outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    summary: dict[str, Any] = {}
+    for path, result in results:
+        name = path.stem
+        result["top_pairs"].to_csv(outdir / f"{name}_top_pairs.csv", index=False)
+        write_top_pairs_table(result["top_pairs"], outdir / f"{name}_top_pairs.tex")
+        write_difference_heatmap(
+            result["difference"], result["index"], outdir / f"{name}_correlation_difference.pdf"
+        )
+        ranges = result["range_violations"]
+        ranges.to_csv(outdir / f"{name}_range_violations.csv", index=False)
+        range_pdf = outdir / f"{name}_range_violations.pdf"
+        if ranges.empty:
+            range_pdf.unlink(missing_ok=True)
+        else:
+            write_range_heatmap(ranges, range_pdf)
+        summary[name] = {"certificate": str(path), **result["summary"]}
+    (outdir / "summary.json").write_text(
+        json.dumps(summary, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+    )
+    print(f"Wrote correlation views for {len(results)} certificate(s) to {outdir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
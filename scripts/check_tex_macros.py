@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""Check control-sequence definitions against their uses before running LaTeX.
+
+Tokenizes ``main.tex``, ``sections/*.tex`` and ``includes/*.tex`` (the
+hand-written ``macros.tex`` and the generated ``metrics_macros.tex``,
+``provenance_macros.tex`` and tables) and indexes, per file, the control
+sequences it defines (``\\newcommand``, ``\\def``, ``\\newif``, ...),
+redefines (``\\renewcommand``) and uses. Across the index it reports:
+
+* uses of an undefined macro close to a defined one (``\\GenderAIRIntrinsicLCl``
+  for ``\\GenderAIRIntrinsicLCI``): an error, with the suggestion;
+* ``\\renewcommand`` of a macro nothing defines: an error, as in LaTeX;
+* a second ``\\newcommand`` of the same macro: an error, as in LaTeX;
+* any other use of a macro that is neither defined here nor a known LaTeX or
+  package command: a warning, an error with ``--strict``.
+
+The index is kept in ``--index`` (default ``dist/tex_macro_index.json``); a
+file is only re-tokenized when its size, mtime and then SHA-256 changed, so a
+check after editing one section takes milliseconds. Exit status is 1 when
+errors are found.
+"""
+
+from __future__ import annotations
+
+import argparse
+import difflib
+import hashlib
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+
+INDEX_SCHEMA = "flbsa.tex_macro_index.v1"
+DEFAULT_PATTERNS = ("main.tex", "sections/*.tex", "includes/*.tex")
+SUGGESTION_CUTOFF = 0.8
+
+_TOKEN_RE = re.compile(r"\\(?:(?P<cs>[A-Za-z]+)|.)|(?P<comment>%[^\n]*)|(?P<text>[{}*])|\n")
+_TOKEN_AT_RE = re.compile(
+    r"\\(?:(?P<cs>[A-Za-z@]+)|.)|(?P<comment>%[^\n]*)|(?P<text>[{}*])|\n"
+)
+# Definitions LaTeX rejects when the name already exists.
+_NEW_DEFINERS = {"newcommand", "DeclareRobustCommand", "DeclareMathOperator", "newlength"}
+# Definitions that silently (re)define.
+_PROVIDERS = {"providecommand", "def", "gdef", "edef", "xdef", "let"}
+_RENEWERS = {"renewcommand"}
+# The control sequence after these is tested, not expanded.
+_GUARDS = {"ifdefined", "ifx", "@ifundefined"}
+
+# LaTeX kernel, TeX primitives and the commands of the packages main.tex
+# loads that the sources use. Extend when a new package command is adopted.
+KNOWN_COMMANDS = frozenset(
+    """
+    @fptop AddToShipoutPictureBG Cref Crefname Delta FloatBarrier IfFileExists
+    InputIfFileExists LaTeX LenToUnit Pr TeX addcontentsline addtolength alpha
+    appendix approx author autoref bar begin beta bfseries bibliography
+    bibliographystyle bottomrule caption cdot cdots centering chi citealp citep
+    citet clearpage cline cref crefname csname date delta dfrac documentclass
+    dots else emph empty end endcsname ensuremath epsilon eqref exp fancyfoot
+    fancyhead fancyhf fancypagestyle fi fontsize footnote footnotesize
+    footrulewidth frac gamma ge geq hat headheight headrulewidth height hfill
+    hline href hspace hypersetup ifdefined ifnum ifx in includegraphics infty
+    input item itshape label large Large ldots le left leq linewidth log lvert
+    makeatletter makeatother makebox maketitle mathbb mathbf mathcal mathrm max
+    mid midrule min mu multicolumn multirow ne neq newcommand newif newline
+    newpage noindent nolinkurl normalsize num operatorname pagestyle paperheight
+    paperwidth par paragraph path pdfinfoomitdate pdfsuppressptexinfo
+    pdftrailerid pi pm protect put qquad quad raisebox ref relax renewcommand
+    right rightarrow rotatebox rvert scriptsize section selectfont setlength
+    sigma sisetup small sqrt subsection subsubsection sum textbar textbf
+    textcolor textit textsf textsuperscript texttt textwidth tfrac thepage
+    times tiny title to topmargin toprule url usepackage vspace xspace
+    """.split()
+)
+
+
+class CheckError(ValueError):
+    """Raised when the sources or the index cannot be read."""
+
+
+def tokens(text: str) -> Iterator[tuple[str, str, int]]:
+    """``("cs", name, line)`` and ``("text", "{"|"}"|"*", line)`` tokens.
+
+    ``@`` is a letter between ``\\makeatletter`` and ``\\makeatother``, as in
+    LaTeX; comments and control symbols (``\\%``, ``\\\\``) are skipped.
+    """
+
+    pattern = _TOKEN_RE
+    line = 1
+    position = 0
+    while (match := pattern.search(text, position)) is not None:
+        line += text.count("\n", position, match.start())
+        position = match.end()
+        if match.group() == "\n":
+            line += 1
+        elif match["cs"] is not None:
+            name = match["cs"]
+            if name == "makeatletter":
+                pattern = _TOKEN_AT_RE
+            elif name == "makeatother":
+                pattern = _TOKEN_RE
+            yield "cs", name, line
+        elif match["text"] is not None:
+            yield "text", match["text"], line
+
+
+def _definition_target(stream: list[tuple[str, str, int]], index: int) -> int | None:
+    """Index of the control sequence defined by the token at ``index``."""
+
+    index += 1
+    while index < len(stream) and stream[index][0] == "text" and stream[index][1] in "*{":
+        index += 1
+    if index < len(stream) and stream[index][0] == "cs":
+        return index
+    return None
+
+
+def scan(text: str) -> dict[str, dict[str, list[int]]]:
+    """Lines of each defined, provided, renewed and used control sequence."""
+
+    record: dict[str, dict[str, list[int]]] = {
+        "defines": {},
+        "provides": {},
+        "renews": {},
+        "uses": {},
+    }
+    stream = list(tokens(text))
+    skip: set[int] = set()
+    for index, (kind, name, line) in enumerate(stream):
+        if kind != "cs" or index in skip:
+            continue
+        if name == "newif":
+            target = _definition_target(stream, index)
+            if target is not None and stream[target][1].startswith("if"):
+                skip.add(target)
+                flag = stream[target][1][2:]
+                for defined in (f"if{flag}", f"{flag}true", f"{flag}false"):
+                    record["defines"].setdefault(defined, []).append(stream[target][2])
+            continue
+        bucket = (
+            "defines"
+            if name in _NEW_DEFINERS
+            else "provides" if name in _PROVIDERS else "renews" if name in _RENEWERS else None
+        )
+        if bucket is not None:
+            target = _definition_target(stream, index)
+            if target is not None:
+                skip.add(target)
+                record[bucket].setdefault(stream[target][1], []).append(stream[target][2])
+        elif name in _GUARDS and index + 1 < len(stream) and stream[index + 1][0] == "cs":
+            skip.add(index + 1)
+        record["uses"].setdefault(name, []).append(line)
+    return record
+
+
+def discover(root: Path, patterns: Iterable[str] = DEFAULT_PATTERNS) -> list[str]:
+    names: set[str] = set()
+    for pattern in patterns:
+        names.update(path.relative_to(root).as_posix() for path in root.glob(pattern))
+    return sorted(names)
+
+
+def load_index(path: Path) -> dict[str, Any]:
+    try:
+        index = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {"schema": INDEX_SCHEMA, "files": {}}
+    except json.JSONDecodeError as exc:
+        raise CheckError(f"unreadable macro index {path}: {exc}") from exc
+    if index.get("schema") != INDEX_SCHEMA:
+        return {"schema": INDEX_SCHEMA, "files": {}}
+    return index
+
+
+def update_index(index: dict[str, Any], root: Path, names: Iterable[str]) -> list[str]:
+    """Refresh ``index`` for ``names`` in place; return the files re-tokenized."""
+
+    files: dict[str, Any] = index["files"]
+    wanted = set(names)
+    for stale in set(files) - wanted:
+        del files[stale]
+    scanned = []
+    for name in sorted(wanted):
+        stat = (root / name).stat()
+        entry = files.get(name)
+        if entry and (entry["size"], entry["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+            continue
+        data = (root / name).read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        if entry is None or entry["sha256"] != digest:
+            entry = {"sha256": digest, **scan(data.decode("utf-8", errors="replace"))}
+            scanned.append(name)
+        entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+        files[name] = entry
+    return scanned
+
+
+def _locations(files: dict[str, Any], bucket: str) -> dict[str, list[str]]:
+    result: dict[str, list[str]] = {}
+    for name, entry in sorted(files.items()):
+        for macro, lines in entry[bucket].items():
+            result.setdefault(macro, []).extend(f"{name}:{line}" for line in lines)
+    return result
+
+
+def check(
+    index: dict[str, Any], known: Iterable[str] = KNOWN_COMMANDS
+) -> dict[str, list[dict[str, Any]]]:
+    """Errors and warnings, each ``{"kind", "macro", "at", ...}``."""
+
+    files = index["files"]
+    defines = _locations(files, "defines")
+    provides = _locations(files, "provides")
+    renews = _locations(files, "renews")
+    uses = _locations(files, "uses")
+    known = set(known)
+    project = sorted(defines.keys() | provides.keys())
+    errors: list[dict[str, Any]] = []
+    warnings: list[dict[str, Any]] = []
+
+    for macro, where in sorted(defines.items()):
+        if len(where) > 1 or macro in known:
+            errors.append({"kind": "redefined", "macro": macro, "at": where})
+    for macro, where in sorted(renews.items()):
+        if macro not in defines and macro not in provides and macro not in known:
+            errors.append({"kind": "renews_undefined", "macro": macro, "at": where})
+    for macro, where in sorted(uses.items()):
+        if macro in defines or macro in provides or macro in known:
+            continue
+        close = difflib.get_close_matches(macro, project, n=1, cutoff=SUGGESTION_CUTOFF)
+        if close:
+            errors.append(
+                {"kind": "undefined", "macro": macro, "at": where, "suggestion": close[0]}
+            )
+        else:
+            warnings.append({"kind": "unknown", "macro": macro, "at": where})
+    return {"errors": errors, "warnings": warnings}
+
+
+def format_finding(finding: dict[str, Any]) -> str:
+    macro = f"\\{finding['macro']}"
+    message = {
+        "redefined": f"{macro} is defined more than once (or shadows a LaTeX command)",
+        "renews_undefined": f"\\renewcommand of undefined {macro}",
+        "undefined": f"undefined {macro}",
+        "unknown": f"{macro} is not defined here and not a known command",
+    }[finding["kind"]]
+    if "suggestion" in finding:
+        message += f" (did you mean \\{finding['suggestion']}?)"
+    return f"{finding['at'][0]}: {message}" + (
+        f" [+{len(finding['at']) - 1} more]" if len(finding["at"]) > 1 else ""
+    )
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--root", type=Path, default=Path("."))
+    parser.add_argument("--index", type=Path, default=Path("dist/tex_macro_index.json"))
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="Treat unknown commands (not defined here, not known) as errors",
+    )
+    parser.add_argument("--json", type=Path, help="Also write the findings as JSON")
+    args = parser.parse_args(argv)
+    if not (args.root / "main.tex").is_file():
+        parser.error(f"no main.tex in {args.root}")
+
+    started = time.perf_counter()
+    try:
+        index = load_index(args.index)
+        previous = json.dumps(index, sort_keys=True)
+        scanned = update_index(index, args.root, discover(args.root))
+    except (CheckError, OSError) as exc:
+        parser.error(str(exc))
+    findings = check(index)
+    if args.strict:
+        findings = {"errors": findings["errors"] + findings["warnings"], "warnings": []}
+    serialized = json.dumps(index, sort_keys=True)
+    if serialized != previous or not args.index.is_file():
+        args.index.parent.mkdir(parents=True, exist_ok=True)
+        args.index.write_text(serialized + "\n", encoding="utf-8")
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    for finding in findings["errors"]:
+        print(f"error: {format_finding(finding)}", file=sys.stderr)
+    for finding in findings["warnings"]:
+        print(f"warning: {format_finding(finding)}", file=sys.stderr)
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(findings, indent=2, sort_keys=True) + "\n")
+    print(
+        f"checked {len(index['files'])} files ({len(scanned)} re-tokenized) "
+        f"in {elapsed_ms:.1f} ms: {len(findings['errors'])} errors, "
+        f"{len(findings['warnings'])} warnings"
+    )
+    return 1 if findings["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
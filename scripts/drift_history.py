@@ -0,0 +1,523 @@
+#!/usr/bin/env python3
+
+"""
+Append-only fairness-metric history over intake snapshots, with AIR trends.
+
+A snapshot is one intake tree: ``manifest.json`` plus ``metrics_uncertainty.json``
+and, when present, ``fairness_slices.json``. It is keyed by the SHA-256 of its
+manifest bytes, so a snapshot seen twice (re-runs, copies, branch rewrites) is
+indexed once. The index is a local SQLite file with one ``metrics`` row per
+snapshot x attribute x pair x slice.
+
+Commands:
+  ingest  add snapshots from intake directories (``--snapshot``) and/or from the
+          history of a git ref (``--git-ref``, e.g. the nightly intake branch).
+          Only manifests not yet indexed are parsed. For git refs the last
+          ingested commit is remembered, and later runs only walk commits after
+          it, so a nightly update costs O(new snapshots).
+  report  write the AIR trend over the last ``--last`` snapshots:
+          air_trend.csv, air_trend.pdf and drift_macros.tex. The figure's
+          threshold line is ``thresholds.air_min`` from ``--sap`` (default
+          config/sap.yaml) unless ``--air-min`` overrides it.
+
+Default index: dist/drift/metrics_history.sqlite.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path, PurePosixPath
+from typing import Any, Iterable
+
+import pandas as pd
+import yaml
+
+
+SCHEMA_VERSION = "1"
+_PDF_METADATA = {
+    "Creator": "Equilens FL-BSA whitepaper",
+    "Producer": "Equilens FL-BSA whitepaper",
+    "CreationDate": None,
+    "ModDate": None,
+}
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS snapshots (
+    manifest_sha256 TEXT PRIMARY KEY,
+    run_id TEXT,
+    created TEXT,
+    source TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    manifest_sha256 TEXT NOT NULL REFERENCES snapshots(manifest_sha256),
+    attribute TEXT NOT NULL,
+    pair TEXT NOT NULL,
+    slice TEXT NOT NULL,
+    ref_n INTEGER,
+    prot_n INTEGER,
+    ref_selected INTEGER,
+    prot_selected INTEGER,
+    air REAL,
+    air_ci_low REAL,
+    air_ci_high REAL,
+    srg REAL,
+    srg_ci_low REAL,
+    srg_ci_high REAL,
+    p_value REAL,
+    p_value_adjusted REAL,
+    PRIMARY KEY (manifest_sha256, attribute, pair, slice)
+);
+CREATE INDEX IF NOT EXISTS metrics_series ON metrics (attribute, pair, slice);
+CREATE TABLE IF NOT EXISTS git_refs (ref TEXT PRIMARY KEY, last_commit TEXT NOT NULL);
+"""
+METRIC_COLUMNS = (
+    "attribute",
+    "pair",
+    "slice",
+    "ref_n",
+    "prot_n",
+    "ref_selected",
+    "prot_selected",
+    "air",
+    "air_ci_low",
+    "air_ci_high",
+    "srg",
+    "srg_ci_low",
+    "srg_ci_high",
+    "p_value",
+    "p_value_adjusted",
+)
+_SLICE_NAMES = ("historical", "amplification", "intrinsic")
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(_SCHEMA)
+    row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+    if row is None:
+        conn.execute("INSERT INTO meta VALUES ('schema_version', ?)", (SCHEMA_VERSION,))
+        conn.commit()
+    elif row[0] != SCHEMA_VERSION:
+        conn.close()
+        raise ValueError(f"{path} has schema version {row[0]}, expected {SCHEMA_VERSION}")
+    return conn
+
+
+def _dict(value: Any) -> dict:
+    return value if isinstance(value, dict) else {}
+
+
+def _ci(block: dict) -> tuple[Any, Any]:
+    ci = block.get("ci95")
+    return (ci[0], ci[1]) if isinstance(ci, list) and len(ci) == 2 else (None, None)
+
+
+def _pair_row(attribute: str, pair: str, slice_name: str, block: dict) -> dict[str, Any]:
+    counts = _dict(block.get("counts"))
+    air = _dict(block.get("air"))
+    srg = _dict(block.get("srg"))
+    air_low, air_high = _ci(air)
+    srg_low, srg_high = _ci(srg)
+    return {
+        "attribute": attribute,
+        "pair": pair,
+        "slice": slice_name,
+        "ref_n": counts.get("ref_n"),
+        "prot_n": counts.get("prot_n"),
+        "ref_selected": counts.get("ref_approved"),
+        "prot_selected": counts.get("prot_approved"),
+        "air": air.get("point"),
+        "air_ci_low": air_low,
+        "air_ci_high": air_high,
+        "srg": srg.get("point"),
+        "srg_ci_low": srg_low,
+        "srg_ci_high": srg_high,
+        "p_value": air.get("p_value"),
+        "p_value_adjusted": air.get("p_value_adjusted"),
+    }
+
+
+def snapshot_rows(uncertainty: dict, fairness_slices: dict) -> list[dict[str, Any]]:
+    """One row per attribute x pair x slice; ``overall`` is the full evaluation."""
+
+    rows: list[dict[str, Any]] = []
+    fu = _dict(uncertainty.get("fairness_uncertainty"))
+    gender = _dict(fu.get("gender"))
+    if gender:
+        pair = f"{gender.get('protected_group', '')}/{gender.get('reference_group', '')}"
+        rows.append(_pair_row("gender", pair, "overall", gender))
+    race = _dict(fu.get("race"))
+    for group, block in sorted(_dict(race.get("pairs")).items()):
+        if isinstance(block, dict):
+            pair = f"{group}/{race.get('reference_group', '')}"
+            rows.append(_pair_row("race", pair, "overall", block))
+    slices = _dict(fairness_slices.get("slices"))
+    attribute = str(fairness_slices.get("attribute") or "gender")
+    for name in _SLICE_NAMES:
+        block = _dict(slices.get(name))
+        if block:
+            pair = f"{block.get('protected_group', '')}/{block.get('reference_group', '')}"
+            rows.append(_pair_row(attribute, pair, name, block))
+    return rows
+
+
+def _json_bytes(data: bytes | None, label: str) -> dict:
+    if data is None:
+        return {}
+    try:
+        payload = json.loads(data.decode("utf-8"))
+    except (UnicodeError, json.JSONDecodeError) as exc:
+        raise ValueError(f"unable to parse {label}") from exc
+    return payload if isinstance(payload, dict) else {}
+
+
+def _is_indexed(conn: sqlite3.Connection, digest: str) -> bool:
+    row = conn.execute("SELECT 1 FROM snapshots WHERE manifest_sha256 = ?", (digest,)).fetchone()
+    return row is not None
+
+
+def _insert_snapshot(
+    conn: sqlite3.Connection,
+    digest: str,
+    manifest: dict,
+    source: str,
+    rows: list[dict[str, Any]],
+) -> None:
+    created = manifest.get("created") or manifest.get("end_ts") or manifest.get("start_ts")
+    conn.execute(
+        "INSERT INTO snapshots VALUES (?, ?, ?, ?)",
+        (digest, manifest.get("run_id"), created, source),
+    )
+    conn.executemany(
+        f"INSERT INTO metrics VALUES ({', '.join('?' * (len(METRIC_COLUMNS) + 1))})",
+        [(digest, *(row[column] for column in METRIC_COLUMNS)) for row in rows],
+    )
+
+
+def ingest_directory(conn: sqlite3.Connection, directory: Path) -> bool:
+    """Index one intake directory; returns False when its manifest is already indexed."""
+
+    manifest_path = directory / "manifest.json"
+    try:
+        manifest_bytes = manifest_path.read_bytes()
+    except OSError as exc:
+        raise ValueError(f"snapshot has no readable manifest.json: {directory}") from exc
+    digest = hashlib.sha256(manifest_bytes).hexdigest()
+    if _is_indexed(conn, digest):
+        return False
+
+    def _optional(name: str) -> bytes | None:
+        path = directory / name
+        return path.read_bytes() if path.is_file() else None
+
+    uncertainty = _json_bytes(_optional("metrics_uncertainty.json"), "metrics_uncertainty.json")
+    slices = _json_bytes(_optional("fairness_slices.json"), "fairness_slices.json")
+    with conn:
+        _insert_snapshot(
+            conn,
+            digest,
+            _json_bytes(manifest_bytes, str(manifest_path)),
+            str(directory),
+            snapshot_rows(uncertainty, slices),
+        )
+    return True
+
+
+class _GitBlobs:
+    """Read many ``<commit>:<path>`` blobs through one ``git cat-file --batch``."""
+
+    def __init__(self, root: Path) -> None:
+        self._process = subprocess.Popen(
+            ["git", "-C", str(root), "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def read(self, spec: str) -> bytes | None:
+        assert self._process.stdin is not None and self._process.stdout is not None
+        self._process.stdin.write(spec.encode("utf-8") + b"\n")
+        self._process.stdin.flush()
+        header = self._process.stdout.readline().split()
+        if len(header) != 3 or header[1] != b"blob":
+            return None
+        data = self._process.stdout.read(int(header[2]))
+        self._process.stdout.read(1)
+        return data
+
+    def close(self) -> None:
+        if self._process.stdin is not None:
+            self._process.stdin.close()
+        self._process.wait()
+
+
+def _git(root: Path, *args: str) -> str:
+    completed = subprocess.run(
+        ["git", "-C", str(root), *args], check=False, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise ValueError(f"git {' '.join(args)} failed: {completed.stderr.strip()}")
+    return completed.stdout.strip()
+
+
+def _new_commits(
+    conn: sqlite3.Connection, root: Path, ref: str, manifest_path: str
+) -> tuple[str, list[str]]:
+    tip = _git(root, "rev-parse", "--verify", f"{ref}^{{commit}}")
+    row = conn.execute("SELECT last_commit FROM git_refs WHERE ref = ?", (ref,)).fetchone()
+    revision = tip
+    if row is not None:
+        ancestor = subprocess.run(
+            ["git", "-C", str(root), "merge-base", "--is-ancestor", row[0], tip],
+            check=False,
+            capture_output=True,
+        )
+        # A rewritten ref falls back to a full walk; known manifests are still skipped.
+        if ancestor.returncode == 0:
+            revision = f"{row[0]}..{tip}"
+    listed = _git(root, "rev-list", "--reverse", revision, "--", manifest_path)
+    return tip, [line for line in listed.splitlines() if line]
+
+
+def ingest_git_ref(
+    conn: sqlite3.Connection, root: Path, ref: str, intake_path: str = "intake"
+) -> tuple[int, int]:
+    """Index intake snapshots committed on ``ref``; returns (walked, added)."""
+
+    base = PurePosixPath(intake_path)
+    tip, commits = _new_commits(conn, root, ref, str(base / "manifest.json"))
+    added = 0
+    blobs = _GitBlobs(root)
+    try:
+        for commit in commits:
+            manifest_bytes = blobs.read(f"{commit}:{base / 'manifest.json'}")
+            if manifest_bytes is None:
+                continue
+            digest = hashlib.sha256(manifest_bytes).hexdigest()
+            if _is_indexed(conn, digest):
+                continue
+            uncertainty = _json_bytes(
+                blobs.read(f"{commit}:{base / 'metrics_uncertainty.json'}"),
+                f"{commit}:metrics_uncertainty.json",
+            )
+            slices = _json_bytes(
+                blobs.read(f"{commit}:{base / 'fairness_slices.json'}"),
+                f"{commit}:fairness_slices.json",
+            )
+            with conn:
+                _insert_snapshot(
+                    conn,
+                    digest,
+                    _json_bytes(manifest_bytes, f"{commit}:manifest.json"),
+                    f"git:{commit}",
+                    snapshot_rows(uncertainty, slices),
+                )
+            added += 1
+    finally:
+        blobs.close()
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO git_refs VALUES (?, ?)", (ref, tip))
+    return len(commits), added
+
+
+def recent_metrics(conn: sqlite3.Connection, last: int) -> pd.DataFrame:
+    """Metric rows of the ``last`` most recent snapshots, oldest first."""
+
+    query = """
+        WITH recent AS (
+            SELECT manifest_sha256, run_id, created, source FROM snapshots
+            ORDER BY created DESC, manifest_sha256 DESC LIMIT ?
+        )
+        SELECT recent.created, recent.run_id, recent.manifest_sha256, metrics.*
+        FROM recent JOIN metrics USING (manifest_sha256)
+        ORDER BY recent.created, recent.manifest_sha256, attribute, pair, slice
+    """
+    frame = pd.read_sql_query(query, conn, params=(last,))
+    # ``metrics.*`` repeats the key column; keep one.
+    return frame.loc[:, ~frame.columns.duplicated()]
+
+
+def _fmt(value: float) -> str:
+    return f"\\num{{{value:.3f}}}"
+
+
+def load_air_min(sap_path: Path) -> float:
+    """``thresholds.air_min`` from the SAP, 0.80 when the SAP does not set it."""
+
+    try:
+        sap = yaml.safe_load(sap_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError, yaml.YAMLError) as exc:
+        raise ValueError(f"unable to read SAP {sap_path}: {exc}") from exc
+    thresholds = sap.get("thresholds") if isinstance(sap, dict) else None
+    value = thresholds.get("air_min", 0.80) if isinstance(thresholds, dict) else 0.80
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{sap_path} thresholds.air_min is not a number")
+    return float(value)
+
+
+def write_macros(frame: pd.DataFrame, out_path: Path) -> None:
+    """Window macros for the headline gender pair (overall evaluation).
+
+    ``\\DriftWindowSize`` is the number of snapshots actually in the window,
+    which is below ``--last`` while the history is shorter than that.
+    """
+
+    gender = frame[(frame["attribute"] == "gender") & (frame["slice"] == "overall")]
+    gender = gender.dropna(subset=["air"])
+    snapshots = int(frame["manifest_sha256"].nunique()) if not frame.empty else 0
+    lines = [
+        "% Generated by scripts/drift_history.py report; do not edit.",
+        f"\\newcommand{{\\DriftWindowSize}}{{{snapshots}}}",
+    ]
+    if gender.empty:
+        lines.extend(
+            f"\\newcommand{{\\{name}}}{{TBD}}"
+            for name in ("DriftGenderAIRMin", "DriftGenderAIRMax", "DriftGenderAIRLatest")
+        )
+    else:
+        lines.extend(
+            [
+                f"\\newcommand{{\\DriftGenderAIRMin}}{{{_fmt(gender['air'].min())}}}",
+                f"\\newcommand{{\\DriftGenderAIRMax}}{{{_fmt(gender['air'].max())}}}",
+                f"\\newcommand{{\\DriftGenderAIRLatest}}{{{_fmt(gender['air'].iloc[-1])}}}",
+            ]
+        )
+    out_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def write_trend_figure(frame: pd.DataFrame, out_path: Path, *, air_min: float) -> bool:
+    try:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt  # type: ignore[import]
+    except Exception:
+        return False
+
+    data = frame.dropna(subset=["air"])
+    if data.empty:
+        return False
+    order = list(dict.fromkeys(data["manifest_sha256"]))
+    position = {digest: index for index, digest in enumerate(order)}
+    attributes = sorted(data["attribute"].unique())
+    fig, axes = plt.subplots(
+        1, len(attributes), figsize=(4.2 * len(attributes), 3.0), squeeze=False
+    )
+    for ax, attribute in zip(axes[0], attributes):
+        for (pair, slice_name), series in data[data["attribute"] == attribute].groupby(
+            ["pair", "slice"], sort=True
+        ):
+            x = series["manifest_sha256"].map(position).to_numpy()
+            ax.plot(x, series["air"].to_numpy(), marker="o", markersize=3, linewidth=0.9,
+                    label=f"{pair} ({slice_name})")
+            if series[["air_ci_low", "air_ci_high"]].notna().all().all():
+                ax.fill_between(
+                    x,
+                    series["air_ci_low"].to_numpy(dtype=float),
+                    series["air_ci_high"].to_numpy(dtype=float),
+                    alpha=0.15,
+                    linewidth=0,
+                )
+        ax.axhline(air_min, linestyle="--", color="#a33a3a", linewidth=0.9)
+        ax.set_title(attribute.capitalize())
+        ax.set_xlabel("Snapshot (oldest to newest)")
+        ax.grid(True, axis="y", linestyle=":", linewidth=0.5)
+        ax.legend(fontsize=6)
+    axes[0][0].set_ylabel("Adverse Impact Ratio (AIR)")
+    fig.tight_layout()
+    with matplotlib.rc_context({"pdf.fonttype": 42}):
+        fig.savefig(out_path, metadata=_PDF_METADATA)
+    plt.close(fig)
+    return True
+
+
+def _ingest_command(args: argparse.Namespace) -> int:
+    if not args.snapshot and not args.git_ref:
+        raise ValueError("give at least one --snapshot or --git-ref")
+    conn = connect(Path(args.db))
+    try:
+        added = sum(ingest_directory(conn, Path(path)) for path in args.snapshot)
+        walked = 0
+        for ref in args.git_ref:
+            ref_walked, ref_added = ingest_git_ref(conn, Path(args.repo), ref, args.intake_path)
+            walked += ref_walked
+            added += ref_added
+        total = conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+    finally:
+        conn.close()
+    print(
+        f"Indexed {added} new snapshot(s) ({len(args.snapshot)} directories, "
+        f"{walked} new commits walked); {total} in {args.db}"
+    )
+    return 0
+
+
+def _report_command(args: argparse.Namespace) -> int:
+    if args.last < 1:
+        raise ValueError("--last must be at least 1")
+    db = Path(args.db)
+    if not db.is_file():
+        raise ValueError(f"history index not found: {db}")
+    conn = connect(db)
+    try:
+        frame = recent_metrics(conn, args.last)
+    finally:
+        conn.close()
+    outdir = Path(args.outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    frame.to_csv(outdir / "air_trend.csv", index=False)
+    air_min = args.air_min if args.air_min is not None else load_air_min(Path(args.sap))
+    write_macros(frame, outdir / "drift_macros.tex")
+    if not write_trend_figure(frame, outdir / "air_trend.pdf", air_min=air_min):
+        (outdir / "air_trend.pdf").unlink(missing_ok=True)
+    print(f"Wrote AIR trend over {frame['manifest_sha256'].nunique()} snapshot(s) to {outdir}")
+    return 0
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", default="dist/drift/metrics_history.sqlite")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest = subparsers.add_parser("ingest", help="index snapshots not yet in the history")
+    ingest.add_argument(
+        "--snapshot", action="append", default=[], help="Intake directory; repeatable"
+    )
+    ingest.add_argument(
+        "--git-ref",
+        action="append",
+        default=[],
+        help="Git ref whose commits carry intake snapshots (e.g. origin/chore/wp-intake-nightly)",
+    )
+    ingest.add_argument("--repo", default=".", help="Repository for --git-ref")
+    ingest.add_argument("--intake-path", default="intake", help="Intake directory inside the tree")
+    ingest.set_defaults(func=_ingest_command)
+
+    report = subparsers.add_parser("report", help="AIR trend figure, CSV and macros")
+    report.add_argument("--last", type=int, default=30, help="Window of most recent snapshots")
+    report.add_argument("--sap", default="config/sap.yaml", help="SAP with thresholds.air_min")
+    report.add_argument(
+        "--air-min", type=float, default=None, help="Threshold line; overrides the SAP value"
+    )
+    report.add_argument("--outdir", default="dist/drift")
+    report.set_defaults(func=_report_command)
+    return parser
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    try:
+        return int(args.func(args))
+    except (ValueError, OSError, sqlite3.Error) as exc:
+        parser.error(str(exc))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
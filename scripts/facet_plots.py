@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+
+"""
+Faceted small-multiples of per-group estimates with confidence intervals.
+
+The publication figures draw one panel per attribute, which stops being
+readable once intersectional groups or many runs are involved. This engine
+sorts the input once by (facet, label), cuts the sorted arrays at facet
+boundaries, splits oversized facets into numbered parts and lays the facets
+out on pages of ``--rows`` x ``--cols`` panels. Each panel is a single
+vectorized ``errorbar`` call, so the work is linear in the number of groups.
+
+Default columns match ``intersectional_slices.csv``; ``--counts`` derives
+Wilson intervals from ``selected``/``n`` instead (for example
+``intake/selection_rates.csv`` faceted by ``attribute``).
+
+Outputs (default ``dist/facets``):
+  - <stem>.pdf                 multi-page PDF (``--layout multipage``), or
+  - <stem>_p001.pdf, ...       one PDF per page (``--layout numbered``)
+  - <stem>_include.tex         figure environments that lay the pages out
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+from intersectional_slices import wilson_interval
+
+
+_PDF_METADATA = {
+    "Creator": "Equilens FL-BSA whitepaper",
+    "Producer": "Equilens FL-BSA whitepaper",
+    "CreationDate": None,
+    "ModDate": None,
+}
+_DEFAULT_CAPTION = "Selection rates with 95\\% confidence intervals by facet"
+
+
+def build_facets(
+    frame: pd.DataFrame,
+    *,
+    facet_column: str,
+    label_column: str,
+    value_column: str,
+    low_column: str,
+    high_column: str,
+    max_groups: int = 25,
+) -> list[dict[str, Any]]:
+    """Group rows into facets of at most ``max_groups`` labels with one sort."""
+
+    if max_groups <= 0:
+        raise ValueError("max_groups must be positive")
+    columns = [facet_column, label_column, value_column, low_column, high_column]
+    missing = [name for name in dict.fromkeys(columns) if name not in frame.columns]
+    if missing:
+        raise ValueError("input is missing columns: " + ", ".join(missing))
+
+    data = frame[list(dict.fromkeys(columns))].dropna(
+        subset=[value_column, low_column, high_column]
+    )
+    keys = pd.DataFrame(
+        {"facet": data[facet_column].astype(str), "label": data[label_column].astype(str)}
+    )
+    order = np.lexsort((keys["label"].to_numpy(), keys["facet"].to_numpy()))
+    facet_names = keys["facet"].to_numpy()[order]
+    labels = keys["label"].to_numpy()[order]
+    values = data[value_column].to_numpy(dtype=float)[order]
+    lows = data[low_column].to_numpy(dtype=float)[order]
+    highs = data[high_column].to_numpy(dtype=float)[order]
+
+    boundaries = np.flatnonzero(facet_names[1:] != facet_names[:-1]) + 1
+    starts = np.concatenate(([0], boundaries))
+    stops = np.concatenate((boundaries, [len(labels)]))
+    facets: list[dict[str, Any]] = []
+    for start, stop in zip(starts.tolist(), stops.tolist()):
+        if stop <= start:
+            continue
+        parts = list(range(start, stop, max_groups))
+        for index, part_start in enumerate(parts, start=1):
+            part = slice(part_start, min(part_start + max_groups, stop))
+            title = facet_names[start]
+            if len(parts) > 1:
+                title = f"{title} ({index}/{len(parts)})"
+            facets.append(
+                {
+                    "title": title,
+                    "labels": labels[part],
+                    "value": values[part],
+                    "low": lows[part],
+                    "high": highs[part],
+                }
+            )
+    return facets
+
+
+def paginate(facets: list[dict[str, Any]], per_page: int) -> list[list[dict[str, Any]]]:
+    if per_page <= 0:
+        raise ValueError("facets per page must be positive")
+    return [facets[start : start + per_page] for start in range(0, len(facets), per_page)]
+
+
+def _draw_page(
+    page: list[dict[str, Any]],
+    *,
+    rows: int,
+    cols: int,
+    max_groups: int,
+    xlabel: str,
+    xlim: tuple[float, float] | None,
+    reference: float | None,
+) -> Any:
+    import matplotlib.pyplot as plt  # type: ignore[import]
+
+    height = rows * (0.9 + 0.16 * max_groups)
+    fig, axes = plt.subplots(rows, cols, figsize=(3.2 * cols, height), squeeze=False)
+    flat = axes.ravel()
+    for ax, facet in zip(flat, page):
+        value = facet["value"]
+        count = len(value)
+        y = np.arange(count - 1, -1, -1, dtype=float)
+        ax.errorbar(
+            value,
+            y,
+            xerr=[
+                np.maximum(value - facet["low"], 0.0),
+                np.maximum(facet["high"] - value, 0.0),
+            ],
+            fmt="o",
+            capsize=2,
+            color="black",
+            ecolor="black",
+            elinewidth=0.7,
+            markersize=3,
+        )
+        if reference is not None:
+            ax.axvline(reference, linestyle="--", color="#a33a3a", linewidth=0.8)
+        ax.set_yticks(y)
+        ax.set_yticklabels(facet["labels"].tolist(), fontsize=6)
+        # Same slot height in every panel so partial facets stay comparable.
+        ax.set_ylim(-0.5 - (max_groups - count), count - 0.5)
+        if xlim is not None:
+            ax.set_xlim(*xlim)
+        ax.set_title(facet["title"], fontsize=8)
+        ax.set_xlabel(xlabel, fontsize=7)
+        ax.tick_params(axis="x", labelsize=6)
+        ax.grid(True, axis="x", linestyle=":", linewidth=0.5)
+    for ax in flat[len(page) :]:
+        ax.axis("off")
+    fig.tight_layout()
+    return fig
+
+
+def render_facets(
+    facets: list[dict[str, Any]],
+    outdir: Path,
+    *,
+    stem: str = "facets",
+    rows: int = 3,
+    cols: int = 3,
+    layout: str = "multipage",
+    max_groups: int = 25,
+    xlabel: str = "Selection rate",
+    xlim: tuple[float, float] | None = (0.0, 1.0),
+    reference: float | None = None,
+) -> list[tuple[Path, int]]:
+    """Render facet pages and return ``(pdf_path, page_number)`` per page."""
+
+    try:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt  # type: ignore[import]
+        from matplotlib.backends.backend_pdf import PdfPages  # type: ignore[import]
+    except Exception as exc:
+        raise ValueError("matplotlib is required to render facet pages") from exc
+
+    if layout not in {"multipage", "numbered"}:
+        raise ValueError(f"unsupported layout: {layout!r}")
+    pages = paginate(facets, rows * cols)
+    outdir.mkdir(parents=True, exist_ok=True)
+    for stale in outdir.glob(f"{stem}_p*.pdf"):
+        stale.unlink()
+    (outdir / f"{stem}.pdf").unlink(missing_ok=True)
+    options = {
+        "rows": rows,
+        "cols": cols,
+        "max_groups": max_groups,
+        "xlabel": xlabel,
+        "xlim": xlim,
+        "reference": reference,
+    }
+
+    rendered: list[tuple[Path, int]] = []
+    with matplotlib.rc_context({"pdf.fonttype": 42, "ps.fonttype": 42}):
+        if layout == "multipage":
+            path = outdir / f"{stem}.pdf"
+            with PdfPages(path, metadata=_PDF_METADATA) as pdf:
+                for number, page in enumerate(pages, start=1):
+                    fig = _draw_page(page, **options)
+                    pdf.savefig(fig)
+                    plt.close(fig)
+                    rendered.append((path, number))
+        else:
+            for number, page in enumerate(pages, start=1):
+                path = outdir / f"{stem}_p{number:03d}.pdf"
+                fig = _draw_page(page, **options)
+                fig.savefig(path, metadata=_PDF_METADATA)
+                plt.close(fig)
+                rendered.append((path, 1))
+    return rendered
+
+
+def write_include(
+    rendered: list[tuple[Path, int]], out_path: Path, *, stem: str, caption: str
+) -> None:
+    """Write one float page per rendered page; paths are kept as given."""
+
+    label = re.sub(r"[^A-Za-z0-9]+", "-", stem).strip("-") or "facets"
+    total = len(rendered)
+    with out_path.open("w", encoding="utf-8") as f:
+        f.write("% Generated by scripts/facet_plots.py; do not edit.\n")
+        for index, (path, page) in enumerate(rendered, start=1):
+            f.write("\\begin{figure}[p]\n\\centering\n")
+            f.write(
+                "\\includegraphics[width=\\textwidth,height=0.85\\textheight,"
+                f"keepaspectratio,page={page}]{{{path.as_posix()}}}\n"
+            )
+            suffix = f" (page {index} of {total})" if total > 1 else ""
+            f.write(f"\\caption{{{caption}{suffix}.}}\n")
+            f.write(f"\\label{{fig:{label}-p{index}}}\n")
+            f.write("\\end{figure}\n")
+
+
+def _load_frame(args: argparse.Namespace) -> tuple[pd.DataFrame, str, str]:
+    path = Path(args.input)
+    if not path.is_file():
+        raise ValueError(f"input CSV not found: {path}")
+    frame = pd.read_csv(path)
+    if not args.counts:
+        return frame, args.ci_low_column, args.ci_high_column
+    missing = [name for name in ("selected", "n") if name not in frame.columns]
+    if missing:
+        raise ValueError("--counts needs columns: " + ", ".join(missing))
+    frame = frame[frame["n"] > 0].copy()
+    frame[args.value_column] = frame["selected"] / frame["n"]
+    frame["_ci_low"], frame["_ci_high"] = wilson_interval(frame["selected"], frame["n"])
+    return frame, "_ci_low", "_ci_high"
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", required=True, help="CSV with one row per group estimate")
+    parser.add_argument("--facet-column", default="attributes")
+    parser.add_argument("--label-column", default="group")
+    parser.add_argument("--value-column", default="selection_rate")
+    parser.add_argument("--ci-low-column", default="selection_rate_ci_low")
+    parser.add_argument("--ci-high-column", default="selection_rate_ci_high")
+    parser.add_argument(
+        "--counts",
+        action="store_true",
+        help="Compute the value and Wilson 95%% CI from selected/n columns",
+    )
+    parser.add_argument("--max-groups-per-facet", type=int, default=25)
+    parser.add_argument("--rows", type=int, default=3)
+    parser.add_argument("--cols", type=int, default=3)
+    parser.add_argument("--layout", choices=("multipage", "numbered"), default="multipage")
+    parser.add_argument("--xlabel", default="Selection rate")
+    parser.add_argument(
+        "--xlim",
+        default="0,1",
+        help="Shared x-axis limits as 'low,high', or 'auto'",
+    )
+    parser.add_argument("--reference-line", type=float, default=None)
+    parser.add_argument("--caption", default=_DEFAULT_CAPTION, help="LaTeX caption text")
+    parser.add_argument("--stem", default="facets")
+    parser.add_argument("--outdir", default="dist/facets")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.rows <= 0 or args.cols <= 0:
+            raise ValueError("--rows and --cols must be positive")
+        if args.xlim == "auto":
+            xlim = None
+        else:
+            try:
+                low, high = (float(part) for part in args.xlim.split(","))
+            except ValueError as exc:
+                raise ValueError(f"invalid --xlim: {args.xlim!r}") from exc
+            xlim = (low, high)
+        frame, low_column, high_column = _load_frame(args)
+        facets = build_facets(
+            frame,
+            facet_column=args.facet_column,
+            label_column=args.label_column,
+            value_column=args.value_column,
+            low_column=low_column,
+            high_column=high_column,
+            max_groups=args.max_groups_per_facet,
+        )
+        if not facets:
+            raise ValueError("input has no rows with a value and confidence interval")
+        outdir = Path(args.outdir)
+        rendered = render_facets(
+            facets,
+            outdir,
+            stem=args.stem,
+            rows=args.rows,
+            cols=args.cols,
+            layout=args.layout,
+            max_groups=args.max_groups_per_facet,
+            xlabel=args.xlabel,
+            xlim=xlim,
+            reference=args.reference_line,
+        )
+    except (ValueError, OSError) as exc:
+        parser.error(str(exc))
+
+    include = outdir / f"{args.stem}_include.tex"
+    write_include(rendered, include, stem=args.stem, caption=args.caption)
+    groups = sum(len(facet["labels"]) for facet in facets)
+    print(f"Wrote {len(rendered)} page(s), {len(facets)} facets, {groups} groups to {outdir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""Local stand-in for the GitHub REST endpoints the intake pull reads.
+
+``FakeGitHubAPI`` is an asyncio HTTP/1.1 server (keep-alive, ETag /
+``If-None-Match`` -> 304, bearer-token check, optional per-request latency)
+serving the producer side of ``pull-wp-intake.yml``:
+
+* ``GET /repos/{repo}/actions/workflows/{file}/runs`` (``branch``, ``status``,
+  ``per_page``), newest run first;
+* ``GET /repos/{repo}/actions/runs/{id}``, stepping through the run's queued
+  statuses one request at a time so polling can be exercised;
+* ``GET /repos/{repo}/actions/runs/{id}/artifacts`` (``per_page``, ``page``);
+* ``GET /repos/{repo}/actions/artifacts/{id}/zip``, a 302 to ``/blobs/{id}``
+  the way GitHub redirects to signed storage URLs;
+* ``GET /repos/{repo}/git/ref/tags/{tag}`` and ``/git/tags/{sha}``.
+
+It counts connections, requests per route and 304s, so tests and
+``producer_artifacts.py bench`` can measure the discovery-and-download path
+without the network.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import json
+import re
+import zipfile
+from collections import Counter
+from typing import Any, Iterable
+from urllib.parse import parse_qs, urlsplit
+
+
+DEFAULT_REPO = "equilens-labs/fl-bsa"
+CHUNK_SIZE = 1 << 16
+_REASONS = {200: "OK", 302: "Found", 304: "Not Modified", 401: "Unauthorized", 404: "Not Found"}
+_ROUTES = (
+    ("workflow_runs", re.compile(r"/repos/([^/]+/[^/]+)/actions/workflows/([^/]+)/runs")),
+    ("run", re.compile(r"/repos/([^/]+/[^/]+)/actions/runs/(\d+)")),
+    ("artifacts", re.compile(r"/repos/([^/]+/[^/]+)/actions/runs/(\d+)/artifacts")),
+    ("zip", re.compile(r"/repos/([^/]+/[^/]+)/actions/artifacts/(\d+)/zip")),
+    ("ref", re.compile(r"/repos/([^/]+/[^/]+)/git/ref/tags/(.+)")),
+    ("tag", re.compile(r"/repos/([^/]+/[^/]+)/git/tags/([0-9a-f]{40})")),
+    ("blob", re.compile(r"/blobs/(\d+)")),
+)
+
+
+def artifact_zip(member: str, data: bytes) -> bytes:
+    """An Actions artifact archive holding ``member`` (the producer's bundle ZIP)."""
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        info = zipfile.ZipInfo(member, date_time=(2026, 1, 1, 0, 0, 0))
+        info.external_attr = 0o100644 << 16
+        archive.writestr(info, data)
+    return buffer.getvalue()
+
+
+class FakeGitHubAPI:
+    """In-process GitHub API stand-in; use as ``async with FakeGitHubAPI() as api``."""
+
+    def __init__(
+        self, *, repo: str = DEFAULT_REPO, token: str | None = None, latency: float = 0.0
+    ) -> None:
+        self.repo = repo
+        self.token = token
+        self.latency = latency
+        self.runs: dict[int, dict[str, Any]] = {}
+        self.artifacts: dict[int, list[dict[str, Any]]] = {}
+        self.blobs: dict[int, bytes] = {}
+        self.refs: dict[str, dict[str, Any]] = {}
+        self.tags: dict[str, dict[str, Any]] = {}
+        self.requests: Counter[str] = Counter()
+        self.connections = 0
+        self.not_modified = 0
+        self.blob_authorization: list[str] = []
+        self._statuses: dict[int, list[str]] = {}
+        self._next_artifact = 9000
+        self._server: asyncio.AbstractServer | None = None
+        self._handlers: dict[asyncio.Task[None], asyncio.StreamWriter] = {}
+        self.url = ""
+
+    # Fixture data.
+
+    def add_run(
+        self,
+        run_id: int,
+        *,
+        workflow: str = "wp-evidence-nightly.yml",
+        branch: str = "main",
+        head_sha: str = "a" * 40,
+        event: str = "schedule",
+        run_attempt: int = 1,
+        statuses: Iterable[str] = ("completed",),
+        conclusion: str = "success",
+        run_started_at: str = "2026-01-01T00:00:00Z",
+    ) -> dict[str, Any]:
+        statuses = list(statuses)
+        run = {
+            "id": run_id,
+            "path": f".github/workflows/{workflow}@refs/heads/{branch}",
+            "head_branch": branch,
+            "head_sha": head_sha,
+            "head_repository": {"full_name": self.repo},
+            "event": event,
+            "run_attempt": run_attempt,
+            "run_started_at": run_started_at,
+            "status": statuses[0],
+            "conclusion": None,
+            "_conclusion": conclusion,
+        }
+        self.runs[run_id] = run
+        self._statuses[run_id] = statuses
+        self.artifacts.setdefault(run_id, [])
+        return run
+
+    def add_artifact(
+        self,
+        run_id: int,
+        name: str,
+        data: bytes,
+        *,
+        expired: bool = False,
+        created_at: str = "2026-01-01T00:10:00Z",
+        **overrides: Any,
+    ) -> dict[str, Any]:
+        run = self.runs[run_id]
+        self._next_artifact += 1
+        artifact = {
+            "id": self._next_artifact,
+            "name": name,
+            "size_in_bytes": len(data),
+            "digest": "sha256:" + hashlib.sha256(data).hexdigest(),
+            "expired": expired,
+            "created_at": created_at,
+            "workflow_run": {
+                "id": run_id,
+                "head_branch": run["head_branch"],
+                "head_sha": run["head_sha"],
+            },
+            **overrides,
+        }
+        self.artifacts[run_id].append(artifact)
+        self.blobs[artifact["id"]] = data
+        return artifact
+
+    def add_tag(self, tag: str, commit_sha: str, *, annotated: int = 0) -> None:
+        """Point ``tag`` at ``commit_sha`` through ``annotated`` tag objects."""
+
+        target = {"type": "commit", "sha": commit_sha}
+        for depth in range(annotated):
+            sha = hashlib.sha1(f"{tag}:{depth}:{commit_sha}".encode()).hexdigest()
+            self.tags[sha] = {"sha": sha, "object": target}
+            target = {"type": "tag", "sha": sha}
+        self.refs[tag] = {"ref": f"refs/tags/{tag}", "object": target}
+
+    # Server.
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        host, port = self._server.sockets[0].getsockname()[:2]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            # Drop idle keep-alive connections so their handlers see EOF and finish.
+            for writer in self._handlers.values():
+                writer.close()
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> FakeGitHubAPI:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        task = asyncio.current_task()
+        assert task is not None
+        self._handlers[task] = writer
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                method, target, _ = lines[0].split(" ", 2)
+                headers = {}
+                for line in lines[1:]:
+                    if line:
+                        name, _, value = line.partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                status, extra, body = self._respond(method, target, headers)
+                response = [f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}"]
+                response += [f"{name}: {value}" for name, value in extra.items()]
+                response.append(f"Content-Length: {len(body)}")
+                writer.write(("\r\n".join(response) + "\r\n\r\n").encode("latin-1"))
+                for offset in range(0, len(body), CHUNK_SIZE):
+                    writer.write(body[offset : offset + CHUNK_SIZE])
+                    await writer.drain()
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        finally:
+            self._handlers.pop(task, None)
+            writer.close()
+
+    # Routes.
+
+    def _json(
+        self, payload: Any, headers: dict[str, str], status: int = 200
+    ) -> tuple[int, dict[str, str], bytes]:
+        body = json.dumps(payload, sort_keys=True).encode("utf-8")
+        etag = '"' + hashlib.sha256(body).hexdigest()[:20] + '"'
+        if status == 200 and headers.get("if-none-match") == etag:
+            self.not_modified += 1
+            return 304, {"ETag": etag}, b""
+        return status, {"Content-Type": "application/json", "ETag": etag}, body
+
+    def _respond(
+        self, method: str, target: str, headers: dict[str, str]
+    ) -> tuple[int, dict[str, str], bytes]:
+        parts = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        for route, pattern in _ROUTES:
+            match = pattern.fullmatch(parts.path)
+            if match:
+                break
+        else:
+            return self._json({"message": "Not Found"}, headers, 404)
+        self.requests[route] += 1
+        if method != "GET":
+            return self._json({"message": "Not Found"}, headers, 404)
+        if route == "blob":
+            self.blob_authorization.append(headers.get("authorization", ""))
+            data = self.blobs.get(int(match.group(1)))
+            if data is None:
+                return self._json({"message": "Not Found"}, headers, 404)
+            return 200, {"Content-Type": "application/zip"}, data
+        if self.token and headers.get("authorization") != f"Bearer {self.token}":
+            return self._json({"message": "Bad credentials"}, headers, 401)
+        if match.group(1) != self.repo:
+            return self._json({"message": "Not Found"}, headers, 404)
+        key = match.group(2)
+        if route == "workflow_runs":
+            runs = [
+                self._public(run)
+                for _, run in sorted(self.runs.items(), reverse=True)
+                if run["path"].split("@")[0] == f".github/workflows/{key}"
+                and run["head_branch"] == query.get("branch", run["head_branch"])
+                and (
+                    query.get("status") != "success"
+                    or (run["status"] == "completed" and run["_conclusion"] == "success")
+                )
+            ]
+            per_page = int(query.get("per_page", 30))
+            return self._json({"total_count": len(runs), "workflow_runs": runs[:per_page]}, headers)
+        if route == "run":
+            run = self.runs.get(int(key))
+            if run is None:
+                return self._json({"message": "Not Found"}, headers, 404)
+            statuses = self._statuses[int(key)]
+            run["status"] = statuses.pop(0) if len(statuses) > 1 else statuses[0]
+            run["conclusion"] = run["_conclusion"] if run["status"] == "completed" else None
+            return self._json(self._public(run), headers)
+        if route == "artifacts":
+            artifacts = self.artifacts.get(int(key))
+            if artifacts is None:
+                return self._json({"message": "Not Found"}, headers, 404)
+            per_page = min(int(query.get("per_page", 30)), 100)
+            start = (int(query.get("page", 1)) - 1) * per_page
+            page = artifacts[start : start + per_page]
+            return self._json({"total_count": len(artifacts), "artifacts": page}, headers)
+        if route == "zip":
+            if int(key) not in self.blobs:
+                return self._json({"message": "Not Found"}, headers, 404)
+            return 302, {"Location": f"{self.url}/blobs/{key}"}, b""
+        table = self.refs if route == "ref" else self.tags
+        if key not in table:
+            return self._json({"message": "Not Found"}, headers, 404)
+        return self._json(table[key], headers)
+
+    @staticmethod
+    def _public(run: dict[str, Any]) -> dict[str, Any]:
+        return {key: value for key, value in run.items() if not key.startswith("_")}
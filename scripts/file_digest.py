@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Streaming SHA-256 of publication artifacts, hashed concurrently and memoized.
+
+``file_digest`` hashes a file through ``hashlib.file_digest`` (fixed-size
+``readinto`` chunks), so memory stays flat whatever the artifact size, and
+remembers the result by path, size, mtime and inode for the rest of the
+process: a manifest build that checks the same ZIP twice reads it once. As in
+Git's racy-clean rule, a file modified within ``RACY_SECONDS`` of being hashed
+is not remembered, since a same-size rewrite inside one timestamp tick would
+keep its key.
+``digest_files`` hashes several files on a thread pool; hashlib releases the
+GIL while it hashes, so large artifacts are read and hashed in parallel.
+
+Errors are the ``OSError`` of the failed read; callers wrap them in their own
+error type. ``python scripts/file_digest.py FILE ...`` prints
+``sha256sum``-style lines.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, NamedTuple
+
+
+CHUNK_SIZE = 1 << 20
+MAX_WORKERS = 8
+RACY_SECONDS = 2
+
+
+class FileDigest(NamedTuple):
+    sha256: str
+    size: int
+
+
+_MEMO: dict[tuple[str, int, int, int, int], FileDigest] = {}
+_MEMO_LOCK = threading.Lock()
+
+
+def _key(path: Path, stat: os.stat_result) -> tuple[str, int, int, int, int]:
+    return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns, stat.st_dev, stat.st_ino)
+
+
+def _stream_sha256(handle) -> str:
+    if hasattr(hashlib, "file_digest"):
+        return hashlib.file_digest(handle, "sha256").hexdigest()
+    digest = hashlib.sha256()
+    buffer = bytearray(CHUNK_SIZE)
+    view = memoryview(buffer)
+    while size := handle.readinto(buffer):
+        digest.update(view[:size])
+    return digest.hexdigest()
+
+
+def file_digest(path: Path) -> FileDigest:
+    """SHA-256 and size of ``path``, reusing this process's earlier result."""
+
+    with open(path, "rb") as handle:
+        before = os.fstat(handle.fileno())
+        key = _key(path, before)
+        with _MEMO_LOCK:
+            cached = _MEMO.get(key)
+        if cached is not None:
+            return cached
+        result = FileDigest(_stream_sha256(handle), before.st_size)
+        after = os.fstat(handle.fileno())
+    # A file rewritten while (or just before) it was read is hashed again next time.
+    racy = time.time_ns() - after.st_mtime_ns < RACY_SECONDS * 1_000_000_000
+    if _key(path, after) == key and not racy:
+        with _MEMO_LOCK:
+            _MEMO[key] = result
+    return result
+
+
+def digest_files(
+    paths: Iterable[Path], *, max_workers: int = MAX_WORKERS
+) -> dict[Path, FileDigest]:
+    """``file_digest`` of every path, hashed concurrently; raises the first error."""
+
+    paths = list(dict.fromkeys(paths))
+    if len(paths) <= 1:
+        return {path: file_digest(path) for path in paths}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as pool:
+        return dict(zip(paths, pool.map(file_digest, paths)))
+
+
+def prefetch(paths: Iterable[Path], *, max_workers: int = MAX_WORKERS) -> None:
+    """Hash ``paths`` concurrently into the memo; unreadable files are left to the caller."""
+
+    paths = list(dict.fromkeys(paths))
+    if not paths:
+        return
+
+    def _quiet(path: Path) -> None:
+        try:
+            file_digest(path)
+        except OSError:
+            pass
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as pool:
+        list(pool.map(_quiet, paths))
+
+
+def clear_cache() -> None:
+    with _MEMO_LOCK:
+        _MEMO.clear()
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+", type=Path)
+    args = parser.parse_args(argv)
+    try:
+        digests = digest_files(args.paths)
+    except OSError as exc:
+        parser.error(str(exc))
+    for path, digest in digests.items():
+        print(f"{digest.sha256}  {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,14 +13,52 @@ Outputs (PDF figures under figures/):
   - selection_rates.pdf  (selection rates by attribute with 95% CIs)
   - air_summary.pdf      (AIR per attribute with 95% CIs and threshold line)
   - gender_air_slices.pdf (historical / amplification / intrinsic gender AIR)
+
+With ``--certificates DIR`` (off by default) the training_convergence and
+hyperparameter_tuning certificates are searched for per-epoch / per-trial
+histories; each series is downsampled with Largest-Triangle-Three-Buckets to
+``--history-points`` and drawn as training_convergence.pdf and
+tuning_trajectory.pdf. Certificates without histories produce no figure.
+
+Figures are independent, so ``--jobs N`` renders them in a process pool whose
+workers import Matplotlib and apply the publication style once at start-up.
+
+With ``--cache-dir`` each figure is keyed by the SHA-256 of the exact input
+subset its generator reads, this script's source, the Matplotlib version, the
+active rcParams and ``_PDF_METADATA``. A hit restores the cached PDF (bytes are
+identical because the metadata dates are nulled); with ``--require-all`` an
+output already matching its current key is left untouched instead of being
+deleted and regenerated.
+
+Lines and collections with more than ``--rasterize-above`` points are embedded
+as ``--raster-dpi`` images while axes, ticks and text stay vector, and fonts are
+always subset Type 42. Each written PDF's size, object count, raster images and
+Type 3 fonts are printed after rendering.
+
+``--backend pgf`` skips Matplotlib entirely and writes, for each figure, a
+``<name>.tex`` pgfplots picture plus compact ``.dat`` tables from the same
+parsed intake rows. Input the ``.tex`` after loading the pgfplots package (and
+its groupplots library for selection_rates); the tables are read from the
+``WPFigureDataDir`` macro, which defaults to ``--outdir`` relative to the
+LaTeX build directory. TikZ externalization can then cache the compiled
+figures across builds.
 """
 
 from __future__ import annotations
 
 import argparse
+import filecmp
+import hashlib
 import json
+import math
+import os
+import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Any, Callable
 
+import numpy as np
 import pandas as pd
 
 
@@ -35,12 +73,72 @@ _EXPECTED_FIGURES = (
     "gender_air_slices.pdf",
     "selection_rates.pdf",
 )
+# Optional figures drawn from --certificates when they carry histories.
+_HISTORY_FIGURES = ("training_convergence.pdf", "tuning_trajectory.pdf")
+
+
+# Lines and collections with more points than ``rasterize_above`` are embedded as
+# images at ``raster_dpi``; axes, ticks and text always stay vector. 0 disables.
+_PDF_OUTPUT: dict[str, int] = {"rasterize_above": 5000, "raster_dpi": 300}
+_PDF_OBJECT_RE = re.compile(rb"(?m)^\d+ \d+ obj\b")
+
+
+def _artist_point_count(artist: Any) -> int:
+    from matplotlib.collections import Collection  # type: ignore[import]
+    from matplotlib.lines import Line2D  # type: ignore[import]
+
+    if isinstance(artist, Line2D):
+        return len(artist.get_xydata())
+    if isinstance(artist, Collection):
+        vertices = sum(len(path.vertices) for path in artist.get_paths())
+        return max(len(artist.get_offsets()), vertices)
+    return 0
+
+
+def _rasterize_dense_artists(fig: Any, rasterize_above: int) -> int:
+    if rasterize_above <= 0:
+        return 0
+    rasterized = 0
+    for ax in fig.axes:
+        for artist in (*ax.lines, *ax.collections):
+            if _artist_point_count(artist) > rasterize_above:
+                artist.set_rasterized(True)
+                rasterized += 1
+    return rasterized
 
 
 def _save_pdf(fig: object, out_path: Path) -> None:
-    """Write stable PDF bytes for an identical figure and Matplotlib runtime."""
+    """Write stable PDF bytes for an identical figure and Matplotlib runtime.
+
+    Dense artists are rasterized first (see ``_PDF_OUTPUT``). Fonts are written
+    as subset Type 42 regardless of the caller's rcParams, never Type 3.
+    """
+
+    import matplotlib as mpl  # type: ignore[import]
+
+    options: dict[str, Any] = {"metadata": _PDF_METADATA}
+    if _rasterize_dense_artists(fig, _PDF_OUTPUT["rasterize_above"]):
+        options["dpi"] = _PDF_OUTPUT["raster_dpi"]
+    with mpl.rc_context({"pdf.fonttype": 42, "ps.fonttype": 42}):
+        fig.savefig(out_path, **options)  # type: ignore[attr-defined]
+
+
+def _pdf_size_report(path: Path) -> dict[str, Any]:
+    data = path.read_bytes()
+    return {
+        "figure": path.name,
+        "bytes": len(data),
+        "objects": len(_PDF_OBJECT_RE.findall(data)),
+        # Soft masks (alpha channels) are image objects too; count only the images.
+        "raster_images": data.count(b"/Subtype /Image") - data.count(b"/SMask "),
+        "type3_fonts": data.count(b"/Subtype /Type3"),
+    }
 
-    fig.savefig(out_path, metadata=_PDF_METADATA)  # type: ignore[attr-defined]
+
+def _close_figure(fig: Any) -> None:
+    import matplotlib.pyplot as plt  # type: ignore[import]
+
+    plt.close(fig)
 
 
 def _maybe_set_style() -> None:
@@ -83,103 +181,67 @@ def _load_json(path: Path) -> dict:
         return {}
 
 
-def _missing_required_figures(outdir: Path) -> list[str]:
+def _expected_outputs(backend: str) -> list[str]:
+    suffix = ".tex" if backend == "pgf" else ".pdf"
+    return [str(Path(name).with_suffix(suffix)) for name in _EXPECTED_FIGURES]
+
+
+def _missing_required_figures(outdir: Path, backend: str = "pdf") -> list[str]:
     return [
         name
-        for name in _EXPECTED_FIGURES
+        for name in _expected_outputs(backend)
         if not (outdir / name).is_file() or (outdir / name).stat().st_size == 0
     ]
 
 
-def _generate_selection_rates_fig(
-    selection_rates: pd.DataFrame, metrics_long: pd.DataFrame, out_path: Path
-) -> None:
-    try:
-        import matplotlib.pyplot as plt  # type: ignore[import]
-    except Exception:
-        return
+def _ci(block: dict) -> list:
+    return block.get("ci95") or [None, None]
+
+
+def _selection_rate_panels(df: pd.DataFrame) -> list[tuple[str, pd.DataFrame]]:
+    """Split normalized selection-rate rows into the per-attribute panels drawn."""
 
+    if df.empty:
+        return []
+    preferred_attrs = ["gender", "race"]
+    present = [a for a in preferred_attrs if a in df["attribute"].unique()]
+    if not present:
+        present = sorted(df["attribute"].unique())
+    # One groupby instead of a boolean mask over the whole frame per attribute.
+    groups = dict(tuple(df.groupby("attribute", sort=False)))
+    panels = []
+    for attr in present:
+        sub = groups.get(attr, df.iloc[:0])
+        panels.append((attr, sub.sort_values("group_name") if not sub.empty else sub.copy()))
+    return panels
+
+
+def _selection_rate_panels_from_metrics(
+    selection_rates: pd.DataFrame, metrics_long: pd.DataFrame
+) -> list[tuple[str, pd.DataFrame]]:
     if selection_rates.empty or metrics_long.empty:
-        return
+        return []
 
     m = metrics_long.copy()
     m["metric_l"] = m["metric"].str.lower()
     sel_m = m[m["metric_l"] == "selection_rate"].copy()
     if sel_m.empty:
-        return
+        return []
 
     # Prefer canonical CI columns when available
-    if "ci_low" in sel_m.columns and "ci_high" in sel_m.columns:
-        ci_low_col = "ci_low"
-        ci_high_col = "ci_high"
-    else:
-        ci_low_col = "lower_ci"
-        ci_high_col = "upper_ci"
+    if "ci_low" not in sel_m.columns or "ci_high" not in sel_m.columns:
+        sel_m = sel_m.rename(columns={"lower_ci": "ci_low", "upper_ci": "ci_high"})
 
     # Extract attribute and group from "{attribute}:{group}" key
     sel_m["attribute"] = sel_m["group"].str.split(":", n=1).str[0]
     sel_m["group_name"] = sel_m["group"].str.split(":", n=1).str[1]
+    return _selection_rate_panels(sel_m)
 
-    preferred_attrs = ["gender", "race"]
-    present = [a for a in preferred_attrs if a in sel_m["attribute"].unique()]
-    if not present:
-        present = sorted(sel_m["attribute"].unique())
-    if not present:
-        return
-
-    n_attr = len(present)
-    fig, axes = plt.subplots(
-        1, n_attr, figsize=(3.6 * n_attr, 2.8), sharey=True, squeeze=False
-    )
-    axes_row = axes[0]
-
-    for ax, attr in zip(axes_row, present):
-        sub = sel_m[sel_m["attribute"] == attr].copy()
-        if sub.empty:
-            ax.axis("off")
-            continue
-        sub = sub.sort_values("group_name")
-
-        x = sub["value"].to_numpy()
-        y = sub["group_name"].to_numpy()
-        lo = sub[ci_low_col].to_numpy()
-        hi = sub[ci_high_col].to_numpy()
-        err_low = x - lo
-        err_high = hi - x
-
-        ax.errorbar(
-            x,
-            y,
-            xerr=[err_low, err_high],
-            fmt="o",
-            capsize=3,
-            color="black",
-            ecolor="black",
-            elinewidth=0.8,
-            markersize=4,
-        )
-        ax.set_xlabel("Selection rate")
-        ax.set_title(attr.capitalize())
-        ax.set_xlim(0.0, 1.0)
-        ax.grid(True, axis="x", linestyle=":", linewidth=0.5)
-
-    axes_row[0].set_ylabel("Group")
-    fig.tight_layout()
-    _save_pdf(fig, out_path)
-    plt.close(fig)
-
-
-def _generate_selection_rates_fig_from_uncertainty(
-    uncertainty: dict, out_path: Path
-) -> None:
-    try:
-        import matplotlib.pyplot as plt  # type: ignore[import]
-    except Exception:
-        return
 
+def _selection_rate_panels_from_uncertainty(uncertainty: dict) -> list[tuple[str, pd.DataFrame]]:
     fu = uncertainty.get("fairness_uncertainty")
     if not isinstance(fu, dict) or not fu:
-        return
+        return []
 
     rows: list[dict[str, object]] = []
 
@@ -195,8 +257,8 @@ def _generate_selection_rates_fig_from_uncertainty(
                 "attribute": "gender",
                 "group_name": ref,
                 "value": ref_sr.get("p"),
-                "ci_low": (ref_sr.get("ci95") or [None, None])[0],
-                "ci_high": (ref_sr.get("ci95") or [None, None])[1],
+                "ci_low": _ci(ref_sr)[0],
+                "ci_high": _ci(ref_sr)[1],
             }
         )
         rows.append(
@@ -204,8 +266,8 @@ def _generate_selection_rates_fig_from_uncertainty(
                 "attribute": "gender",
                 "group_name": prot,
                 "value": prot_sr.get("p"),
-                "ci_low": (prot_sr.get("ci95") or [None, None])[0],
-                "ci_high": (prot_sr.get("ci95") or [None, None])[1],
+                "ci_low": _ci(prot_sr)[0],
+                "ci_high": _ci(prot_sr)[1],
             }
         )
 
@@ -227,8 +289,8 @@ def _generate_selection_rates_fig_from_uncertainty(
                         "attribute": "race",
                         "group_name": ref,
                         "value": ref_sr.get("p"),
-                        "ci_low": (ref_sr.get("ci95") or [None, None])[0],
-                        "ci_high": (ref_sr.get("ci95") or [None, None])[1],
+                        "ci_low": _ci(ref_sr)[0],
+                        "ci_high": _ci(ref_sr)[1],
                     }
                 )
                 ref_written = True
@@ -237,133 +299,47 @@ def _generate_selection_rates_fig_from_uncertainty(
                     "attribute": "race",
                     "group_name": str(prot_group),
                     "value": prot_sr.get("p"),
-                    "ci_low": (prot_sr.get("ci95") or [None, None])[0],
-                    "ci_high": (prot_sr.get("ci95") or [None, None])[1],
+                    "ci_low": _ci(prot_sr)[0],
+                    "ci_high": _ci(prot_sr)[1],
                 }
             )
 
     if not rows:
-        return
-
-    df = pd.DataFrame(rows)
-    df = df.dropna(subset=["value", "ci_low", "ci_high"])
-    if df.empty:
-        return
-
-    preferred_attrs = ["gender", "race"]
-    present = [a for a in preferred_attrs if a in df["attribute"].unique()]
-    if not present:
-        present = sorted(df["attribute"].unique())
-    if not present:
-        return
-
-    n_attr = len(present)
-    fig, axes = plt.subplots(
-        1, n_attr, figsize=(3.6 * n_attr, 2.8), sharey=True, squeeze=False
-    )
-    axes_row = axes[0]
-
-    for ax, attr in zip(axes_row, present):
-        sub = df[df["attribute"] == attr].copy()
-        if sub.empty:
-            ax.axis("off")
-            continue
-        sub = sub.sort_values("group_name")
-        x = sub["value"].to_numpy()
-        y = sub["group_name"].to_numpy()
-        lo = sub["ci_low"].to_numpy()
-        hi = sub["ci_high"].to_numpy()
-        err_low = x - lo
-        err_high = hi - x
-        ax.errorbar(
-            x,
-            y,
-            xerr=[err_low, err_high],
-            fmt="o",
-            capsize=3,
-            color="black",
-            ecolor="black",
-            elinewidth=0.8,
-            markersize=4,
-        )
-        ax.set_xlabel("Selection rate")
-        ax.set_title(attr.capitalize())
-        ax.set_xlim(0.0, 1.0)
-        ax.grid(True, axis="x", linestyle=":", linewidth=0.5)
-
-    axes_row[0].set_ylabel("Group")
-    fig.tight_layout()
-    _save_pdf(fig, out_path)
-    plt.close(fig)
-
+        return []
+    df = pd.DataFrame(rows).dropna(subset=["value", "ci_low", "ci_high"])
+    return _selection_rate_panels(df)
 
-def _generate_air_fig(metrics_long: pd.DataFrame, out_path: Path) -> None:
-    try:
-        import matplotlib.pyplot as plt  # type: ignore[import]
-    except Exception:
-        return
 
+def _air_points_from_metrics(metrics_long: pd.DataFrame) -> pd.DataFrame:
     if metrics_long.empty:
-        return
+        return pd.DataFrame()
 
     m = metrics_long.copy()
     m["metric_l"] = m["metric"].str.lower()
     air = m[m["metric_l"] == "air"].copy()
     if air.empty:
-        return
+        return pd.DataFrame()
 
     # Prefer canonical CI columns when available
-    if "ci_low" in air.columns and "ci_high" in air.columns:
-        ci_low_col = "ci_low"
-        ci_high_col = "ci_high"
-    else:
-        ci_low_col = "lower_ci"
-        ci_high_col = "upper_ci"
+    if "ci_low" not in air.columns or "ci_high" not in air.columns:
+        air = air.rename(columns={"lower_ci": "ci_low", "upper_ci": "ci_high"})
 
     air["attribute"] = air["group"].str.split(":", n=1).str[0]
     air = air.sort_values("attribute")
-
-    x_pos = range(len(air))
-    y = air["value"].to_numpy()
-    lo = air[ci_low_col].to_numpy()
-    hi = air[ci_high_col].to_numpy()
-    err_low = y - lo
-    err_high = hi - y
-
-    fig, ax = plt.subplots(figsize=(4.0, 3.0))
-    ax.errorbar(
-        x_pos,
-        y,
-        yerr=[err_low, err_high],
-        fmt="o",
-        capsize=3,
-        color="black",
-        ecolor="black",
-        elinewidth=0.8,
-        markersize=4,
+    return pd.DataFrame(
+        {
+            "label": air["attribute"].tolist(),
+            "value": air["value"].tolist(),
+            "ci_low": air["ci_low"].tolist(),
+            "ci_high": air["ci_high"].tolist(),
+        }
     )
-    ax.axhline(0.8, linestyle="--", color="red", linewidth=0.8, label="Threshold 0.80")
-    ax.set_xticks(list(x_pos))
-    ax.set_xticklabels(air["attribute"].tolist())
-    ax.set_ylabel("Adverse impact ratio (AIR)")
-    ymax = max(1.0, float(hi.max()) * 1.05, 0.85)
-    ax.set_ylim(0.0, ymax)
-    ax.grid(True, axis="y", linestyle=":", linewidth=0.5)
-    ax.legend(fontsize=8)
-    fig.tight_layout()
-    _save_pdf(fig, out_path)
-    plt.close(fig)
 
 
-def _generate_air_fig_from_uncertainty(uncertainty: dict, out_path: Path) -> None:
-    try:
-        import matplotlib.pyplot as plt  # type: ignore[import]
-    except Exception:
-        return
-
+def _air_points_from_uncertainty(uncertainty: dict) -> pd.DataFrame:
     fu = uncertainty.get("fairness_uncertainty")
     if not isinstance(fu, dict) or not fu:
-        return
+        return pd.DataFrame()
 
     rows: list[dict[str, object]] = []
 
@@ -374,8 +350,8 @@ def _generate_air_fig_from_uncertainty(uncertainty: dict, out_path: Path) -> Non
             {
                 "label": "gender",
                 "value": air.get("point"),
-                "ci_low": (air.get("ci95") or [None, None])[0],
-                "ci_high": (air.get("ci95") or [None, None])[1],
+                "ci_low": _ci(air)[0],
+                "ci_high": _ci(air)[1],
             }
         )
 
@@ -389,26 +365,303 @@ def _generate_air_fig_from_uncertainty(uncertainty: dict, out_path: Path) -> Non
             {
                 "label": f"race ({worst})",
                 "value": air.get("point"),
-                "ci_low": (air.get("ci95") or [None, None])[0],
-                "ci_high": (air.get("ci95") or [None, None])[1],
+                "ci_low": _ci(air)[0],
+                "ci_high": _ci(air)[1],
             }
         )
 
     if not rows:
-        return
+        return pd.DataFrame()
+    return pd.DataFrame(rows).dropna(subset=["value", "ci_low", "ci_high"])
 
-    df = pd.DataFrame(rows).dropna(subset=["value", "ci_low", "ci_high"])
-    if df.empty:
-        return
 
-    x_pos = range(len(df))
-    y = df["value"].to_numpy()
-    lo = df["ci_low"].to_numpy()
-    hi = df["ci_high"].to_numpy()
+_GENDER_SLICE_LABELS = (
+    ("historical", "Historical"),
+    ("amplification", "Amplification\n(bias-preserving)"),
+    ("intrinsic", "Intrinsic\n(de-biased)"),
+)
+
+
+def _gender_air_slice_points(fairness_slices: dict) -> tuple[pd.DataFrame, float]:
+    slices = fairness_slices.get("slices")
+    if not isinstance(slices, dict) or not slices:
+        return pd.DataFrame(), 0.8
+
+    rows: list[dict[str, object]] = []
+    for key, label in _GENDER_SLICE_LABELS:
+        slice_data = slices.get(key)
+        if not isinstance(slice_data, dict):
+            continue
+        air = slice_data.get("air")
+        if not isinstance(air, dict):
+            continue
+        ci = _ci(air)
+        rows.append(
+            {
+                "label": label,
+                "value": air.get("point"),
+                "ci_low": ci[0] if len(ci) > 0 else None,
+                "ci_high": ci[1] if len(ci) > 1 else None,
+            }
+        )
+
+    threshold = float(fairness_slices.get("air_threshold") or 0.8)
+    if not rows:
+        return pd.DataFrame(), threshold
+    return pd.DataFrame(rows).dropna(subset=["value", "ci_low", "ci_high"]), threshold
+
+
+# Certificate histories (per epoch / step / trial) are downsampled to this many
+# points per series before plotting.
+_HISTORY_POINTS = 500
+_HISTORY_MIN_LENGTH = 3
+_HISTORY_X_KEYS = ("epoch", "step", "iteration", "trial", "trial_number", "number")
+_HISTORY_OBJECTIVE_KEYS = ("objective", "value", "score", "loss", "metric")
+# Only these keys hold histories: record lists (one record per epoch / step /
+# trial) and per-epoch loss or metric series. Other numeric arrays in a
+# certificate (bin edges, per-group vectors, ...) are not plotted.
+_HISTORY_RECORDS_RE = re.compile(r"(^|_)(history|epochs|steps|iterations|trials)$")
+_HISTORY_SERIES_RE = re.compile(r"(^|_)(history|loss|losses|metric|metrics|objective|score)$")
+_HISTORY_FIELD_RE = re.compile(r"(^|_)(loss|metric|objective|score|value)$")
+_BRANCH_ORDER = ("intrinsic", "amplification")
+
+
+def _is_number(value: Any) -> bool:
+    return (
+        isinstance(value, (int, float))
+        and not isinstance(value, bool)
+        and math.isfinite(float(value))
+    )
+
+
+def _certificate_series(payload: Any, prefix: str = "") -> dict[str, tuple[list, list]]:
+    """Collect loss / metric histories in a certificate, keyed by dotted path.
+
+    A list of numbers under a loss, metric or history key is a series over its
+    index; a list of records under a history, epochs, steps or trials key is
+    one series per loss / metric / objective field over the first x key
+    (epoch, step, trial, ...) every record carries, or over the record index.
+    """
+
+    found: dict[str, tuple[list, list]] = {}
+    leaf = prefix.rsplit(".", 1)[-1].lower()
+    if isinstance(payload, dict):
+        for name, value in payload.items():
+            found.update(_certificate_series(value, f"{prefix}.{name}" if prefix else str(name)))
+    elif isinstance(payload, list) and len(payload) >= _HISTORY_MIN_LENGTH:
+        if all(_is_number(value) for value in payload):
+            if _HISTORY_SERIES_RE.search(leaf):
+                found[prefix] = (list(range(len(payload))), [float(value) for value in payload])
+        elif _HISTORY_RECORDS_RE.search(leaf) and all(
+            isinstance(record, dict) for record in payload
+        ):
+            x_key = next(
+                (
+                    key
+                    for key in _HISTORY_X_KEYS
+                    if all(_is_number(record.get(key)) for record in payload)
+                ),
+                None,
+            )
+            xs = [float(r[x_key]) for r in payload] if x_key else list(range(len(payload)))
+            fields = sorted(
+                {
+                    key
+                    for record in payload
+                    for key, value in record.items()
+                    if key != x_key
+                    and _HISTORY_FIELD_RE.search(str(key).lower())
+                    and _is_number(value)
+                }
+            )
+            for field in fields:
+                pairs = [
+                    (x, float(record[field]))
+                    for x, record in zip(xs, payload)
+                    if _is_number(record.get(field))
+                ]
+                if len(pairs) >= _HISTORY_MIN_LENGTH:
+                    found[f"{prefix}.{field}"] = ([x for x, _ in pairs], [y for _, y in pairs])
+    return found
+
+
+def _lttb(x: Any, y: Any, budget: int) -> tuple[np.ndarray, np.ndarray]:
+    """Largest-Triangle-Three-Buckets: keep at most ``budget`` visually salient points.
+
+    The first and last points are kept; every interior bucket contributes the
+    point forming the largest triangle with the previously kept point and the
+    mean of the next bucket. One pass, linear in the series length.
+    """
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = x.size
+    if budget < 3:
+        raise ValueError("LTTB needs a budget of at least 3 points")
+    if n <= budget:
+        return x, y
+    edges = np.linspace(1, n - 1, budget - 1).astype(np.int64)
+    keep = np.empty(budget, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = n - 1
+    anchor = 0
+    for bucket in range(budget - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < budget - 1:
+            next_x = x[stop : edges[bucket + 2]].mean()
+            next_y = y[stop : edges[bucket + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs(
+            (x[anchor] - next_x) * (y[start:stop] - y[anchor])
+            - (x[anchor] - x[start:stop]) * (next_y - y[anchor])
+        )
+        anchor = start + int(np.argmax(area))
+        keep[bucket + 1] = anchor
+    return x[keep], y[keep]
+
+
+def _branch_certificates(certificates_dir: Path, prefix: str) -> list[tuple[str, dict]]:
+    found = []
+    for path in sorted(certificates_dir.glob(f"{prefix}_*.json")):
+        payload = _load_json(path)
+        if payload:
+            found.append((str(payload.get("branch_mode") or path.stem[len(prefix) + 1 :]), payload))
+    rank = {branch: index for index, branch in enumerate(_BRANCH_ORDER)}
+    return sorted(found, key=lambda item: (rank.get(item[0], len(rank)), item[0]))
+
+
+def _series_labels(names: list[str]) -> list[str]:
+    short = [name.rsplit(".", 1)[-1] for name in names]
+    return [
+        label if short.count(label) == 1 else name for label, name in zip(short, names)
+    ]
+
+
+def _training_histories(certificates_dir: Path, budget: int) -> dict[str, list[dict]]:
+    """Loss / metric histories per branch from training_convergence certificates."""
+
+    histories: dict[str, list[dict]] = {}
+    for branch, payload in _branch_certificates(
+        certificates_dir, "training_convergence_certificate"
+    ):
+        series = _certificate_series(payload)
+        names = sorted(series)
+        entries = []
+        for name, label in zip(names, _series_labels(names)):
+            x, y = _lttb(*series[name], budget)
+            entries.append({"label": label, "x": x.tolist(), "y": y.tolist()})
+        if entries:
+            histories[branch] = entries
+    return histories
+
+
+def _tuning_trajectories(certificates_dir: Path, budget: int) -> dict[str, dict]:
+    """Per-trial objective and best-so-far per branch from tuning certificates."""
+
+    trajectories: dict[str, dict] = {}
+    for branch, payload in _branch_certificates(
+        certificates_dir, "hyperparameter_tuning_certificate"
+    ):
+        series = _certificate_series(payload)
+        if not series:
+            continue
+        names = sorted(series)
+        name = next(
+            (n for key in _HISTORY_OBJECTIVE_KEYS for n in names if n.rsplit(".", 1)[-1] == key),
+            None,
+        )
+        if name is None:
+            print(
+                f"No objective field ({', '.join(_HISTORY_OBJECTIVE_KEYS)}) in the {branch} "
+                "tuning certificate; tuning trajectory skipped"
+            )
+            continue
+        direction = str(
+            payload.get("direction") or payload.get("optimization_direction") or "minimize"
+        ).lower()
+        x, y = (np.asarray(values, dtype=float) for values in series[name])
+        best = np.maximum.accumulate(y) if direction.startswith("max") else np.minimum.accumulate(y)
+        trial_x, trial_y = _lttb(x, y, budget)
+        best_x, best_y = _lttb(x, best, budget)
+        trajectories[branch] = {
+            "label": name.rsplit(".", 1)[-1],
+            "direction": "maximize" if direction.startswith("max") else "minimize",
+            "x": trial_x.tolist(),
+            "y": trial_y.tolist(),
+            "best_x": best_x.tolist(),
+            "best_y": best_y.tolist(),
+        }
+    return trajectories
+
+
+def _air_ylim(hi: Any) -> tuple[float, float]:
+    return 0.0, max(1.0, float(hi.max()) * 1.05, 0.85)
+
+
+def _gender_air_slices_ylim(lo: Any, hi: Any, threshold: float) -> tuple[float, float]:
+    y_min = max(0.0, min(float(lo.min()), threshold) - 0.08)
+    y_max = max(float(hi.max()), threshold, 1.0) + 0.08
+    return y_min, y_max
+
+
+def _draw_selection_rates(panels: list[tuple[str, pd.DataFrame]]) -> Any:
+    try:
+        import matplotlib.pyplot as plt  # type: ignore[import]
+    except Exception:
+        return None
+
+    n_attr = len(panels)
+    fig, axes = plt.subplots(
+        1, n_attr, figsize=(3.6 * n_attr, 2.8), sharey=True, squeeze=False
+    )
+    axes_row = axes[0]
+
+    for ax, (attr, sub) in zip(axes_row, panels):
+        if sub.empty:
+            ax.axis("off")
+            continue
+        x = sub["value"].to_numpy()
+        y = sub["group_name"].to_numpy()
+        lo = sub["ci_low"].to_numpy()
+        hi = sub["ci_high"].to_numpy()
+        err_low = x - lo
+        err_high = hi - x
+        ax.errorbar(
+            x,
+            y,
+            xerr=[err_low, err_high],
+            fmt="o",
+            capsize=3,
+            color="black",
+            ecolor="black",
+            elinewidth=0.8,
+            markersize=4,
+        )
+        ax.set_xlabel("Selection rate")
+        ax.set_title(attr.capitalize())
+        ax.set_xlim(0.0, 1.0)
+        ax.grid(True, axis="x", linestyle=":", linewidth=0.5)
+
+    axes_row[0].set_ylabel("Group")
+    fig.tight_layout()
+    return fig
+
+
+def _draw_air(points: pd.DataFrame, *, figsize: tuple[float, float], ylabel: str) -> Any:
+    try:
+        import matplotlib.pyplot as plt  # type: ignore[import]
+    except Exception:
+        return None
+
+    x_pos = range(len(points))
+    y = points["value"].to_numpy()
+    lo = points["ci_low"].to_numpy()
+    hi = points["ci_high"].to_numpy()
     err_low = y - lo
     err_high = hi - y
 
-    fig, ax = plt.subplots(figsize=(4.5, 3.0))
+    fig, ax = plt.subplots(figsize=figsize)
     ax.errorbar(
         x_pos,
         y,
@@ -422,59 +675,25 @@ def _generate_air_fig_from_uncertainty(uncertainty: dict, out_path: Path) -> Non
     )
     ax.axhline(0.8, linestyle="--", color="red", linewidth=0.8, label="Threshold 0.80")
     ax.set_xticks(list(x_pos))
-    ax.set_xticklabels(df["label"].tolist())
-    ax.set_ylabel("Disparity ratio (AIR)")
-    ymax = max(1.0, float(hi.max()) * 1.05, 0.85)
-    ax.set_ylim(0.0, ymax)
+    ax.set_xticklabels(points["label"].tolist())
+    ax.set_ylabel(ylabel)
+    ax.set_ylim(*_air_ylim(hi))
     ax.grid(True, axis="y", linestyle=":", linewidth=0.5)
     ax.legend(fontsize=8)
     fig.tight_layout()
-    _save_pdf(fig, out_path)
-    plt.close(fig)
+    return fig
 
 
-def _generate_gender_air_slices_fig(fairness_slices: dict, out_path: Path) -> None:
+def _draw_gender_air_slices(points: pd.DataFrame, threshold: float) -> Any:
     try:
         import matplotlib.pyplot as plt  # type: ignore[import]
     except Exception:
-        return
+        return None
 
-    slices = fairness_slices.get("slices")
-    if not isinstance(slices, dict) or not slices:
-        return
-
-    ordered = [
-        ("historical", "Historical"),
-        ("amplification", "Amplification\n(bias-preserving)"),
-        ("intrinsic", "Intrinsic\n(de-biased)"),
-    ]
-    rows: list[dict[str, object]] = []
-    for key, label in ordered:
-        slice_data = slices.get(key)
-        if not isinstance(slice_data, dict):
-            continue
-        air = slice_data.get("air")
-        if not isinstance(air, dict):
-            continue
-        ci = air.get("ci95") or [None, None]
-        rows.append(
-            {
-                "label": label,
-                "value": air.get("point"),
-                "ci_low": ci[0] if len(ci) > 0 else None,
-                "ci_high": ci[1] if len(ci) > 1 else None,
-            }
-        )
-
-    df = pd.DataFrame(rows).dropna(subset=["value", "ci_low", "ci_high"])
-    if df.empty:
-        return
-
-    threshold = float(fairness_slices.get("air_threshold") or 0.8)
-    x_pos = range(len(df))
-    y = df["value"].to_numpy(dtype=float)
-    lo = df["ci_low"].to_numpy(dtype=float)
-    hi = df["ci_high"].to_numpy(dtype=float)
+    x_pos = range(len(points))
+    y = points["value"].to_numpy(dtype=float)
+    lo = points["ci_low"].to_numpy(dtype=float)
+    hi = points["ci_high"].to_numpy(dtype=float)
     err_low = y - lo
     err_high = hi - y
 
@@ -498,16 +717,672 @@ def _generate_gender_air_slices_fig(fairness_slices: dict, out_path: Path) -> No
         label=f"{threshold:.2f} threshold",
     )
     ax.set_xticks(list(x_pos))
-    ax.set_xticklabels(df["label"].tolist())
+    ax.set_xticklabels(points["label"].tolist())
     ax.set_ylabel("Adverse Impact Ratio (AIR)")
-    y_min = max(0.0, min(float(lo.min()), threshold) - 0.08)
-    y_max = max(float(hi.max()), threshold, 1.0) + 0.08
-    ax.set_ylim(y_min, y_max)
+    ax.set_ylim(*_gender_air_slices_ylim(lo, hi, threshold))
     ax.grid(True, axis="y", linestyle=":", linewidth=0.5)
     ax.legend(fontsize=8, loc="lower right")
     fig.tight_layout()
-    _save_pdf(fig, out_path)
-    plt.close(fig)
+    return fig
+
+
+def _draw_training_histories(histories: dict[str, list[dict]]) -> Any:
+    try:
+        import matplotlib.pyplot as plt  # type: ignore[import]
+    except Exception:
+        return None
+
+    fig, axes = plt.subplots(
+        1, len(histories), figsize=(3.6 * len(histories), 2.8), squeeze=False
+    )
+    for ax, (branch, entries) in zip(axes[0], histories.items()):
+        for entry in entries:
+            ax.plot(entry["x"], entry["y"], linewidth=0.9, label=entry["label"])
+        ax.set_title(branch.capitalize())
+        ax.set_xlabel("Epoch / step")
+        ax.grid(True, linestyle=":", linewidth=0.5)
+        ax.legend(fontsize=7)
+    axes[0][0].set_ylabel("Value")
+    fig.tight_layout()
+    return fig
+
+
+def _draw_tuning_trajectories(trajectories: dict[str, dict]) -> Any:
+    try:
+        import matplotlib.pyplot as plt  # type: ignore[import]
+    except Exception:
+        return None
+
+    fig, axes = plt.subplots(
+        1, len(trajectories), figsize=(3.6 * len(trajectories), 2.8), squeeze=False
+    )
+    for ax, (branch, trajectory) in zip(axes[0], trajectories.items()):
+        ax.plot(
+            trajectory["x"],
+            trajectory["y"],
+            "o",
+            color="black",
+            markersize=2.5,
+            label="Trial",
+        )
+        ax.step(
+            trajectory["best_x"],
+            trajectory["best_y"],
+            where="post",
+            color="#a33a3a",
+            linewidth=0.9,
+            label=f"Best so far ({trajectory['direction']})",
+        )
+        ax.set_title(branch.capitalize())
+        ax.set_xlabel("Trial")
+        ax.set_ylabel(trajectory["label"])
+        ax.grid(True, linestyle=":", linewidth=0.5)
+        ax.legend(fontsize=7)
+    fig.tight_layout()
+    return fig
+
+
+_AIR_FROM_METRICS_STYLE = {"figsize": (4.0, 3.0), "ylabel": "Adverse impact ratio (AIR)"}
+_AIR_FROM_UNCERTAINTY_STYLE = {"figsize": (4.5, 3.0), "ylabel": "Disparity ratio (AIR)"}
+
+
+def _generate_selection_rates_fig(
+    selection_rates: pd.DataFrame, metrics_long: pd.DataFrame, out_path: Path
+) -> None:
+    panels = _selection_rate_panels_from_metrics(selection_rates, metrics_long)
+    if panels:
+        fig = _draw_selection_rates(panels)
+        if fig is not None:
+            _save_pdf(fig, out_path)
+            _close_figure(fig)
+
+
+def _generate_selection_rates_fig_from_uncertainty(
+    uncertainty: dict, out_path: Path
+) -> None:
+    panels = _selection_rate_panels_from_uncertainty(uncertainty)
+    if panels:
+        fig = _draw_selection_rates(panels)
+        if fig is not None:
+            _save_pdf(fig, out_path)
+            _close_figure(fig)
+
+
+def _generate_air_fig(metrics_long: pd.DataFrame, out_path: Path) -> None:
+    points = _air_points_from_metrics(metrics_long)
+    if not points.empty:
+        fig = _draw_air(points, **_AIR_FROM_METRICS_STYLE)
+        if fig is not None:
+            _save_pdf(fig, out_path)
+            _close_figure(fig)
+
+
+def _generate_air_fig_from_uncertainty(uncertainty: dict, out_path: Path) -> None:
+    points = _air_points_from_uncertainty(uncertainty)
+    if not points.empty:
+        fig = _draw_air(points, **_AIR_FROM_UNCERTAINTY_STYLE)
+        if fig is not None:
+            _save_pdf(fig, out_path)
+            _close_figure(fig)
+
+
+def _generate_gender_air_slices_fig(fairness_slices: dict, out_path: Path) -> None:
+    points, threshold = _gender_air_slice_points(fairness_slices)
+    if not points.empty:
+        fig = _draw_gender_air_slices(points, threshold)
+        if fig is not None:
+            _save_pdf(fig, out_path)
+            _close_figure(fig)
+
+
+def _generate_training_convergence_fig(histories: dict[str, list[dict]], out_path: Path) -> None:
+    if histories:
+        fig = _draw_training_histories(histories)
+        if fig is not None:
+            _save_pdf(fig, out_path)
+            _close_figure(fig)
+
+
+def _generate_tuning_trajectory_fig(trajectories: dict[str, dict], out_path: Path) -> None:
+    if trajectories:
+        fig = _draw_tuning_trajectories(trajectories)
+        if fig is not None:
+            _save_pdf(fig, out_path)
+            _close_figure(fig)
+
+
+_PGF_PREAMBLE = (
+    "% Generated by scripts/gen_plots_from_intake.py --backend pgf; do not edit.\n"
+    "% Requires \\usepackage{pgfplots}{libraries}. Data tables are read from \\WPFigureDataDir.\n"
+)
+_PGF_SPECIALS = {
+    "\\": r"\textbackslash{}",
+    "&": r"\&",
+    "%": r"\%",
+    "$": r"\$",
+    "#": r"\#",
+    "_": r"\_",
+    "{": r"\{",
+    "}": r"\}",
+    "~": r"\textasciitilde{}",
+    "^": r"\textasciicircum{}",
+}
+
+
+def _pgf_escape(text: object) -> str:
+    escaped = "".join(_PGF_SPECIALS.get(char, char) for char in str(text))
+    return escaped.replace("\n", r"\\")
+
+
+def _pgf_number(value: object) -> str:
+    number = float(value)  # type: ignore[arg-type]
+    # Shortest round-trip form, so the tables carry exactly the plotted values.
+    return str(int(number)) if number.is_integer() else repr(number)
+
+
+def _pgf_color(hex_color: str) -> str:
+    red, green, blue = (int(hex_color[i : i + 2], 16) for i in (1, 3, 5))
+    return f"{{rgb,255:red,{red};green,{green};blue,{blue}}}"
+
+
+def _write_pgf_table(path: Path, columns: dict[str, Any]) -> None:
+    names = list(columns)
+    rows = zip(*(columns[name] for name in names))
+    lines = [" ".join(names)]
+    lines.extend(" ".join(_pgf_number(value) for value in row) for row in rows)
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def _pgf_header(out_path: Path, libraries: str = "") -> str:
+    return _PGF_PREAMBLE.replace("{libraries}", libraries) + (
+        "\\providecommand{\\WPFigureDataDir}{%s}" % out_path.parent.as_posix()
+    )
+
+
+def _pgf_ticks(count: int) -> str:
+    return ",".join(str(index) for index in range(count))
+
+
+def _pgf_labels(labels: list[Any]) -> str:
+    return ",".join("{%s}" % _pgf_escape(label) for label in labels)
+
+
+def _write_pgf_selection_rates(panels: list[tuple[str, pd.DataFrame]], out_path: Path) -> None:
+    # Panels share one categorical y axis, in first-appearance order (as sharey does).
+    categories: list[str] = []
+    for _attr, sub in panels:
+        for name in sub.get("group_name", pd.Series(dtype=object)).tolist():
+            if name not in categories:
+                categories.append(name)
+    lines = [
+        _pgf_header(out_path, " and \\usepgfplotslibrary{groupplots}"),
+        "\\begin{tikzpicture}",
+        "\\begin{groupplot}[",
+        "  group style={group size=%d by 1, y descriptions at=edge left, horizontal sep=0.5cm},"
+        % len(panels),
+        "  width=3.6in, height=2.8in,",
+        "  xmin=0, xmax=1, ymin=-0.5, ymax=%s," % _pgf_number(len(categories) - 0.5),
+        "  ytick={%s}, yticklabels={%s}," % (_pgf_ticks(len(categories)), _pgf_labels(categories)),
+        "  xlabel={Selection rate}, xmajorgrids, grid style={dotted},",
+        "]",
+    ]
+    stem = out_path.stem
+    for index, (attr, sub) in enumerate(panels):
+        options = ["title={%s}" % _pgf_escape(attr.capitalize())]
+        if index == 0:
+            options.append("ylabel={Group}")
+        if sub.empty:
+            lines.append("\\nextgroupplot[hide axis]")
+            continue
+        lines.append("\\nextgroupplot[%s]" % ", ".join(options))
+        table = out_path.with_name(f"{stem}_{attr}.dat")
+        value = sub["value"].to_numpy(dtype=float)
+        _write_pgf_table(
+            table,
+            {
+                "y": [categories.index(name) for name in sub["group_name"]],
+                "value": value,
+                "err_minus": value - sub["ci_low"].to_numpy(dtype=float),
+                "err_plus": sub["ci_high"].to_numpy(dtype=float) - value,
+            },
+        )
+        lines.extend(
+            [
+                "\\addplot+[black, only marks, mark=*, mark size=1.4pt,",
+                "  error bars/.cd, x dir=both, x explicit]",
+                "  table[x=value, y=y, x error minus=err_minus, x error plus=err_plus]",
+                "  {\\WPFigureDataDir/%s};" % table.name,
+            ]
+        )
+    lines.extend(["\\end{groupplot}", "\\end{tikzpicture}", ""])
+    out_path.write_text("\n".join(lines), encoding="utf-8")
+
+
+def _write_pgf_errorbar_axis(
+    points: pd.DataFrame,
+    out_path: Path,
+    *,
+    size: tuple[float, float],
+    ylabel: str,
+    ylim: tuple[float, float],
+    threshold: float,
+    threshold_style: str,
+    threshold_label: str,
+    extra_axis_options: list[str],
+) -> None:
+    value = points["value"].to_numpy(dtype=float)
+    table = out_path.with_suffix(".dat")
+    _write_pgf_table(
+        table,
+        {
+            "x": range(len(points)),
+            "value": value,
+            "err_minus": value - points["ci_low"].to_numpy(dtype=float),
+            "err_plus": points["ci_high"].to_numpy(dtype=float) - value,
+        },
+    )
+    count = len(points)
+    lines = [
+        _pgf_header(out_path),
+        "\\begin{tikzpicture}",
+        "\\begin{axis}[",
+        "  width=%sin, height=%sin," % (_pgf_number(size[0]), _pgf_number(size[1])),
+        "  xmin=-0.5, xmax=%s, ymin=%s, ymax=%s,"
+        % (_pgf_number(count - 0.5), _pgf_number(ylim[0]), _pgf_number(ylim[1])),
+        "  xtick={%s}, xticklabels={%s},"
+        % (_pgf_ticks(count), _pgf_labels(points["label"].tolist())),
+        "  ylabel={%s}, ymajorgrids, grid style={dotted}," % _pgf_escape(ylabel),
+        *("  %s," % option for option in extra_axis_options),
+        "]",
+        "\\addplot+[black, only marks, mark=*, mark size=1.4pt, forget plot,",
+        "  error bars/.cd, y dir=both, y explicit]",
+        "  table[x=x, y=value, y error minus=err_minus, y error plus=err_plus]",
+        "  {\\WPFigureDataDir/%s};" % table.name,
+        "\\addplot[%s] coordinates {(-0.5,%s) (%s,%s)};"
+        % (
+            threshold_style,
+            _pgf_number(threshold),
+            _pgf_number(count - 0.5),
+            _pgf_number(threshold),
+        ),
+        "\\addlegendentry{%s}" % _pgf_escape(threshold_label),
+        "\\end{axis}",
+        "\\end{tikzpicture}",
+        "",
+    ]
+    out_path.write_text("\n".join(lines), encoding="utf-8")
+
+
+def _write_pgf_air(
+    points: pd.DataFrame, out_path: Path, *, figsize: tuple[float, float], ylabel: str
+) -> None:
+    _write_pgf_errorbar_axis(
+        points,
+        out_path,
+        size=figsize,
+        ylabel=ylabel,
+        ylim=_air_ylim(points["ci_high"].to_numpy(dtype=float)),
+        threshold=0.8,
+        threshold_style="red, dashed",
+        threshold_label="Threshold 0.80",
+        extra_axis_options=["legend style={font=\\footnotesize}"],
+    )
+
+
+def _pgf_selection_rates_fig(
+    selection_rates: pd.DataFrame, metrics_long: pd.DataFrame, out_path: Path
+) -> None:
+    panels = _selection_rate_panels_from_metrics(selection_rates, metrics_long)
+    if panels:
+        _write_pgf_selection_rates(panels, out_path)
+
+
+def _pgf_selection_rates_fig_from_uncertainty(uncertainty: dict, out_path: Path) -> None:
+    panels = _selection_rate_panels_from_uncertainty(uncertainty)
+    if panels:
+        _write_pgf_selection_rates(panels, out_path)
+
+
+def _pgf_air_fig(metrics_long: pd.DataFrame, out_path: Path) -> None:
+    points = _air_points_from_metrics(metrics_long)
+    if not points.empty:
+        _write_pgf_air(points, out_path, **_AIR_FROM_METRICS_STYLE)
+
+
+def _pgf_air_fig_from_uncertainty(uncertainty: dict, out_path: Path) -> None:
+    points = _air_points_from_uncertainty(uncertainty)
+    if not points.empty:
+        _write_pgf_air(points, out_path, **_AIR_FROM_UNCERTAINTY_STYLE)
+
+
+def _pgf_gender_air_slices_fig(fairness_slices: dict, out_path: Path) -> None:
+    points, threshold = _gender_air_slice_points(fairness_slices)
+    if points.empty:
+        return
+    lo = points["ci_low"].to_numpy(dtype=float)
+    hi = points["ci_high"].to_numpy(dtype=float)
+    _write_pgf_errorbar_axis(
+        points,
+        out_path,
+        size=(5.1, 3.1),
+        ylabel="Adverse Impact Ratio (AIR)",
+        ylim=_gender_air_slices_ylim(lo, hi, threshold),
+        threshold=threshold,
+        threshold_style="dashed, color=%s" % _pgf_color("#a33a3a"),
+        threshold_label=f"{threshold:.2f} threshold",
+        extra_axis_options=[
+            "xticklabel style={align=center}",
+            "legend pos=south east",
+            "legend style={font=\\footnotesize}",
+        ],
+    )
+
+
+def _write_pgf_history_panels(panels: list[dict[str, Any]], out_path: Path) -> None:
+    lines = [
+        _pgf_header(out_path, " and \\usepgfplotslibrary{groupplots}"),
+        "\\begin{tikzpicture}",
+        "\\begin{groupplot}[",
+        "  group style={group size=%d by 1, horizontal sep=1.6cm}," % len(panels),
+        "  width=3.6in, height=2.8in, grid=major, grid style={dotted},",
+        "  legend style={font=\\tiny},",
+        "]",
+    ]
+    for panel_index, panel in enumerate(panels):
+        lines.append(
+            "\\nextgroupplot[title={%s}, xlabel={%s}, ylabel={%s}]"
+            % (
+                _pgf_escape(panel["title"]),
+                _pgf_escape(panel["xlabel"]),
+                _pgf_escape(panel["ylabel"]),
+            )
+        )
+        for plot_index, plot in enumerate(panel["plots"]):
+            table = out_path.with_name(f"{out_path.stem}_{panel_index}_{plot_index}.dat")
+            _write_pgf_table(table, {"x": plot["x"], "y": plot["y"]})
+            lines.append(
+                "\\addplot+[%s] table[x=x, y=y] {\\WPFigureDataDir/%s};"
+                % (plot["style"], table.name)
+            )
+            lines.append("\\addlegendentry{%s}" % _pgf_escape(plot["label"]))
+    lines.extend(["\\end{groupplot}", "\\end{tikzpicture}", ""])
+    out_path.write_text("\n".join(lines), encoding="utf-8")
+
+
+def _pgf_training_convergence_fig(histories: dict[str, list[dict]], out_path: Path) -> None:
+    if not histories:
+        return
+    panels = [
+        {
+            "title": branch.capitalize(),
+            "xlabel": "Epoch / step",
+            "ylabel": "Value",
+            "plots": [{**entry, "style": "no markers"} for entry in entries],
+        }
+        for branch, entries in histories.items()
+    ]
+    _write_pgf_history_panels(panels, out_path)
+
+
+def _pgf_tuning_trajectory_fig(trajectories: dict[str, dict], out_path: Path) -> None:
+    if not trajectories:
+        return
+    panels = [
+        {
+            "title": branch.capitalize(),
+            "xlabel": "Trial",
+            "ylabel": trajectory["label"],
+            "plots": [
+                {
+                    "label": "Trial",
+                    "x": trajectory["x"],
+                    "y": trajectory["y"],
+                    "style": "black, only marks, mark=*, mark size=0.8pt",
+                },
+                {
+                    "label": f"Best so far ({trajectory['direction']})",
+                    "x": trajectory["best_x"],
+                    "y": trajectory["best_y"],
+                    "style": "const plot, no markers, color=%s" % _pgf_color("#a33a3a"),
+                },
+            ],
+        }
+        for branch, trajectory in trajectories.items()
+    ]
+    _write_pgf_history_panels(panels, out_path)
+
+
+# pgfplots counterparts of the Matplotlib generators (same inputs, `.tex` output).
+_PGF_WRITERS: dict[str, Callable[..., None]] = {
+    "_generate_selection_rates_fig": _pgf_selection_rates_fig,
+    "_generate_selection_rates_fig_from_uncertainty": _pgf_selection_rates_fig_from_uncertainty,
+    "_generate_air_fig": _pgf_air_fig,
+    "_generate_air_fig_from_uncertainty": _pgf_air_fig_from_uncertainty,
+    "_generate_gender_air_slices_fig": _pgf_gender_air_slices_fig,
+    "_generate_training_convergence_fig": _pgf_training_convergence_fig,
+    "_generate_tuning_trajectory_fig": _pgf_tuning_trajectory_fig,
+}
+
+
+def _init_render_worker(pdf_output: dict[str, int] | None = None) -> None:
+    """Pool initializer: import Matplotlib and apply the style once per worker."""
+
+    if pdf_output is not None:
+        _PDF_OUTPUT.update(pdf_output)
+    try:
+        import matplotlib.pyplot  # type: ignore[import]  # noqa: F401
+    except Exception:
+        return
+    _maybe_set_style()
+
+
+def _render_task(generator: Callable[..., None], inputs: tuple[Any, ...], out_path: Path) -> None:
+    generator(*inputs, out_path)
+
+
+def _dict(value: Any) -> dict:
+    return value if isinstance(value, dict) else {}
+
+
+def _selection_rates_cache_inputs(
+    selection_rates: pd.DataFrame, metrics_long: pd.DataFrame
+) -> Any:
+    metrics = metrics_long[metrics_long["metric"].str.lower() == "selection_rate"]
+    return {
+        "selection_rates_empty": bool(selection_rates.empty),
+        "metrics": metrics.to_csv(index=False),
+    }
+
+
+def _air_cache_inputs(metrics_long: pd.DataFrame) -> Any:
+    return metrics_long[metrics_long["metric"].str.lower() == "air"].to_csv(index=False)
+
+
+def _selection_rates_uncertainty_cache_inputs(uncertainty: dict) -> Any:
+    fu = _dict(uncertainty.get("fairness_uncertainty"))
+    gender = _dict(fu.get("gender"))
+    race = _dict(fu.get("race"))
+    return {
+        "gender": {
+            key: gender.get(key)
+            for key in ("reference_group", "protected_group", "selection_rates")
+        },
+        "race": {
+            "display_in_main_pdf": race.get("display_in_main_pdf"),
+            "reference_group": race.get("reference_group"),
+            # Pair order decides which reference rate is drawn, so it is kept.
+            "pairs": [
+                [group, _dict(pair).get("selection_rates")]
+                for group, pair in _dict(race.get("pairs")).items()
+            ],
+        },
+        "present": sorted(key for key in ("gender", "race") if isinstance(fu.get(key), dict)),
+    }
+
+
+def _air_uncertainty_cache_inputs(uncertainty: dict) -> Any:
+    fu = _dict(uncertainty.get("fairness_uncertainty"))
+    race = _dict(fu.get("race"))
+    worst = race.get("worst_case_pair")
+    return {
+        "gender_air": _dict(fu.get("gender")).get("air"),
+        "race": {
+            "display_in_main_pdf": race.get("display_in_main_pdf"),
+            "worst_case_pair": worst,
+            "air": _dict(_dict(race.get("pairs")).get(worst)).get("air"),
+        },
+        "present": sorted(key for key in ("gender", "race") if isinstance(fu.get(key), dict)),
+    }
+
+
+def _gender_air_slices_cache_inputs(fairness_slices: dict) -> Any:
+    slices = _dict(fairness_slices.get("slices"))
+    return {
+        "air_threshold": fairness_slices.get("air_threshold"),
+        "slices": {
+            key: _dict(slices.get(key)).get("air")
+            for key in ("historical", "amplification", "intrinsic")
+        },
+        "has_slices": bool(slices),
+    }
+
+
+def _history_cache_inputs(histories: dict) -> Any:
+    # History figures already receive extracted, downsampled series.
+    return histories
+
+
+# Projection of each generator's arguments onto the fields it actually reads.
+_CACHE_INPUTS: dict[str, Callable[..., Any]] = {
+    "_generate_selection_rates_fig": _selection_rates_cache_inputs,
+    "_generate_air_fig": _air_cache_inputs,
+    "_generate_selection_rates_fig_from_uncertainty": _selection_rates_uncertainty_cache_inputs,
+    "_generate_air_fig_from_uncertainty": _air_uncertainty_cache_inputs,
+    "_generate_gender_air_slices_fig": _gender_air_slices_cache_inputs,
+    "_generate_training_convergence_fig": _history_cache_inputs,
+    "_generate_tuning_trajectory_fig": _history_cache_inputs,
+}
+
+
+def _plotting_stack_fingerprint() -> dict[str, Any]:
+    """Everything outside the inputs that can change the rendered PDF bytes."""
+
+    import matplotlib as mpl  # type: ignore[import]
+
+    return {
+        "script_sha256": hashlib.sha256(Path(__file__).read_bytes()).hexdigest(),
+        "matplotlib": mpl.__version__,
+        "rcparams": {
+            key: repr(value)
+            for key, value in sorted(mpl.rcParams.items())
+            if not key.startswith("backend")
+        },
+        "pdf_metadata": _PDF_METADATA,
+        "pdf_output": _PDF_OUTPUT,
+    }
+
+
+def _figure_cache_key(
+    generator: Callable[..., None],
+    inputs: tuple[Any, ...],
+    figure: str,
+    fingerprint: dict[str, Any],
+) -> str:
+    subset = _CACHE_INPUTS[generator.__name__](*inputs)
+    payload = {
+        "figure": figure,
+        "generator": generator.__name__,
+        "inputs_sha256": hashlib.sha256(
+            json.dumps(subset, sort_keys=False, default=str).encode("utf-8")
+        ).hexdigest(),
+        "stack": fingerprint,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _render_figures(
+    tasks: list[tuple[Callable[..., None], tuple[Any, ...], Path]],
+    jobs: int,
+    cache_dir: Path | None = None,
+) -> None:
+    """Render every figure task; returns only after all of them have finished."""
+
+    pending = tasks
+    stores: list[tuple[Path, Path]] = []
+    if cache_dir is not None:
+        fingerprint = _plotting_stack_fingerprint()
+        pending = []
+        for generator, inputs, out_path in tasks:
+            entry = cache_dir / (
+                _figure_cache_key(generator, inputs, out_path.name, fingerprint) + ".pdf"
+            )
+            if entry.is_file() and entry.stat().st_size > 0:
+                if not (out_path.is_file() and filecmp.cmp(entry, out_path, shallow=False)):
+                    shutil.copyfile(entry, out_path)
+                continue
+            # A miss must never leave (or cache) a stale output under the new key.
+            out_path.unlink(missing_ok=True)
+            pending.append((generator, inputs, out_path))
+            stores.append((out_path, entry))
+
+    if jobs <= 1 or len(pending) <= 1:
+        for generator, inputs, out_path in pending:
+            _render_task(generator, inputs, out_path)
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(jobs, len(pending)),
+            initializer=_init_render_worker,
+            initargs=(dict(_PDF_OUTPUT),),
+        ) as pool:
+            futures = [pool.submit(_render_task, *task) for task in pending]
+            for future in futures:
+                future.result()
+
+    for out_path, entry in stores:
+        if out_path.is_file() and out_path.stat().st_size > 0:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            staging = entry.with_suffix(".partial")
+            shutil.copyfile(out_path, staging)
+            os.replace(staging, entry)
+
+
+def _report_figure_sizes(tasks: list[tuple[Any, Any, Path]]) -> None:
+    for _generator, _inputs, out_path in tasks:
+        if out_path.is_file():
+            report = _pdf_size_report(out_path)
+            print(
+                f"{report['figure']}: {report['bytes']} bytes, {report['objects']} objects, "
+                f"{report['raster_images']} raster images, {report['type3_fonts']} Type 3 fonts"
+            )
+
+
+def _render_pgf_figures(tasks: list[tuple[Callable[..., None], tuple[Any, ...], Path]]) -> None:
+    """Write the pgfplots counterpart of every figure task; Matplotlib is not imported."""
+
+    for generator, inputs, out_path in tasks:
+        _PGF_WRITERS[generator.__name__](*inputs, out_path.with_suffix(".tex"))
+
+
+def _remove_stale_history_figures(
+    outdir: Path, tasks: list[tuple[Any, Any, Path]], backend: str
+) -> None:
+    produced = {out_path.name for _generator, _inputs, out_path in tasks}
+    for name in _HISTORY_FIGURES:
+        if name in produced:
+            continue
+        stem = Path(name).stem
+        (outdir / name).unlink(missing_ok=True)
+        if backend == "pgf":
+            (outdir / f"{stem}.tex").unlink(missing_ok=True)
+            for table in outdir.glob(f"{stem}_*.dat"):
+                table.unlink()
+
+
+def _remove_untasked_figures(outdir: Path, tasks: list[tuple[Any, Any, Path]]) -> None:
+    produced = {out_path.name for _generator, _inputs, out_path in tasks}
+    for name in _EXPECTED_FIGURES:
+        if name not in produced:
+            (outdir / name).unlink(missing_ok=True)
 
 
 def main() -> int:
@@ -540,43 +1415,136 @@ def main() -> int:
         action="store_true",
         help="Fail unless every reviewed publication figure is freshly generated",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Render figures in this many worker processes (default: 1, in-process)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Reuse figures rendered from identical inputs and plotting stack (default: off)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=("pdf", "pgf"),
+        default="pdf",
+        help="pdf: Matplotlib PDFs (default); pgf: pgfplots .tex plus .dat tables, no Matplotlib",
+    )
+    parser.add_argument(
+        "--rasterize-above",
+        type=int,
+        default=_PDF_OUTPUT["rasterize_above"],
+        help="Rasterize lines/collections with more points than this; text stays vector "
+        "(default: %(default)s, 0 disables)",
+    )
+    parser.add_argument(
+        "--raster-dpi",
+        type=int,
+        default=_PDF_OUTPUT["raster_dpi"],
+        help="Resolution of rasterized artists (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--certificates",
+        default=None,
+        help="Also plot training-convergence and tuning-trajectory histories from the "
+        "certificates in this directory (e.g. intake/certificates; default: off)",
+    )
+    parser.add_argument(
+        "--history-points",
+        type=int,
+        default=_HISTORY_POINTS,
+        help="LTTB point budget per history series (default: %(default)s)",
+    )
     args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.rasterize_above < 0 or args.raster_dpi < 1:
+        parser.error("--rasterize-above must be >= 0 and --raster-dpi at least 1")
+    _PDF_OUTPUT.update({"rasterize_above": args.rasterize_above, "raster_dpi": args.raster_dpi})
+    if args.backend == "pgf" and args.cache_dir:
+        parser.error("--cache-dir applies to the pdf backend only")
+    if args.history_points < 3:
+        parser.error("--history-points must be at least 3")
+    certificates_dir = Path(args.certificates) if args.certificates else None
+    if certificates_dir is not None and not certificates_dir.is_dir():
+        parser.error(f"certificates directory not found: {certificates_dir}")
 
     selection_path = Path(args.selection)
     metrics_path = Path(args.metrics)
     fairness_slices_path = Path(args.fairness_slices)
     outdir = Path(args.outdir)
     outdir.mkdir(parents=True, exist_ok=True)
-    if args.require_all:
-        for name in _EXPECTED_FIGURES:
+    cache_dir = Path(args.cache_dir) if args.cache_dir else None
+    if args.require_all and cache_dir is None:
+        for name in _expected_outputs(args.backend):
             (outdir / name).unlink(missing_ok=True)
+            if args.backend == "pgf":
+                for table in outdir.glob(f"{Path(name).stem}*.dat"):
+                    table.unlink()
 
-    # If matplotlib is not available, skip plot generation gracefully.
-    try:
-        import matplotlib.pyplot  # type: ignore[import]  # noqa: F401
-    except Exception:
-        if args.require_all:
-            parser.error("matplotlib is required to regenerate publication figures")
-        return 0
+    if args.backend == "pdf":
+        # If matplotlib is not available, skip plot generation gracefully.
+        try:
+            import matplotlib.pyplot  # type: ignore[import]  # noqa: F401
+        except Exception:
+            if args.require_all:
+                parser.error("matplotlib is required to regenerate publication figures")
+            return 0
 
-    _maybe_set_style()
+        _maybe_set_style()
 
     uncertainty = _load_json(Path(args.uncertainty))
     fairness_slices = _load_json(fairness_slices_path)
+    tasks: list[tuple[Callable[..., None], tuple[Any, ...], Path]] = []
     if fairness_slices:
-        _generate_gender_air_slices_fig(fairness_slices, outdir / "gender_air_slices.pdf")
+        tasks.append(
+            (_generate_gender_air_slices_fig, (fairness_slices,), outdir / "gender_air_slices.pdf")
+        )
+    if certificates_dir is not None:
+        histories = _training_histories(certificates_dir, args.history_points)
+        if histories:
+            tasks.append(
+                (
+                    _generate_training_convergence_fig,
+                    (histories,),
+                    outdir / "training_convergence.pdf",
+                )
+            )
+        trajectories = _tuning_trajectories(certificates_dir, args.history_points)
+        if trajectories:
+            tasks.append(
+                (_generate_tuning_trajectory_fig, (trajectories,), outdir / "tuning_trajectory.pdf")
+            )
+        if not histories and not trajectories:
+            print(f"No training or tuning histories in {certificates_dir}; history figures skipped")
+        _remove_stale_history_figures(outdir, tasks, args.backend)
 
     if not selection_path.exists() or not metrics_path.exists():
         # Deterministic SoT plots can still be generated without metrics_long.csv
         if uncertainty:
-            _generate_selection_rates_fig_from_uncertainty(
-                uncertainty, outdir / "selection_rates.pdf"
+            tasks.append(
+                (
+                    _generate_selection_rates_fig_from_uncertainty,
+                    (uncertainty,),
+                    outdir / "selection_rates.pdf",
+                )
+            )
+            tasks.append(
+                (_generate_air_fig_from_uncertainty, (uncertainty,), outdir / "air_summary.pdf")
             )
-            _generate_air_fig_from_uncertainty(uncertainty, outdir / "air_summary.pdf")
+        if args.backend == "pgf":
+            _render_pgf_figures(tasks)
+        else:
+            if args.require_all and cache_dir is not None:
+                _remove_untasked_figures(outdir, tasks)
+            _render_figures(tasks, args.jobs, cache_dir)
+            _report_figure_sizes(tasks)
         if args.require_all:
             parser.error(
                 "required publication figures were not freshly generated: "
-                + ", ".join(_missing_required_figures(outdir))
+                + ", ".join(_missing_required_figures(outdir, args.backend))
             )
         return 0
 
@@ -584,15 +1552,29 @@ def main() -> int:
     mlong = pd.read_csv(metrics_path)
 
     if uncertainty:
-        _generate_selection_rates_fig_from_uncertainty(
-            uncertainty, outdir / "selection_rates.pdf"
+        tasks.append(
+            (
+                _generate_selection_rates_fig_from_uncertainty,
+                (uncertainty,),
+                outdir / "selection_rates.pdf",
+            )
+        )
+        tasks.append(
+            (_generate_air_fig_from_uncertainty, (uncertainty,), outdir / "air_summary.pdf")
         )
-        _generate_air_fig_from_uncertainty(uncertainty, outdir / "air_summary.pdf")
     else:
-        _generate_selection_rates_fig(sel, mlong, outdir / "selection_rates.pdf")
-        _generate_air_fig(mlong, outdir / "air_summary.pdf")
+        tasks.append((_generate_selection_rates_fig, (sel, mlong), outdir / "selection_rates.pdf"))
+        tasks.append((_generate_air_fig, (mlong,), outdir / "air_summary.pdf"))
+    if args.backend == "pgf":
+        _render_pgf_figures(tasks)
+    else:
+        if args.require_all and cache_dir is not None:
+            _remove_untasked_figures(outdir, tasks)
+        # Workers have all joined here, so the freshness check sees final outputs.
+        _render_figures(tasks, args.jobs, cache_dir)
+        _report_figure_sizes(tasks)
     if args.require_all:
-        missing = _missing_required_figures(outdir)
+        missing = _missing_required_figures(outdir, args.backend)
         if missing:
             parser.error(
                 "required publication figures were not freshly generated: "
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+
+"""
+Structural diff of two intake trees (or extracted bundles).
+
+Every JSON/YAML document is turned into a Merkle tree: each object, array and
+scalar carries a SHA-256 over its kind and its children's digests (object keys
+sorted). The diff walks both trees from the root and only descends where the
+digests differ, so identical subtrees of a large certificate are skipped
+whole and the walk costs O(changed paths x depth). Files whose bytes are
+identical are not parsed at all.
+
+CSVs are diffed by row on their natural key columns (``_CSV_KEY_COLUMNS``;
+``run_id`` is never part of a key because it changes on every run), falling
+back to the first column and then to the row number when a key is not unique.
+
+Changes are reported as ``added``, ``removed``, ``changed`` and
+``type_changed``. Values are redacted with the rules of
+``validate_public_intake``: anything under a sensitive field or column name is
+shown as ``[redacted]`` (and the name as ``[redacted-key]``), keys with
+high-confidence sensitive content are shown as ``[redacted-key]``, and string
+values with such content are replaced by the kind of content found.
+
+Output: a JSON report (default dist/intake_diff/diff.json) and one line per
+change on stdout.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import sys
+from pathlib import Path
+from typing import Any, Iterable, NamedTuple
+
+import yaml
+
+from validate_public_intake import is_sensitive_key, sensitive_text_label
+
+
+_STRUCTURED_SUFFIXES = {".json", ".yaml", ".yml"}
+_CSV_KEY_COLUMNS = {
+    "calibration_bins_TEMPLATE.csv": ("split", "model_id", "bin_lower", "bin_upper"),
+    "confusion_by_group_TEMPLATE.csv": ("split", "model_id", "attribute", "group"),
+    "governance_contacts.csv": ("role",),
+    "group_confusion.csv": ("split", "model_id", "attribute", "group"),
+    "licenses_inventory.csv": ("component",),
+    "metrics_long.csv": ("split", "model_id", "metric", "group"),
+    "regulatory_matrix.csv": ("framework", "citation"),
+    "selection_rates.csv": ("split", "model_id", "attribute", "group"),
+}
+_DISPLAY_CHARS = 120
+REDACTED = "[redacted]"
+REDACTED_KEY = "[redacted-key]"
+
+
+class HashNode(NamedTuple):
+    digest: bytes
+    kind: str
+    value: Any
+    children: dict[str, "HashNode"] | list["HashNode"] | None
+
+
+def _kind(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, dict):
+        return "object"
+    if isinstance(value, list):
+        return "array"
+    return type(value).__name__
+
+
+def merkle(value: Any) -> HashNode:
+    """Hash ``value`` bottom-up; equal digests mean equal subtrees."""
+
+    kind = _kind(value)
+    digest = hashlib.sha256(kind.encode("ascii") + b"\0")
+    if isinstance(value, dict):
+        children = {str(key): merkle(child) for key, child in value.items()}
+        for key in sorted(children):
+            encoded = key.encode("utf-8")
+            digest.update(len(encoded).to_bytes(8, "big") + encoded + children[key].digest)
+        return HashNode(digest.digest(), kind, None, children)
+    if isinstance(value, list):
+        items = [merkle(child) for child in value]
+        for item in items:
+            digest.update(item.digest)
+        return HashNode(digest.digest(), kind, None, items)
+    digest.update(json.dumps(value, sort_keys=True, default=str).encode("utf-8"))
+    return HashNode(digest.digest(), kind, value, None)
+
+
+def _display(node: HashNode, redacted: bool) -> Any:
+    if redacted:
+        return REDACTED
+    if node.kind == "object":
+        return f"{{object with {len(node.children)} keys}}"
+    if node.kind == "array":
+        return f"[array with {len(node.children)} items]"
+    if isinstance(node.value, str):
+        label = sensitive_text_label(node.value)
+        if label is not None:
+            return f"[redacted: {label}]"
+        if len(node.value) > _DISPLAY_CHARS:
+            return node.value[:_DISPLAY_CHARS] + "..."
+    return node.value
+
+
+def diff_trees(
+    old: HashNode,
+    new: HashNode,
+    location: str = "",
+    *,
+    redacted: bool = False,
+) -> list[dict[str, Any]]:
+    """Changes between two Merkle trees, skipping subtrees with equal digests."""
+
+    changes: list[dict[str, Any]] = []
+
+    def _entry(change: str, path: str, before: HashNode | None, after: HashNode | None,
+               hidden: bool) -> None:
+        record: dict[str, Any] = {"change": change, "path": path}
+        if before is not None:
+            record["old_type"] = before.kind
+            record["old"] = _display(before, hidden)
+        if after is not None:
+            record["new_type"] = after.kind
+            record["new"] = _display(after, hidden)
+        changes.append(record)
+
+    def _walk(before: HashNode, after: HashNode, path: str, hidden: bool) -> None:
+        if before.digest == after.digest:
+            return
+        if before.kind != after.kind:
+            _entry("type_changed", path, before, after, hidden)
+        elif before.kind == "object":
+            assert isinstance(before.children, dict) and isinstance(after.children, dict)
+            for key in sorted(before.children.keys() | after.children.keys()):
+                sensitive = hidden or is_sensitive_key(key)
+                # Keys can carry data too (CSV row keys); hide the name, keep the value.
+                label = REDACTED_KEY if sensitive or sensitive_text_label(key) else key
+                child = f"{path}.{label}" if path else label
+                if key not in after.children:
+                    _entry("removed", child, before.children[key], None, sensitive)
+                elif key not in before.children:
+                    _entry("added", child, None, after.children[key], sensitive)
+                else:
+                    _walk(before.children[key], after.children[key], child, sensitive)
+        elif before.kind == "array":
+            assert isinstance(before.children, list) and isinstance(after.children, list)
+            shared = min(len(before.children), len(after.children))
+            for index in range(shared):
+                _walk(before.children[index], after.children[index], f"{path}[{index}]", hidden)
+            for index in range(shared, len(before.children)):
+                _entry("removed", f"{path}[{index}]", before.children[index], None, hidden)
+            for index in range(shared, len(after.children)):
+                _entry("added", f"{path}[{index}]", None, after.children[index], hidden)
+        else:
+            _entry("changed", path, before, after, hidden)
+
+    _walk(old, new, location, redacted)
+    return changes
+
+
+def _row_keys(header: list[str], rows: list[list[str]], name: str) -> list[str]:
+    def _keys(columns: Iterable[str]) -> list[str] | None:
+        indexes = [header.index(column) for column in columns]
+        keys = [
+            ",".join(f"{header[i]}={row[i] if i < len(row) else ''}" for i in indexes)
+            for row in rows
+        ]
+        return keys if len(set(keys)) == len(keys) else None
+
+    preferred = _CSV_KEY_COLUMNS.get(name)
+    if preferred and all(column in header for column in preferred):
+        keys = _keys(preferred)
+        if keys is not None:
+            return keys
+    if header and header[0] != "run_id":
+        keys = _keys(header[:1])
+        if keys is not None:
+            return keys
+    return [f"row={number}" for number in range(2, len(rows) + 2)]
+
+
+def csv_document(text: str, name: str) -> dict[str, Any]:
+    """``{"columns": header, "rows": {natural key: {column: cell}}}`` for diffing."""
+
+    reader = csv.reader(io.StringIO(text))
+    try:
+        header = next(reader)
+    except StopIteration:
+        return {"columns": [], "rows": {}}
+    rows = [row for row in reader if row]
+    keys = _row_keys(header, rows, name)
+    return {
+        "columns": header,
+        "rows": {
+            key: {column: (row[i] if i < len(row) else None) for i, column in enumerate(header)}
+            for key, row in zip(keys, rows)
+        },
+    }
+
+
+def load_document(data: bytes, name: str) -> Any:
+    text = data.decode("utf-8")
+    suffix = Path(name).suffix
+    if suffix == ".json":
+        return json.loads(text)
+    if suffix in {".yaml", ".yml"}:
+        return yaml.safe_load(text)
+    if suffix == ".csv":
+        return csv_document(text, Path(name).name)
+    raise ValueError(f"unsupported intake format: {name}")
+
+
+def _files(root: Path) -> dict[str, Path]:
+    if not root.is_dir():
+        raise ValueError(f"not a directory: {root}")
+    return {
+        path.relative_to(root).as_posix(): path
+        for path in root.rglob("*")
+        if path.is_file() and (path.suffix in _STRUCTURED_SUFFIXES or path.suffix == ".csv")
+    }
+
+
+def diff_directories(old_root: Path, new_root: Path) -> list[dict[str, Any]]:
+    old_files = _files(old_root)
+    new_files = _files(new_root)
+    changes: list[dict[str, Any]] = []
+    for name in sorted(old_files.keys() | new_files.keys()):
+        if name not in new_files:
+            changes.append({"file": name, "change": "removed", "path": ""})
+            continue
+        if name not in old_files:
+            changes.append({"file": name, "change": "added", "path": ""})
+            continue
+        old_bytes = old_files[name].read_bytes()
+        new_bytes = new_files[name].read_bytes()
+        if old_bytes == new_bytes:
+            continue
+        try:
+            old_tree = merkle(load_document(old_bytes, name))
+            new_tree = merkle(load_document(new_bytes, name))
+        except (UnicodeError, json.JSONDecodeError, yaml.YAMLError, csv.Error) as exc:
+            raise ValueError(f"unable to parse {name}: {exc.__class__.__name__}") from exc
+        for change in diff_trees(old_tree, new_tree):
+            changes.append({"file": name, **change})
+    return changes
+
+
+def _format(change: dict[str, Any]) -> str:
+    symbol = {"added": "+", "removed": "-", "changed": "~", "type_changed": "!"}[
+        change["change"]
+    ]
+    location = f"{change['file']}:{change['path']}" if change["path"] else change["file"]
+    if change["change"] == "changed":
+        return f"{symbol} {location}: {change['old']!r} -> {change['new']!r}"
+    if change["change"] == "type_changed":
+        return f"{symbol} {location}: {change['old_type']} -> {change['new_type']}"
+    if "old" in change:
+        return f"{symbol} {location}: {change['old']!r}"
+    if "new" in change:
+        return f"{symbol} {location}: {change['new']!r}"
+    return f"{symbol} {location}"
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--old", required=True, help="Previous intake directory or bundle root")
+    parser.add_argument("--new", default="intake", help="New intake directory or bundle root")
+    parser.add_argument("--output", default="dist/intake_diff/diff.json")
+    parser.add_argument("--max-lines", type=int, default=200, help="Changes printed to stdout")
+    args = parser.parse_args(argv)
+    try:
+        changes = diff_directories(Path(args.old), Path(args.new))
+    except (ValueError, OSError) as exc:
+        parser.error(str(exc))
+
+    counts: dict[str, int] = {}
+    for change in changes:
+        counts[change["change"]] = counts.get(change["change"], 0) + 1
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(
+        json.dumps(
+            {"old": str(args.old), "new": str(args.new), "counts": counts, "changes": changes},
+            indent=2,
+            sort_keys=True,
+        )
+        + "\n",
+        encoding="utf-8",
+    )
+    for change in changes[: args.max_lines]:
+        print(_format(change))
+    if len(changes) > args.max_lines:
+        print(f"... {len(changes) - args.max_lines} more in {output}")
+    summary = ", ".join(f"{counts[key]} {key}" for key in sorted(counts)) or "no changes"
+    print(f"{len(changes)} structural change(s): {summary}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
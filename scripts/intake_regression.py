@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+
+"""
+Rank metric changes between a candidate intake snapshot and the stable anchor.
+
+Both sides are flattened into one record per (attribute, pair, slice, split,
+model_id, metric):
+
+* AIR, SRG and the reference/protected selection rates from
+  ``metrics_uncertainty.json`` (slice ``overall``) and ``fairness_slices.json``
+  (slices ``historical``, ``amplification`` and ``intrinsic``);
+* every row of ``metrics_long.csv`` (pair = group, keyed by its split and
+  model_id as ``intake_diff`` keys that file);
+* top-level ``*_score`` values of the certificates (no interval).
+
+The baseline is read straight from Git objects at the anchor's intake commit
+(``baselines/stable-v5-characterization.json``) through one
+``git cat-file --batch`` process, so no checkout is needed; the intake tree OID
+is checked against the anchor before anything is compared. Records are aligned
+on their key once, and deltas, relative deltas and 95% interval overlap are
+computed over whole arrays. A change is material when the intervals no longer
+overlap, or, for point-only metrics, when the absolute delta reaches
+``--min-delta``; added and removed metrics are always material. The ranked
+report lists material changes first, then by absolute delta (added and removed
+metrics, which have none, lead).
+
+Outputs under ``--outdir`` (default dist/intake_regression): changes.csv and
+summary.json. ``--fail-on-change`` exits 1 when any change is material.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path, PurePosixPath
+from typing import Any, Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+
+KEY_COLUMNS = ("attribute", "pair", "slice", "split", "model_id", "metric")
+REPORT_COLUMNS = (
+    *KEY_COLUMNS,
+    "status",
+    "baseline",
+    "candidate",
+    "delta",
+    "relative_delta",
+    "baseline_low",
+    "baseline_high",
+    "candidate_low",
+    "candidate_high",
+    "ci_overlap",
+    "material",
+)
+_SLICE_NAMES = ("historical", "amplification", "intrinsic")
+_SCORE_KEY_RE = re.compile(r"_score(_min)?$")
+_SHA_RE = re.compile(r"^[0-9a-f]{40}$")
+
+
+def _dict(value: Any) -> dict:
+    return value if isinstance(value, dict) else {}
+
+
+def _number(value: Any) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return float("nan")
+    return float(value)
+
+
+def _interval(block: dict) -> tuple[float, float]:
+    ci = block.get("ci95")
+    if isinstance(ci, list) and len(ci) == 2:
+        return _number(ci[0]), _number(ci[1])
+    return float("nan"), float("nan")
+
+
+def _pair_records(attribute: str, pair: str, slice_name: str, block: dict) -> Iterator[tuple]:
+    for metric in ("air", "srg"):
+        estimate = _dict(block.get(metric))
+        if estimate:
+            yield (attribute, pair, slice_name, "", "", metric,
+                   _number(estimate.get("point")), *_interval(estimate))
+    rates = _dict(block.get("selection_rates"))
+    for side in ("ref", "prot"):
+        rate = _dict(rates.get(side))
+        if rate:
+            yield (attribute, pair, slice_name, "", "", f"selection_rate_{side}",
+                   _number(rate.get("p")), *_interval(rate))
+
+
+def fairness_records(uncertainty: dict, fairness_slices: dict) -> list[tuple]:
+    records: list[tuple] = []
+    fu = _dict(uncertainty.get("fairness_uncertainty"))
+    gender = _dict(fu.get("gender"))
+    if gender:
+        pair = f"{gender.get('protected_group', '')}/{gender.get('reference_group', '')}"
+        records.extend(_pair_records("gender", pair, "overall", gender))
+    race = _dict(fu.get("race"))
+    for group, block in sorted(_dict(race.get("pairs")).items()):
+        if isinstance(block, dict):
+            pair = f"{group}/{race.get('reference_group', '')}"
+            records.extend(_pair_records("race", pair, "overall", block))
+    attribute = str(fairness_slices.get("attribute") or "gender")
+    slices = _dict(fairness_slices.get("slices"))
+    for name in _SLICE_NAMES:
+        block = _dict(slices.get(name))
+        if block:
+            pair = f"{block.get('protected_group', '')}/{block.get('reference_group', '')}"
+            records.extend(_pair_records(attribute, pair, name, block))
+    return records
+
+
+def metrics_long_records(text: str) -> list[tuple]:
+    records: list[tuple] = []
+    for row in csv.DictReader(io.StringIO(text)):
+        attribute, _, group = str(row.get("group", "")).partition(":")
+
+        def _cell(name: str) -> float:
+            try:
+                return float(row.get(name) or "nan")
+            except ValueError:
+                return float("nan")
+
+        records.append(
+            (attribute, group, "", row.get("split", ""), row.get("model_id", ""),
+             row.get("metric", ""), _cell("value"), _cell("lower_ci"), _cell("upper_ci"))
+        )
+    return records
+
+
+def certificate_records(name: str, payload: dict) -> list[tuple]:
+    """Numeric ``*_score`` entries at the top level and one section below."""
+
+    records: list[tuple] = []
+    nan = float("nan")
+    for key, value in sorted(payload.items()):
+        if _SCORE_KEY_RE.search(key) and not np.isnan(_number(value)):
+            records.append(("certificate", name, "", "", "", key, _number(value), nan, nan))
+        elif isinstance(value, dict):
+            for inner, inner_value in sorted(value.items()):
+                if _SCORE_KEY_RE.search(inner) and not np.isnan(_number(inner_value)):
+                    records.append(
+                        ("certificate", name, "", "", "", f"{key}.{inner}",
+                         _number(inner_value), nan, nan)
+                    )
+    return records
+
+
+def snapshot_frame(files: dict[str, bytes]) -> pd.DataFrame:
+    """Flatten one snapshot given as ``{intake-relative path: bytes}``."""
+
+    def _json(name: str) -> dict:
+        data = files.get(name)
+        if data is None:
+            return {}
+        try:
+            payload = json.loads(data.decode("utf-8"))
+        except (UnicodeError, json.JSONDecodeError) as exc:
+            raise ValueError(f"unable to parse {name}") from exc
+        return payload if isinstance(payload, dict) else {}
+
+    records = fairness_records(
+        _json("metrics_uncertainty.json"), _json("fairness_slices.json")
+    )
+    if "metrics_long.csv" in files:
+        records.extend(metrics_long_records(files["metrics_long.csv"].decode("utf-8")))
+    for name in sorted(files):
+        path = PurePosixPath(name)
+        if path.parent.name == "certificates" and path.suffix == ".json":
+            records.extend(certificate_records(path.stem, _json(name)))
+    frame = pd.DataFrame.from_records(
+        records, columns=[*KEY_COLUMNS, "value", "low", "high"]
+    )
+    duplicated = frame.duplicated(list(KEY_COLUMNS))
+    if duplicated.any():
+        first = frame.loc[duplicated, list(KEY_COLUMNS)].iloc[0].tolist()
+        raise ValueError(f"duplicate metric key {first}")
+    return frame
+
+
+def _snapshot_names(names: Iterable[str]) -> list[str]:
+    wanted = {"metrics_uncertainty.json", "fairness_slices.json", "metrics_long.csv"}
+    return sorted(
+        name
+        for name in names
+        if name in wanted or (name.startswith("certificates/") and name.endswith(".json"))
+    )
+
+
+def read_directory(directory: Path) -> dict[str, bytes]:
+    if not directory.is_dir():
+        raise ValueError(f"candidate intake directory not found: {directory}")
+    names = [path.relative_to(directory).as_posix() for path in directory.rglob("*")]
+    return {name: (directory / name).read_bytes() for name in _snapshot_names(names)}
+
+
+def _git(root: Path, *args: str) -> str:
+    completed = subprocess.run(
+        ["git", "-C", str(root), *args], check=False, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise ValueError(f"git {' '.join(args)} failed: {completed.stderr.strip()}")
+    return completed.stdout.strip()
+
+
+def read_git_tree(
+    root: Path, revision: str, intake_path: str = "intake", expected_tree: str | None = None
+) -> dict[str, bytes]:
+    """Read the snapshot files of ``revision:intake_path`` without a checkout."""
+
+    probe = subprocess.run(
+        ["git", "-C", str(root), "cat-file", "-e", f"{revision}^{{commit}}"],
+        check=False,
+        capture_output=True,
+    )
+    if probe.returncode != 0:
+        raise ValueError(
+            f"baseline revision {revision} is not in this clone; fetch it or pass --baseline-rev"
+        )
+    tree = _git(root, "rev-parse", "--verify", f"{revision}:{intake_path}")
+    if expected_tree is not None and tree != expected_tree:
+        raise ValueError(
+            f"{revision}:{intake_path} is tree {tree}, anchor pins {expected_tree}"
+        )
+    listed = _git(root, "ls-tree", "-r", "--name-only", tree)
+    names = _snapshot_names(listed.splitlines())
+    process = subprocess.Popen(
+        ["git", "-C", str(root), "cat-file", "--batch"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    assert process.stdin is not None and process.stdout is not None
+    files: dict[str, bytes] = {}
+    try:
+        for name in names:
+            process.stdin.write(f"{tree}:{name}\n".encode("utf-8"))
+            process.stdin.flush()
+            header = process.stdout.readline().split()
+            if len(header) != 3 or header[1] != b"blob":
+                raise ValueError(f"unable to read {revision}:{intake_path}/{name}")
+            files[name] = process.stdout.read(int(header[2]))
+            process.stdout.read(1)
+    finally:
+        process.stdin.close()
+        process.wait()
+    return files
+
+
+def compare(baseline: pd.DataFrame, candidate: pd.DataFrame, *, min_delta: float) -> pd.DataFrame:
+    """Align both snapshots on the metric key and rank the differences."""
+
+    keys = list(KEY_COLUMNS)
+    merged = baseline.merge(
+        candidate, on=keys, how="outer", suffixes=("_b", "_c"), indicator=True
+    )
+    b = merged["value_b"].to_numpy(dtype=float)
+    c = merged["value_c"].to_numpy(dtype=float)
+    b_low = merged["low_b"].to_numpy(dtype=float)
+    b_high = merged["high_b"].to_numpy(dtype=float)
+    c_low = merged["low_c"].to_numpy(dtype=float)
+    c_high = merged["high_c"].to_numpy(dtype=float)
+
+    delta = c - b
+    abs_delta = np.abs(delta)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relative = np.where(b != 0.0, delta / np.abs(b), np.nan)
+    has_ci = ~np.isnan(b_low) & ~np.isnan(b_high) & ~np.isnan(c_low) & ~np.isnan(c_high)
+    overlap = (b_low <= c_high) & (c_low <= b_high)
+    side = merged["_merge"].to_numpy()
+    status = np.where(
+        side == "left_only", "removed", np.where(side == "right_only", "added", "changed")
+    )
+    status = np.where((status == "changed") & (delta == 0.0), "unchanged", status)
+    material = np.where(
+        has_ci,
+        ~overlap,
+        np.nan_to_num(abs_delta, nan=0.0) >= min_delta,
+    )
+    material |= (status == "added") | (status == "removed")
+
+    report = pd.DataFrame(
+        {
+            **{column: merged[column] for column in keys},
+            "status": status,
+            "baseline": b,
+            "candidate": c,
+            "delta": delta,
+            "relative_delta": relative,
+            "baseline_low": b_low,
+            "baseline_high": b_high,
+            "candidate_low": c_low,
+            "candidate_high": c_high,
+            "ci_overlap": np.where(has_ci, overlap.astype(object), None),
+            "material": material,
+        }
+    )
+    order = np.lexsort(
+        (
+            merged["metric"].to_numpy(),
+            merged["model_id"].to_numpy(),
+            merged["split"].to_numpy(),
+            merged["slice"].to_numpy(),
+            merged["pair"].to_numpy(),
+            merged["attribute"].to_numpy(),
+            -np.nan_to_num(abs_delta, nan=np.inf),
+            ~material,
+        )
+    )
+    return report.iloc[order].reset_index(drop=True)
+
+
+def _load_anchor(path: Path) -> tuple[str, str]:
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as exc:
+        raise ValueError(f"unable to read anchor {path}") from exc
+    consumer = _dict(_dict(payload).get("consumer"))
+    commit = consumer.get("intake_commit")
+    tree = consumer.get("intake_tree_git_oid")
+    if not (isinstance(commit, str) and _SHA_RE.match(commit)):
+        raise ValueError(f"{path} has no consumer.intake_commit")
+    if not (isinstance(tree, str) and _SHA_RE.match(tree)):
+        raise ValueError(f"{path} has no consumer.intake_tree_git_oid")
+    return commit, tree
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--candidate", default="intake", help="Candidate intake directory")
+    parser.add_argument(
+        "--anchor",
+        default="baselines/stable-v5-characterization.json",
+        help="Anchor whose consumer.intake_commit is the baseline",
+    )
+    parser.add_argument(
+        "--baseline-rev",
+        help="Compare against this revision instead of the anchor (no tree pin check)",
+    )
+    parser.add_argument("--repo", default=".", help="Repository holding the baseline objects")
+    parser.add_argument("--intake-path", default="intake")
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=0.01,
+        help="Absolute delta that is material for metrics without an interval",
+    )
+    parser.add_argument("--top", type=int, default=20, help="Changes printed to stdout")
+    parser.add_argument("--outdir", default="dist/intake_regression")
+    parser.add_argument("--fail-on-change", action="store_true")
+    return parser
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    if args.min_delta < 0:
+        parser.error("--min-delta must be non-negative")
+    repo = Path(args.repo)
+    try:
+        if args.baseline_rev:
+            revision, expected_tree = args.baseline_rev, None
+        else:
+            revision, expected_tree = _load_anchor(Path(args.anchor))
+        started = time.perf_counter()
+        baseline_files = read_git_tree(repo, revision, args.intake_path, expected_tree)
+        candidate_files = read_directory(Path(args.candidate))
+        report = compare(
+            snapshot_frame(baseline_files),
+            snapshot_frame(candidate_files),
+            min_delta=args.min_delta,
+        )
+        elapsed = time.perf_counter() - started
+    except (ValueError, OSError) as exc:
+        parser.error(str(exc))
+
+    outdir = Path(args.outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    report.to_csv(outdir / "changes.csv", index=False, columns=list(REPORT_COLUMNS))
+    material = report[report["material"]]
+    summary = {
+        "baseline_revision": revision,
+        "candidate": str(args.candidate),
+        "metrics": int(len(report)),
+        "material_changes": int(len(material)),
+        "status_counts": {
+            str(key): int(value)
+            for key, value in report["status"].value_counts().sort_index().items()
+        },
+        "seconds": round(elapsed, 4),
+    }
+    (outdir / "summary.json").write_text(
+        json.dumps(summary, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+    )
+
+    print(
+        f"Compared {summary['metrics']} metrics against {revision} in {elapsed:.3f}s: "
+        f"{summary['material_changes']} material change(s)"
+    )
+    for row in report.head(args.top).itertuples(index=False):
+        if row.status == "unchanged":
+            break
+        flag = "*" if row.material else " "
+        scope = "/".join(part for part in (row.slice, row.split, row.model_id) if part) or "-"
+        print(
+            f"{flag} {row.attribute}/{row.pair}/{scope} {row.metric}: "
+            f"{row.baseline:.4g} -> {row.candidate:.4g} ({row.status})"
+        )
+    if args.fail_on_change and summary["material_changes"]:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
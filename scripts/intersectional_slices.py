@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+
+"""
+Enumerate intersectional fairness slices from sparse group-level counts.
+
+Inputs:
+  - cell counts CSV: one column per protected attribute declared in
+    config/fairness_config.yaml plus integer ``selected`` and ``n`` columns.
+    Only observed cells are listed; absent combinations are never created.
+  - config/fairness_config.yaml (attribute order + display policy)
+
+Outputs (under --outdir, default dist/intersectional/):
+  - intersectional_slices.csv       (one row per displayed k-way cell)
+  - table_intersectional_air.tex    (worst AIR cells, for an appendix table)
+
+The outputs stay outside includes/ until a reviewed appendix adopts them, so
+the arXiv source allowlist never sees an untracked generated table.
+
+Every k-way combination of attributes up to ``--max-depth`` is aggregated with
+a single grouped sum over the observed cells. The ``min_group_n`` /
+``min_group_pct`` display policy is applied as a pruning rule during
+enumeration: a cell count can only shrink when another attribute is added, so an
+attribute combination is skipped entirely once any of its parents has no
+displayable cell, and only rows under displayable parent cells are grouped.
+
+Statistics follow the deterministic v4 SoT conventions used in
+intake/metrics_uncertainty.json: Wilson selection-rate intervals, a delta-method
+log-ratio interval for AIR, the producer's Newcombe-Wilson SRG interval, and a
+pooled two-proportion z-test. Within each attribute combination, the displayed
+cell with the highest selection rate is the reference
+(``highest_selection_rate_four_fifths``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import math
+from pathlib import Path
+from statistics import NormalDist
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import yaml
+
+
+KEY_SEPARATOR = "|"
+# The producer computes Wilson intervals with the rounded 1.96 quantile and the
+# AIR delta interval with the exact one; keep both so depth-1 output matches SoT.
+_WILSON_Z = 1.96
+_SLICE_COLUMNS = (
+    "depth",
+    "attributes",
+    "group",
+    "reference_group",
+    "n",
+    "selected",
+    "selection_rate",
+    "selection_rate_ci_low",
+    "selection_rate_ci_high",
+    "ref_n",
+    "ref_selected",
+    "ref_selection_rate",
+    "air",
+    "air_ci_low",
+    "air_ci_high",
+    "srg",
+    "srg_ci_low",
+    "srg_ci_high",
+    "p_value",
+)
+
+
+def _load_yaml(path: Path, label: str) -> dict[str, Any]:
+    if not path.is_file():
+        raise ValueError(f"required {label} file is missing: {path}")
+    try:
+        payload = yaml.safe_load(path.read_text(encoding="utf-8"))
+    except (OSError, UnicodeError, yaml.YAMLError) as exc:
+        raise ValueError(f"required {label} file is malformed: {path}") from exc
+    if not isinstance(payload, dict):
+        raise ValueError(f"required {label} payload must be a YAML mapping: {path}")
+    return payload
+
+
+def load_policy(config_path: Path) -> tuple[list[str], int, float]:
+    """Return declared attributes and the ``(min_group_n, min_group_pct)`` policy."""
+
+    config = _load_yaml(config_path, "fairness config")
+    attributes = config.get("attributes")
+    if not isinstance(attributes, dict) or not attributes:
+        raise ValueError("fairness config attributes must be a non-empty mapping")
+    policy = config.get("policy") if isinstance(config.get("policy"), dict) else {}
+    display = policy.get("display_race_in_main_pdf")
+    display = display if isinstance(display, dict) else {}
+    try:
+        min_group_n = int(display.get("min_group_n", 0) or 0)
+        min_group_pct = float(display.get("min_group_pct", 0.0) or 0.0)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("fairness config display policy must be numeric") from exc
+    if min_group_n < 0 or not 0 <= min_group_pct <= 1:
+        raise ValueError("fairness config display policy is out of range")
+    return [str(name) for name in attributes], min_group_n, min_group_pct
+
+
+def wilson_interval(
+    selected: np.ndarray, n: np.ndarray, *, z: float = _WILSON_Z
+) -> tuple[np.ndarray, np.ndarray]:
+    selected = np.asarray(selected, dtype=float)
+    n = np.asarray(n, dtype=float)
+    p = selected / n
+    denom = 1.0 + z * z / n
+    centre = (p + z * z / (2.0 * n)) / denom
+    half = z * np.sqrt(p * (1.0 - p) / n + z * z / (4.0 * n * n)) / denom
+    return centre - half, centre + half
+
+
+def air_interval(
+    prot_selected: np.ndarray,
+    prot_n: np.ndarray,
+    ref_selected: np.ndarray,
+    ref_n: np.ndarray,
+    *,
+    alpha: float = 0.05,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return AIR and its delta-method log-ratio interval (NaN when undefined)."""
+
+    z = NormalDist().inv_cdf(1.0 - alpha / 2.0)
+    p1 = np.asarray(prot_selected, dtype=float) / np.asarray(prot_n, dtype=float)
+    p0 = np.asarray(ref_selected, dtype=float) / np.asarray(ref_n, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        air = np.where(p0 > 0, p1 / p0, np.nan)
+        se = np.sqrt((1.0 - p1) / (prot_n * p1) + (1.0 - p0) / (ref_n * p0))
+        defined = (p1 > 0) & (p0 > 0)
+        low = np.where(defined, air * np.exp(-z * se), np.nan)
+        high = np.where(defined, air * np.exp(z * se), np.nan)
+    return air, low, high
+
+
+def srg_interval(
+    prot_selected: np.ndarray,
+    prot_n: np.ndarray,
+    ref_selected: np.ndarray,
+    ref_n: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return the selection-rate gap (prot - ref) and its Newcombe-Wilson interval."""
+
+    p1 = np.asarray(prot_selected, dtype=float) / np.asarray(prot_n, dtype=float)
+    p0 = np.asarray(ref_selected, dtype=float) / np.asarray(ref_n, dtype=float)
+    l1, u1 = wilson_interval(prot_selected, prot_n)
+    l0, u0 = wilson_interval(ref_selected, ref_n)
+    gap = p1 - p0
+    return gap, gap - (p1 - l1) - (u0 - p0), gap + (u1 - p1) + (p0 - l0)
+
+
+_ERFC = np.frompyfunc(math.erfc, 1, 1)
+
+
+def two_proportion_p_value(
+    prot_selected: np.ndarray,
+    prot_n: np.ndarray,
+    ref_selected: np.ndarray,
+    ref_n: np.ndarray,
+) -> np.ndarray:
+    """Two-sided pooled two-proportion z-test p-values."""
+
+    x1 = np.asarray(prot_selected, dtype=float)
+    n1 = np.asarray(prot_n, dtype=float)
+    x0 = np.asarray(ref_selected, dtype=float)
+    n0 = np.asarray(ref_n, dtype=float)
+    pooled = (x1 + x0) / (n1 + n0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        stat = (x1 / n1 - x0 / n0) / np.sqrt(
+            pooled * (1.0 - pooled) * (1.0 / n1 + 1.0 / n0)
+        )
+    stat = np.where(np.isfinite(stat), np.abs(stat), 0.0)
+    return _ERFC(stat / math.sqrt(2.0)).astype(float)
+
+
+def _validate_cells(cells: pd.DataFrame, attributes: list[str]) -> pd.DataFrame:
+    missing = [name for name in (*attributes, "selected", "n") if name not in cells.columns]
+    if missing:
+        raise ValueError("cell counts CSV is missing columns: " + ", ".join(missing))
+    frame = cells.loc[:, [*attributes, "selected", "n"]].copy()
+    for field in ("selected", "n"):
+        try:
+            values = pd.to_numeric(frame[field], errors="raise")
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"cell counts column {field} must be numeric") from exc
+        if values.isna().any() or (values < 0).any() or (values % 1 != 0).any():
+            raise ValueError(f"cell counts column {field} must be non-negative integers")
+        frame[field] = values.astype(np.int64)
+    if (frame["selected"] > frame["n"]).any():
+        raise ValueError("cell counts selected must not exceed n")
+    for name in attributes:
+        frame[name] = frame[name].astype(str)
+        if (frame[name].str.contains(KEY_SEPARATOR, regex=False)).any():
+            raise ValueError(f"cell counts column {name} must not contain {KEY_SEPARATOR!r}")
+    return frame
+
+
+def _slice_metrics(
+    kept: pd.DataFrame, subset: tuple[str, ...], alpha: float
+) -> pd.DataFrame:
+    keys = kept.loc[:, list(subset)].astype(str).agg(KEY_SEPARATOR.join, axis=1)
+    selected = kept["selected"].to_numpy(dtype=float)
+    n = kept["n"].to_numpy(dtype=float)
+    rate = selected / n
+    # Stable argmax: ties resolve to the first cell in grouped (sorted) order.
+    ref_index = int(np.argmax(rate))
+    protected = np.arange(len(kept)) != ref_index
+    if not protected.any():
+        return pd.DataFrame(columns=list(_SLICE_COLUMNS))
+
+    x1, n1 = selected[protected], n[protected]
+    x0 = np.full_like(x1, selected[ref_index])
+    n0 = np.full_like(n1, n[ref_index])
+    sr_low, sr_high = wilson_interval(x1, n1)
+    air, air_low, air_high = air_interval(x1, n1, x0, n0, alpha=alpha)
+    srg, srg_low, srg_high = srg_interval(x1, n1, x0, n0)
+    return pd.DataFrame(
+        {
+            "depth": len(subset),
+            "attributes": KEY_SEPARATOR.join(subset),
+            "group": keys.to_numpy()[protected],
+            "reference_group": keys.iloc[ref_index],
+            "n": n1.astype(np.int64),
+            "selected": x1.astype(np.int64),
+            "selection_rate": x1 / n1,
+            "selection_rate_ci_low": sr_low,
+            "selection_rate_ci_high": sr_high,
+            "ref_n": n0.astype(np.int64),
+            "ref_selected": x0.astype(np.int64),
+            "ref_selection_rate": x0 / n0,
+            "air": air,
+            "air_ci_low": air_low,
+            "air_ci_high": air_high,
+            "srg": srg,
+            "srg_ci_low": srg_low,
+            "srg_ci_high": srg_high,
+            "p_value": two_proportion_p_value(x1, n1, x0, n0),
+        },
+        columns=list(_SLICE_COLUMNS),
+    )
+
+
+def enumerate_intersections(
+    cells: pd.DataFrame,
+    attributes: list[str],
+    *,
+    max_depth: int,
+    min_group_n: int = 0,
+    min_group_pct: float = 0.0,
+    alpha: float = 0.05,
+) -> pd.DataFrame:
+    """Return displayable k-way slices (k <= ``max_depth``) with deterministic CIs."""
+
+    if max_depth < 1:
+        raise ValueError("max_depth must be at least 1")
+    frame = _validate_cells(cells, attributes)
+    frame = frame[frame["n"] > 0]
+    total = int(frame["n"].sum())
+    if total <= 0:
+        raise ValueError("cell counts must contain at least one observation")
+    min_n = max(float(min_group_n), float(min_group_pct) * total)
+
+    displayable: dict[tuple[str, ...], pd.DataFrame] = {}
+    results: list[pd.DataFrame] = []
+    for depth in range(1, min(max_depth, len(attributes)) + 1):
+        for subset in itertools.combinations(attributes, depth):
+            parents = [
+                tuple(name for name in subset if name != dropped) for dropped in subset
+            ] if depth > 1 else []
+            if any(parent not in displayable for parent in parents):
+                continue
+            source = frame
+            # Semi-join on the smallest parents first so pruned regions are
+            # discarded before the grouped sum instead of after it.
+            for parent in sorted(parents, key=lambda item: len(displayable[item])):
+                source = source.merge(
+                    displayable[parent].loc[:, list(parent)], on=list(parent), how="inner"
+                )
+                if source.empty:
+                    break
+            if source.empty:
+                continue
+            grouped = (
+                source.groupby(list(subset), sort=True, observed=True)[["selected", "n"]]
+                .sum()
+                .reset_index()
+            )
+            kept = grouped[grouped["n"] >= min_n].reset_index(drop=True)
+            if kept.empty:
+                continue
+            displayable[subset] = kept
+            results.append(_slice_metrics(kept, subset, alpha))
+
+    results = [frame for frame in results if not frame.empty]
+    if not results:
+        return pd.DataFrame(columns=list(_SLICE_COLUMNS))
+    return pd.concat(results, ignore_index=True)
+
+
+def _latex_escape(text: str) -> str:
+    return (
+        text.replace("\\", "\\textbackslash{}")
+        .replace("&", "\\&")
+        .replace("%", "\\%")
+        .replace("$", "\\$")
+        .replace("#", "\\#")
+        .replace("_", "\\_")
+        .replace("{", "\\{")
+        .replace("}", "\\}")
+        .replace("~", "\\textasciitilde{}")
+        .replace("^", "\\textasciicircum{}")
+    )
+
+
+def _fmt_key(value: str) -> str:
+    return " $\\times$ ".join(_latex_escape(part) for part in value.split(KEY_SEPARATOR))
+
+
+def _fmt_num(x: Any, *, decimals: int = 3) -> str:
+    try:
+        val = float(x)
+    except Exception:
+        return "TBD"
+    if not math.isfinite(val):
+        return "TBD"
+    formatted = f"{val:.{decimals}f}".rstrip("0").rstrip(".")
+    if formatted in {"-0", "-0.0"}:
+        formatted = "0"
+    return f"\\num{{{formatted}}}"
+
+
+def _fmt_p_value(x: Any) -> str:
+    try:
+        val = float(x)
+    except Exception:
+        return "TBD"
+    if not math.isfinite(val):
+        return "TBD"
+    if val < 1e-4:
+        return f"\\num[round-mode=figures,round-precision=3]{{{max(val, 1e-308):.3e}}}"
+    return f"\\num[round-mode=places,round-precision=4]{{{val:.4f}}}"
+
+
+def write_table(slices: pd.DataFrame, out_path: Path, *, max_rows: int) -> None:
+    """Write the lowest-AIR intersectional cells as a booktabs table body."""
+
+    ordered = slices.sort_values(["air", "depth", "attributes", "group"], na_position="last")
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with out_path.open("w", encoding="utf-8") as f:
+        f.write("\\begin{tabular}{llrSSSr}\n\\toprule\n")
+        f.write("slice & reference & {$n$} & {AIR} & {LCI} & {UCI} & {p}\\\\\n\\midrule\n")
+        for _, row in ordered.head(max_rows).iterrows():
+            cells = [
+                _fmt_key(str(row["group"])),
+                _fmt_key(str(row["reference_group"])),
+                str(int(row["n"])),
+                _fmt_num(row["air"]),
+                _fmt_num(row["air_ci_low"]),
+                _fmt_num(row["air_ci_high"]),
+                _fmt_p_value(row["p_value"]),
+            ]
+            f.write(" & ".join(cells) + "\\\\\n")
+        if ordered.empty:
+            f.write("\\multicolumn{7}{c}{\\emph{No intersection meets the display policy}}\\\\\n")
+        f.write("\\bottomrule\n\\end{tabular}\n")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Enumerate intersectional fairness slices")
+    ap.add_argument("--cells", required=True, help="Cell counts CSV (attributes + selected + n)")
+    ap.add_argument("--config", default="config/fairness_config.yaml")
+    ap.add_argument("--max-depth", type=int, default=2)
+    ap.add_argument("--alpha", type=float, default=0.05)
+    ap.add_argument("--max-table-rows", type=int, default=25)
+    ap.add_argument("--outdir", default="dist/intersectional")
+    args = ap.parse_args()
+
+    try:
+        attributes, min_group_n, min_group_pct = load_policy(Path(args.config))
+        try:
+            cells = pd.read_csv(args.cells, dtype={name: str for name in attributes})
+        except (OSError, UnicodeError, pd.errors.ParserError, pd.errors.EmptyDataError) as exc:
+            raise ValueError(f"cell counts CSV is malformed: {args.cells}") from exc
+        slices = enumerate_intersections(
+            cells,
+            attributes,
+            max_depth=args.max_depth,
+            min_group_n=min_group_n,
+            min_group_pct=min_group_pct,
+            alpha=args.alpha,
+        )
+    except ValueError as exc:
+        ap.error(str(exc))
+
+    outdir = Path(args.outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    slices.to_csv(outdir / "intersectional_slices.csv", index=False)
+    write_table(slices, outdir / "table_intersectional_air.tex", max_rows=args.max_table_rows)
+    print(f"Wrote {len(slices)} intersectional slices to {outdir}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
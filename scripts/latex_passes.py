@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""Explain LaTeX passes from ``main.log``, ``main.aux`` and ``main.fls``.
+
+After a pdflatex pass (run with ``-recorder``) the three files say what the
+pass read, what it wrote and what it warned about. ``analyze_pass`` turns them
+into one record: rerun triggers (changed labels, cleveref labels, natbib
+citations, bibliography, undefined references, other auxiliary files), the
+generated includes and figures that were read, and the page count.
+
+Whether another pass is needed is decided by content, not by warnings: a
+pass is only worth repeating when a file it wrote and a later pass reads
+(``.aux``, ``.toc``, ``.out``, ``.bbl``, ...) now differs from what it read.
+``scripts/build_pdf.py --minimal-passes`` uses this to stop as soon as the
+auxiliary state is stable. The log warnings are kept to name the cause.
+
+``python scripts/latex_passes.py`` analyzes the files of a finished build
+(for example one run by latexmk) and prints the record as JSON.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from pathlib import Path, PurePosixPath
+from typing import Any, Iterable
+
+
+_LOG_WIDTH = 79
+_NON_REREAD_SUFFIXES = {".fls", ".log", ".pdf", ".synctex", ".fmt"}
+_LABEL_RE = re.compile(r"^\\newlabel\{(?P<key>[^}]*)\}\{(?P<value>.*)\}\s*$")
+_BIBCITE_RE = re.compile(r"^\\bibcite\{(?P<key>[^}]*)\}\{(?P<value>.*)\}\s*$")
+_CITATION_RE = re.compile(r"^\\citation\{(?P<keys>[^}]*)\}")
+_BIBDATA_RE = re.compile(r"^\\bibdata\{(?P<value>[^}]*)\}")
+_BIBSTYLE_RE = re.compile(r"^\\bibstyle\{(?P<value>[^}]*)\}")
+_AUX_INPUT_RE = re.compile(r"^\\@input\{(?P<path>[^}]*)\}")
+_UNDEFINED_REFERENCE_RE = re.compile(r"LaTeX Warning: Reference `([^']+)' on page")
+_UNDEFINED_CITATION_RE = re.compile(
+    r"(?:LaTeX|Package natbib) Warning: Citation `([^']+)' on page"
+)
+_OUTPUT_RE = re.compile(r"Output written on .+? \((\d+) pages?, (\d+) bytes\)")
+_RERUN_FILE_RE = re.compile(r"Package rerunfilecheck Warning: File `([^']+)' has changed")
+_LOG_TRIGGERS = (
+    ("labels", re.compile(r"LaTeX Warning: Label\(s\) may have changed")),
+    ("citations", re.compile(r"Package natbib Warning: Citation\(s\) may have changed")),
+    ("undefined_references", re.compile(r"LaTeX Warning: There were undefined references")),
+    ("rerun_requested", re.compile(r"Rerun to get")),
+)
+
+
+def _read(path: Path) -> str:
+    try:
+        return path.read_text(encoding="utf-8", errors="replace")
+    except FileNotFoundError:
+        return ""
+
+
+def unwrap_log(text: str, width: int = _LOG_WIDTH) -> str:
+    """Join the hard-wrapped lines TeX writes at ``max_print_line`` characters."""
+
+    joined: list[str] = []
+    carry = ""
+    for line in text.splitlines():
+        if len(line) == width:
+            carry += line
+            continue
+        joined.append(carry + line)
+        carry = ""
+    if carry:
+        joined.append(carry)
+    return "\n".join(joined)
+
+
+def parse_log(text: str) -> dict[str, Any]:
+    log = unwrap_log(text)
+    output = _OUTPUT_RE.search(log)
+    return {
+        "warnings": sorted(name for name, pattern in _LOG_TRIGGERS if pattern.search(log)),
+        "undefined_references": sorted(set(_UNDEFINED_REFERENCE_RE.findall(log))),
+        "undefined_citations": sorted(set(_UNDEFINED_CITATION_RE.findall(log))),
+        "changed_files_reported": sorted(set(_RERUN_FILE_RE.findall(log))),
+        "pages": int(output.group(1)) if output else None,
+        "pdf_bytes": int(output.group(2)) if output else None,
+    }
+
+
+def parse_aux(path: Path, *, _seen: set[Path] | None = None) -> dict[str, Any]:
+    """Labels, bibliography entries and citations, following ``\\@input`` files."""
+
+    seen = _seen if _seen is not None else set()
+    result: dict[str, Any] = {
+        "labels": {},
+        "bibcites": {},
+        "citations": set(),
+        "bibdata": None,
+        "bibstyle": None,
+        "files": [],
+    }
+    if path in seen or not path.is_file():
+        return result
+    seen.add(path)
+    result["files"].append(path)
+    for line in _read(path).splitlines():
+        if match := _LABEL_RE.match(line):
+            result["labels"][match["key"]] = match["value"]
+        elif match := _BIBCITE_RE.match(line):
+            result["bibcites"][match["key"]] = match["value"]
+        elif match := _CITATION_RE.match(line):
+            result["citations"].update(key.strip() for key in match["keys"].split(","))
+        elif match := _BIBDATA_RE.match(line):
+            result["bibdata"] = match["value"]
+        elif match := _BIBSTYLE_RE.match(line):
+            result["bibstyle"] = match["value"]
+        elif match := _AUX_INPUT_RE.match(line):
+            child = parse_aux(path.parent / match["path"], _seen=seen)
+            result["labels"].update(child["labels"])
+            result["bibcites"].update(child["bibcites"])
+            result["citations"].update(child["citations"])
+            result["files"].extend(child["files"])
+    return result
+
+
+def parse_fls(text: str, root: Path) -> dict[str, list[str]]:
+    """Files read and written by the pass, relative to ``root`` where possible."""
+
+    pwd = root.resolve()
+    inputs: set[str] = set()
+    outputs: set[str] = set()
+    for line in text.splitlines():
+        kind, _, value = line.partition(" ")
+        if kind == "PWD":
+            pwd = Path(value)
+        elif kind in {"INPUT", "OUTPUT"}:
+            path = Path(value) if Path(value).is_absolute() else pwd / value
+            try:
+                name = path.resolve().relative_to(root.resolve()).as_posix()
+            except ValueError:
+                name = path.as_posix()
+            (inputs if kind == "INPUT" else outputs).add(name)
+    return {"inputs": sorted(inputs), "outputs": sorted(outputs)}
+
+
+def reread_files(outputs: Iterable[str]) -> list[str]:
+    """Written files a later pass reads back (auxiliary state, not the PDF or log)."""
+
+    return sorted(
+        name
+        for name in outputs
+        if not PurePosixPath(name).is_absolute()
+        and PurePosixPath(name).suffix not in _NON_REREAD_SUFFIXES
+    )
+
+
+def digests(root: Path, names: Iterable[str]) -> dict[str, str | None]:
+    result: dict[str, str | None] = {}
+    for name in names:
+        path = root / name
+        result[name] = hashlib.sha256(path.read_bytes()).hexdigest() if path.is_file() else None
+    return result
+
+
+def _changed_keys(before: dict[str, str], after: dict[str, str]) -> list[str]:
+    return sorted(key for key in before.keys() | after.keys() if before.get(key) != after.get(key))
+
+
+def analyze_pass(
+    root: Path,
+    jobname: str,
+    *,
+    before: dict[str, str | None],
+    previous_aux: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Record one finished pass; ``before`` holds digests taken before it started."""
+
+    log = parse_log(_read(root / f"{jobname}.log"))
+    fls = parse_fls(_read(root / f"{jobname}.fls"), root)
+    aux = parse_aux(root / f"{jobname}.aux")
+    reread = sorted(set(reread_files(fls["outputs"])) | set(before))
+    after = digests(root, reread)
+    changed = [name for name in reread if before.get(name) != after.get(name)]
+
+    previous = previous_aux or {"labels": {}, "bibcites": {}, "citations": set()}
+    labels = {key: value for key, value in aux["labels"].items() if not key.endswith("@cref")}
+    old_labels = {
+        key: value for key, value in previous["labels"].items() if not key.endswith("@cref")
+    }
+    cref = {key: value for key, value in aux["labels"].items() if key.endswith("@cref")}
+    old_cref = {
+        key: value for key, value in previous["labels"].items() if key.endswith("@cref")
+    }
+    triggers: list[str] = []
+    if changed:
+        if _changed_keys(old_labels, labels):
+            triggers.append("labels")
+        if _changed_keys(old_cref, cref):
+            triggers.append("cleveref")
+        if _changed_keys(previous["bibcites"], aux["bibcites"]) or "citations" in log["warnings"]:
+            triggers.append("citations")
+        if (
+            log["undefined_references"]
+            or log["undefined_citations"]
+            or "undefined_references" in log["warnings"]
+        ):
+            triggers.append("undefined_references")
+        aux_files = {
+            path.relative_to(root).as_posix()
+            for path in aux["files"]
+            if path.is_relative_to(root)
+        }
+        # .toc/.out/... changes, or aux changes none of the above explain.
+        if not triggers or any(name not in aux_files for name in changed):
+            triggers.append("auxiliary_files")
+
+    return {
+        "rerun": bool(changed),
+        "triggers": triggers,
+        "changed_files": changed,
+        "log_warnings": log["warnings"],
+        "undefined_references": log["undefined_references"],
+        "undefined_citations": log["undefined_citations"],
+        "pages": log["pages"],
+        "pdf_bytes": log["pdf_bytes"],
+        "includes_read": [name for name in fls["inputs"] if name.startswith("includes/")],
+        "figures_read": [name for name in fls["inputs"] if name.startswith("figures/")],
+        "digests": after,
+        "aux": aux,
+    }
+
+
+def public_record(record: dict[str, Any]) -> dict[str, Any]:
+    """The JSON-serialisable part of an ``analyze_pass`` record."""
+
+    return {key: value for key, value in record.items() if key not in {"aux", "digests"}}
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--root", type=Path, default=Path("."))
+    parser.add_argument("--jobname", default="main")
+    args = parser.parse_args(argv)
+    if not (args.root / f"{args.jobname}.log").is_file():
+        parser.error(f"no {args.jobname}.log in {args.root}; build the document first")
+    record = analyze_pass(args.root, args.jobname, before={})
+    # Without a pre-pass snapshot nothing is known to have changed; report the
+    # log evidence only.
+    record = public_record(record)
+    record.pop("rerun")
+    record.pop("triggers")
+    record.pop("changed_files")
+    print(json.dumps(record, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
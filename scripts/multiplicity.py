@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+
+"""
+Vectorized multiplicity corrections and a cross-check of shipped adjustments.
+
+Supported methods: Bonferroni, Holm (step-down), Hochberg (step-up),
+Benjamini-Hochberg (BH) and Benjamini-Yekutieli (BY). Families are arbitrary
+labels (attribute, slice, run, intersection depth, ...). All families are
+ordered with a single ``numpy.lexsort`` and the step-down/step-up monotonicity
+is enforced with grouped cumulative max/min, so there is no per-family Python
+loop and tiny p-values (for example 1e-44) keep full precision.
+
+Commands:
+  check   recompute ``p_value_adjusted`` in metrics_uncertainty.json and
+          fairness_slices.json from the declared ``p_value_adjustment``
+  adjust  add an adjusted p-value column to any CSV, per family
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sys
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+
+METHODS = ("bonferroni", "holm", "hochberg", "bh", "by")
+# Labels used by the producer payloads and config/sap.yaml.
+_METHOD_ALIASES = {
+    "none": "none",
+    "bonferroni": "bonferroni",
+    "holm": "holm",
+    "holm_bonferroni": "holm",
+    "hochberg": "hochberg",
+    "bh": "bh",
+    "fdr_bh": "bh",
+    "benjamini_hochberg": "bh",
+    "by": "by",
+    "fdr_by": "by",
+    "benjamini_yekutieli": "by",
+}
+
+
+def normalize_method(label: Any) -> str:
+    key = str(label or "").strip().lower().replace("-", "_")
+    if key not in _METHOD_ALIASES:
+        raise ValueError(f"unsupported multiplicity adjustment: {label!r}")
+    return _METHOD_ALIASES[key]
+
+
+def adjust_p_values(
+    p_values: Iterable[float] | np.ndarray,
+    method: str,
+    families: Iterable[Any] | np.ndarray | None = None,
+) -> np.ndarray:
+    """Return adjusted p-values in input order, corrected within each family."""
+
+    method = normalize_method(method)
+    p = np.asarray(p_values, dtype=float)
+    if p.ndim != 1:
+        raise ValueError("p-values must be one-dimensional")
+    if p.size and (not np.isfinite(p).all() or (p < 0).any() or (p > 1).any()):
+        raise ValueError("p-values must be finite and within [0, 1]")
+    if method == "none" or p.size == 0:
+        return p.copy()
+
+    if families is None:
+        codes = np.zeros(p.size, dtype=np.int64)
+    else:
+        codes, _uniques = pd.factorize(np.asarray(families, dtype=object), sort=True)
+        if codes.size != p.size:
+            raise ValueError("families must align with p-values")
+    order = np.lexsort((p, codes))
+    sorted_p = p[order]
+    sorted_codes = codes[order]
+
+    # Family sizes and 1-based ranks within each family, without a Python loop.
+    sizes = np.bincount(sorted_codes)
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    m = sizes[sorted_codes].astype(float)
+    rank = (np.arange(p.size) - starts[sorted_codes] + 1).astype(float)
+
+    grouped = pd.Series(sorted_codes)
+    if method == "bonferroni":
+        adjusted = sorted_p * m
+    elif method == "holm":
+        adjusted = pd.Series(sorted_p * (m - rank + 1.0)).groupby(grouped).cummax().to_numpy()
+    else:
+        if method == "hochberg":
+            raw = sorted_p * (m - rank + 1.0)
+        else:
+            raw = sorted_p * m / rank
+            if method == "by":
+                # c(m) = sum_{k<=m} 1/k, looked up per family from one cumulative sum.
+                harmonic = np.cumsum(1.0 / np.arange(1, int(sizes.max()) + 1))
+                raw = raw * harmonic[sizes[sorted_codes] - 1]
+        reversed_series = pd.Series(raw[::-1])
+        adjusted = (
+            reversed_series.groupby(pd.Series(sorted_codes[::-1])).cummin().to_numpy()[::-1]
+        )
+
+    result = np.empty_like(p)
+    result[order] = np.minimum(adjusted, 1.0)
+    return result
+
+
+def _metric_blocks(uncertainty: dict[str, Any], slices: dict[str, Any]) -> list[dict[str, Any]]:
+    """Flatten shipped metric blocks that carry p-value adjustment fields."""
+
+    blocks: list[dict[str, Any]] = []
+
+    def _add(source: str, family: str, member: str, pair: Any) -> None:
+        if not isinstance(pair, dict):
+            return
+        for metric in ("air", "srg"):
+            block = pair.get(metric)
+            if isinstance(block, dict) and "p_value_adjusted" in block:
+                blocks.append(
+                    {
+                        "source": source,
+                        "family": f"{family}.{metric}",
+                        "member": member,
+                        "p_value": block.get("p_value"),
+                        "p_value_adjusted": block.get("p_value_adjusted"),
+                        "method": block.get("p_value_adjustment", "none"),
+                    }
+                )
+
+    fu = uncertainty.get("fairness_uncertainty")
+    fu = fu if isinstance(fu, dict) else {}
+    gender = fu.get("gender")
+    if isinstance(gender, dict):
+        _add("metrics_uncertainty", "gender", str(gender.get("protected_group", "")), gender)
+    race = fu.get("race") if isinstance(fu.get("race"), dict) else {}
+    pairs = race.get("pairs") if isinstance(race.get("pairs"), dict) else {}
+    for group, pair in sorted(pairs.items()):
+        _add("metrics_uncertainty", "race", str(group), pair)
+    slice_map = slices.get("slices") if isinstance(slices.get("slices"), dict) else {}
+    for key, pair in sorted(slice_map.items()):
+        _add("fairness_slices", f"slice.{key}", str(key), pair)
+    return blocks
+
+
+def crosscheck_shipped_adjustments(
+    uncertainty: dict[str, Any], slices: dict[str, Any], *, rel_tol: float = 1e-9
+) -> dict[str, Any]:
+    """Recompute every shipped ``p_value_adjusted`` within its declared family."""
+
+    blocks = pd.DataFrame(_metric_blocks(uncertainty, slices))
+    mismatches: list[dict[str, Any]] = []
+    families: dict[str, str] = {}
+    if blocks.empty:
+        return {"checked": 0, "families": families, "mismatches": mismatches, "status": "empty"}
+
+    for column in ("p_value", "p_value_adjusted"):
+        numbers = pd.to_numeric(blocks[column], errors="coerce")
+        if numbers.isna().any():
+            raise ValueError(f"shipped {column} values must be numeric")
+        blocks[column] = numbers
+    methods = blocks["method"].map(normalize_method)
+    family_methods = methods.groupby(blocks["family"]).unique()
+    for family, values in family_methods.items():
+        if len(values) != 1:
+            raise ValueError(f"family {family} mixes p-value adjustment methods")
+        families[str(family)] = str(values[0])
+
+    expected = np.empty(len(blocks))
+    for method in sorted(set(families.values())):
+        mask = methods.to_numpy() == method
+        expected[mask] = adjust_p_values(
+            blocks.loc[mask, "p_value"], method, blocks.loc[mask, "family"]
+        )
+    for row, value in zip(blocks.itertuples(index=False), expected):
+        if not math.isclose(row.p_value_adjusted, value, rel_tol=rel_tol, abs_tol=0.0):
+            mismatches.append(
+                {
+                    "source": row.source,
+                    "family": row.family,
+                    "member": row.member,
+                    "method": families[row.family],
+                    "shipped": row.p_value_adjusted,
+                    "recomputed": float(value),
+                }
+            )
+    return {
+        "checked": int(len(blocks)),
+        "families": dict(sorted(families.items())),
+        "mismatches": mismatches,
+        "status": "mismatch" if mismatches else "consistent",
+    }
+
+
+def _load_json(path: Path) -> dict[str, Any]:
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, UnicodeError, json.JSONDecodeError) as exc:
+        raise ValueError(f"unable to read JSON from {path}") from exc
+    if not isinstance(payload, dict):
+        raise ValueError(f"expected a JSON object in {path}")
+    return payload
+
+
+def _check_command(args: argparse.Namespace) -> int:
+    report = crosscheck_shipped_adjustments(
+        _load_json(Path(args.uncertainty)), _load_json(Path(args.slices))
+    )
+    print(json.dumps(report, indent=2, sort_keys=True))
+    return 1 if report["mismatches"] else 0
+
+
+def _adjust_command(args: argparse.Namespace) -> int:
+    frame = pd.read_csv(args.input)
+    if args.p_column not in frame.columns:
+        raise ValueError(f"input CSV has no {args.p_column!r} column")
+    missing = [name for name in args.family_column if name not in frame.columns]
+    if missing:
+        raise ValueError("input CSV is missing family columns: " + ", ".join(missing))
+    families = (
+        frame[args.family_column].astype(str).agg("\x1f".join, axis=1)
+        if args.family_column
+        else None
+    )
+    method = normalize_method(args.method)
+    frame[args.output_column or f"p_value_{method}"] = adjust_p_values(
+        frame[args.p_column], method, families
+    )
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    frame.to_csv(output, index=False)
+    print(f"Wrote {len(frame)} adjusted p-values to {output}")
+    return 0
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    check = subparsers.add_parser("check", help="cross-check shipped p_value_adjusted fields")
+    check.add_argument("--uncertainty", default="intake/metrics_uncertainty.json")
+    check.add_argument("--slices", default="intake/fairness_slices.json")
+    check.set_defaults(func=_check_command)
+
+    adjust = subparsers.add_parser("adjust", help="adjust a CSV p-value column per family")
+    adjust.add_argument("--input", required=True)
+    adjust.add_argument("--output", required=True)
+    adjust.add_argument("--p-column", default="p_value")
+    adjust.add_argument(
+        "--family-column",
+        action="append",
+        default=[],
+        help="Column defining a family; repeat to combine (default: one family)",
+    )
+    adjust.add_argument("--method", default="holm", choices=sorted(set(_METHOD_ALIASES)))
+    adjust.add_argument("--output-column")
+    adjust.set_defaults(func=_adjust_command)
+    return parser
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    try:
+        return int(args.func(args))
+    except ValueError as exc:
+        parser.error(str(exc))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,7 +4,6 @@
 from __future__ import annotations
 
 import argparse
-import hashlib
 import os
 import stat
 import subprocess
@@ -13,6 +12,8 @@ import time
 import zipfile
 from pathlib import Path
 
+from file_digest import file_digest
+
 
 _DIRECT_FILES = {".latexmkrc", "main.bbl", "main.tex"}
 _SUFFIXES = {
@@ -67,7 +68,10 @@ def _assert_reviewed_member(path: Path, rel: str, tracked: set[str]) -> None:
     expected = _CONTROLLED_GENERATED_SHA256.get(rel)
     if expected is None:
         raise PackageError("untracked publication source is forbidden; name redacted")
-    actual = hashlib.sha256(path.read_bytes()).hexdigest()
+    try:
+        actual = file_digest(path).sha256
+    except OSError as exc:
+        raise PackageError(f"unable to hash controlled generated source {rel}: {exc}") from exc
     if actual != expected:
         raise PackageError(
             f"controlled generated publication source {rel} has unexpected bytes: "
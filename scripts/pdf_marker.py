@@ -0,0 +1,1075 @@
+#!/usr/bin/env python3
+"""Find the public demo watermark in a PDF without extracting its whole text.
+
+``find_marker`` memory-maps the PDF, reads its cross-reference data (classic
+tables, or the xref and object streams pdfTeX writes), walks the page tree and
+interprets each page's content streams: they are inflated with
+``zlib.decompressobj`` in bounded chunks as the tokenizer consumes them, the
+text-showing operators (``Tj``, ``TJ``, ``'``, ``"``, including text inside
+form XObjects) are decoded through the current font's ``ToUnicode`` CMap or its
+``/Encoding`` differences, and the scan stops at the first page that shows the
+marker. ``every_page=True`` instead checks all pages in order and reports the
+ones without it.
+
+Matching ignores whitespace, because TeX output has no space glyphs and word
+gaps are positioning: ``DEMO / EVALUATION ONLY`` matches the glyph run
+``DEMO/EVALUATIONONLY`` however it is kerned. A PDF that cannot be read far
+enough to decide raises ``MarkerError``; there is no fallback to "found".
+
+``python scripts/pdf_marker.py main.pdf --every-page --compare-pdftotext``
+checks the verdict page by page against ``pdftotext`` (as CI does on every
+build); ``--text`` prints the decoded text per page.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import binascii
+import contextlib
+import mmap
+import re
+import subprocess
+import sys
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, NamedTuple
+
+
+MARKER = "DEMO / EVALUATION ONLY"
+CHUNK_SIZE = 1 << 16
+LOOKAHEAD = 1 << 12
+# A TJ adjustment wider than this (thousandths of text space) reads as a word gap.
+TJ_SPACE = 200
+
+Runner = Callable[..., subprocess.CompletedProcess]
+
+
+class MarkerError(ValueError):
+    """The PDF cannot be read far enough to decide whether it carries the marker."""
+
+
+class Name(str):
+    """A PDF name object (``/Font``), kept apart from string objects (``bytes``)."""
+
+
+class Operator(str):
+    """A content-stream operator (``Tj``)."""
+
+
+class Ref(NamedTuple):
+    number: int
+    generation: int
+
+
+class Stream(NamedTuple):
+    info: dict[str, Any]
+    start: int
+    length: int
+
+
+class Page(NamedTuple):
+    info: dict[str, Any]
+    resources: dict[str, Any]
+
+
+class MarkerScan(NamedTuple):
+    found: bool
+    page_count: int
+    pages_checked: int
+    marked_pages: tuple[int, ...]
+    unmarked_pages: tuple[int, ...]
+
+
+# --- Object syntax ---------------------------------------------------------------------------
+
+_WHITESPACE = b"\x00\t\n\x0c\r "
+_SKIP_RE = re.compile(rb"(?:[\x00\t\n\x0c\r ]+|%[^\r\n]*)*")
+_REGULAR_RE = re.compile(rb"[^\x00\t\n\x0c\r ()<>\[\]{}/%]+")
+_NUMBER_RE = re.compile(rb"[+-]?(?:\d+\.?\d*|\.\d+)")
+_REF_TAIL_RE = re.compile(
+    rb"[\x00\t\n\x0c\r ]+(\d+)[\x00\t\n\x0c\r ]+R(?![^\x00\t\n\x0c\r ()<>\[\]{}/%])"
+)
+_PLAIN_RE = re.compile(rb"[^()\\]+")
+_NAME_ESCAPE_RE = re.compile(rb"#([0-9A-Fa-f]{2})")
+_ESCAPES = {
+    ord("n"): b"\n",
+    ord("r"): b"\r",
+    ord("t"): b"\t",
+    ord("b"): b"\b",
+    ord("f"): b"\f",
+}
+
+
+def _skip(buf: Any, pos: int) -> int:
+    return _SKIP_RE.match(buf, pos).end()
+
+
+def _literal_string(buf: Any, pos: int) -> tuple[bytes, int]:
+    out = bytearray()
+    depth = 1
+    pos += 1
+    end = len(buf)
+    while pos < end:
+        plain = _PLAIN_RE.match(buf, pos)
+        if plain:
+            out += plain.group()
+            pos = plain.end()
+            continue
+        char = buf[pos]
+        pos += 1
+        if char == 0x5C:
+            if pos >= end:
+                break
+            escaped = buf[pos]
+            pos += 1
+            if escaped in _ESCAPES:
+                out += _ESCAPES[escaped]
+            elif 0x30 <= escaped <= 0x37:
+                digits = [escaped]
+                while len(digits) < 3 and pos < end and 0x30 <= buf[pos] <= 0x37:
+                    digits.append(buf[pos])
+                    pos += 1
+                out.append(int(bytes(digits), 8) & 0xFF)
+            elif escaped == 0x0D:
+                if pos < end and buf[pos] == 0x0A:
+                    pos += 1
+            elif escaped != 0x0A:
+                out.append(escaped)
+        elif char == 0x28:
+            depth += 1
+            out.append(char)
+        else:
+            depth -= 1
+            if not depth:
+                return bytes(out), pos
+            out.append(char)
+    raise MarkerError("unterminated string")
+
+
+def _hex_string(buf: Any, pos: int) -> tuple[bytes, int]:
+    close = buf.find(b">", pos + 1)
+    if close < 0:
+        raise MarkerError("unterminated hex string")
+    digits = bytes(buf[pos + 1 : close]).translate(None, _WHITESPACE)
+    if len(digits) % 2:
+        digits += b"0"
+    try:
+        return binascii.unhexlify(digits), close + 1
+    except binascii.Error as exc:
+        raise MarkerError(f"invalid hex string at offset {pos}") from exc
+
+
+def _name(buf: Any, pos: int) -> tuple[Name, int]:
+    match = _REGULAR_RE.match(buf, pos + 1)
+    if not match:
+        return Name(""), pos + 1
+    raw = _NAME_ESCAPE_RE.sub(lambda escape: bytes([int(escape.group(1), 16)]), match.group())
+    return Name(raw.decode("latin-1")), match.end()
+
+
+def parse_object(buf: Any, pos: int) -> tuple[Any, int]:
+    """Parse one direct object at ``pos``; return it and the offset after it."""
+
+    pos = _skip(buf, pos)
+    if pos >= len(buf):
+        raise MarkerError("unexpected end of PDF data")
+    lead = buf[pos : pos + 1]
+    if lead == b"/":
+        return _name(buf, pos)
+    if lead == b"(":
+        return _literal_string(buf, pos)
+    if lead == b"<":
+        if buf[pos + 1 : pos + 2] != b"<":
+            return _hex_string(buf, pos)
+        result: dict[str, Any] = {}
+        pos += 2
+        while True:
+            pos = _skip(buf, pos)
+            if buf[pos : pos + 2] == b">>":
+                return result, pos + 2
+            key, pos = parse_object(buf, pos)
+            if not isinstance(key, Name):
+                raise MarkerError(f"dictionary key is not a name at offset {pos}")
+            result[key], pos = parse_object(buf, pos)
+    if lead == b"[":
+        items = []
+        pos += 1
+        while True:
+            pos = _skip(buf, pos)
+            if buf[pos : pos + 1] == b"]":
+                return items, pos + 1
+            item, pos = parse_object(buf, pos)
+            items.append(item)
+    match = _REGULAR_RE.match(buf, pos)
+    if not match:
+        raise MarkerError(f"unexpected {bytes(lead)!r} at offset {pos}")
+    word, end = match.group(), match.end()
+    if _NUMBER_RE.fullmatch(word):
+        if b"." in word:
+            return float(word), end
+        tail = _REF_TAIL_RE.match(buf, end)
+        if tail:
+            return Ref(int(word), int(tail.group(1))), tail.end()
+        return int(word), end
+    if word in (b"true", b"false"):
+        return word == b"true", end
+    if word == b"null":
+        return None, end
+    raise MarkerError(f"unexpected keyword {word.decode('latin-1')!r} at offset {pos}")
+
+
+# --- Stream filters --------------------------------------------------------------------------
+
+
+def _inflate(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    inflater = zlib.decompressobj()
+    try:
+        for chunk in chunks:
+            pending = chunk
+            while pending and not inflater.eof:
+                output = inflater.decompress(pending, CHUNK_SIZE)
+                if output:
+                    yield output
+                pending = inflater.unconsumed_tail
+            if inflater.eof:
+                return
+        tail = inflater.flush()
+    except zlib.error as exc:
+        raise MarkerError(f"corrupt FlateDecode stream: {exc}") from exc
+    if tail:
+        yield tail
+
+
+def _unpredict(data: bytes, params: dict[str, Any]) -> bytes:
+    predictor = params.get("Predictor", 1)
+    if predictor == 1:
+        return data
+    if predictor < 10:
+        raise MarkerError(f"unsupported stream predictor {predictor}")
+    colors = params.get("Colors", 1)
+    bits = params.get("BitsPerComponent", 8)
+    row_size = (params.get("Columns", 1) * colors * bits + 7) // 8
+    step = max(1, colors * bits // 8)
+    output = bytearray()
+    previous = bytearray(row_size)
+    for offset in range(0, len(data), row_size + 1):
+        kind = data[offset]
+        row = bytearray(data[offset + 1 : offset + 1 + row_size].ljust(row_size, b"\0"))
+        for index in range(row_size):
+            left = row[index - step] if index >= step else 0
+            up = previous[index]
+            if kind == 1:
+                row[index] = (row[index] + left) & 0xFF
+            elif kind == 2:
+                row[index] = (row[index] + up) & 0xFF
+            elif kind == 3:
+                row[index] = (row[index] + ((left + up) >> 1)) & 0xFF
+            elif kind == 4:
+                corner = previous[index - step] if index >= step else 0
+                guess = left + up - corner
+                nearest = min(
+                    (abs(guess - left), 0, left),
+                    (abs(guess - up), 1, up),
+                    (abs(guess - corner), 2, corner),
+                )[2]
+                row[index] = (row[index] + nearest) & 0xFF
+            elif kind:
+                raise MarkerError(f"unsupported PNG predictor row type {kind}")
+        output += row
+        previous = row
+    return bytes(output)
+
+
+def _decode(data: bytes, name: str, params: dict[str, Any]) -> bytes:
+    if name in ("FlateDecode", "Fl"):
+        return _unpredict(b"".join(_inflate([data])), params)
+    if name in ("ASCIIHexDecode", "AHx"):
+        digits = data.split(b">", 1)[0].translate(None, _WHITESPACE)
+        return binascii.unhexlify(digits + b"0" * (len(digits) % 2))
+    if name in ("ASCII85Decode", "A85"):
+        body = data.translate(None, _WHITESPACE)
+        body = body[2:] if body.startswith(b"<~") else body
+        return base64.a85decode(body.split(b"~>", 1)[0])
+    raise MarkerError(f"unsupported stream filter /{name}")
+
+
+# --- Document --------------------------------------------------------------------------------
+
+_HEADER_RE = re.compile(rb"%PDF-\d")
+_STARTXREF_RE = re.compile(rb"startxref\s+(\d+)")
+_OBJECT_RE = re.compile(rb"\s*(\d+)\s+(\d+)\s+obj\b")
+_ANY_OBJECT_RE = re.compile(rb"(?<![0-9])(\d+)\s+(\d+)\s+obj\b")
+_STREAM_RE = re.compile(rb"[\x00\t\x0c\r\n ]*stream(?:\r\n|\n|\r)")
+_ENDSTREAM_RE = re.compile(rb"[\r\n]*endstream")
+_XREF_ENTRY_RE = re.compile(rb"\s*(\d{1,10})\s+(\d{1,5})\s+([nf])")
+_XREF_SECTION_RE = re.compile(rb"\s*(\d+)\s+(\d+)")
+
+
+class PdfDocument:
+    """Lazy random access to the objects of a PDF held in ``data`` (bytes or mmap)."""
+
+    def __init__(self, data: Any) -> None:
+        if not _HEADER_RE.search(data, 0, 1024):
+            raise MarkerError("not a PDF file (no %PDF- header)")
+        self._data = data
+        # Object number -> (1, offset) or (2, object stream number, index); None if free.
+        self._xref: dict[int, tuple[int, ...] | None] = {}
+        self._objects: dict[int, Any] = {}
+        self._object_streams: dict[int, tuple[bytes, dict[int, int]]] = {}
+        self._fonts: dict[Any, _Font] = {}
+        self.trailer = self._read_trailer()
+        if "Encrypt" in self.trailer:
+            raise MarkerError("encrypted PDFs are not supported")
+
+    # Cross-reference data.
+
+    def _read_trailer(self) -> dict[str, Any]:
+        tail_start = max(0, len(self._data) - 4096)
+        starts = list(_STARTXREF_RE.finditer(self._data, tail_start))
+        if starts:
+            try:
+                trailer = self._read_xref_chain(int(starts[-1].group(1)))
+            except MarkerError:
+                trailer = {}
+            # Lookups made while the xref was incomplete may have cached nulls.
+            self._objects.clear()
+            if "Root" in trailer:
+                return trailer
+        return self._scan_objects()
+
+    def _read_xref_chain(self, offset: int) -> dict[str, Any]:
+        trailer: dict[str, Any] = {}
+        seen = set()
+        while isinstance(offset, int) and offset not in seen:
+            seen.add(offset)
+            pos = _skip(self._data, offset)
+            if self._data[pos : pos + 4] == b"xref":
+                section = self._read_xref_table(pos + 4)
+                if isinstance(section.get("XRefStm"), int):
+                    self._read_xref_stream(section["XRefStm"])
+            else:
+                section = self._read_xref_stream(pos)
+            for key, value in section.items():
+                trailer.setdefault(key, value)
+            offset = section.get("Prev")
+        return trailer
+
+    def _read_xref_table(self, pos: int) -> dict[str, Any]:
+        data = self._data
+        while True:
+            pos = _skip(data, pos)
+            if data[pos : pos + 7] == b"trailer":
+                trailer, _ = parse_object(data, pos + 7)
+                if not isinstance(trailer, dict):
+                    raise MarkerError("xref trailer is not a dictionary")
+                return trailer
+            section = _XREF_SECTION_RE.match(data, pos)
+            if not section:
+                raise MarkerError(f"malformed xref table at offset {pos}")
+            first, count = int(section.group(1)), int(section.group(2))
+            pos = section.end()
+            for number in range(first, first + count):
+                entry = _XREF_ENTRY_RE.match(data, pos)
+                if not entry:
+                    raise MarkerError(f"malformed xref entry at offset {pos}")
+                pos = entry.end()
+                location = (1, int(entry.group(1))) if entry.group(3) == b"n" else None
+                self._xref.setdefault(number, location)
+
+    def _read_xref_stream(self, offset: int) -> dict[str, Any]:
+        _, stream = self._object_at(offset)
+        if not isinstance(stream, Stream) or stream.info.get("Type") != "XRef":
+            raise MarkerError(f"no xref table or stream at offset {offset}")
+        widths = stream.info.get("W")
+        if not (isinstance(widths, list) and len(widths) == 3):
+            raise MarkerError("xref stream has no /W widths")
+        index = stream.info.get("Index", [0, stream.info.get("Size", 0)])
+        data = self.stream_data(stream)
+        pos = 0
+        for first, count in zip(index[::2], index[1::2]):
+            for number in range(first, first + count):
+                fields = []
+                for width in widths:
+                    fields.append(int.from_bytes(data[pos : pos + width], "big"))
+                    pos += width
+                kind = fields[0] if widths[0] else 1
+                if kind == 1:
+                    self._xref.setdefault(number, (1, fields[1]))
+                elif kind == 2:
+                    self._xref.setdefault(number, (2, fields[1], fields[2]))
+                else:
+                    self._xref.setdefault(number, None)
+        if pos > len(data):
+            raise MarkerError("xref stream is shorter than its /Index")
+        return stream.info
+
+    def _scan_objects(self) -> dict[str, Any]:
+        """Rebuild the xref from ``N G obj`` headers when it is missing or broken."""
+
+        self._xref.clear()
+        self._objects.clear()
+        for match in _ANY_OBJECT_RE.finditer(self._data):
+            self._xref[int(match.group(1))] = (1, match.start())
+        trailer: dict[str, Any] = {}
+        keyword = self._data.rfind(b"trailer")
+        if keyword >= 0:
+            with contextlib.suppress(MarkerError):
+                found, _ = parse_object(self._data, keyword + 7)
+                if isinstance(found, dict):
+                    trailer = found
+        if "Root" not in trailer:
+            for number in sorted(self._xref):
+                with contextlib.suppress(MarkerError):
+                    value = self.get(number)
+                    info = value.info if isinstance(value, Stream) else value
+                    if isinstance(info, dict) and info.get("Type") == "Catalog":
+                        trailer["Root"] = Ref(number, 0)
+        if "Root" not in trailer:
+            raise MarkerError("PDF has no readable cross-reference data or catalog")
+        return trailer
+
+    # Objects.
+
+    def _object_at(self, offset: int) -> tuple[int, Any]:
+        header = _OBJECT_RE.match(self._data, offset)
+        if not header:
+            raise MarkerError(f"no object at offset {offset}")
+        value, pos = parse_object(self._data, header.end())
+        if isinstance(value, dict):
+            stream = _STREAM_RE.match(self._data, pos)
+            if stream:
+                start = stream.end()
+                value = Stream(value, start, self._stream_length(value, start))
+        return int(header.group(1)), value
+
+    def _stream_length(self, info: dict[str, Any], start: int) -> int:
+        length = info.get("Length")
+        if isinstance(length, Ref):
+            try:
+                length = self.resolve(length)
+            except MarkerError:
+                length = None
+        if isinstance(length, int) and _ENDSTREAM_RE.match(self._data, start + length):
+            return length
+        end = self._data.find(b"endstream", start)
+        if end < 0:
+            raise MarkerError(f"unterminated stream at offset {start}")
+        while end > start and self._data[end - 1 : end] in (b"\n", b"\r"):
+            end -= 1
+        return end - start
+
+    def _object_stream(self, number: int) -> tuple[bytes, dict[int, int]]:
+        cached = self._object_streams.get(number)
+        if cached is None:
+            stream = self.get(number)
+            if not isinstance(stream, Stream):
+                raise MarkerError(f"object {number} is not an object stream")
+            data = self.stream_data(stream)
+            first = stream.info.get("First", 0)
+            header = data[:first].split()
+            offsets = {
+                int(header[index]): first + int(header[index + 1])
+                for index in range(0, min(len(header), 2 * stream.info.get("N", 0)), 2)
+            }
+            cached = self._object_streams[number] = (data, offsets)
+        return cached
+
+    def get(self, number: int) -> Any:
+        if number in self._objects:
+            return self._objects[number]
+        location = self._xref.get(number)
+        value = None
+        if location is not None and location[0] == 1:
+            _, value = self._object_at(location[1])
+        elif location is not None:
+            data, offsets = self._object_stream(location[1])
+            if number not in offsets:
+                raise MarkerError(f"object {number} is missing from object stream {location[1]}")
+            value, _ = parse_object(data, offsets[number])
+        self._objects[number] = value
+        return value
+
+    def resolve(self, value: Any) -> Any:
+        seen = set()
+        while isinstance(value, Ref):
+            if value.number in seen:
+                raise MarkerError(f"reference cycle at object {value.number}")
+            seen.add(value.number)
+            value = self.get(value.number)
+        return value
+
+    # Streams.
+
+    def _filters(self, stream: Stream) -> list[tuple[str, dict[str, Any]]]:
+        names = self.resolve(stream.info.get("Filter"))
+        params = self.resolve(stream.info.get("DecodeParms"))
+        names = [names] if isinstance(names, str) else list(names or [])
+        params = params if isinstance(params, list) else [params] * len(names)
+        return [
+            (str(name), self.resolve(param) or {}) for name, param in zip(names, params)
+        ]
+
+    def _raw_chunks(self, stream: Stream) -> Iterator[bytes]:
+        for offset in range(0, stream.length, CHUNK_SIZE):
+            end = stream.start + min(offset + CHUNK_SIZE, stream.length)
+            yield self._data[stream.start + offset : end]
+
+    def stream_data(self, stream: Stream) -> bytes:
+        data = self._data[stream.start : stream.start + stream.length]
+        for name, params in self._filters(stream):
+            data = _decode(data, name, params)
+        return data
+
+    def stream_chunks(self, stream: Stream) -> Iterator[bytes]:
+        """Decoded stream bytes; a plain FlateDecode stream is inflated chunk by chunk."""
+
+        filters = self._filters(stream)
+        if not filters:
+            yield from self._raw_chunks(stream)
+        elif len(filters) == 1 and filters[0][0] in ("FlateDecode", "Fl") and (
+            filters[0][1].get("Predictor", 1) == 1
+        ):
+            yield from _inflate(self._raw_chunks(stream))
+        else:
+            yield self.stream_data(stream)
+
+    # Pages and text.
+
+    def pages(self) -> list[Page]:
+        root = self.resolve(self.trailer.get("Root"))
+        if not isinstance(root, dict):
+            raise MarkerError("PDF has no document catalog")
+        pages: list[Page] = []
+        stack: list[tuple[Any, dict[str, Any]]] = [(root.get("Pages"), {})]
+        seen = set()
+        while stack:
+            reference, inherited = stack.pop()
+            if isinstance(reference, Ref):
+                if reference.number in seen:
+                    continue
+                seen.add(reference.number)
+            node = self.resolve(reference)
+            if not isinstance(node, dict):
+                continue
+            resources = self.resolve(node.get("Resources"))
+            resources = resources if isinstance(resources, dict) else inherited
+            kids = self.resolve(node.get("Kids"))
+            if node.get("Type") == "Pages" or isinstance(kids, list):
+                stack.extend((kid, resources) for kid in reversed(kids or []))
+            else:
+                pages.append(Page(node, resources))
+        return pages
+
+    def _font(self, fonts: dict[str, Any], name: Any) -> _Font | None:
+        reference = fonts.get(name)
+        key = reference if isinstance(reference, Ref) else id(reference)
+        font = self._fonts.get(key)
+        if font is None:
+            info = self.resolve(reference)
+            if not isinstance(info, dict):
+                return None
+            font = self._fonts[key] = _Font(self, info)
+        return font
+
+    def _content(self, contents: Any) -> Iterator[bytes]:
+        contents = self.resolve(contents)
+        for part in contents if isinstance(contents, list) else [contents]:
+            stream = self.resolve(part)
+            if isinstance(stream, Stream):
+                yield from self.stream_chunks(stream)
+                # Content arrays are concatenated with whitespace between the parts.
+                yield b"\n"
+
+    def page_text(self, page: Page) -> Iterator[str]:
+        """The decoded text of ``page`` piece by piece, in content-stream order."""
+
+        yield from self._text(self._content(page.info.get("Contents")), page.resources, ())
+
+    def _text(
+        self, chunks: Iterator[bytes], resources: dict[str, Any], forms: tuple[Any, ...]
+    ) -> Iterator[str]:
+        fonts = self.resolve(resources.get("Font")) or {}
+        xobjects = self.resolve(resources.get("XObject")) or {}
+        font = None
+        saved: list[_Font | None] = []
+        for operator, operands in content_operations(chunks):
+            if operator == "Tf" and len(operands) >= 2:
+                font = self._font(fonts, operands[-2])
+            elif operator in ("Tj", "'", '"') and operands and isinstance(operands[-1], bytes):
+                if operator != "Tj":
+                    yield "\n"
+                yield font.decode(operands[-1]) if font else ""
+            elif operator == "TJ" and operands and isinstance(operands[-1], list):
+                for item in operands[-1]:
+                    if isinstance(item, bytes):
+                        yield font.decode(item) if font else ""
+                    elif isinstance(item, (int, float)) and item < -TJ_SPACE:
+                        yield " "
+            elif operator in ("Td", "TD", "Tm", "T*"):
+                yield " "
+            elif operator == "ET":
+                yield "\n"
+            elif operator == "q":
+                saved.append(font)
+            elif operator == "Q" and saved:
+                font = saved.pop()
+            elif operator == "Do" and operands:
+                reference = xobjects.get(operands[-1])
+                form = self.resolve(reference)
+                if (
+                    isinstance(form, Stream)
+                    and form.info.get("Subtype") == "Form"
+                    and reference not in forms
+                ):
+                    form_resources = self.resolve(form.info.get("Resources"))
+                    yield from self._text(
+                        self.stream_chunks(form),
+                        form_resources if isinstance(form_resources, dict) else resources,
+                        (*forms, reference),
+                    )
+
+
+@contextlib.contextmanager
+def open_pdf(path: Path) -> Iterator[PdfDocument]:
+    """A ``PdfDocument`` over a read-only memory map of ``path``."""
+
+    try:
+        with open(path, "rb") as handle:
+            try:
+                data: Any = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                data = b""  # an empty file cannot be mapped
+    except OSError as exc:
+        raise MarkerError(f"unable to read {path}: {exc}") from exc
+    try:
+        yield PdfDocument(data)
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+
+
+# --- Content streams -------------------------------------------------------------------------
+
+_INLINE_IMAGE_END_RE = re.compile(rb"[\x00\t\n\x0c\r ]EI(?=[\x00\t\n\x0c\r ]|$)")
+_END = object()
+_OPEN = object()
+_CLOSE = object()
+
+
+def _content_token(buf: bytes, pos: int) -> tuple[Any, int]:
+    pos = _skip(buf, pos)
+    if pos >= len(buf):
+        return _END, pos
+    lead = buf[pos : pos + 1]
+    if lead == b"/":
+        return _name(buf, pos)
+    if lead == b"(":
+        return _literal_string(buf, pos)
+    if lead == b"<":
+        if buf[pos + 1 : pos + 2] == b"<":
+            return _OPEN, pos + 2
+        return _hex_string(buf, pos)
+    if lead == b">":
+        if buf[pos + 1 : pos + 2] == b">":
+            return _CLOSE, pos + 2
+        raise MarkerError(f"stray '>' in content stream at offset {pos}")
+    if lead == b"[":
+        return _OPEN, pos + 1
+    if lead == b"]":
+        return _CLOSE, pos + 1
+    if lead in (b"{", b"}"):
+        return None, pos + 1
+    match = _REGULAR_RE.match(buf, pos)
+    if not match:
+        raise MarkerError(f"unexpected {lead!r} in content stream")
+    word = match.group()
+    if _NUMBER_RE.fullmatch(word):
+        return (float(word) if b"." in word else int(word)), match.end()
+    if word in (b"true", b"false", b"null"):
+        return (None if word == b"null" else word == b"true"), match.end()
+    return Operator(word.decode("latin-1")), match.end()
+
+
+def content_operations(chunks: Iterable[bytes]) -> Iterator[tuple[Operator, list[Any]]]:
+    """``(operator, operands)`` pairs of a content stream fed as decoded chunks.
+
+    Only a lookahead window of the stream is held: chunks are pulled as the
+    tokenizer reaches the end of the buffered data (or a token spans it).
+    """
+
+    chunks = iter(chunks)
+    buf = b""
+    pos = 0
+    exhausted = False
+    operands: list[Any] = []
+    nested: list[list[Any]] = []
+
+    def pull() -> bool:
+        nonlocal buf, pos, exhausted
+        more = next(chunks, None)
+        if more is None:
+            exhausted = True
+            return False
+        buf = buf[pos:] + bytes(more)
+        pos = 0
+        return True
+
+    while True:
+        if not exhausted and len(buf) - pos < LOOKAHEAD and pull():
+            continue
+        try:
+            token, end = _content_token(buf, pos)
+        except MarkerError:
+            if exhausted or not pull():
+                raise
+            continue
+        if token is _END:
+            if exhausted or not pull():
+                return
+            continue
+        if end >= len(buf) and not exhausted and pull():
+            continue  # the token may continue in the next chunk
+        pos = end
+        if token is _OPEN:
+            nested.append([])
+        elif token is _CLOSE:
+            if nested:
+                closed = nested.pop()
+                (nested[-1] if nested else operands).append(closed)
+        elif nested:
+            nested[-1].append(token)
+        elif isinstance(token, Operator):
+            yield token, operands
+            operands = []
+            if token == "ID":
+                # Inline image data is binary; skip to the EI that ends it.
+                while True:
+                    found = _INLINE_IMAGE_END_RE.search(buf, pos)
+                    if found:
+                        pos = found.end()
+                        break
+                    if exhausted or not pull():
+                        return
+        elif token is not None:
+            operands.append(token)
+
+
+# --- Fonts -----------------------------------------------------------------------------------
+
+_GLYPHS = {
+    "space": " ",
+    "exclam": "!",
+    "quotedbl": '"',
+    "numbersign": "#",
+    "dollar": "$",
+    "percent": "%",
+    "ampersand": "&",
+    "quotesingle": "'",
+    "quoteright": "’",
+    "quoteleft": "‘",
+    "parenleft": "(",
+    "parenright": ")",
+    "asterisk": "*",
+    "plus": "+",
+    "comma": ",",
+    "hyphen": "-",
+    "period": ".",
+    "slash": "/",
+    "zero": "0",
+    "one": "1",
+    "two": "2",
+    "three": "3",
+    "four": "4",
+    "five": "5",
+    "six": "6",
+    "seven": "7",
+    "eight": "8",
+    "nine": "9",
+    "colon": ":",
+    "semicolon": ";",
+    "less": "<",
+    "equal": "=",
+    "greater": ">",
+    "question": "?",
+    "at": "@",
+    "bracketleft": "[",
+    "backslash": "\\",
+    "bracketright": "]",
+    "asciicircum": "^",
+    "underscore": "_",
+    "grave": "`",
+    "braceleft": "{",
+    "bar": "|",
+    "braceright": "}",
+    "asciitilde": "~",
+    "endash": "–",
+    "emdash": "—",
+    "quotedblleft": "“",
+    "quotedblright": "”",
+    "quotesinglbase": "‚",
+    "quotedblbase": "„",
+    "bullet": "•",
+    "ellipsis": "…",
+    "minus": "−",
+    "section": "§",
+    "paragraph": "¶",
+    "dagger": "†",
+    "daggerdbl": "‡",
+    "degree": "°",
+    "multiply": "×",
+    "divide": "÷",
+    "ff": "ff",
+    "fi": "fi",
+    "fl": "fl",
+    "ffi": "ffi",
+    "ffl": "ffl",
+    "germandbls": "ß",
+    "dotlessi": "ı",
+    "nbspace": " ",
+    "visiblespace": "␣",
+    "perthousand": "‰",
+}
+_UNI_RE = re.compile(r"uni((?:[0-9A-F]{4})+)")
+_U_RE = re.compile(r"u([0-9A-F]{4,6})")
+_CODESPACE_RE = re.compile(rb"begincodespacerange\s*<([0-9A-Fa-f\s]*)>", re.S)
+_BFCHAR_RE = re.compile(rb"beginbfchar(.*?)endbfchar", re.S)
+_BFRANGE_RE = re.compile(rb"beginbfrange(.*?)endbfrange", re.S)
+_CMAP_TOKEN_RE = re.compile(rb"<([0-9A-Fa-f\s]*)>|\[|\]")
+
+
+def glyph_text(name: str) -> str:
+    """Unicode text of a glyph name (Adobe Glyph List rules for the names TeX fonts use)."""
+
+    base = name.split(".", 1)[0]
+    if "_" in base:
+        return "".join(glyph_text(part) for part in base.split("_"))
+    if base in _GLYPHS:
+        return _GLYPHS[base]
+    if len(base) == 1:
+        return base
+    match = _UNI_RE.fullmatch(base)
+    if match:
+        digits = match.group(1)
+        return "".join(chr(int(digits[i : i + 4], 16)) for i in range(0, len(digits), 4))
+    match = _U_RE.fullmatch(base)
+    if match and int(match.group(1), 16) <= sys.maxunicode:
+        return chr(int(match.group(1), 16))
+    return ""
+
+
+def _utf16(data: bytes) -> str:
+    return data.decode("utf-16-be", errors="ignore")
+
+
+def parse_to_unicode(data: bytes) -> tuple[int, dict[int, str]]:
+    """Code width in bytes and code -> text of a ``ToUnicode`` CMap."""
+
+    codespace = _CODESPACE_RE.search(data)
+    width = len(codespace.group(1).translate(None, _WHITESPACE)) // 2 if codespace else 1
+    mapping: dict[int, str] = {}
+    for section in _BFCHAR_RE.findall(data):
+        values = [
+            binascii.unhexlify(token.translate(None, _WHITESPACE))
+            for token in re.findall(rb"<([0-9A-Fa-f\s]*)>", section)
+        ]
+        for source, target in zip(values[::2], values[1::2]):
+            mapping[int.from_bytes(source, "big")] = _utf16(target)
+    for section in _BFRANGE_RE.findall(data):
+        tokens = []
+        for match in _CMAP_TOKEN_RE.finditer(section):
+            if match.group(1) is None:
+                tokens.append(match.group())
+            else:
+                tokens.append(binascii.unhexlify(match.group(1).translate(None, _WHITESPACE)))
+        index = 0
+        while index + 2 < len(tokens):
+            low = int.from_bytes(tokens[index], "big")
+            high = int.from_bytes(tokens[index + 1], "big")
+            if tokens[index + 2] == b"[":
+                close = tokens.index(b"]", index + 3)
+                for code, target in zip(range(low, high + 1), tokens[index + 3 : close]):
+                    mapping[code] = _utf16(target)
+                index = close + 1
+                continue
+            target = tokens[index + 2]
+            start = int.from_bytes(target, "big")
+            for code in range(low, min(high, low + 0xFFFF) + 1):
+                value = (start + code - low).to_bytes(max(len(target), 2), "big")
+                mapping[code] = _utf16(value)
+            index += 3
+    return max(width, 1), mapping
+
+
+def _base_encoding(name: Any) -> dict[int, str]:
+    if name == "WinAnsiEncoding":
+        return {code: bytes([code]).decode("cp1252", errors="ignore") for code in range(32, 256)}
+    if name == "MacRomanEncoding":
+        return {code: bytes([code]).decode("mac_roman") for code in range(32, 256)}
+    table = {code: chr(code) for code in range(32, 127)}
+    table.update({0x27: "’", 0x60: "‘"})  # StandardEncoding quotes
+    return table
+
+
+class _Font:
+    """Byte codes to text for one font dictionary."""
+
+    def __init__(self, document: PdfDocument, info: dict[str, Any]) -> None:
+        self.width = 2 if info.get("Subtype") == "Type0" else 1
+        self.codes: dict[int, str] = {}
+        encoding = document.resolve(info.get("Encoding"))
+        if self.width == 1:
+            base = encoding.get("BaseEncoding") if isinstance(encoding, dict) else encoding
+            self.codes = _base_encoding(base)
+            differences = (
+                document.resolve(encoding.get("Differences"))
+                if isinstance(encoding, dict)
+                else None
+            )
+            code = 0
+            for item in differences or []:
+                if isinstance(item, int):
+                    code = item
+                elif isinstance(item, Name):
+                    self.codes[code] = glyph_text(item)
+                    code += 1
+        to_unicode = document.resolve(info.get("ToUnicode"))
+        if isinstance(to_unicode, Stream):
+            width, mapping = parse_to_unicode(document.stream_data(to_unicode))
+            self.width = width if self.width == 2 else self.width
+            self.codes.update(mapping)
+
+    def decode(self, data: bytes) -> str:
+        if self.width == 1:
+            return "".join(self.codes.get(code, "") for code in data)
+        return "".join(
+            self.codes.get(int.from_bytes(data[index : index + self.width], "big"), "")
+            for index in range(0, len(data) - self.width + 1, self.width)
+        )
+
+
+# --- Marker scan -----------------------------------------------------------------------------
+
+
+def _compact(text: str) -> str:
+    return "".join(text.split())
+
+
+def page_has_marker(document: PdfDocument, page: Page, marker: str = MARKER) -> bool:
+    """Whether ``page`` shows ``marker``; stops decoding the page once it does."""
+
+    needle = _compact(marker)
+    if not needle:
+        raise MarkerError("marker text is empty")
+    window = ""
+    for piece in document.page_text(page):
+        window += _compact(piece)
+        if needle in window:
+            return True
+        window = window[len(window) - len(needle) + 1 :] if len(window) >= len(needle) else window
+    return False
+
+
+def find_marker(
+    pdf: Path,
+    marker: str = MARKER,
+    *,
+    every_page: bool = False,
+) -> MarkerScan:
+    """Scan ``pdf`` for ``marker``: up to the first marked page, or every page."""
+
+    with open_pdf(pdf) as document:
+        pages = document.pages()
+        if not pages:
+            raise MarkerError(f"{pdf} has no pages")
+        count = len(pages)
+        if not every_page:
+            for number, page in enumerate(pages, start=1):
+                if page_has_marker(document, page, marker):
+                    return MarkerScan(True, count, number, (number,), tuple(range(1, number)))
+            return MarkerScan(False, count, count, (), tuple(range(1, count + 1)))
+        verdicts = [page_has_marker(document, page, marker) for page in pages]
+    marked = tuple(number for number, seen in enumerate(verdicts, start=1) if seen)
+    unmarked = tuple(number for number, seen in enumerate(verdicts, start=1) if not seen)
+    return MarkerScan(not unmarked, count, count, marked, unmarked)
+
+
+def page_texts(pdf: Path) -> list[str]:
+    with open_pdf(pdf) as document:
+        return ["".join(document.page_text(page)) for page in document.pages()]
+
+
+def pdftotext_marked_pages(
+    pdf: Path, marker: str = MARKER, *, pdftotext: str = "pdftotext", run: Runner = subprocess.run
+) -> tuple[int, tuple[int, ...]]:
+    """Page count and marked pages according to ``pdftotext`` (pages end with form feeds)."""
+
+    try:
+        completed = run([pdftotext, str(pdf), "-"], check=False, capture_output=True, text=True)
+    except OSError as exc:
+        raise MarkerError(f"unable to execute {pdftotext}: {exc}") from exc
+    if completed.returncode != 0:
+        detail = completed.stderr.strip() if completed.stderr else f"exit {completed.returncode}"
+        raise MarkerError(f"unable to inspect {pdf} with {pdftotext}: {detail}")
+    pages = completed.stdout.split("\f")
+    if pages and not pages[-1].strip():
+        pages.pop()
+    needle = _compact(marker)
+    marked = tuple(number for number, text in enumerate(pages, 1) if needle in _compact(text))
+    return len(pages), marked
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdf", type=Path)
+    parser.add_argument("--marker", default=MARKER)
+    parser.add_argument(
+        "--every-page", action="store_true", help="Require the marker on every page"
+    )
+    parser.add_argument(
+        "--compare-pdftotext",
+        action="store_true",
+        help="Fail if pdftotext finds the marker on a page this scan does not",
+    )
+    parser.add_argument("--pdftotext", default="pdftotext")
+    parser.add_argument("--text", action="store_true", help="Print the decoded text per page")
+    args = parser.parse_args(argv)
+    try:
+        if args.text:
+            for number, text in enumerate(page_texts(args.pdf), start=1):
+                print(f"--- page {number}\n{text}")
+            return 0
+        scan = find_marker(
+            args.pdf, args.marker, every_page=args.every_page or args.compare_pdftotext
+        )
+        reference = None
+        if args.compare_pdftotext:
+            reference = pdftotext_marked_pages(args.pdf, args.marker, pdftotext=args.pdftotext)
+    except MarkerError as exc:
+        parser.error(str(exc))
+    failed = not scan.found if args.every_page else not scan.marked_pages
+    print(
+        f"{args.pdf}: marker on {len(scan.marked_pages)} of {scan.pages_checked} page(s) "
+        f"checked ({scan.page_count} total)"
+    )
+    if args.every_page and scan.unmarked_pages:
+        pages = ", ".join(map(str, scan.unmarked_pages))
+        print(f"pages without {args.marker}: {pages}", file=sys.stderr)
+    if reference is not None:
+        count, expected = reference
+        missed = sorted(set(expected) - set(scan.marked_pages))
+        extra = sorted(set(scan.marked_pages) - set(expected))
+        if count != scan.page_count:
+            print(f"pdftotext reports {count} pages, this scan {scan.page_count}", file=sys.stderr)
+            failed = True
+        if missed:
+            print(f"pdftotext finds the marker on pages {missed} but this scan does not",
+                  file=sys.stderr)
+            failed = True
+        if extra:
+            print(f"pdftotext misses the marker on pages {extra} (rotated or unordered text)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,902 @@
+#!/usr/bin/env python3
+"""Resolve, verify and download the producer's intake artifact with asyncio.
+
+This is the ``Download intake bundle from producer`` step of
+``pull-wp-intake.yml`` as a Python client, with the same contract checks and
+error messages: the producer repository, workflow, branch and artifact name
+allow-lists; the run's workflow path, branch, head SHA, event and attempt; the
+release tag peeled to the run head; exactly one unexpired artifact whose
+digest, size, creation time and workflow run bind it to the verified run; and
+downloaded bytes and archive layout that match that identity.
+
+What differs is how it talks to GitHub:
+
+* one ``HttpPool`` of keep-alive HTTP/1.1 connections (stdlib ``asyncio``
+  streams, at most ``limit`` per origin) carries every request;
+* every JSON GET is conditional: ``EtagCache`` replays the cached body on a
+  304, so polling an unchanged run costs no rate limit;
+* the run is polled with exponential backoff and jitter inside the same
+  20-minute bound as the workflow's 81 x 15 s loop;
+* the release tag chain and the artifact listing are fetched concurrently,
+  and the listing's pages after the first are requested together;
+* the artifact ZIP is streamed to disk through SHA-256 (redirects to signed
+  storage URLs drop the ``Authorization`` header).
+
+``fetch`` runs the step (``--github-env "$GITHUB_ENV"`` appends the
+``SELECTED_PRODUCER_*`` lines); ``bench`` runs the whole path against the
+local ``fake_github_api.FakeGitHubAPI`` stand-in and reports requests,
+connections, 304s and wall time, so it can be measured without the network.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import ssl
+import stat
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterable, NamedTuple
+from urllib.parse import quote, urljoin, urlsplit
+
+
+API_URL = "https://api.github.com"
+API_VERSION = "2022-11-28"
+CHUNK_SIZE = 1 << 16
+POOL_LIMIT = 6
+PER_PAGE = 100
+MAX_BUNDLE_BYTES = 20 * 1024 * 1024
+MAX_TAG_DEPTH = 8
+MAX_REDIRECTS = 3
+PRODUCER_REPOS = ("equilens-labs/fl-bsa",)
+PRODUCER_WORKFLOWS = ("release-evidence.yml", "wp-evidence-nightly.yml")
+APPROVED_EVENTS = {
+    "wp-evidence-nightly.yml": ("schedule", "workflow_dispatch"),
+    "release-evidence.yml": ("workflow_dispatch",),
+}
+PENDING_STATUSES = ("queued", "in_progress", "requested", "waiting", "pending")
+PRIMARY_ARTIFACT = "wp-intake-bundle-v4"
+REVIEWER_PACK = "wp-reviewer-pack-v4"
+BUNDLE_FILENAMES = {
+    PRIMARY_ARTIFACT: "WhitePaper_Intake_Bundle_v4.zip",
+    REVIEWER_PACK: "WhitePaper_Reviewer_Pack_v4.zip",
+}
+_QUALIFIED_RE = re.compile(r"wp-intake-bundle-v4-[1-9][0-9]*")
+_RELEASE_BRANCH_RE = re.compile(r"release/v[0-9]+\.[0-9]+\.[0-9]+-[0-9a-f]{8}")
+_RUN_ID_RE = re.compile(r"[1-9][0-9]*")
+_SHA_RE = re.compile(r"[0-9a-f]{40}")
+_DIGEST_RE = re.compile(r"sha256:[0-9a-f]{64}")
+_TIMESTAMP_RE = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}T[0-9]{2}:[0-9]{2}:[0-9]{2}Z")
+_SEMVER_TAG_RE = re.compile(r"v[0-9]+\.[0-9]+\.[0-9]+")
+
+Sleep = Callable[[float], Awaitable[None]]
+
+
+class ProducerError(RuntimeError):
+    pass
+
+
+class Response(NamedTuple):
+    status: int
+    headers: dict[str, str]
+    body: bytes
+
+
+class PollPolicy(NamedTuple):
+    """Backoff for run polling; the defaults keep the workflow's 20-minute bound."""
+
+    attempts: int = 81
+    initial: float = 5.0
+    factor: float = 1.5
+    maximum: float = 60.0
+    deadline: float = 20 * 60.0
+
+
+class IntakeRequest(NamedTuple):
+    repo: str
+    workflow: str
+    branch: str
+    artifact: str = ""
+    event_name: str = "schedule"
+    run_id: str = ""
+    run_attempt: str = ""
+    artifact_id: str = ""
+    artifact_digest: str = ""
+
+
+# --- HTTP --------------------------------------------------------------------------------------
+
+
+class _StaleConnection(Exception):
+    """A kept-alive connection closed before answering; the request can be resent."""
+
+
+class HttpPool:
+    """Keep-alive HTTP/1.1 connections, at most ``limit`` open per origin."""
+
+    def __init__(
+        self,
+        *,
+        limit: int = POOL_LIMIT,
+        timeout: float = 30.0,
+        ssl_context: ssl.SSLContext | None = None,
+    ) -> None:
+        self.limit = limit
+        self.timeout = timeout
+        self._ssl = ssl_context
+        self._idle: dict[tuple[str, str, int], list[tuple[Any, Any]]] = {}
+        self._slots: dict[tuple[str, str, int], asyncio.Semaphore] = {}
+        self.connections_opened = 0
+        self.requests = 0
+
+    async def __aenter__(self) -> HttpPool:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for _, writer in connections:
+                writer.close()
+
+    async def _read(self, operation: Awaitable[bytes]) -> bytes:
+        try:
+            return await asyncio.wait_for(operation, self.timeout)
+        except asyncio.TimeoutError as exc:
+            raise ProducerError(f"no response within {self.timeout:g}s") from exc
+
+    async def _open(self, origin: tuple[str, str, int]) -> tuple[Any, Any]:
+        scheme, host, port = origin
+        context = None
+        if scheme == "https":
+            context = self._ssl or ssl.create_default_context()
+        self.connections_opened += 1
+        return await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=context), self.timeout
+        )
+
+    async def request(
+        self,
+        url: str,
+        headers: dict[str, str] | None = None,
+        *,
+        sink: Callable[[bytes], None] | None = None,
+    ) -> Response:
+        """GET ``url``; a 200 body goes to ``sink`` chunk by chunk when one is given."""
+
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ProducerError(f"unsupported URL {url}")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        origin = (parts.scheme, parts.hostname, port)
+        default_port = port == (443 if parts.scheme == "https" else 80)
+        host = parts.hostname if default_port else f"{parts.hostname}:{port}"
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        lines = [f"GET {target} HTTP/1.1", f"Host: {host}", "Connection: keep-alive"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        payload = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+        slot = self._slots.setdefault(origin, asyncio.Semaphore(self.limit))
+        async with slot:
+            while True:
+                idle = self._idle.get(origin)
+                reused = bool(idle)
+                reader, writer = idle.pop() if idle else await self._open(origin)
+                try:
+                    response, keep = await self._exchange(reader, writer, payload, sink)
+                except _StaleConnection:
+                    writer.close()
+                    if reused:
+                        continue
+                    raise ProducerError(f"GET {url}: connection closed without a response")
+                except (OSError, asyncio.IncompleteReadError) as exc:
+                    writer.close()
+                    raise ProducerError(f"GET {url}: {exc}") from exc
+                except BaseException:
+                    writer.close()
+                    raise
+                self.requests += 1
+                if keep:
+                    self._idle.setdefault(origin, []).append((reader, writer))
+                else:
+                    writer.close()
+                return response
+
+    async def _exchange(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        payload: bytes,
+        sink: Callable[[bytes], None] | None,
+    ) -> tuple[Response, bool]:
+        try:
+            writer.write(payload)
+            await writer.drain()
+            status_line = await self._read(reader.readline())
+        except (ConnectionError, asyncio.IncompleteReadError) as exc:
+            raise _StaleConnection() from exc
+        if not status_line:
+            raise _StaleConnection()
+        version, _, rest = status_line.decode("latin-1").strip().partition(" ")
+        try:
+            status = int(rest.split(" ", 1)[0])
+        except ValueError as exc:
+            raise ProducerError(f"malformed HTTP status line {status_line!r}") from exc
+        headers: dict[str, str] = {}
+        while True:
+            line = await self._read(reader.readline())
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        body = bytearray()
+        deliver = sink if sink is not None and status == 200 else body.extend
+        keep = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        if status in (204, 304) or 100 <= status < 200:
+            pass
+        elif "chunked" in headers.get("transfer-encoding", "").lower():
+            while True:
+                size_line = await self._read(reader.readline())
+                try:
+                    size = int(size_line.split(b";")[0], 16)
+                except ValueError as exc:
+                    raise ProducerError(f"malformed HTTP chunk size line {size_line!r}") from exc
+                if not size:
+                    while (await self._read(reader.readline())) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                deliver(await self._read(reader.readexactly(size)))
+                await self._read(reader.readexactly(2))
+        elif "content-length" in headers:
+            remaining = int(headers["content-length"])
+            while remaining:
+                chunk = await self._read(reader.read(min(CHUNK_SIZE, remaining)))
+                if not chunk:
+                    raise asyncio.IncompleteReadError(b"", remaining)
+                deliver(chunk)
+                remaining -= len(chunk)
+        else:
+            keep = False
+            while chunk := await self._read(reader.read(CHUNK_SIZE)):
+                deliver(chunk)
+        return Response(status, headers, bytes(body)), keep
+
+
+class EtagCache:
+    """ETag and body per URL, replayed when GitHub answers 304 Not Modified."""
+
+    def __init__(self) -> None:
+        self._entries: dict[str, tuple[str, bytes]] = {}
+        self.hits = 0
+
+    def get(self, url: str) -> tuple[str, bytes] | None:
+        return self._entries.get(url)
+
+    def put(self, url: str, etag: str, body: bytes) -> None:
+        self._entries[url] = (etag, body)
+
+
+class GitHubClient:
+    def __init__(
+        self,
+        pool: HttpPool,
+        *,
+        api_url: str = API_URL,
+        token: str | None = None,
+        etags: EtagCache | None = None,
+    ) -> None:
+        self.pool = pool
+        self.api_url = api_url.rstrip("/")
+        self.token = token
+        self.etags = etags if etags is not None else EtagCache()
+
+    def _headers(self) -> dict[str, str]:
+        headers = {
+            "Accept": "application/vnd.github+json",
+            "User-Agent": "fl-bsa-whitepaper-intake",
+            "X-GitHub-Api-Version": API_VERSION,
+        }
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        return headers
+
+    async def get_json(self, path: str) -> Any:
+        url = f"{self.api_url}/{path}"
+        headers = self._headers()
+        cached = self.etags.get(url)
+        if cached:
+            headers["If-None-Match"] = cached[0]
+        response = await self.pool.request(url, headers)
+        if response.status == 304 and cached:
+            self.etags.hits += 1
+            body = cached[1]
+        elif response.status == 200:
+            body = response.body
+            if "etag" in response.headers:
+                self.etags.put(url, response.headers["etag"], body)
+        else:
+            try:
+                message = json.loads(response.body).get("message", "")
+            except (ValueError, AttributeError):
+                message = ""
+            raise ProducerError(f"GET {path}: HTTP {response.status} {message}".rstrip())
+        try:
+            return json.loads(body)
+        except ValueError as exc:
+            raise ProducerError(f"GET {path}: response is not JSON") from exc
+
+    async def get_all(self, path: str, key: str, *, per_page: int = PER_PAGE) -> list[Any]:
+        """Every item of a paginated listing; pages after the first are fetched together."""
+
+        separator = "&" if "?" in path else "?"
+        first = await self.get_json(f"{path}{separator}per_page={per_page}&page=1")
+        total = first.get("total_count", 0)
+        pages = -(-total // per_page)
+        rest = await asyncio.gather(
+            *(
+                self.get_json(f"{path}{separator}per_page={per_page}&page={page}")
+                for page in range(2, pages + 1)
+            )
+        )
+        items = [item for page in (first, *rest) for item in page.get(key, [])]
+        if len(items) != total:
+            raise ProducerError(f"{path} changed while it was listed")
+        return items
+
+    async def download(self, path: str, destination: Path) -> tuple[str, int]:
+        """Stream ``path`` (following redirects) to ``destination``; return SHA-256 and size."""
+
+        url = f"{self.api_url}/{path}"
+        headers = self._headers()
+        digest = hashlib.sha256()
+        size = 0
+        with open(destination, "wb") as handle:
+
+            def sink(chunk: bytes) -> None:
+                nonlocal size
+                digest.update(chunk)
+                handle.write(chunk)
+                size += len(chunk)
+
+            for _ in range(MAX_REDIRECTS + 1):
+                response = await self.pool.request(url, headers, sink=sink)
+                if response.status in (301, 302, 303, 307, 308):
+                    url = urljoin(url, response.headers.get("location", ""))
+                    # Signed storage URLs carry their own authorization.
+                    headers = {"User-Agent": headers["User-Agent"]}
+                    continue
+                if response.status != 200:
+                    raise ProducerError(f"GET {path}: HTTP {response.status}")
+                return digest.hexdigest(), size
+        raise ProducerError(f"GET {path}: more than {MAX_REDIRECTS} redirects")
+
+
+# --- Intake contract ---------------------------------------------------------------------------
+
+
+def validate_request(request: IntakeRequest) -> None:
+    if request.repo not in PRODUCER_REPOS:
+        raise ProducerError(
+            f"Unsupported producer_repo={request.repo}; expected {PRODUCER_REPOS[0]}."
+        )
+    if request.workflow not in PRODUCER_WORKFLOWS:
+        raise ProducerError(
+            f"Unsupported workflow_file={request.workflow}; expected release-evidence.yml "
+            "or wp-evidence-nightly.yml."
+        )
+    artifact = request.artifact
+    if not artifact:
+        if request.event_name != "schedule":
+            raise ProducerError("repository_dispatch must select an exact producer artifact name.")
+    elif artifact.startswith(f"{PRIMARY_ARTIFACT}-"):
+        if not _QUALIFIED_RE.fullmatch(artifact):
+            raise ProducerError(f"Malformed run-attempt-qualified artifact_name={artifact}.")
+    elif artifact not in (PRIMARY_ARTIFACT, REVIEWER_PACK):
+        raise ProducerError(
+            f"Unsupported artifact_name={artifact}; expected {PRIMARY_ARTIFACT}, its "
+            f"run-attempt-qualified form, or explicit {REVIEWER_PACK} compatibility input."
+        )
+    nightly = request.workflow == "wp-evidence-nightly.yml" and request.branch == "main"
+    release = request.workflow == "release-evidence.yml" and bool(
+        _RELEASE_BRANCH_RE.fullmatch(request.branch)
+    )
+    if not (nightly or release):
+        raise ProducerError(
+            f"Unapproved producer workflow/branch pair: {request.workflow}@{request.branch}. "
+            "Nightly intake is restricted to main; release intake requires "
+            "release/vMAJOR.MINOR.PATCH-SHA8."
+        )
+
+
+def check_run(run: dict[str, Any], run_id: str, request: IntakeRequest) -> str:
+    """Contract checks on one run payload; return its status once it may be waited on."""
+
+    run_id_matches = str(run.get("id")) == run_id
+    repository = (run.get("head_repository") or {}).get("full_name")
+    workflow_path = str(run.get("path") or "").split("@")[0]
+    if not (
+        run_id_matches
+        and repository == request.repo
+        and workflow_path == f".github/workflows/{request.workflow}"
+        and run.get("head_branch") == request.branch
+        and _SHA_RE.fullmatch(str(run.get("head_sha") or ""))
+    ):
+        raise ProducerError(
+            f"Producer run {run_id} does not match the required workflow, branch, "
+            "and head-SHA contract."
+        )
+    if run.get("event") not in APPROVED_EVENTS[request.workflow]:
+        raise ProducerError(f"Producer run {run_id} has an unapproved workflow/event pair.")
+    status = run.get("status")
+    if status == "completed":
+        if run.get("conclusion") != "success":
+            raise ProducerError(
+                f"Producer run {run_id} completed without success; refusing its artifact."
+            )
+    elif status not in PENDING_STATUSES:
+        raise ProducerError(f"Producer run {run_id} has unsupported status {status!r}.")
+    return status
+
+
+def backoff_delays(policy: PollPolicy, rng: random.Random) -> Iterable[float]:
+    """Exponential backoff with jitter: each wait is drawn from [delay/2, delay]."""
+
+    for attempt in range(policy.attempts - 1):
+        delay = min(policy.maximum, policy.initial * policy.factor**attempt)
+        yield delay / 2 + rng.random() * delay / 2
+
+
+async def latest_successful_run(client: GitHubClient, request: IntakeRequest) -> str:
+    payload = await client.get_json(
+        f"repos/{request.repo}/actions/workflows/{quote(request.workflow)}/runs"
+        f"?branch={quote(request.branch, safe='')}&status=success&per_page=1"
+    )
+    runs = payload.get("workflow_runs") or []
+    if not runs:
+        raise ProducerError(
+            f"No successful {request.repo}/{request.workflow}@{request.branch} run found."
+        )
+    return str(runs[0].get("id", ""))
+
+
+async def wait_for_run(
+    client: GitHubClient,
+    request: IntakeRequest,
+    run_id: str,
+    *,
+    policy: PollPolicy = PollPolicy(),
+    sleep: Sleep = asyncio.sleep,
+    rng: random.Random | None = None,
+    log: Callable[[str], None] = print,
+) -> dict[str, Any]:
+    """Poll the run until it completes successfully, within ``policy``'s bound."""
+
+    delays = iter(backoff_delays(policy, rng or random.Random()))
+    waited = 0.0
+    for attempt in range(1, policy.attempts + 1):
+        try:
+            run = await client.get_json(f"repos/{request.repo}/actions/runs/{run_id}")
+        except ProducerError as exc:
+            raise ProducerError(
+                f"Unable to resolve {request.repo} run {run_id}; check token scopes and "
+                f"run visibility ({exc})."
+            ) from exc
+        status = check_run(run, run_id, request)
+        if status == "completed":
+            return run
+        delay = next(delays, None)
+        if delay is None or waited + delay > policy.deadline:
+            break
+        log(
+            f"Producer run {run_id} is {status}; waiting {delay:.1f}s for exact-run completion "
+            f"({attempt}/{policy.attempts})."
+        )
+        await sleep(delay)
+        waited += delay
+    minutes = policy.deadline / 60
+    raise ProducerError(
+        f"Producer run {run_id} did not complete successfully within the {minutes:g}-minute "
+        "bounded wait."
+    )
+
+
+def bind_attempt(run: dict[str, Any], run_id: str, request: IntakeRequest) -> str:
+    """Check the run attempt and start time; return the exact artifact name to download."""
+
+    attempt = str(run.get("run_attempt"))
+    if not _RUN_ID_RE.fullmatch(attempt):
+        raise ProducerError(
+            f"Producer run {run_id} has a missing or malformed run_attempt={attempt!r}."
+        )
+    started = str(run.get("run_started_at") or "")
+    if not _TIMESTAMP_RE.fullmatch(started):
+        raise ProducerError(f"Producer run {run_id} has malformed run_started_at={started!r}.")
+    artifact = request.artifact or f"{PRIMARY_ARTIFACT}-{attempt}"
+    if artifact == PRIMARY_ARTIFACT and attempt != "1":
+        raise ProducerError(
+            "Unqualified primary artifacts are accepted only for first-attempt legacy runs; "
+            f"attempt {attempt} requires {PRIMARY_ARTIFACT}-{attempt}."
+        )
+    if artifact.startswith(f"{PRIMARY_ARTIFACT}-") and artifact != f"{PRIMARY_ARTIFACT}-{attempt}":
+        raise ProducerError(
+            f"Artifact {artifact} is not qualified for verified run attempt {attempt}."
+        )
+    if artifact == REVIEWER_PACK and attempt != "1":
+        raise ProducerError(
+            "Legacy reviewer-pack compatibility is restricted to first-attempt runs."
+        )
+    if request.run_attempt and request.run_attempt != attempt:
+        raise ProducerError(
+            f"Dispatched producer run attempt {request.run_attempt} does not match API "
+            f"attempt {attempt}."
+        )
+    return artifact
+
+
+async def verify_release_tag(client: GitHubClient, request: IntakeRequest, head_sha: str) -> None:
+    """A release run's head must be the commit its semantic tag peels to."""
+
+    if request.workflow != "release-evidence.yml":
+        return
+    suffix = f"-{head_sha[:8]}"
+    tag = request.branch.removeprefix("release/")
+    tag = tag[: -len(suffix)] if tag.endswith(suffix) else tag
+    if not _SEMVER_TAG_RE.fullmatch(tag):
+        raise ProducerError(
+            f"Unable to derive a semantic release tag from {request.branch} and {head_sha}."
+        )
+    try:
+        target = (await client.get_json(f"repos/{request.repo}/git/ref/tags/{tag}")).get("object")
+    except ProducerError as exc:
+        raise ProducerError(f"Unable to resolve producer release tag {tag}.") from exc
+    for _ in range(MAX_TAG_DEPTH):
+        kind, sha = (target or {}).get("type", ""), str((target or {}).get("sha", ""))
+        if kind == "commit":
+            break
+        if kind != "tag" or not _SHA_RE.fullmatch(sha):
+            raise ProducerError(f"Producer tag {tag} has an unsupported Git object chain.")
+        target = (await client.get_json(f"repos/{request.repo}/git/tags/{sha}")).get("object")
+    kind, sha = (target or {}).get("type", ""), str((target or {}).get("sha", ""))
+    if kind != "commit" or not _SHA_RE.fullmatch(sha):
+        raise ProducerError(
+            f"Producer tag {tag} did not peel to a commit within the bounded depth."
+        )
+    if sha != head_sha:
+        raise ProducerError(
+            f"Producer release tag {tag} resolves to {sha}, not run head {head_sha}."
+        )
+
+
+async def list_artifacts(
+    client: GitHubClient, request: IntakeRequest, run_id: str
+) -> list[dict[str, Any]]:
+    try:
+        return await client.get_all(
+            f"repos/{request.repo}/actions/runs/{run_id}/artifacts", "artifacts"
+        )
+    except ProducerError as exc:
+        raise ProducerError(
+            f"Unable to list artifacts for {request.repo} run {run_id}; check token scopes and "
+            "producer run visibility."
+        ) from exc
+
+
+def select_artifact(
+    artifacts: list[dict[str, Any]],
+    artifact: str,
+    run: dict[str, Any],
+    request: IntakeRequest,
+    *,
+    log: Callable[[str], None] = print,
+) -> dict[str, Any]:
+    """The one artifact named ``artifact``, checked against the verified run."""
+
+    run_id = str(run["id"])
+    names = [item.get("name") for item in artifacts]
+    if (
+        request.event_name == "schedule"
+        and str(run.get("run_attempt")) == "1"
+        and artifact == f"{PRIMARY_ARTIFACT}-1"
+        and f"{PRIMARY_ARTIFACT}-1" not in names
+        and PRIMARY_ARTIFACT in names
+    ):
+        artifact = PRIMARY_ARTIFACT
+        log(
+            f"Scheduled intake selected the attested first-attempt transition artifact "
+            f"{PRIMARY_ARTIFACT}; reviewer-pack fallback remains forbidden."
+        )
+    matches = [item for item in artifacts if item.get("name") == artifact]
+    if len(matches) > 1:
+        raise ProducerError(
+            f"Producer run {run_id} has duplicate {artifact} artifacts; refusing ambiguous intake."
+        )
+    if not matches:
+        message = (
+            f"Requested producer artifact {artifact} is not present in {request.repo} run {run_id}."
+        )
+        if artifact == PRIMARY_ARTIFACT:
+            message += (
+                f" The unattested {REVIEWER_PACK} compatibility path must be requested "
+                "explicitly; it is never an automatic fallback."
+            )
+        raise ProducerError(message)
+    selected = matches[0]
+    if selected.get("expired") is True:
+        raise ProducerError(
+            f"Requested producer artifact {artifact} in {request.repo} run {run_id} is expired."
+        )
+    artifact_id = str(selected.get("id"))
+    digest = str(selected.get("digest") or "")
+    size = str(selected.get("size_in_bytes"))
+    created = str(selected.get("created_at") or "")
+    if not (
+        _RUN_ID_RE.fullmatch(artifact_id)
+        and _DIGEST_RE.fullmatch(digest)
+        and _RUN_ID_RE.fullmatch(size)
+    ):
+        raise ProducerError("Selected producer artifact has incomplete identity metadata.")
+    started = str(run.get("run_started_at"))
+    if not _TIMESTAMP_RE.fullmatch(created) or created < started:
+        raise ProducerError(
+            f"Artifact {artifact_id} creation {created!r} predates or cannot be bound to "
+            f"current attempt start {started!r}."
+        )
+    workflow_run = selected.get("workflow_run") or {}
+    if not (
+        str(workflow_run.get("id")) == run_id
+        and workflow_run.get("head_sha") == run.get("head_sha")
+        and workflow_run.get("head_branch") == request.branch
+    ):
+        raise ProducerError("Selected artifact metadata is not bound to the verified producer run.")
+    if request.artifact_id and request.artifact_id != artifact_id:
+        raise ProducerError(
+            f"Dispatched artifact ID {request.artifact_id} does not match API artifact "
+            f"{artifact_id}."
+        )
+    if request.artifact_digest and request.artifact_digest != digest:
+        raise ProducerError(
+            f"Dispatched artifact digest {request.artifact_digest} does not match API digest "
+            f"{digest}."
+        )
+    if artifact == REVIEWER_PACK:
+        log(
+            "::warning title=Explicit legacy compatibility path::wp-reviewer-pack-v4 is "
+            "unattested and is accepted only because this exact legacy artifact name was "
+            "requested."
+        )
+    return {**selected, "name": artifact}
+
+
+def check_bundle_archive(archive_path: Path, expected: str) -> zipfile.ZipInfo:
+    with zipfile.ZipFile(archive_path) as archive:
+        infos = archive.infolist()
+        if len(infos) != 1 or infos[0].filename != expected:
+            raise ProducerError(
+                "producer Actions artifact must contain exactly the expected root bundle "
+                f"{expected!r}; received {len(infos)} redacted member(s)"
+            )
+        info = infos[0]
+        file_type = stat.S_IFMT(info.external_attr >> 16)
+        if info.is_dir() or file_type not in (0, stat.S_IFREG) or info.flag_bits & 0x1:
+            raise ProducerError("producer Actions artifact bundle member is not a regular file")
+        if info.file_size <= 0 or info.file_size > MAX_BUNDLE_BYTES:
+            raise ProducerError("producer Actions artifact bundle member has an unsafe size")
+        bad_member = archive.testzip()
+        if bad_member is not None:
+            raise ProducerError(f"producer Actions artifact CRC validation failed: {bad_member}")
+        return info
+
+
+async def fetch_intake(
+    client: GitHubClient,
+    request: IntakeRequest,
+    output_dir: Path,
+    *,
+    policy: PollPolicy = PollPolicy(),
+    sleep: Sleep = asyncio.sleep,
+    rng: random.Random | None = None,
+    log: Callable[[str], None] = print,
+) -> dict[str, str]:
+    """Resolve, verify, download and unpack the producer bundle into ``output_dir``.
+
+    Returns the ``SELECTED_PRODUCER_*`` values the workflow exports.
+    """
+
+    validate_request(request)
+    run_id = request.run_id or await latest_successful_run(client, request)
+    if not _RUN_ID_RE.fullmatch(run_id):
+        raise ProducerError(
+            f"Producer run ID must be a positive numeric GitHub Actions run ID; got {run_id!r}."
+        )
+    run = await wait_for_run(client, request, run_id, policy=policy, sleep=sleep, rng=rng, log=log)
+    artifact = bind_attempt(run, run_id, request)
+    if not request.artifact:
+        log(
+            f"Scheduled intake derived exact artifact {artifact} from verified run attempt "
+            f"{run['run_attempt']}."
+        )
+
+    # The tag chain and the artifact listing are independent; fetch them together.
+    tasks = [
+        asyncio.ensure_future(verify_release_tag(client, request, run["head_sha"])),
+        asyncio.ensure_future(list_artifacts(client, request, run_id)),
+    ]
+    try:
+        _, listing = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    selected = select_artifact(listing, artifact, run, request, log=log)
+    artifact = selected["name"]
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    log(
+        f"Downloading artifact {selected['id']} ({artifact}) from {request.repo} run {run_id} "
+        f"attempt {run['run_attempt']}"
+    )
+    handle, name = tempfile.mkstemp(prefix="producer-artifact.", suffix=".zip", dir=output_dir)
+    os.close(handle)
+    archive = Path(name)
+    try:
+        digest, size = await client.download(
+            f"repos/{request.repo}/actions/artifacts/{selected['id']}/zip", archive
+        )
+        expected = f"{selected['digest']}/{selected['size_in_bytes']}"
+        if f"sha256:{digest}/{size}" != expected:
+            raise ProducerError(
+                "Downloaded artifact bytes do not match API identity: "
+                f"expected={expected} actual=sha256:{digest}/{size}."
+            )
+        kind = REVIEWER_PACK if artifact == REVIEWER_PACK else PRIMARY_ARTIFACT
+        filename = BUNDLE_FILENAMES[kind]
+        info = check_bundle_archive(archive, filename)
+        with zipfile.ZipFile(archive) as bundle:
+            bundle.extract(info, output_dir)
+    finally:
+        archive.unlink(missing_ok=True)
+    return {
+        "SELECTED_PRODUCER_REPO": request.repo,
+        "SELECTED_PRODUCER_WORKFLOW": request.workflow,
+        "SELECTED_PRODUCER_BRANCH": request.branch,
+        "SELECTED_PRODUCER_HEAD_SHA": run["head_sha"],
+        "SELECTED_PRODUCER_ARTIFACT": artifact,
+        "SELECTED_PRODUCER_ARTIFACT_ID": str(selected["id"]),
+        "SELECTED_PRODUCER_ARTIFACT_DIGEST": selected["digest"],
+        "SELECTED_PRODUCER_RUN_ID": run_id,
+        "SELECTED_PRODUCER_RUN_ATTEMPT": str(run["run_attempt"]),
+    }
+
+
+# --- CLI ---------------------------------------------------------------------------------------
+
+
+def _token(repo: str) -> str | None:
+    token = os.environ.get("PRODUCER_TOKEN") or os.environ.get("GH_TOKEN") or None
+    if token is None and repo != os.environ.get("GITHUB_REPOSITORY"):
+        raise ProducerError(
+            f"PRODUCER_TOKEN is required to read artifacts from {repo}. Configure a token "
+            f"with Actions read access to {repo}, or dispatch with artifacts from this "
+            "repository."
+        )
+    return token
+
+
+async def _fetch(args: argparse.Namespace) -> dict[str, str]:
+    request = IntakeRequest(
+        repo=args.repo,
+        workflow=args.workflow,
+        branch=args.branch,
+        artifact=args.artifact,
+        event_name=args.event_name,
+        run_id=args.run_id,
+        run_attempt=args.run_attempt,
+        artifact_id=args.artifact_id,
+        artifact_digest=args.artifact_digest,
+    )
+    async with HttpPool(limit=args.connections) as pool:
+        client = GitHubClient(pool, api_url=args.api_url, token=_token(request.repo))
+        return await fetch_intake(client, request, args.output)
+
+
+async def bench(
+    *, artifacts: int = 250, pending_polls: int = 3, latency: float = 0.02, limit: int = POOL_LIMIT
+) -> dict[str, Any]:
+    """Run ``fetch_intake`` against a local ``FakeGitHubAPI`` and report what it cost."""
+
+    from fake_github_api import FakeGitHubAPI, artifact_zip
+
+    request = IntakeRequest(
+        "equilens-labs/fl-bsa",
+        "wp-evidence-nightly.yml",
+        "main",
+        artifact=f"{PRIMARY_ARTIFACT}-1",
+        event_name="repository_dispatch",
+        run_id="7001",
+    )
+    async with FakeGitHubAPI(repo=request.repo, token="bench", latency=latency) as api:
+        api.add_run(7001, statuses=["queued"] + ["in_progress"] * pending_polls + ["completed"])
+        for index in range(artifacts - 1):
+            api.add_artifact(7001, f"coverage-{index}", b"x")
+        bundle = artifact_zip(BUNDLE_FILENAMES[PRIMARY_ARTIFACT], os.urandom(4 << 20))
+        api.add_artifact(7001, f"{PRIMARY_ARTIFACT}-1", bundle)
+        with tempfile.TemporaryDirectory() as tmp:
+            started = time.perf_counter()
+            async with HttpPool(limit=limit) as pool:
+                client = GitHubClient(pool, api_url=api.url, token="bench")
+                await fetch_intake(
+                    client,
+                    request,
+                    Path(tmp),
+                    policy=PollPolicy(initial=0.01, factor=1.0, maximum=0.01),
+                    log=lambda _message: None,
+                )
+            seconds = time.perf_counter() - started
+        return {
+            "seconds": round(seconds, 3),
+            "requests": sum(api.requests.values()),
+            "connections": api.connections,
+            "not_modified": api.not_modified,
+            "artifact_pages": api.requests["artifacts"],
+        }
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    fetch = commands.add_parser("fetch", help="Download the producer bundle (workflow step)")
+    fetch.add_argument("--repo", default=PRODUCER_REPOS[0])
+    fetch.add_argument("--workflow", default="wp-evidence-nightly.yml")
+    fetch.add_argument("--branch", default="main")
+    fetch.add_argument("--artifact", default="")
+    fetch.add_argument("--event-name", default=os.environ.get("GITHUB_EVENT_NAME", "schedule"))
+    fetch.add_argument("--run-id", default="")
+    fetch.add_argument("--run-attempt", default="")
+    fetch.add_argument("--artifact-id", default="")
+    fetch.add_argument("--artifact-digest", default="")
+    fetch.add_argument("--output", type=Path, default=Path("wp-bundle"))
+    fetch.add_argument("--api-url", default=os.environ.get("GITHUB_API_URL", API_URL))
+    fetch.add_argument("--connections", type=int, default=POOL_LIMIT)
+    fetch.add_argument("--github-env", type=Path, help="Append SELECTED_* lines to this file")
+    measure = commands.add_parser("bench", help="Time the whole path against the local stand-in")
+    measure.add_argument("--artifacts", type=int, default=250)
+    measure.add_argument("--pending-polls", type=int, default=3)
+    measure.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args(argv)
+
+    if args.command == "bench":
+        for limit in (1, POOL_LIMIT):
+            report = asyncio.run(
+                bench(
+                    artifacts=args.artifacts,
+                    pending_polls=args.pending_polls,
+                    latency=args.latency,
+                    limit=limit,
+                )
+            )
+            print(f"{limit} connection(s) per origin: " + json.dumps(report, sort_keys=True))
+        return 0
+    try:
+        selection = asyncio.run(_fetch(args))
+    except ProducerError as exc:
+        parser.error(str(exc))
+    lines = "".join(f"{key}={value}\n" for key, value in selection.items())
+    if args.github_env:
+        with open(args.github_env, "a", encoding="utf-8") as handle:
+            handle.write(lines)
+    print(lines, end="")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+
+"""
+Sweep SAP thresholds and alpha levels across every reported pair and slice.
+
+Inputs (default paths):
+  - intake/metrics_uncertainty.json (gender pair + every race pair, with counts)
+  - intake/fairness_slices.json     (historical / amplification / intrinsic)
+  - intake/metrics_long.csv         (tpr_gap / fpr_gap / ece rows, when present)
+  - config/sap.yaml                 (the reviewed thresholds, marked in outputs)
+
+Outputs (under --outdir, default dist/sap_sensitivity/):
+  - sap_sensitivity_air.csv   (one row per alpha x air_min grid point)
+  - sap_sensitivity_gaps.csv  (one row per metric x threshold grid point)
+  - table_sap_sensitivity.tex (point-estimate AIR violations under the paper's
+                                rule, then CI-confirmed counts per alpha)
+  - sap_sensitivity_air.pdf   (heatmap of the same counts)
+
+``paper_violations`` applies the rule behind the paper's PASS/FAIL and
+``\\NumAIRViolations``: a point estimate below ``air_min`` on the gender pair,
+plus the worst-case race pair when the intake displays race in the main PDF.
+``point_violations`` and the CI columns cover every pair and slice.
+
+AIR intervals are recomputed from the shipped counts with the same delta-method
+log-ratio rule the producer uses, so the whole alpha x threshold x pair cube is
+evaluated with one broadcast instead of re-running the generators per grid
+point. At ``alpha = 0.05`` the recomputed bounds equal the shipped ``ci95``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+from pathlib import Path
+from statistics import NormalDist
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import yaml
+
+
+_PDF_METADATA = {
+    "Creator": "Equilens FL-BSA whitepaper",
+    "Producer": "Equilens FL-BSA whitepaper",
+    "CreationDate": None,
+    "ModDate": None,
+}
+_GAP_METRICS = {
+    "tpr_gap": "tpr_gap_max",
+    "fpr_gap": "fpr_gap_max",
+    "ece": "ece_max",
+}
+_DEFAULT_GRIDS = {
+    "air_min": "0.70:0.90:0.01",
+    "alpha": "0.01,0.05,0.10",
+    "tpr_gap_max": "0.01:0.10:0.01",
+    "fpr_gap_max": "0.01:0.10:0.01",
+    "ece_max": "0.005:0.05:0.005",
+}
+
+
+def _load_json(path: Path) -> dict[str, Any]:
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        raise ValueError(f"unable to read {path}: {exc}") from exc
+    return payload if isinstance(payload, dict) else {}
+
+
+def _load_yaml(path: Path) -> dict[str, Any]:
+    try:
+        payload = yaml.safe_load(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError, yaml.YAMLError) as exc:
+        raise ValueError(f"unable to read {path}: {exc}") from exc
+    return payload if isinstance(payload, dict) else {}
+
+
+def _truthy(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in {"1", "true", "yes", "on"}
+
+
+def parse_grid(spec: str) -> np.ndarray:
+    """Parse ``start:stop:step`` (inclusive) or a comma-separated list."""
+
+    text = spec.strip()
+    try:
+        if ":" in text:
+            start, stop, step = (float(part) for part in text.split(":"))
+            if step <= 0 or stop < start:
+                raise ValueError
+            count = int(math.floor((stop - start) / step + 1e-9)) + 1
+            values = start + step * np.arange(count)
+        else:
+            values = np.array([float(part) for part in text.split(",") if part.strip()])
+    except ValueError as exc:
+        raise ValueError(f"invalid grid specification: {spec!r}") from exc
+    values = np.unique(np.round(values, 12))
+    if values.size == 0 or not np.isfinite(values).all():
+        raise ValueError(f"invalid grid specification: {spec!r}")
+    return values
+
+
+def _pair_entry(
+    label: str, attribute: str, pair: Any, *, in_paper: bool = False
+) -> dict[str, Any] | None:
+    if not isinstance(pair, dict):
+        return None
+    counts = pair.get("counts") if isinstance(pair.get("counts"), dict) else {}
+    air = pair.get("air") if isinstance(pair.get("air"), dict) else {}
+    try:
+        entry = {
+            "label": label,
+            "attribute": attribute,
+            "prot_selected": float(counts["prot_approved"]),
+            "prot_n": float(counts["prot_n"]),
+            "ref_selected": float(counts["ref_approved"]),
+            "ref_n": float(counts["ref_n"]),
+        }
+    except (KeyError, TypeError, ValueError):
+        return None
+    p_value = air.get("p_value_adjusted", air.get("p_value"))
+    entry["p_value"] = float(p_value) if isinstance(p_value, (int, float)) else math.nan
+    point = air.get("point")
+    entry["air_point"] = float(point) if isinstance(point, (int, float)) else math.nan
+    entry["in_paper"] = in_paper
+    return entry
+
+
+def collect_air_surface(uncertainty: dict[str, Any], slices: dict[str, Any]) -> pd.DataFrame:
+    """Flatten every SoT pair and gender slice into aligned count columns.
+
+    ``in_paper`` marks the pairs the paper's AIR violation count looks at.
+    """
+
+    entries: list[dict[str, Any] | None] = []
+    fu = uncertainty.get("fairness_uncertainty")
+    fu = fu if isinstance(fu, dict) else {}
+    gender = fu.get("gender") if isinstance(fu.get("gender"), dict) else {}
+    if gender:
+        entries.append(
+            _pair_entry(
+                f"gender:{gender.get('protected_group', '')}", "gender", gender, in_paper=True
+            )
+        )
+    race = fu.get("race") if isinstance(fu.get("race"), dict) else {}
+    pairs = race.get("pairs") if isinstance(race.get("pairs"), dict) else {}
+    race_in_paper = _truthy(race.get("display_in_main_pdf"))
+    for group in sorted(pairs):
+        entries.append(
+            _pair_entry(
+                f"race:{group}",
+                "race",
+                pairs[group],
+                in_paper=race_in_paper and group == race.get("worst_case_pair"),
+            )
+        )
+    slice_map = slices.get("slices") if isinstance(slices.get("slices"), dict) else {}
+    for key in ("historical", "amplification", "intrinsic"):
+        if key in slice_map:
+            entries.append(_pair_entry(f"slice:{key}", "gender_slice", slice_map[key]))
+    return pd.DataFrame(
+        [entry for entry in entries if entry is not None],
+        columns=[
+            "label",
+            "attribute",
+            "prot_selected",
+            "prot_n",
+            "ref_selected",
+            "ref_n",
+            "p_value",
+            "air_point",
+            "in_paper",
+        ],
+    )
+
+
+def sweep_air(surface: pd.DataFrame, air_grid: np.ndarray, alpha_grid: np.ndarray) -> pd.DataFrame:
+    """Evaluate the alpha x air_min x pair cube in one broadcast."""
+
+    x1 = surface["prot_selected"].to_numpy(dtype=float)
+    n1 = surface["prot_n"].to_numpy(dtype=float)
+    x0 = surface["ref_selected"].to_numpy(dtype=float)
+    n0 = surface["ref_n"].to_numpy(dtype=float)
+    p_values = surface["p_value"].to_numpy(dtype=float)
+    in_paper = surface["in_paper"].to_numpy(dtype=bool)
+    p1 = x1 / n1
+    p0 = x0 / n0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        point = p1 / p0
+        se = np.sqrt((1.0 - p1) / (n1 * p1) + (1.0 - p0) / (n0 * p0))
+    # Point comparisons use the shipped estimate, as the macro generator does.
+    shipped = surface["air_point"].to_numpy(dtype=float)
+    reported = np.where(np.isfinite(shipped), shipped, point)
+
+    z = np.array([NormalDist().inv_cdf(1.0 - a / 2.0) for a in alpha_grid])
+    # Shapes: alpha (A, 1, 1), threshold (1, T, 1), pair (1, 1, P).
+    z3 = z[:, None, None]
+    thr3 = air_grid[None, :, None]
+    upper = point[None, None, :] * np.exp(z3 * se[None, None, :])
+    lower = point[None, None, :] * np.exp(-z3 * se[None, None, :])
+    below = reported[None, None, :] < thr3
+    ci_confirmed = upper < thr3
+    ambiguous = (lower < thr3) & ~ci_confirmed
+    significant = below & (p_values[None, None, :] < alpha_grid[:, None, None])
+
+    shape = (alpha_grid.size, air_grid.size)
+    alpha_axis, thr_axis = np.meshgrid(alpha_grid, air_grid, indexing="ij")
+    return pd.DataFrame(
+        {
+            "alpha": alpha_axis.ravel(),
+            "air_min": thr_axis.ravel(),
+            "pairs": np.full(shape, point.size).ravel(),
+            "paper_violations": np.broadcast_to((below & in_paper).sum(axis=2), shape).ravel(),
+            "point_violations": np.broadcast_to(below.sum(axis=2), shape).ravel(),
+            "ci_confirmed_violations": ci_confirmed.sum(axis=2).ravel(),
+            "ci_ambiguous": ambiguous.sum(axis=2).ravel(),
+            "significant_violations": significant.sum(axis=2).ravel(),
+        }
+    )
+
+
+def sweep_gaps(metrics_long: pd.DataFrame, grids: dict[str, np.ndarray]) -> pd.DataFrame:
+    """Count threshold exceedances for each gap/ECE metric across its grid."""
+
+    frames: list[pd.DataFrame] = []
+    if metrics_long.empty or "metric" not in metrics_long.columns:
+        return pd.DataFrame(columns=["metric", "threshold", "rows", "violations"])
+    metric_l = metrics_long["metric"].astype(str).str.lower()
+    values = pd.to_numeric(metrics_long.get("value"), errors="coerce")
+    for metric, threshold_key in _GAP_METRICS.items():
+        observed = values[metric_l == metric].dropna().to_numpy(dtype=float)
+        grid = grids[threshold_key]
+        exceed = observed[None, :] > grid[:, None]
+        frames.append(
+            pd.DataFrame(
+                {
+                    "metric": metric,
+                    "threshold": grid,
+                    "rows": observed.size,
+                    "violations": exceed.sum(axis=1),
+                }
+            )
+        )
+    return pd.concat(frames, ignore_index=True)
+
+
+def _fmt_threshold(value: float) -> str:
+    return f"{value:.3f}".rstrip("0").rstrip(".")
+
+
+def write_table(
+    air: pd.DataFrame, out_path: Path, *, sap_air_min: float, max_rows: int
+) -> None:
+    """Write paper-rule point violations, then CI-confirmed counts per alpha, by air_min."""
+
+    pivot = air.pivot(index="air_min", columns="alpha", values="ci_confirmed_violations")
+    paper = air.groupby("air_min")["paper_violations"].first()
+    if len(pivot) > max_rows:
+        step = int(math.ceil(len(pivot) / max_rows))
+        nearest = pivot.index[np.argmin(np.abs(pivot.index - sap_air_min))]
+        keep = set(pivot.index[::step]) | {nearest}
+        pivot = pivot.loc[sorted(keep)]
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with out_path.open("w", encoding="utf-8") as f:
+        columns = len(pivot.columns)
+        f.write(f"\\begin{{tabular}}{{lr{'r' * columns}}}\n\\toprule\n")
+        f.write(
+            f"AIR threshold & Point violations & \\multicolumn{{{columns}}}{{c}}"
+            "{CI-confirmed violations, all pairs and slices}\\\\\n"
+            f"\\cmidrule(lr){{3-{columns + 2}}}\n"
+        )
+        header = " & ".join(f"$\\alpha={_fmt_threshold(a)}$" for a in pivot.columns)
+        f.write(f" & (paper rule) & {header}\\\\\n\\midrule\n")
+        for threshold, row in pivot.iterrows():
+            label = _fmt_threshold(float(threshold))
+            if math.isclose(float(threshold), sap_air_min, abs_tol=1e-9):
+                label = f"\\textbf{{{label}}} (SAP)"
+            cells = [str(int(paper.loc[threshold])), *(str(int(v)) for v in row)]
+            f.write(label + " & " + " & ".join(cells) + "\\\\\n")
+        f.write("\\bottomrule\n\\end{tabular}\n")
+
+
+def write_heatmap(air: pd.DataFrame, out_path: Path, *, sap_air_min: float) -> bool:
+    try:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt  # type: ignore[import]
+    except Exception:
+        return False
+
+    pivot = air.pivot(index="alpha", columns="air_min", values="ci_confirmed_violations")
+    paper = air.groupby("air_min")["paper_violations"].first().reindex(pivot.columns)
+    # CI-confirmed rows per alpha, with the paper-rule point count as the top row.
+    counts = np.vstack([pivot.to_numpy(), paper.to_numpy()[None, :]])
+    labels = [f"CI, $\\alpha$={_fmt_threshold(a)}" for a in pivot.index] + ["point (paper rule)"]
+    fig, ax = plt.subplots(figsize=(5.6, 0.6 + 0.35 * len(labels)))
+    image = ax.imshow(
+        counts,
+        aspect="auto",
+        cmap="Greys",
+        origin="lower",
+        extent=(
+            float(pivot.columns.min()),
+            float(pivot.columns.max()),
+            -0.5,
+            len(labels) - 0.5,
+        ),
+        interpolation="nearest",
+    )
+    ax.axvline(sap_air_min, linestyle="--", color="#a33a3a", linewidth=0.9)
+    ax.axhline(len(pivot.index) - 0.5, color="white", linewidth=1.5)
+    ax.set_yticks(range(len(labels)))
+    ax.set_yticklabels(labels)
+    ax.set_xlabel("AIR threshold")
+    fig.colorbar(image, ax=ax, label="AIR violations")
+    fig.tight_layout()
+    fig.savefig(out_path, metadata=_PDF_METADATA)
+    plt.close(fig)
+    return True
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Sweep SAP thresholds and alpha levels")
+    ap.add_argument("--uncertainty", default="intake/metrics_uncertainty.json")
+    ap.add_argument("--slices", default="intake/fairness_slices.json")
+    ap.add_argument("--metrics", default="intake/metrics_long.csv")
+    ap.add_argument("--sap", default="config/sap.yaml")
+    for key, default in _DEFAULT_GRIDS.items():
+        ap.add_argument(
+            f"--{key.replace('_', '-')}",
+            dest=key,
+            default=default,
+            help=f"Grid as start:stop:step or a comma list (default {default})",
+        )
+    ap.add_argument("--max-table-rows", type=int, default=12)
+    ap.add_argument("--outdir", default="dist/sap_sensitivity")
+    args = ap.parse_args()
+
+    try:
+        grids = {key: parse_grid(getattr(args, key)) for key in _DEFAULT_GRIDS}
+    except ValueError as exc:
+        ap.error(str(exc))
+    if ((grids["alpha"] <= 0) | (grids["alpha"] >= 1)).any():
+        ap.error("alpha grid values must be in (0, 1)")
+
+    try:
+        sap = _load_yaml(Path(args.sap))
+        uncertainty = _load_json(Path(args.uncertainty))
+        slices = _load_json(Path(args.slices))
+    except ValueError as exc:
+        ap.error(str(exc))
+    thresholds = sap.get("thresholds") if isinstance(sap.get("thresholds"), dict) else {}
+    sap_air_min = float(thresholds.get("air_min", 0.80))
+    # Always evaluate the reviewed SAP thresholds so the baseline row exists.
+    for key in ("air_min", *_GAP_METRICS.values()):
+        if key in thresholds:
+            grids[key] = np.unique(np.append(grids[key], float(thresholds[key])))
+
+    surface = collect_air_surface(uncertainty, slices)
+    if surface.empty:
+        ap.error("no AIR pairs or slices with counts were found in the intake")
+    metrics_path = Path(args.metrics)
+    metrics_long = pd.read_csv(metrics_path) if metrics_path.is_file() else pd.DataFrame()
+
+    air = sweep_air(surface, grids["air_min"], grids["alpha"])
+    air["is_sap_threshold"] = np.isclose(air["air_min"], sap_air_min)
+    gaps = sweep_gaps(metrics_long, grids)
+    gaps["is_sap_threshold"] = [
+        math.isclose(row.threshold, float(thresholds.get(_GAP_METRICS[row.metric], math.nan)))
+        for row in gaps.itertuples()
+    ]
+
+    outdir = Path(args.outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    air.to_csv(outdir / "sap_sensitivity_air.csv", index=False)
+    gaps.to_csv(outdir / "sap_sensitivity_gaps.csv", index=False)
+    write_table(
+        air,
+        outdir / "table_sap_sensitivity.tex",
+        sap_air_min=sap_air_min,
+        max_rows=args.max_table_rows,
+    )
+    write_heatmap(air, outdir / "sap_sensitivity_air.pdf", sap_air_min=sap_air_min)
+    print(
+        f"Evaluated {len(air)} AIR grid points x {len(surface)} pairs/slices and "
+        f"{len(gaps)} gap/ECE grid points into {outdir}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
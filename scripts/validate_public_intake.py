@@ -203,25 +203,36 @@ def _read_text(path: Path) -> str:
         raise DisclosureError(f"{path} is not UTF-8: {exc}") from exc
 
 
-def _scan_text(value: str, location: str) -> None:
-    if len(value) > _MAX_CELL_OR_STRING_CHARS:
-        raise DisclosureError(
-            f"{location} exceeds the {_MAX_CELL_OR_STRING_CHARS}-character value limit"
-        )
+def sensitive_text_label(value: str) -> str | None:
+    """Name the first high-confidence sensitive content in ``value``, if any."""
+
     if _CONTROL_CHARACTER.search(value):
-        raise DisclosureError(f"{location} contains a control character")
+        return "control character"
     for label, pattern in _TEXT_PATTERNS:
         if pattern.search(value):
-            raise DisclosureError(f"{location} contains a high-confidence {label}")
+            return f"high-confidence {label}"
     for candidate in _IPV4_CANDIDATE.findall(value) + _IPV6_CANDIDATE.findall(value):
         try:
             address = ipaddress.ip_address(candidate)
         except ValueError:
             continue
         if address.is_private:
-            raise DisclosureError(
-                f"{location} contains a private IP address; value redacted"
-            )
+            return "private IP address"
+    return None
+
+
+def _scan_text(value: str, location: str) -> None:
+    if len(value) > _MAX_CELL_OR_STRING_CHARS:
+        raise DisclosureError(
+            f"{location} exceeds the {_MAX_CELL_OR_STRING_CHARS}-character value limit"
+        )
+    label = sensitive_text_label(value)
+    if label == "private IP address":
+        raise DisclosureError(
+            f"{location} contains a private IP address; value redacted"
+        )
+    if label is not None:
+        raise DisclosureError(f"{location} contains a {label}")
 
 
 def _normalized_key(value: Any) -> str:
@@ -229,7 +240,9 @@ def _normalized_key(value: Any) -> str:
     return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_")
 
 
-def _is_sensitive_key(value: Any) -> bool:
+def is_sensitive_key(value: Any) -> bool:
+    """True when a field or column name matches a forbidden sensitive token."""
+
     normalized = _normalized_key(value)
     wrapped = f"_{normalized}_"
     return any(f"_{token}_" in wrapped for token in _SENSITIVE_KEY_TOKENS)
@@ -271,7 +284,7 @@ def _validate_structure(
             # certificate's already-reviewed matrix below. Use a redacted
             # location here so an invalid producer key cannot reach logs.
             for key, value in candidate.items():
-                if _is_sensitive_key(key):
+                if is_sensitive_key(key):
                     raise DisclosureError(
                         f"{location} contains a forbidden sensitive field; key redacted"
                     )
@@ -283,7 +296,7 @@ def _validate_structure(
                 )
             return
         for key, value in candidate.items():
-            if _is_sensitive_key(key):
+            if is_sensitive_key(key):
                 raise DisclosureError(
                     f"{location} contains a forbidden sensitive field; key redacted"
                 )
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+
+"""
+Verify the manifest ``dataset_hash`` with a bounded-memory streaming pass.
+
+The producer canonicalizes the input as documented in
+``manifest.dataset_hash_canonicalization``: the CSV is parsed with
+``pandas.read_csv`` and re-serialized with ``DataFrame.to_csv(index=False)``
+as UTF-8, and the SHA-256 of those bytes is recorded in both
+``canonical_input_sha256`` and ``dataset_hash`` (``sha256:<hex>``).
+
+This script reproduces that byte stream chunk by chunk. Per-chunk CSV text only
+differs from the full-frame text when pandas infers a different dtype for a
+column in different chunks (for example integers in one chunk and integers with
+missing values in another). The first pass hashes optimistically and records
+the per-chunk dtypes; if every column kept one dtype the digest is final.
+Otherwise a second pass applies the dtype the full-frame parse would settle on
+(the same common-type rule pandas uses when joining its own internal parser
+chunks) and hashes again. Columns that mix numbers and text are read as text in
+that pass, which matches the full-frame parse whenever pandas itself does not
+emit a ``DtypeWarning`` for the column.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_CHUNKSIZE = 200_000
+# The canonical stream is what the producer's Linux runners emit.
+_LINE_TERMINATOR = "\n"
+_SHA256_RE = re.compile(r"[0-9a-f]{64}")
+
+
+def _serialize(frame: pd.DataFrame, *, header: bool) -> bytes:
+    return frame.to_csv(index=False, header=header, lineterminator=_LINE_TERMINATOR).encode(
+        "utf-8"
+    )
+
+
+def canonical_sha256_full(path: Path) -> str:
+    """Reference implementation: the documented full-frame canonicalization."""
+
+    return hashlib.sha256(_serialize(pd.read_csv(path), header=True)).hexdigest()
+
+
+def common_dtype(dtypes: Iterable[np.dtype]) -> np.dtype:
+    """Dtype the full-frame parse settles on for one column seen in several chunks."""
+
+    unique = list(dict.fromkeys(np.dtype(dtype) for dtype in dtypes))
+    if len(unique) == 1:
+        return unique[0]
+    if all(dtype.kind in "iuf" for dtype in unique):
+        return np.result_type(*unique)
+    return np.dtype(object)
+
+
+def _read_chunks(path: Path, chunksize: int, dtype: dict[str, Any] | None = None):
+    try:
+        return pd.read_csv(path, chunksize=chunksize, dtype=dtype)
+    except pd.errors.EmptyDataError as exc:
+        raise ValueError(f"dataset CSV is empty: {path}") from exc
+
+
+def _hash_pass(
+    path: Path,
+    chunksize: int,
+    *,
+    read_dtype: dict[str, Any] | None = None,
+    cast: dict[str, np.dtype] | None = None,
+) -> tuple[str, int, int, dict[str, list[np.dtype]]]:
+    digest = hashlib.sha256()
+    seen: dict[str, list[np.dtype]] = {}
+    rows = 0
+    chunks = 0
+    for chunk in _read_chunks(path, chunksize, read_dtype):
+        for column, dtype in chunk.dtypes.items():
+            seen.setdefault(column, []).append(dtype)
+        if cast:
+            chunk = chunk.astype({name: dtype for name, dtype in cast.items() if name in chunk})
+        digest.update(_serialize(chunk, header=chunks == 0))
+        rows += len(chunk)
+        chunks += 1
+    return digest.hexdigest(), rows, chunks, seen
+
+
+def canonical_sha256_stream(path: Path, *, chunksize: int = DEFAULT_CHUNKSIZE) -> dict[str, Any]:
+    """Stream the canonical bytes of ``path`` into SHA-256 in bounded memory."""
+
+    if chunksize <= 0:
+        raise ValueError("chunksize must be positive")
+    sha256, rows, chunks, seen = _hash_pass(path, chunksize)
+    unstable = {name: dtypes for name, dtypes in seen.items() if len(set(dtypes)) > 1}
+    result = {"sha256": sha256, "rows": rows, "chunks": chunks, "passes": 1, "recast_columns": []}
+    if not unstable:
+        return result
+
+    read_dtype: dict[str, Any] = {}
+    cast: dict[str, np.dtype] = {}
+    for name, dtypes in unstable.items():
+        target = common_dtype(dtypes)
+        if target == np.dtype(object) and any(dtype.kind in "iuf" for dtype in dtypes):
+            read_dtype[name] = str
+        else:
+            cast[name] = target
+    sha256, rows, chunks, _seen = _hash_pass(path, chunksize, read_dtype=read_dtype, cast=cast)
+    result.update(
+        {"sha256": sha256, "rows": rows, "chunks": chunks, "passes": 2, "recast_columns": sorted(unstable)}
+    )
+    return result
+
+
+def expected_digests(manifest: dict[str, Any]) -> dict[str, str]:
+    """Return the manifest's canonical digests, requiring them to agree."""
+
+    canonicalization = str(manifest.get("dataset_hash_canonicalization") or "")
+    if "to_csv(index=False)" not in canonicalization:
+        raise ValueError(
+            "manifest.dataset_hash_canonicalization does not describe the pandas "
+            f"re-serialization this verifier reproduces: {canonicalization!r}"
+        )
+    digests: dict[str, str] = {}
+    canonical = manifest.get("canonical_input_sha256")
+    if canonical is not None:
+        if not isinstance(canonical, str) or not _SHA256_RE.fullmatch(canonical):
+            raise ValueError("manifest.canonical_input_sha256 must be a sha256 hex digest")
+        digests["canonical_input_sha256"] = canonical
+    dataset_hash = manifest.get("dataset_hash")
+    if dataset_hash is not None:
+        if not isinstance(dataset_hash, str) or not re.fullmatch(r"sha256:[0-9a-f]{64}", dataset_hash):
+            raise ValueError("manifest.dataset_hash must be a sha256 digest")
+        digests["dataset_hash"] = dataset_hash.split(":", 1)[1]
+    if not digests:
+        raise ValueError("manifest has neither canonical_input_sha256 nor dataset_hash")
+    if len(set(digests.values())) != 1:
+        raise ValueError("manifest canonical_input_sha256 and dataset_hash disagree")
+    return digests
+
+
+def _load_manifest(path: Path) -> dict[str, Any]:
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, UnicodeError, json.JSONDecodeError) as exc:
+        raise ValueError(f"unable to read manifest JSON from {path}") from exc
+    if not isinstance(payload, dict):
+        raise ValueError(f"expected a JSON object in {path}")
+    return payload
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", required=True, help="Dataset CSV (manifest dataset_hash_path)")
+    parser.add_argument("--manifest", default="intake/manifest.json")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument(
+        "--full-frame",
+        action="store_true",
+        help="Also hash the fully loaded DataFrame (reference check; needs the whole file in memory)",
+    )
+    args = parser.parse_args(argv)
+
+    path = Path(args.input)
+    try:
+        if not path.is_file():
+            raise ValueError(f"dataset CSV not found: {path}")
+        expected = expected_digests(_load_manifest(Path(args.manifest)))
+        result = canonical_sha256_stream(path, chunksize=args.chunksize)
+        if args.full_frame:
+            result["full_frame_sha256"] = canonical_sha256_full(path)
+    except (ValueError, OSError, pd.errors.ParserError) as exc:
+        parser.error(str(exc))
+
+    matches = {field: result["sha256"] == digest for field, digest in expected.items()}
+    if "full_frame_sha256" in result:
+        matches["full_frame"] = result["full_frame_sha256"] == result["sha256"]
+    report = {
+        "input": str(path),
+        "manifest": str(args.manifest),
+        "expected_sha256": next(iter(expected.values())),
+        **result,
+        "matches": matches,
+        "status": "match" if all(matches.values()) else "mismatch",
+    }
+    print(json.dumps(report, indent=2, sort_keys=True))
+    return 0 if report["status"] == "match" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+import importlib.util
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+ROOT = Path(__file__).resolve().parents[1]
+MODULE_PATH = ROOT / "scripts" / "build_local_intake.py"
+SPEC = importlib.util.spec_from_file_location("build_local_intake_under_test", MODULE_PATH)
+assert SPEC is not None and SPEC.loader is not None
+BUILDER = importlib.util.module_from_spec(SPEC)
+SPEC.loader.exec_module(BUILDER)
+
+TEMPLATES = ROOT / "templates" / "intake_templates"
+
+
+def _raw_frame(rows: int = 997) -> pd.DataFrame:
+    rng = np.random.default_rng(20260718)
+    score = rng.random(rows)
+    score[rng.random(rows) < 0.1] = np.nan
+    income = rng.random(rows)
+    income[rng.random(rows) < 0.2] = np.nan
+    gender = rng.choice(["female", "male", ""], rows, p=[0.45, 0.45, 0.1])
+    return pd.DataFrame(
+        {
+            "split": rng.choice(["train", "test"], rows),
+            "gender": gender,
+            "race": rng.choice(["black", "white", "asian"], rows),
+            "label": rng.integers(0, 2, rows),
+            "yhat": rng.integers(0, 2, rows),
+            "score": score,
+            "income": income,
+            "event_time": pd.date_range("2025-01-01", periods=rows, freq="h").strftime(
+                "%Y-%m-%dT%H:%M"
+            ),
+        }
+    )
+
+
+def _run(raw: Path, outdir: Path, *extra: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [
+            sys.executable,
+            str(MODULE_PATH),
+            "--input",
+            str(raw),
+            "--attribute",
+            "gender",
+            "--attribute",
+            "race",
+            "--score-column",
+            "score",
+            "--split-column",
+            "split",
+            "--time-column",
+            "event_time",
+            "--outdir",
+            str(outdir),
+            *extra,
+        ],
+        check=False,
+        capture_output=True,
+        text=True,
+    )
+
+
+class BuildLocalIntakeTests(unittest.TestCase):
+    def test_tables_use_tracked_schemas_and_match_full_frame_aggregates(self) -> None:
+        frame = _raw_frame()
+        with tempfile.TemporaryDirectory() as tmp:
+            raw = Path(tmp) / "raw.csv"
+            frame.to_csv(raw, index=False)
+            outdir = Path(tmp) / "out"
+            completed = _run(raw, outdir, "--chunksize", "64")
+            self.assertEqual(0, completed.returncode, completed.stderr)
+
+            expected_headers = {
+                "dataset_summary.csv": TEMPLATES / "dataset_summary.csv",
+                "group_summary.csv": TEMPLATES / "group_summary.csv",
+                "feature_missingness.csv": TEMPLATES / "feature_missingness.csv",
+                "group_confusion.csv": ROOT / "intake" / "confusion_by_group_TEMPLATE.csv",
+                "selection_rates.csv": ROOT / "intake" / "selection_rates.csv",
+            }
+            for name, template in expected_headers.items():
+                with self.subTest(table=name):
+                    header = template.read_text(encoding="utf-8").splitlines()[0]
+                    written = (outdir / name).read_text(encoding="utf-8").splitlines()[0]
+                    self.assertEqual(header, written)
+
+            groups = pd.read_csv(outdir / "group_summary.csv").set_index(["split", "group"])
+            test_female = frame[(frame["split"] == "test") & (frame["gender"] == "female")]
+            row = groups.loc[("test", "gender:female")]
+            self.assertEqual(len(test_female), row["n"])
+            self.assertAlmostEqual(test_female["score"].mean(), row["mean_score"], places=12)
+            negatives = test_female[test_female["label"] == 0]
+            self.assertAlmostEqual((negatives["yhat"] == 1).mean(), row["fpr"], places=12)
+            self.assertIn(("train", "gender:missing"), groups.index)
+
+            confusion = pd.read_csv(outdir / "group_confusion.csv")
+            selection = pd.read_csv(outdir / "selection_rates.csv")
+            np.testing.assert_array_equal(
+                confusion[["TP", "FP", "TN", "FN"]].sum(axis=1), selection["n"]
+            )
+            self.assertEqual(2 * len(frame), int(selection["n"].sum()))
+
+            dataset = pd.read_csv(outdir / "dataset_summary.csv").set_index("split")
+            train = frame[frame["split"] == "train"]
+            self.assertEqual(train["event_time"].min(), dataset.loc["train", "timeframe_start"])
+            missingness = pd.read_csv(outdir / "feature_missingness.csv").set_index(
+                ["feature", "split"]
+            )
+            self.assertAlmostEqual(
+                train["income"].isna().mean(), missingness.loc[("income", "train"), "frac_missing"]
+            )
+
+            report = json.loads((outdir / "build_report.json").read_text(encoding="utf-8"))
+            self.assertEqual(len(frame), report["rows"])
+            self.assertEqual(16, report["chunks"])
+            moments = {
+                (item["split"], item["attribute"], item["group"]): item
+                for item in report["score_moments"]
+            }
+            self.assertAlmostEqual(
+                test_female["score"].var(ddof=1),
+                moments[("test", "gender", "female")]["variance"],
+                places=12,
+            )
+
+    def test_process_pool_shards_match_serial_stream(self) -> None:
+        frame = _raw_frame(4_001)
+        with tempfile.TemporaryDirectory() as tmp:
+            raw = Path(tmp) / "raw.csv"
+            frame.to_csv(raw, index=False)
+            serial = _run(raw, Path(tmp) / "serial", "--chunksize", "500")
+            sharded = _run(raw, Path(tmp) / "sharded", "--chunksize", "500", "--jobs", "3")
+            self.assertEqual(0, serial.returncode, serial.stderr)
+            self.assertEqual(0, sharded.returncode, sharded.stderr)
+
+            report = json.loads(
+                (Path(tmp) / "sharded" / "build_report.json").read_text(encoding="utf-8")
+            )
+            self.assertEqual(3, report["shards"])
+            for name in sorted(path.name for path in (Path(tmp) / "serial").glob("*.csv")):
+                with self.subTest(table=name):
+                    left = pd.read_csv(Path(tmp) / "serial" / name)
+                    right = pd.read_csv(Path(tmp) / "sharded" / name)
+                    pd.testing.assert_frame_equal(left, right, check_exact=False, rtol=1e-12)
+
+    def test_non_binary_decisions_are_rejected(self) -> None:
+        frame = _raw_frame(20)
+        frame.loc[3, "yhat"] = 2
+        with tempfile.TemporaryDirectory() as tmp:
+            raw = Path(tmp) / "raw.csv"
+            frame.to_csv(raw, index=False)
+            completed = _run(raw, Path(tmp) / "out")
+
+            self.assertNotEqual(0, completed.returncode)
+            self.assertIn("must be binary", completed.stderr)
+            self.assertFalse((Path(tmp) / "out").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,438 @@
+import importlib.util
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+MODULE_PATH = ROOT / "scripts" / "build_pdf.py"
+sys.path.insert(0, str(MODULE_PATH.parent))
+SPEC = importlib.util.spec_from_file_location("build_pdf_under_test", MODULE_PATH)
+assert SPEC is not None and SPEC.loader is not None
+BUILD = importlib.util.module_from_spec(SPEC)
+SPEC.loader.exec_module(BUILD)
+
+
+class _FakeTex:
+    """Record commands; answer ``pdftex --version`` and write dumped formats."""
+
+    def __init__(self, version: str = "pdfTeX 3.141592653-2.6-1.40.25 (TeX Live 2023)") -> None:
+        self.version = version
+        self.commands: list[list[str]] = []
+
+    def __call__(self, command, **kwargs):
+        self.commands.append(list(command))
+        if command[:2] == ["pdftex", "--version"]:
+            return subprocess.CompletedProcess(command, 0, stdout=f"{self.version}\nkpathsea\n")
+        if command[:2] == ["pdftex", "-ini"]:
+            prefixes = ("-jobname=", "-output-directory=")
+            options = dict(part.split("=", 1) for part in command if part.startswith(prefixes))
+            fmt = Path(options["-output-directory"]) / f"{options['-jobname']}.fmt"
+            fmt.write_bytes(b"format")
+        if command[0] == "pdflatex" and any(part.startswith("-jobname=") for part in command):
+            self._preview(command)
+        elif command[0] == "pdflatex":
+            self._pdflatex(Path(kwargs["cwd"]))
+        if command[0] == "latexmk":
+            (Path(kwargs["cwd"]) / "main.pdf").write_bytes(b"%PDF-1.5 latexmk\n")
+        if command[0] == "bibtex":
+            (Path(kwargs["cwd"]) / "main.bbl").write_text("\\bibitem{a}\n", encoding="utf-8")
+        return subprocess.CompletedProcess(command, 0, stdout="")
+
+    @staticmethod
+    def _pdflatex(root: Path) -> None:
+        """A document with one label and one citation resolved through BibTeX."""
+
+        aux = root / "main.aux"
+        had_aux = aux.is_file()
+        lines = ["\\relax", "\\citation{a}"]
+        if (root / "main.bbl").is_file():
+            lines.append("\\bibcite{a}{1}")
+        lines += [
+            "\\newlabel{sec:x}{{1}{1}}",
+            "\\newlabel{sec:x@cref}{{[section][1][]1}{1}}",
+            "\\bibdata{references}",
+            "\\bibstyle{plainnat}",
+        ]
+        aux.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        log = ["This is pdfTeX"]
+        if not had_aux:
+            log.append("LaTeX Warning: There were undefined references.")
+        log.append("Output written on main.pdf (3 pages, 1000 bytes).")
+        (root / "main.log").write_text("\n".join(log) + "\n", encoding="utf-8")
+        (root / "main.pdf").write_bytes(b"%PDF-1.5 pdflatex\n")
+        fls = [f"PWD {root.resolve()}", "INPUT main.tex", "INPUT includes/macros.tex"]
+        if had_aux:
+            fls.append("INPUT main.aux")
+        fls += ["OUTPUT main.aux", "OUTPUT main.log", "OUTPUT main.pdf"]
+        (root / "main.fls").write_text("\n".join(fls) + "\n", encoding="utf-8")
+
+
+    def _preview(self, command) -> None:
+        """Keep the seeded aux and write the selected section's labels."""
+
+        options = dict(part.split("=", 1) for part in command if "=" in part)
+        output = Path(options["-output-directory"])
+        aux = output / f"{options['-jobname']}.aux"
+        self.seeded_aux = aux.read_text(encoding="utf-8")
+        self.driver = Path(command[-1]).read_text(encoding="utf-8")
+        aux.write_text(
+            "\\relax\n\\newlabel{fig:b}{{2}{9}}\n\\newlabel{fig:c}{{7}{9}}\n",
+            encoding="utf-8",
+        )
+        (output / f"{options['-jobname']}.log").write_text(
+            "Output written on main-preview.pdf (2 pages, 500 bytes).\n", encoding="utf-8"
+        )
+        (output / f"{options['-jobname']}.pdf").write_bytes(b"%PDF-1.5\n")
+
+
+def _main(root: Path, packages: str = "\\usepackage{siunitx}\n") -> Path:
+    main = root / "main.tex"
+    main.write_text(
+        "\\ifdefined\\pdftrailerid\\pdftrailerid{}\\fi\n"
+        "\\documentclass{article}\n"
+        f"{packages}"
+        "\\csname endofdump\\endcsname\n"
+        "\\input{includes/macros}\n"
+        "\\begin{document}\nx\n\\end{document}\n",
+        encoding="utf-8",
+    )
+    return main
+
+
+class PreambleTests(unittest.TestCase):
+    def test_tracked_main_splits_static_packages_from_generated_inputs(self) -> None:
+        preamble = BUILD.static_preamble((ROOT / "main.tex").read_text(encoding="utf-8"))
+        self.assertTrue(preamble.startswith("\\documentclass[11pt]{article}"))
+        for package in ("siunitx", "hyperref", "microtype", "lmodern", "eso-pic"):
+            self.assertIn(f"{{{package}}}", preamble)
+        self.assertIn("\\crefname{figure}", preamble)
+        self.assertNotIn("\\input{includes/", preamble)
+        self.assertNotIn("publication_profile", preamble)
+        self.assertNotIn("pdftrailerid", preamble)
+
+    def test_missing_marker_is_rejected(self) -> None:
+        with self.assertRaisesRegex(BUILD.BuildError, "endofdump"):
+            BUILD.static_preamble("\\documentclass{article}\n\\begin{document}\n")
+
+    def test_key_tracks_preamble_and_tex_version(self) -> None:
+        base = BUILD.preamble_key("\\usepackage{a}\n", "TeX Live 2023")
+        self.assertEqual(base, BUILD.preamble_key("\\usepackage{a}\n", "TeX Live 2023"))
+        self.assertNotEqual(base, BUILD.preamble_key("\\usepackage{b}\n", "TeX Live 2023"))
+        self.assertNotEqual(base, BUILD.preamble_key("\\usepackage{a}\n", "TeX Live 2024"))
+
+
+class FormatLifecycleTests(unittest.TestCase):
+    def test_format_is_reused_then_rebuilt_when_the_key_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            main = _main(root)
+            format_dir = root / "dist" / "texfmt"
+            tex = _FakeTex()
+
+            first, rebuilt = BUILD.ensure_format(main, format_dir, run=tex)
+            self.assertTrue(rebuilt)
+            self.assertEqual((first, False), BUILD.ensure_format(main, format_dir, run=tex))
+            dumps = [command for command in tex.commands if command[:2] == ["pdftex", "-ini"]]
+            self.assertEqual(1, len(dumps))
+            self.assertEqual(["&pdflatex", "mylatexformat.ltx", "main.tex"], dumps[0][-3:])
+
+            _main(root, "\\usepackage{siunitx}\n\\usepackage{booktabs}\n")
+            second, rebuilt = BUILD.ensure_format(main, format_dir, run=tex)
+            self.assertTrue(rebuilt)
+            third, rebuilt = BUILD.ensure_format(main, format_dir, run=_FakeTex("TeX Live 2024"))
+            self.assertTrue(rebuilt)
+            self.assertEqual(3, len({first, second, third}))
+            self.assertEqual(
+                sorted([f"{third}.fmt", f"{third}.json"]),
+                sorted(path.name for path in format_dir.iterdir()),
+            )
+
+    def test_every_latexmk_pass_uses_the_format(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            main = _main(root)
+            tex = _FakeTex()
+            record = root / "dist" / "build" / "build_record.json"
+            self.assertEqual(
+                0,
+                BUILD.build(main, root / "fmt", use_format=True, build_record=record, run=tex),
+            )
+            latexmk = tex.commands[-1]
+            self.assertEqual("latexmk", latexmk[0])
+            preamble = BUILD.static_preamble(main.read_text(encoding="utf-8"))
+            name = BUILD.format_name(main, BUILD.preamble_key(preamble, tex.version))
+            self.assertIn(
+                f"-pdflatex=pdflatex -fmt={name} -interaction=nonstopmode -halt-on-error %O %S",
+                latexmk,
+            )
+
+            # The format is opt-in: the default is the plain latexmk build.
+            plain = _FakeTex()
+            self.assertEqual(0, BUILD.build(main, root / "fmt", build_record=record, run=plain))
+            self.assertEqual(
+                [["latexmk", "-pdf", "-interaction=nonstopmode", "-halt-on-error", "main.tex"]],
+                plain.commands,
+            )
+
+
+class MinimalPassTests(unittest.TestCase):
+    def test_clean_build_reruns_only_while_auxiliary_state_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            main = _main(root)
+            (root / "references.bib").write_text("@misc{a}\n", encoding="utf-8")
+            passes_json = root / "dist" / "build" / "passes.json"
+            tex = _FakeTex()
+            self.assertEqual(
+                0,
+                BUILD.build(
+                    main,
+                    root / "fmt",
+                    use_format=True,
+                    minimal_passes=True,
+                    passes_json=passes_json,
+                    bbl_cache=root / "bbl",
+                    build_record=root / "record.json",
+                    run=tex,
+                ),
+            )
+            report = json.loads(passes_json.read_text(encoding="utf-8"))
+            passes = report["passes"]
+            self.assertTrue(report["converged"])
+            self.assertEqual([1, 2, 3], [entry["pass"] for entry in passes])
+            self.assertEqual(
+                ["labels", "cleveref", "undefined_references", "bibliography"],
+                passes[0]["triggers"],
+            )
+            self.assertEqual(["citations"], passes[1]["triggers"])
+            self.assertEqual([], passes[2]["triggers"])
+            self.assertEqual("bibtex", passes[0]["bibliography"]["status"])
+            self.assertEqual(["includes/macros.tex"], passes[0]["includes_read"])
+            self.assertEqual(3, passes[2]["pages"])
+            pdflatex = [command for command in tex.commands if command[0] == "pdflatex"]
+            self.assertEqual(3, len(pdflatex))
+            self.assertTrue(all("-recorder" in command for command in pdflatex))
+            self.assertTrue(all(command[-2].startswith("-fmt=") for command in pdflatex))
+
+            warm = _FakeTex()
+            BUILD.build(
+                main,
+                root / "fmt",
+                use_format=True,
+                minimal_passes=True,
+                passes_json=passes_json,
+                bbl_cache=root / "bbl",
+                build_record=root / "record.json",
+                run=warm,
+            )
+            report = json.loads(passes_json.read_text(encoding="utf-8"))
+            self.assertEqual(1, len(report["passes"]))
+            self.assertNotIn("bibtex", [command[0] for command in warm.commands])
+            history = (passes_json.parent / "pass_history.jsonl").read_text(encoding="utf-8")
+            self.assertEqual(2, len(history.splitlines()))
+
+    def test_bbl_cache_skips_bibtex_and_the_pass_it_would_force(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            main = _main(root)
+            bib = root / "references.bib"
+            bib.write_text("@misc{a}\n", encoding="utf-8")
+            cache = root / "bbl"
+
+            def _clean_build() -> tuple[dict, _FakeTex]:
+                for suffix in (".aux", ".bbl", ".log", ".fls"):
+                    (root / f"main{suffix}").unlink(missing_ok=True)
+                tex = _FakeTex()
+                report = BUILD.run_minimal_passes(
+                    main, format_name=None, env={}, bbl_cache=cache, run=tex
+                )
+                return report, tex
+
+            first, tex = _clean_build()
+            self.assertEqual(3, len(first["passes"]))
+            self.assertIn(["bibtex", "main"], tex.commands)
+            blob = root / "main.bbl"
+            objects = list((cache / "objects").iterdir())
+            self.assertEqual(
+                [f"{BUILD.hashlib.sha256(blob.read_bytes()).hexdigest()}.bbl"],
+                [path.name for path in objects],
+            )
+
+            second, tex = _clean_build()
+            self.assertEqual("restored_latest", second["bibliography_prepass"])
+            self.assertEqual(2, len(second["passes"]))
+            self.assertEqual("current", second["passes"][0]["bibliography"]["status"])
+            self.assertNotIn(["bibtex", "main"], tex.commands)
+
+            aux = BUILD.parse_aux(root / "main.aux")
+            key = BUILD.bibliography_key(root, aux)
+            bib.write_text("@misc{a, note={edited}}\n", encoding="utf-8")
+            self.assertNotEqual(key, BUILD.bibliography_key(root, aux))
+            third, tex = _clean_build()
+            self.assertIn(["bibtex", "main"], tex.commands)
+            self.assertEqual("bibtex", third["passes"][0]["bibliography"]["status"])
+
+
+class BuildRecordTests(unittest.TestCase):
+    def test_matching_record_skips_latex_and_edits_force_a_rebuild(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            main = _main(root)
+            for name in ("includes", "sections", "figures", "bib"):
+                (root / name).mkdir()
+            (root / "includes" / "macros.tex").write_text("\\newcommand{\\A}{1}\n")
+            (root / "figures" / "air.pdf").write_bytes(b"%PDF figure")
+            (root / "main.bbl").write_text("\\bibitem{a}\n", encoding="utf-8")
+            record = root / "dist" / "build" / "build_record.json"
+
+            self.assertEqual(
+                ["no build record at " + str(record)], BUILD.record_mismatches(main, record)
+            )
+            BUILD.build(main, root / "fmt", build_record=record, run=_FakeTex())
+            written = json.loads(record.read_text(encoding="utf-8"))
+            self.assertEqual(
+                ["figures/air.pdf", "includes/macros.tex", "main.bbl", "main.tex"],
+                sorted(written["inputs"]),
+            )
+            self.assertEqual([], BUILD.record_mismatches(main, record))
+
+            reused = _FakeTex()
+            BUILD.build(main, root / "fmt", build_record=record, reuse_record=True, run=reused)
+            self.assertEqual([], reused.commands)
+
+            (root / "figures" / "air.pdf").write_bytes(b"%PDF figure v2")
+            (root / "sections" / "new.tex").write_text("x\n", encoding="utf-8")
+            (root / "main.bbl").unlink()
+            self.assertEqual(
+                [
+                    "figures/air.pdf changed",
+                    "main.bbl removed",
+                    "sections/new.tex added",
+                ],
+                BUILD.record_mismatches(main, record),
+            )
+            rebuilt = _FakeTex()
+            BUILD.build(main, root / "fmt", build_record=record, reuse_record=True, run=rebuilt)
+            self.assertEqual("latexmk", rebuilt.commands[-1][0])
+
+            (root / "main.pdf").write_bytes(b"%PDF edited by hand")
+            self.assertIn(
+                "main.pdf differs from the recorded build", BUILD.record_mismatches(main, record)
+            )
+
+
+def _sectioned(root: Path) -> Path:
+    """A document with three numbered sections, an appendix and a cached full aux."""
+
+    (root / "sections").mkdir()
+    sources = {
+        "one": "\\section{One}\n\\begin{figure}x\\end{figure}\n% \\section{Not counted}\n",
+        "two": "\\section*{Unnumbered}\n\\begin{table}x\\end{table}\n",
+        "three": "\\section{Three}\\label{sec:three}\n"
+        "\\begin{figure}\\caption{B}\\label{fig:b}\\end{figure}\n"
+        "\\begin{figure}\\caption{C}\\label{fig:c}\\end{figure}\n",
+        "appendix_a": "\\section{Appendix}\n",
+    }
+    for name, text in sources.items():
+        (root / "sections" / f"{name}.tex").write_text(text, encoding="utf-8")
+    main = _main(root)
+    main.write_text(
+        main.read_text(encoding="utf-8").replace(
+            "\nx\n",
+            "\n\\input{sections/one}\n\\input{sections/two}\n\\input{sections/three}\n"
+            "\\appendix\n\\input{sections/appendix_a}\n",
+        ),
+        encoding="utf-8",
+    )
+    (root / "main.aux").write_text(
+        "\\relax\n\\bibcite{a}{4}\n"
+        "\\newlabel{sec:three}{{2}{7}}\n"
+        "\\newlabel{sec:three@cref}{{[section][2][]2}{[1][7][]7}}\n"
+        "\\newlabel{fig:b}{{2}{9}}\n"
+        "\\newlabel{fig:b@cref}{{[figure][2][]2}{[1][9][]9}}\n"
+        "\\newlabel{fig:c}{{3}{9}}\n"
+        "\\newlabel{fig:c@cref}{{[figure][3][]3}{[1][9][]9}}\n",
+        encoding="utf-8",
+    )
+    return main
+
+
+class PreviewTests(unittest.TestCase):
+    def test_counters_come_from_skipped_sources_and_cached_labels(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            main = _sectioned(root)
+            source = main.read_text(encoding="utf-8")
+            self.assertEqual(
+                ["sections/three", "sections/appendix_a"],
+                BUILD.resolve_sections(source, ["three.tex", "sections/appendix_a", "three"]),
+            )
+            with self.assertRaisesRegex(BUILD.BuildError, "choose from: one, two"):
+                BUILD.resolve_sections(source, ["06_results"])
+
+            counters = BUILD.preview_counters(
+                root,
+                source,
+                ["sections/two", "sections/three", "sections/appendix_a"],
+                BUILD.parse_aux(root / "main.aux"),
+            )
+            self.assertEqual({"section": 1, "figure": 1, "table": 0}, counters["sections/two"])
+            self.assertEqual(
+                {"section": 1, "figure": 1, "table": 1, "page": 7}, counters["sections/three"]
+            )
+            self.assertEqual(0, counters["sections/appendix_a"]["section"])
+            self.assertEqual(3, counters["sections/appendix_a"]["figure"])
+
+            driver = BUILD.preview_source(source, {"sections/three": counters["sections/three"]})
+            self.assertIn("% preview: skipped sections/one", driver)
+            self.assertIn(
+                "\\clearpage\\setcounter{page}{7}\n"
+                "\\setcounter{section}{1}\\setcounter{figure}{1}\\setcounter{table}{1}\n"
+                "\\input{sections/three}",
+                driver,
+            )
+            self.assertEqual(1, driver.count("\\input{sections/"))
+
+    def test_preview_seeds_the_full_aux_and_reports_drift(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            main = _sectioned(root)
+            preview_dir = root / "dist" / "preview"
+            passes_json = root / "dist" / "build" / "passes.json"
+            passes_json.parent.mkdir(parents=True)
+            passes_json.write_text(json.dumps({"total_seconds": 12.5}), encoding="utf-8")
+            tex = _FakeTex()
+
+            record = BUILD.build_preview(
+                main,
+                ["three"],
+                root / "fmt",
+                use_format=True,
+                preview_dir=preview_dir,
+                passes_json=passes_json,
+                run=tex,
+            )
+            self.assertIn("\\bibcite{a}{4}", tex.seeded_aux)
+            self.assertNotIn("sections/one}", tex.driver.replace("skipped sections/one", ""))
+            command = tex.commands[-1]
+            self.assertTrue(command[-4].startswith("-fmt=main-preamble-"))
+            self.assertEqual("-jobname=main-preview", command[-2])
+            self.assertEqual(["sections/three"], record["sections"])
+            self.assertEqual((2, 12.5), (record["pages"], record["full_build_seconds"]))
+            self.assertEqual(["fig:c"], record["relabelled"])
+            self.assertEqual(
+                record, json.loads((preview_dir / "main-preview.json").read_text("utf-8"))
+            )
+            self.assertFalse((root / "main-preview.pdf").exists())
+
+            (root / "main.aux").unlink()
+            with self.assertRaisesRegex(BUILD.BuildError, "run `make pdf` first"):
+                BUILD.build_preview(main, ["three"], root / "fmt", run=_FakeTex())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+import importlib.util
+import json
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+MODULE_PATH = ROOT / "scripts" / "build_profiles.py"
+sys.path.insert(0, str(MODULE_PATH.parent))
+SPEC = importlib.util.spec_from_file_location("build_profiles_under_test", MODULE_PATH)
+assert SPEC is not None and SPEC.loader is not None
+PROFILES = importlib.util.module_from_spec(SPEC)
+SPEC.loader.exec_module(PROFILES)
+
+
+def _pdf(lines: list[str]) -> str:
+    """A one-page PDF showing ``lines`` in WinAnsi-encoded Helvetica."""
+
+    ops = "".join(
+        f"BT /F1 12 Tf 72 {720 - 20 * index} Td ({line}) Tj ET\n"
+        for index, line in enumerate(lines)
+    )
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        "/Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(ops)} >>\nstream\n{ops}endstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    out = "%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return out
+
+
+class _FakeToolchain:
+    """pdftex/latexmk/pdftotext stand-ins; latexmk runs must overlap to finish."""
+
+    def __init__(
+        self,
+        *,
+        leak_watermark: bool = False,
+        concurrent: int = 2,
+        pdftotext: str = "pdftotext",
+        pdftotext_sees_marker: bool | None = None,
+    ) -> None:
+        self.commands: list[list[str]] = []
+        self.barrier = threading.Barrier(concurrent, timeout=5)
+        self.leak_watermark = leak_watermark
+        self.pdftotext = pdftotext
+        self.pdftotext_sees_marker = pdftotext_sees_marker
+        self.lock = threading.Lock()
+
+    def __call__(self, command, **kwargs):
+        with self.lock:
+            self.commands.append(list(command))
+        if command[:2] == ["pdftex", "--version"]:
+            return subprocess.CompletedProcess(command, 0, stdout="pdfTeX 3.14 (TeX Live 2023)\n")
+        if command[:2] == ["pdftex", "-ini"]:
+            options = dict(part.split("=", 1) for part in command if "=" in part)
+            fmt = Path(options["-output-directory"]) / f"{options['-jobname']}.fmt"
+            fmt.write_bytes(b"format")
+        if command[0] == "latexmk":
+            self.barrier.wait()
+            root = Path(kwargs["cwd"])
+            outdir = root / next(p for p in command if p.startswith("-outdir=")).split("=", 1)[1]
+            driver = (root / command[-1]).read_text(encoding="utf-8")
+            profile = re.search(r"\\input\{([^}]*publication_profile[^}]*)\}", driver)[1]
+            draft = "\\drafttrue" in (root / profile).read_text(encoding="utf-8")
+            marked = draft or self.leak_watermark
+            lines = ["Results", *(["DEMO / EVALUATION ONLY"] if marked else [])]
+            (outdir / "main.pdf").write_text(_pdf(lines), encoding="ascii")
+        if command[0] == self.pdftotext:
+            seen = self.pdftotext_sees_marker
+            if seen is None:
+                seen = "DEMO" in Path(command[1]).read_text(encoding="ascii")
+            text = "Results\n" + ("DEMO / EVALUATION\nONLY\n" if seen else "") + "\f"
+            return subprocess.CompletedProcess(command, 0, stdout=text, stderr="")
+        return subprocess.CompletedProcess(command, 0, stdout="")
+
+
+def _checkout(root: Path) -> Path:
+    main = root / "main.tex"
+    main.write_text(
+        "\\documentclass{article}\n\\usepackage{eso-pic}\n\\csname endofdump\\endcsname\n"
+        "\\input{includes/macros}\n"
+        "\\InputIfFileExists{includes/publication_profile.local.tex}{}{}\n"
+        "\\begin{document}\nx\n\\end{document}\n",
+        encoding="utf-8",
+    )
+    (root / "includes").mkdir()
+    # A leftover CI profile must not leak into the unmarked build.
+    (root / "includes" / "publication_profile.local.tex").write_text("\\drafttrue\n")
+    return main
+
+
+class ProfileBuildTests(unittest.TestCase):
+    def test_tracked_main_has_one_profile_input(self) -> None:
+        source = (ROOT / "main.tex").read_text(encoding="utf-8")
+        driver = PROFILES.profile_source(source, Path("dist/profiles/demo/profile.tex"))
+        self.assertNotIn("publication_profile.local", driver)
+        self.assertIn("\\input{dist/profiles/demo/profile.tex}", driver)
+        with self.assertRaisesRegex(PROFILES.BuildError, "exactly one"):
+            PROFILES.profile_source("\\begin{document}\n", Path("p.tex"))
+
+    def test_profiles_compile_concurrently_and_are_verified(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            main = _checkout(root)
+            tex = _FakeToolchain()
+            report = PROFILES.build_profiles(main, root / "fmt", use_format=True, run=tex)
+
+            dumps = [command for command in tex.commands if command[:2] == ["pdftex", "-ini"]]
+            self.assertEqual(1, len(dumps))
+            latexmk = [command for command in tex.commands if command[0] == "latexmk"]
+            self.assertEqual(
+                {"-outdir=dist/profiles/demo", "-outdir=dist/profiles/unmarked"},
+                {command[-2] for command in latexmk},
+            )
+            self.assertTrue(all("-fmt=main-preamble-" in command[-3] for command in latexmk))
+            self.assertEqual(
+                [("demo", True), ("unmarked", False)],
+                [(entry["profile"], entry["watermark"]) for entry in report["profiles"]],
+            )
+            self.assertIn("DEMO", (root / "dist" / "whitepaper-demo.pdf").read_text())
+            self.assertNotIn("DEMO", (root / "dist" / "whitepaper.pdf").read_text())
+            recorded = json.loads((root / "dist" / "profiles" / "profiles.json").read_text())
+            self.assertEqual(report, recorded)
+
+    def test_unexpected_watermark_fails_the_build(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            main = _checkout(root)
+            with self.assertRaisesRegex(PROFILES.BuildError, "unmarked PDF unexpectedly carries"):
+                PROFILES.build_profiles(main, root / "fmt", run=_FakeToolchain(leak_watermark=True))
+            self.assertFalse((root / "dist" / "whitepaper.pdf").exists())
+            self.assertFalse((root / "dist" / "whitepaper-demo.pdf").exists())
+
+            with self.assertRaisesRegex(PROFILES.BuildError, "unknown profile"):
+                PROFILES.build_profiles(main, root / "fmt", names=["print"], run=_FakeToolchain())
+
+    def test_marker_scan_needs_no_pdftotext_and_is_cross_checked_when_present(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            main = _checkout(root)
+            tex = _FakeToolchain()
+            PROFILES.build_profiles(main, root / "fmt", pdftotext="no-such-pdftotext", run=tex)
+            self.assertFalse(any(command[0] == "no-such-pdftotext" for command in tex.commands))
+
+            # An installed pdftotext (any executable on PATH) must agree with the scan.
+            tex = _FakeToolchain(pdftotext=sys.executable)
+            PROFILES.build_profiles(main, root / "fmt", pdftotext=sys.executable, run=tex)
+            self.assertEqual(2, sum(command[0] == sys.executable for command in tex.commands))
+
+            tex = _FakeToolchain(pdftotext=sys.executable, pdftotext_sees_marker=False)
+            with self.assertRaisesRegex(PROFILES.BuildError, "does not find .* but the scan finds"):
+                PROFILES.build_profiles(main, root / "fmt", pdftotext=sys.executable, run=tex)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+import importlib.util
+import json
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+
+ROOT = Path(__file__).resolve().parents[1]
+MODULE_PATH = ROOT / "scripts" / "certificate_correlations.py"
+SPEC = importlib.util.spec_from_file_location("certificate_correlations_under_test", MODULE_PATH)
+assert SPEC is not None and SPEC.loader is not None
+CORRELATIONS = importlib.util.module_from_spec(SPEC)
+SPEC.loader.exec_module(CORRELATIONS)
+
+
+def _certificate(columns: int, *, seed: int = 5) -> dict:
+    rng = np.random.default_rng(seed)
+    names = [f"feature_{index:03d}" for index in range(columns)]
+    base = rng.uniform(-1.0, 1.0, (columns, columns))
+    real = (base + base.T) / 2.0
+    np.fill_diagonal(real, 1.0)
+    noise = rng.normal(0.0, 0.05, (columns, columns))
+    synthetic = np.clip(real + (noise + noise.T) / 2.0, -1.0, 1.0)
+    np.fill_diagonal(synthetic, 1.0)
+
+    def _nested(matrix: np.ndarray) -> dict:
+        return {
+            row: {column: float(matrix[i, j]) for j, column in enumerate(names)}
+            for i, row in enumerate(names)
+        }
+
+    real_nested = _nested(real)
+    synthetic_nested = _nested(synthetic)
+    # Non-finite correlations are shipped as null.
+    real_nested[names[1]][names[2]] = None
+    real_nested[names[2]][names[1]] = None
+    return {
+        "correlation_analysis": {
+            "real_correlation_matrix": real_nested,
+            "synthetic_correlation_matrix": synthetic_nested,
+            "correlation_differences": _nested(np.abs(synthetic - real)),
+            "broken_correlations": [
+                {
+                    "column1": names[4],
+                    "column2": names[0],
+                    "difference": 0.5,
+                    "real_correlation": 0.0,
+                    "synthetic_correlation": 0.5,
+                }
+            ],
+        },
+        "statistical_comparison": {
+            "range_violations": {
+                names[3]: {
+                    "real_range": [0.0, 10.0],
+                    "synthetic_range": [-2.0, 11.0],
+                    "violation_type": "out_of_bounds",
+                }
+            }
+        },
+    }
+
+
+class CorrelationExtractionTests(unittest.TestCase):
+    def test_dense_matrices_match_per_pair_lookup(self) -> None:
+        payload = _certificate(12)
+        analysis = payload["correlation_analysis"]
+        index = CORRELATIONS.column_index(
+            analysis["real_correlation_matrix"], analysis["synthetic_correlation_matrix"]
+        )
+        dense = CORRELATIONS.dense_matrix(analysis["real_correlation_matrix"], index)
+
+        for i, row in enumerate(index):
+            for j, column in enumerate(index):
+                value = analysis["real_correlation_matrix"][row][column]
+                if value is None:
+                    self.assertTrue(np.isnan(dense[i, j]))
+                else:
+                    self.assertEqual(value, dense[i, j])
+
+    def test_top_pairs_rank_broken_flags_and_ranges(self) -> None:
+        payload = _certificate(12)
+        result = CORRELATIONS.analyze_certificate(payload, k=5)
+        analysis = payload["correlation_analysis"]
+
+        expected = []
+        names = sorted(analysis["real_correlation_matrix"])
+        for i, first in enumerate(names):
+            for second in names[i + 1 :]:
+                real = analysis["real_correlation_matrix"][first][second]
+                if real is None:
+                    continue
+                synthetic = analysis["synthetic_correlation_matrix"][first][second]
+                expected.append((-abs(synthetic - real), first, second))
+        expected.sort()
+        pairs = result["top_pairs"]
+        self.assertEqual(
+            [(first, second) for _d, first, second in expected[:5]],
+            list(zip(pairs["column1"], pairs["column2"])),
+        )
+        self.assertEqual(list(CORRELATIONS.TOP_PAIR_COLUMNS), list(pairs.columns))
+
+        summary = result["summary"]
+        self.assertEqual(66, summary["pairs"])
+        self.assertEqual(65, summary["finite_pairs"])
+        self.assertEqual(1, summary["broken_pairs"])
+        self.assertEqual(0.0, summary["shipped_difference_max_deviation"])
+        ranges = result["range_violations"]
+        self.assertEqual(["feature_003"], ranges["column"].tolist())
+        self.assertAlmostEqual(0.2, ranges["below_fraction"].iloc[0])
+        self.assertAlmostEqual(0.1, ranges["above_fraction"].iloc[0])
+
+    def test_hundreds_of_columns_are_extracted_quickly(self) -> None:
+        payload = _certificate(300)
+        started = time.perf_counter()
+        result = CORRELATIONS.analyze_certificate(payload, k=20)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(300 * 299 // 2, result["summary"]["pairs"])
+        self.assertEqual(20, len(result["top_pairs"]))
+        self.assertTrue(result["top_pairs"]["abs_difference"].is_monotonic_decreasing)
+        self.assertLess(elapsed, 5.0)
+
+    def test_missing_matrices_are_rejected(self) -> None:
+        with self.assertRaisesRegex(ValueError, "correlation matrices"):
+            CORRELATIONS.analyze_certificate({"correlation_analysis": {}})
+
+
+class CliTests(unittest.TestCase):
+    def test_tracked_certificates_agree_with_shipped_differences(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            completed = subprocess.run(
+                [sys.executable, str(MODULE_PATH), "--outdir", tmp],
+                cwd=ROOT,
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+            self.assertEqual(0, completed.returncode, completed.stderr)
+            summary = json.loads((Path(tmp) / "summary.json").read_text(encoding="utf-8"))
+            self.assertIn("synthetic_quality_certificate", summary)
+            for name, record in summary.items():
+                self.assertEqual(0.0, record["shipped_difference_max_deviation"], name)
+                self.assertEqual(
+                    record["shipped_max_correlation_difference"], record["max_abs_difference"]
+                )
+                self.assertTrue((Path(tmp) / f"{name}_correlation_difference.pdf").is_file())
+                table = (Path(tmp) / f"{name}_top_pairs.tex").read_text(encoding="utf-8")
+                self.assertIn("\\toprule", table)
+
+    def test_range_violation_heatmap_is_written_when_present(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            certificate = Path(tmp) / "custom_certificate.json"
+            certificate.write_text(json.dumps(_certificate(6)), encoding="utf-8")
+            completed = subprocess.run(
+                [
+                    sys.executable,
+                    str(MODULE_PATH),
+                    "--certificate",
+                    str(certificate),
+                    "--outdir",
+                    str(Path(tmp) / "out"),
+                ],
+                cwd=ROOT,
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+            self.assertEqual(0, completed.returncode, completed.stderr)
+            outdir = Path(tmp) / "out"
+            self.assertTrue((outdir / "custom_certificate_range_violations.pdf").is_file())
+            table = (Path(tmp) / "out" / "custom_certificate_top_pairs.tex").read_text(
+                encoding="utf-8"
+            )
+            self.assertIn("$^{\\dagger}$", table)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+MODULE_PATH = ROOT / "scripts" / "check_tex_macros.py"
+SPEC = importlib.util.spec_from_file_location("check_tex_macros_under_test", MODULE_PATH)
+assert SPEC is not None and SPEC.loader is not None
+CHECK = importlib.util.module_from_spec(SPEC)
+SPEC.loader.exec_module(CHECK)
+
+
+def _index(files: dict[str, str]) -> dict:
+    return {"files": {name: CHECK.scan(text) for name, text in files.items()}}
+
+
+class ScanTests(unittest.TestCase):
+    def test_definitions_uses_and_catcodes(self) -> None:
+        record = CHECK.scan(
+            "\\newif\\ifdraft\n"
+            "\\newcommand*{\\GenderAIR}{0.8} % \\Commented\n"
+            "\\renewcommand\\GenderAIR{\\num{0.9}}\n"
+            "\\ifdefined\\pdftrailerid\\pdftrailerid{}\\fi\n"
+            "a\\\\b \\% \\makeatletter\\setlength{\\@fptop}{0pt}\\makeatother \\x@y\n"
+        )
+        self.assertEqual(
+            {"ifdraft": [1], "drafttrue": [1], "draftfalse": [1], "GenderAIR": [2]},
+            record["defines"],
+        )
+        self.assertEqual({"GenderAIR": [3]}, record["renews"])
+        self.assertEqual([4], record["uses"]["pdftrailerid"])
+        self.assertIn("@fptop", record["uses"])
+        self.assertIn("x", record["uses"])
+        for absent in ("Commented", "b", "x@y"):
+            self.assertNotIn(absent, record["uses"])
+
+    def test_tracked_sources_have_no_errors(self) -> None:
+        index = {"files": {}}
+        CHECK.update_index(index, ROOT, CHECK.discover(ROOT))
+        self.assertIn("includes/metrics_macros.tex", index["files"])
+        findings = CHECK.check(index)
+        self.assertEqual([], findings["errors"])
+        self.assertEqual([], findings["warnings"])
+
+
+class CheckTests(unittest.TestCase):
+    def test_misspelled_renewed_and_duplicate_macros(self) -> None:
+        findings = CHECK.check(
+            _index(
+                {
+                    "includes/macros.tex": "\\newcommand{\\GenderAIRIntrinsicLCI}{TBD}\n",
+                    "includes/metrics_macros.tex": "\\renewcommand{\\GenderAIRIntrinsicLCI}{1}\n"
+                    "\\renewcommand{\\RaceAIRIntrinsic}{1}\n",
+                    "sections/06_results.tex": "\\GenderAIRIntrinsicLCl{} \\foreignmacro\n"
+                    "\\newcommand{\\GenderAIRIntrinsicLCI}{x}\n",
+                }
+            )
+        )
+        errors = {(finding["kind"], finding["macro"]): finding for finding in findings["errors"]}
+        self.assertEqual(
+            {
+                ("undefined", "GenderAIRIntrinsicLCl"),
+                ("renews_undefined", "RaceAIRIntrinsic"),
+                ("redefined", "GenderAIRIntrinsicLCI"),
+            },
+            set(errors),
+        )
+        undefined = errors[("undefined", "GenderAIRIntrinsicLCl")]
+        self.assertEqual("GenderAIRIntrinsicLCI", undefined["suggestion"])
+        self.assertEqual(["sections/06_results.tex:1"], undefined["at"])
+        self.assertIn("did you mean \\GenderAIRIntrinsicLCI?", CHECK.format_finding(undefined))
+        self.assertEqual(["foreignmacro"], [item["macro"] for item in findings["warnings"]])
+
+
+class IndexTests(unittest.TestCase):
+    def test_only_changed_files_are_retokenized(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "sections").mkdir()
+            (root / "includes").mkdir()
+            (root / "main.tex").write_text("\\input{includes/macros}\n", encoding="utf-8")
+            (root / "includes" / "macros.tex").write_text("\\newcommand{\\A}{a}\n")
+            section = root / "sections" / "one.tex"
+            section.write_text("\\A\n", encoding="utf-8")
+            index = {"schema": CHECK.INDEX_SCHEMA, "files": {}}
+
+            self.assertEqual(3, len(CHECK.update_index(index, root, CHECK.discover(root))))
+            self.assertEqual([], CHECK.update_index(index, root, CHECK.discover(root)))
+            stat = section.stat()
+            os.utime(section, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            self.assertEqual([], CHECK.update_index(index, root, CHECK.discover(root)))
+            entry = index["files"]["sections/one.tex"]
+            self.assertEqual(stat.st_mtime_ns + 10**9, entry["mtime_ns"])
+
+            section.write_text("\\B\n", encoding="utf-8")
+            (root / "sections" / "two.tex").write_text("\\A\n", encoding="utf-8")
+            self.assertEqual(
+                ["sections/one.tex", "sections/two.tex"],
+                CHECK.update_index(index, root, CHECK.discover(root)),
+            )
+            (root / "sections" / "two.tex").unlink()
+            CHECK.update_index(index, root, CHECK.discover(root))
+            self.assertNotIn("sections/two.tex", index["files"])
+
+    def test_cli_persists_index_and_fails_on_errors(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp) / "paper"
+            for name in ("sections", "includes"):
+                shutil.copytree(ROOT / name, root / name)
+            shutil.copyfile(ROOT / "main.tex", root / "main.tex")
+            index = Path(tmp) / "index.json"
+            command = [sys.executable, str(MODULE_PATH), "--root", str(root), "--index", str(index)]
+
+            clean = subprocess.run(command, capture_output=True, text=True, check=False)
+            self.assertEqual(0, clean.returncode, clean.stderr)
+            self.assertIn("re-tokenized", clean.stdout)
+            self.assertEqual(CHECK.INDEX_SCHEMA, json.loads(index.read_text())["schema"])
+
+            results = root / "sections" / "06_results.tex"
+            results.write_text(results.read_text() + "\\GenderAIRIntrinsicLCl\n")
+            broken = subprocess.run(command, capture_output=True, text=True, check=False)
+            self.assertEqual(1, broken.returncode)
+            self.assertIn("(1 re-tokenized)", broken.stdout)
+            self.assertIn("did you mean \\GenderAIRIntrinsicLCI?", broken.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
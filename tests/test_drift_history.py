@@ -0,0 +1,195 @@
+import importlib.util
+import json
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+MODULE_PATH = ROOT / "scripts" / "drift_history.py"
+SPEC = importlib.util.spec_from_file_location("drift_history_under_test", MODULE_PATH)
+assert SPEC is not None and SPEC.loader is not None
+DRIFT = importlib.util.module_from_spec(SPEC)
+SPEC.loader.exec_module(DRIFT)
+
+
+def _write_snapshot(directory: Path, index: int, gender_air: float) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest = {"run_id": f"run-{index:03d}", "created": f"2026-01-{index + 1:02d}T00:00:00Z"}
+    pair = {
+        "counts": {"ref_n": 100, "prot_n": 80, "ref_approved": 60, "prot_approved": 40},
+        "air": {"point": gender_air, "ci95": [gender_air - 0.05, gender_air + 0.05]},
+        "srg": {"point": 0.1, "ci95": [0.05, 0.15]},
+    }
+    uncertainty = {
+        "fairness_uncertainty": {
+            "gender": {"reference_group": "Male", "protected_group": "Female", **pair},
+            "race": {"reference_group": "White", "pairs": {"Black": pair, "Asian": pair}},
+        }
+    }
+    (directory / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+    (directory / "metrics_uncertainty.json").write_text(json.dumps(uncertainty), encoding="utf-8")
+
+
+def _git(repo: Path, *args: str) -> None:
+    subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True)
+
+
+class IngestTests(unittest.TestCase):
+    def test_tracked_intake_rows_cover_pairs_and_slices(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            conn = DRIFT.connect(Path(tmp) / "history.sqlite")
+            self.assertTrue(DRIFT.ingest_directory(conn, ROOT / "intake"))
+            self.assertFalse(DRIFT.ingest_directory(conn, ROOT / "intake"))
+            rows = conn.execute("SELECT attribute, slice FROM metrics").fetchall()
+            conn.close()
+        self.assertIn(("gender", "overall"), rows)
+        self.assertIn(("race", "overall"), rows)
+        self.assertIn(("gender", "historical"), rows)
+
+    def test_directory_snapshots_are_keyed_by_manifest_digest(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp)
+            _write_snapshot(base / "a", 0, 0.9)
+            shutil.copytree(base / "a", base / "copy")
+            _write_snapshot(base / "b", 1, 0.8)
+            conn = DRIFT.connect(base / "history.sqlite")
+            added = [DRIFT.ingest_directory(conn, base / name) for name in ("a", "copy", "b")]
+            snapshots = conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+            metrics = conn.execute("SELECT COUNT(*) FROM metrics").fetchone()[0]
+            conn.close()
+        self.assertEqual([True, False, True], added)
+        self.assertEqual(2, snapshots)
+        self.assertEqual(6, metrics)
+
+    def test_git_ref_ingest_only_walks_new_commits(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            repo = Path(tmp) / "repo"
+            repo.mkdir()
+            _git(repo, "init", "-q", "-b", "nightly")
+            _git(repo, "config", "user.email", "ci@example.invalid")
+            _git(repo, "config", "user.name", "ci")
+            for index, air in enumerate((0.91, 0.88, 0.84)):
+                _write_snapshot(repo / "intake", index, air)
+                _git(repo, "add", "intake")
+                _git(repo, "commit", "-q", "-m", f"intake {index}")
+            (repo / "notes.txt").write_text("unrelated\n", encoding="utf-8")
+            _git(repo, "add", "notes.txt")
+            _git(repo, "commit", "-q", "-m", "notes")
+
+            conn = DRIFT.connect(Path(tmp) / "history.sqlite")
+            self.assertEqual((3, 3), DRIFT.ingest_git_ref(conn, repo, "nightly"))
+            self.assertEqual((0, 0), DRIFT.ingest_git_ref(conn, repo, "nightly"))
+
+            _write_snapshot(repo / "intake", 3, 0.79)
+            _git(repo, "add", "intake")
+            _git(repo, "commit", "-q", "-m", "intake 3")
+            self.assertEqual((1, 1), DRIFT.ingest_git_ref(conn, repo, "nightly"))
+
+            frame = DRIFT.recent_metrics(conn, 2)
+            conn.close()
+        gender = frame[frame["attribute"] == "gender"]
+        self.assertEqual(["run-002", "run-003"], gender["run_id"].tolist())
+        self.assertEqual([0.84, 0.79], gender["air"].tolist())
+
+
+class ReportTests(unittest.TestCase):
+    def test_cli_ingest_and_report_window(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp)
+            snapshots = []
+            for index, air in enumerate((0.95, 0.70, 0.85, 0.82)):
+                _write_snapshot(base / f"s{index}", index, air)
+                snapshots += ["--snapshot", str(base / f"s{index}")]
+            db = str(base / "history.sqlite")
+            ingest = subprocess.run(
+                [sys.executable, str(MODULE_PATH), "--db", db, "ingest", *snapshots],
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+            self.assertEqual(0, ingest.returncode, ingest.stderr)
+            self.assertIn("Indexed 4 new snapshot(s)", ingest.stdout)
+
+            outdir = base / "out"
+            report = subprocess.run(
+                [
+                    sys.executable,
+                    str(MODULE_PATH),
+                    "--db",
+                    db,
+                    "report",
+                    "--last",
+                    "3",
+                    "--outdir",
+                    str(outdir),
+                ],
+                cwd=ROOT,
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+            self.assertEqual(0, report.returncode, report.stderr)
+            macros = (outdir / "drift_macros.tex").read_text(encoding="utf-8")
+            self.assertNotIn("DriftSnapshotCount", macros)
+            self.assertIn("\\newcommand{\\DriftWindowSize}{3}", macros)
+            self.assertIn("\\newcommand{\\DriftGenderAIRMin}{\\num{0.700}}", macros)
+            self.assertIn("\\newcommand{\\DriftGenderAIRMax}{\\num{0.850}}", macros)
+            self.assertIn("\\newcommand{\\DriftGenderAIRLatest}{\\num{0.820}}", macros)
+            self.assertTrue((outdir / "air_trend.pdf").is_file())
+            with sqlite3.connect(db) as conn:
+                self.assertEqual(4, conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0])
+
+            # A window longer than the history reports the snapshots it holds.
+            longer = subprocess.run(
+                [
+                    sys.executable,
+                    str(MODULE_PATH),
+                    "--db",
+                    db,
+                    "report",
+                    "--last",
+                    "30",
+                    "--outdir",
+                    str(outdir),
+                ],
+                cwd=ROOT,
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+            self.assertEqual(0, longer.returncode, longer.stderr)
+            macros = (outdir / "drift_macros.tex").read_text(encoding="utf-8")
+            self.assertIn("\\newcommand{\\DriftWindowSize}{4}", macros)
+
+    def test_air_min_comes_from_the_sap(self) -> None:
+        self.assertEqual(0.80, DRIFT.load_air_min(ROOT / "config" / "sap.yaml"))
+        with tempfile.TemporaryDirectory() as tmp:
+            sap = Path(tmp) / "sap.yaml"
+            sap.write_text("thresholds:\n  air_min: 0.9\n", encoding="utf-8")
+            self.assertEqual(0.9, DRIFT.load_air_min(sap))
+            sap.write_text("thresholds: [unclosed\n", encoding="utf-8")
+            with self.assertRaisesRegex(ValueError, "unable to read SAP"):
+                DRIFT.load_air_min(sap)
+            with self.assertRaisesRegex(ValueError, "unable to read SAP"):
+                DRIFT.load_air_min(Path(tmp) / "missing.yaml")
+
+    def test_missing_index_and_empty_ingest_are_parser_errors(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = str(Path(tmp) / "missing.sqlite")
+            for args in (["report"], ["ingest"]):
+                completed = subprocess.run(
+                    [sys.executable, str(MODULE_PATH), "--db", db, *args],
+                    capture_output=True,
+                    text=True,
+                    check=False,
+                )
+                self.assertEqual(2, completed.returncode)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -92,7 +92,7 @@ class EditorialClaimsContractTests(unittest.TestCase):
         self.assertIn("Adverse Impact Ratio (AIR)", source)
         self.assertIn('"CreationDate": None', source)
         self.assertIn('"ModDate": None', source)
-        self.assertEqual(5, source.count("_save_pdf(fig, out_path)"))
+        self.assertEqual(7, source.count("_save_pdf(fig, out_path)"))
         self.assertNotIn("fig.suptitle", source)
         self.assertLess(
             source.index("\n    _maybe_set_style()\n"),
@@ -0,0 +1,178 @@
+import importlib.util
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+ROOT = Path(__file__).resolve().parents[1]
+MODULE_PATH = ROOT / "scripts" / "facet_plots.py"
+sys.path.insert(0, str(MODULE_PATH.parent))
+SPEC = importlib.util.spec_from_file_location("facet_plots_under_test", MODULE_PATH)
+assert SPEC is not None and SPEC.loader is not None
+FACETS = importlib.util.module_from_spec(SPEC)
+SPEC.loader.exec_module(FACETS)
+
+_COLUMNS = {
+    "facet_column": "attributes",
+    "label_column": "group",
+    "value_column": "selection_rate",
+    "low_column": "selection_rate_ci_low",
+    "high_column": "selection_rate_ci_high",
+}
+
+
+def _estimates(facet_sizes: dict[str, int], *, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    rows = []
+    for facet, size in facet_sizes.items():
+        for index in range(size):
+            rate = float(rng.uniform(0.2, 0.8))
+            rows.append(
+                {
+                    "attributes": facet,
+                    "group": f"{facet}-g{index:03d}",
+                    "selection_rate": rate,
+                    "selection_rate_ci_low": rate - 0.05,
+                    "selection_rate_ci_high": rate + 0.05,
+                }
+            )
+    # Shuffle so the engine cannot rely on input order.
+    return pd.DataFrame(rows).sample(frac=1.0, random_state=seed).reset_index(drop=True)
+
+
+class BuildFacetsTests(unittest.TestCase):
+    def test_groups_are_sorted_split_and_complete(self) -> None:
+        frame = _estimates({"race": 7, "gender": 2, "age_band": 12})
+        facets = FACETS.build_facets(frame, max_groups=5, **_COLUMNS)
+
+        self.assertEqual(
+            [facet["title"] for facet in facets],
+            [
+                "age_band (1/3)",
+                "age_band (2/3)",
+                "age_band (3/3)",
+                "gender",
+                "race (1/2)",
+                "race (2/2)",
+            ],
+        )
+        self.assertEqual([len(facet["labels"]) for facet in facets], [5, 5, 2, 2, 5, 2])
+        labels = np.concatenate([facet["labels"] for facet in facets])
+        self.assertEqual(sorted(labels.tolist()), sorted(frame["group"].tolist()))
+
+        lookup = frame.set_index("group")
+        for facet in facets:
+            self.assertEqual(facet["labels"].tolist(), sorted(facet["labels"].tolist()))
+            np.testing.assert_array_equal(
+                facet["value"], lookup.loc[facet["labels"], "selection_rate"].to_numpy()
+            )
+
+    def test_rows_without_interval_are_dropped_and_missing_columns_rejected(self) -> None:
+        frame = _estimates({"gender": 3})
+        frame.loc[0, "selection_rate_ci_low"] = np.nan
+        facets = FACETS.build_facets(frame, **_COLUMNS)
+        self.assertEqual(len(facets[0]["labels"]), 2)
+
+        with self.assertRaisesRegex(ValueError, "selection_rate_ci_high"):
+            FACETS.build_facets(frame.drop(columns="selection_rate_ci_high"), **_COLUMNS)
+
+    def test_paginate_fills_pages_in_order(self) -> None:
+        pages = FACETS.paginate(list(range(10)), 4)
+        self.assertEqual(pages, [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]])
+
+
+class RenderTests(unittest.TestCase):
+    def test_five_hundred_groups_render_to_stable_multipage_pdf(self) -> None:
+        frame = _estimates({f"attr{index:02d}": 25 for index in range(20)})
+        facets = FACETS.build_facets(frame, max_groups=25, **_COLUMNS)
+        self.assertEqual(sum(len(facet["labels"]) for facet in facets), 500)
+
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            started = time.perf_counter()
+            rendered = FACETS.render_facets(facets, Path(first), rows=3, cols=3)
+            elapsed = time.perf_counter() - started
+            FACETS.render_facets(facets, Path(second), rows=3, cols=3)
+
+            self.assertEqual([page for _path, page in rendered], [1, 2, 3])
+            self.assertEqual({path.name for path, _page in rendered}, {"facets.pdf"})
+            pdf = (Path(first) / "facets.pdf").read_bytes()
+            self.assertEqual(pdf.count(b"/Type /Page /"), 3)
+            self.assertEqual(pdf, (Path(second) / "facets.pdf").read_bytes())
+            self.assertLess(elapsed, 60.0)
+
+    def test_numbered_layout_and_include(self) -> None:
+        facets = FACETS.build_facets(_estimates({"a": 3, "b": 3, "c": 3}), **_COLUMNS)
+        with tempfile.TemporaryDirectory() as tmp:
+            outdir = Path(tmp)
+            (outdir / "facets.pdf").write_bytes(b"stale")
+            rendered = FACETS.render_facets(facets, outdir, rows=1, cols=2, layout="numbered")
+            include = outdir / "facets_include.tex"
+            FACETS.write_include(rendered, include, stem="facets", caption="Rates")
+
+            self.assertEqual(
+                sorted(path.name for path in outdir.glob("*.pdf")),
+                ["facets_p001.pdf", "facets_p002.pdf"],
+            )
+            text = include.read_text(encoding="utf-8")
+            self.assertEqual(text.count("\\begin{figure}[p]"), 2)
+            for path, _page in rendered:
+                self.assertIn(f"page=1]{{{path.as_posix()}}}", text)
+            self.assertIn("\\caption{Rates (page 2 of 2).}", text)
+            self.assertIn("\\label{fig:facets-p2}", text)
+
+
+class CliTests(unittest.TestCase):
+    def test_counts_mode_on_tracked_selection_rates(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            proc = subprocess.run(
+                [
+                    sys.executable,
+                    str(MODULE_PATH),
+                    "--input",
+                    str(ROOT / "intake" / "selection_rates.csv"),
+                    "--counts",
+                    "--facet-column",
+                    "attribute",
+                    "--stem",
+                    "selection",
+                    "--outdir",
+                    tmp,
+                ],
+                cwd=ROOT,
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+            self.assertEqual(proc.returncode, 0, proc.stderr)
+            self.assertTrue((Path(tmp) / "selection.pdf").is_file())
+            text = (Path(tmp) / "selection_include.tex").read_text(encoding="utf-8")
+            self.assertIn("page=1]", text)
+
+    def test_missing_columns_are_parser_errors(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            proc = subprocess.run(
+                [
+                    sys.executable,
+                    str(MODULE_PATH),
+                    "--input",
+                    str(ROOT / "intake" / "selection_rates.csv"),
+                    "--outdir",
+                    tmp,
+                ],
+                cwd=ROOT,
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+            self.assertEqual(proc.returncode, 2)
+            self.assertIn("missing columns", proc.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
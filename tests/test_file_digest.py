@@ -0,0 +1,98 @@
+import hashlib
+import importlib.util
+import os
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+import unittest
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+MODULE_PATH = ROOT / "scripts" / "file_digest.py"
+SPEC = importlib.util.spec_from_file_location("file_digest_under_test", MODULE_PATH)
+assert SPEC is not None and SPEC.loader is not None
+DIGEST = importlib.util.module_from_spec(SPEC)
+SPEC.loader.exec_module(DIGEST)
+
+_OLD_NS = 1_700_000_000 * 10**9
+
+
+def _write(path: Path, data: bytes, mtime_ns: int = _OLD_NS) -> Path:
+    path.write_bytes(data)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+
+class FileDigestTests(unittest.TestCase):
+    def setUp(self) -> None:
+        DIGEST.clear_cache()
+
+    def test_streamed_digest_matches_and_memory_stays_flat(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            data = os.urandom(1 << 20) * 24
+            path = _write(Path(tmp) / "whitepaper_arxiv_source.zip", data)
+            expected = hashlib.sha256(data).hexdigest()
+            del data
+            tracemalloc.start()
+            try:
+                digest = DIGEST.file_digest(path)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+        self.assertEqual((expected, 24 << 20), tuple(digest))
+        self.assertLess(peak, 4 << 20)
+
+    def test_memo_is_keyed_by_size_mtime_and_inode(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = _write(Path(tmp) / "main.pdf", b"first")
+            first = DIGEST.file_digest(path)
+            # Same size and mtime: the memo answers without reading the file.
+            _write(path, b"other")
+            self.assertEqual(first, DIGEST.file_digest(path))
+            _write(path, b"other", _OLD_NS + 1)
+            self.assertEqual(hashlib.sha256(b"other").hexdigest(), DIGEST.file_digest(path).sha256)
+
+            replaced = _write(Path(tmp) / "replacement", b"third")
+            os.replace(replaced, path)
+            os.utime(path, ns=(_OLD_NS + 1, _OLD_NS + 1))
+            self.assertEqual(hashlib.sha256(b"third").hexdigest(), DIGEST.file_digest(path).sha256)
+
+    def test_recently_modified_files_are_not_memoized(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "main.pdf"
+            path.write_bytes(b"first")
+            DIGEST.file_digest(path)
+            stat = path.stat()
+            path.write_bytes(b"other")
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            self.assertEqual(hashlib.sha256(b"other").hexdigest(), DIGEST.file_digest(path).sha256)
+
+    def test_concurrent_digests_keep_order_and_raise_errors(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = [
+                _write(Path(tmp) / f"{index}.bin", bytes([index]) * 4096) for index in range(6)
+            ]
+            digests = DIGEST.digest_files(reversed(paths))
+            self.assertEqual(list(reversed(paths)), list(digests))
+            for path in paths:
+                expected = hashlib.sha256(path.read_bytes()).hexdigest()
+                self.assertEqual(expected, digests[path].sha256)
+
+            missing = Path(tmp) / "absent.zip"
+            with self.assertRaises(FileNotFoundError):
+                DIGEST.digest_files([paths[0], missing])
+            DIGEST.prefetch([missing, paths[1]])
+
+            completed = subprocess.run(
+                [sys.executable, str(MODULE_PATH), str(paths[0]), str(missing)],
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+            self.assertEqual(2, completed.returncode)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 import hashlib
 import importlib.util
 import json
+import shutil
+import subprocess
 import sys
 import tempfile
 import unittest
@@ -260,6 +262,21 @@ class IntakeAnchorTests(unittest.TestCase):
             ):
                 ANCHOR.validate_anchor(tampered, ROOT)
 
+    def test_runs_from_the_producer_fetch_set_alone(self) -> None:
+        # docs/ci_intake.md: consumers fetch only the descriptor, this script
+        # and the frozen exporter.
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ("intake_anchor.py", "stable_v5_export.py"):
+                shutil.copy(MODULE_PATH.parent / name, Path(tmp) / name)
+            result = subprocess.run(
+                [sys.executable, "-S", "intake_anchor.py", "--help"],
+                cwd=tmp,
+                capture_output=True,
+                text=True,
+            )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("validate", result.stdout)
+
 
 if __name__ == "__main__":
     unittest.main()
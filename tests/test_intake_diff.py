@@ -0,0 +1,155 @@
+import copy
+import importlib.util
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+MODULE_PATH = ROOT / "scripts" / "intake_diff.py"
+sys.path.insert(0, str(MODULE_PATH.parent))
+SPEC = importlib.util.spec_from_file_location("intake_diff_under_test", MODULE_PATH)
+assert SPEC is not None and SPEC.loader is not None
+DIFF = importlib.util.module_from_spec(SPEC)
+SPEC.loader.exec_module(DIFF)
+
+LARGE_CERTIFICATE = (
+    ROOT / "intake" / "certificates" / "branch_intrinsic__synthetic_validation_certificate.json"
+)
+
+
+def _changes(old: object, new: object) -> list[dict]:
+    return DIFF.diff_trees(DIFF.merkle(old), DIFF.merkle(new))
+
+
+class MerkleTests(unittest.TestCase):
+    def test_digest_ignores_key_order_but_not_types(self) -> None:
+        self.assertEqual(
+            DIFF.merkle({"a": 1, "b": [1, 2]}).digest, DIFF.merkle({"b": [1, 2], "a": 1}).digest
+        )
+        digests = {DIFF.merkle(value).digest for value in (1, "1", True, None, [1], {"1": 1})}
+        self.assertEqual(6, len(digests))
+        self.assertNotEqual(DIFF.merkle([1, 2]).digest, DIFF.merkle([2, 1]).digest)
+
+    def test_change_kinds_and_paths(self) -> None:
+        old = {"a": {"b": 1, "c": [1, 2, 3]}, "d": "x", "gone": True}
+        new = {"a": {"b": 2, "c": [1, 2]}, "d": 5, "new": {"k": 1}}
+        self.assertEqual(
+            [
+                {"change": "changed", "path": "a.b", "old_type": "number", "old": 1,
+                 "new_type": "number", "new": 2},
+                {"change": "removed", "path": "a.c[2]", "old_type": "number", "old": 3},
+                {"change": "type_changed", "path": "d", "old_type": "string", "old": "x",
+                 "new_type": "number", "new": 5},
+                {"change": "removed", "path": "gone", "old_type": "boolean", "old": True},
+                {"change": "added", "path": "new", "new_type": "object",
+                 "new": "{object with 1 keys}"},
+            ],
+            _changes(old, new),
+        )
+
+    def test_large_certificate_single_leaf_change(self) -> None:
+        payload = json.loads(LARGE_CERTIFICATE.read_text(encoding="utf-8"))
+        edited = copy.deepcopy(payload)
+        edited["branch_mode"] = f"{payload['branch_mode']}-edited"
+        old_tree = DIFF.merkle(payload)
+        new_tree = DIFF.merkle(edited)
+
+        started = time.perf_counter()
+        changes = DIFF.diff_trees(old_tree, new_tree)
+        elapsed = time.perf_counter() - started
+        self.assertEqual(["branch_mode"], [change["path"] for change in changes])
+        self.assertLess(elapsed, 0.01)
+        self.assertEqual([], DIFF.diff_trees(old_tree, DIFF.merkle(copy.deepcopy(payload))))
+
+
+class RedactionTests(unittest.TestCase):
+    def test_sensitive_fields_and_content_are_redacted(self) -> None:
+        old = {"owner": {"email": "a@example.org"}, "host": "10.0.0.1", "note": "ok"}
+        new = {"owner": {"email": "b@example.org"}, "host": "10.0.0.2", "note": "c@example.org"}
+        changes = {change["path"]: change for change in _changes(old, new)}
+
+        self.assertEqual({"owner.[redacted-key]", "host", "note"}, set(changes))
+        owner = changes["owner.[redacted-key]"]
+        self.assertEqual(("[redacted]", "[redacted]"), (owner["old"], owner["new"]))
+        self.assertEqual("[redacted: private IP address]", changes["host"]["new"])
+        self.assertEqual("ok", changes["note"]["old"])
+        self.assertEqual("[redacted: high-confidence email address]", changes["note"]["new"])
+        self.assertNotIn("example.org", json.dumps(list(changes.values())))
+
+
+class CsvTests(unittest.TestCase):
+    def test_rows_are_matched_on_natural_keys(self) -> None:
+        header = "run_id,split,model_id,metric,group,value\n"
+        old = header + "r1,test,m,air,gender:all,0.8\nr1,test,m,air,race:all,0.7\n"
+        reordered = header + "r2,test,m,air,race:all,0.7\nr2,test,m,air,gender:all,0.9\n"
+        changes = _changes(
+            DIFF.csv_document(old, "metrics_long.csv"),
+            DIFF.csv_document(reordered, "metrics_long.csv"),
+        )
+        paths = sorted(change["path"] for change in changes)
+        self.assertEqual(
+            [
+                "rows.split=test,model_id=m,metric=air,group=gender:all.run_id",
+                "rows.split=test,model_id=m,metric=air,group=gender:all.value",
+                "rows.split=test,model_id=m,metric=air,group=race:all.run_id",
+            ],
+            paths,
+        )
+
+    def test_sensitive_columns_and_duplicate_keys(self) -> None:
+        old = DIFF.csv_document("role,email\nowner,a@example.org\n", "governance_contacts.csv")
+        new = DIFF.csv_document("role,email\nowner,b@example.org\n", "governance_contacts.csv")
+        [change] = _changes(old, new)
+        self.assertEqual("rows.role=owner.[redacted-key]", change["path"])
+        self.assertEqual("[redacted]", change["new"])
+
+        duplicated = DIFF.csv_document("a,b\nx,1\nx,2\n", "other.csv")
+        self.assertEqual(["row=2", "row=3"], list(duplicated["rows"]))
+
+
+class CliTests(unittest.TestCase):
+    def test_bundle_diff_reports_changes_and_writes_json(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            old = Path(tmp) / "old"
+            shutil.copytree(ROOT / "intake", old, ignore=shutil.ignore_patterns("archive"))
+            new = Path(tmp) / "new"
+            shutil.copytree(old, new)
+            manifest = json.loads((new / "manifest.json").read_text(encoding="utf-8"))
+            manifest["run_id"] = "changed-run"
+            (new / "manifest.json").write_text(json.dumps(manifest, indent=4), encoding="utf-8")
+            (new / "governance_contacts.csv").unlink()
+            output = Path(tmp) / "diff.json"
+
+            completed = subprocess.run(
+                [sys.executable, str(MODULE_PATH), "--old", str(old), "--new", str(new),
+                 "--output", str(output)],
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+            self.assertEqual(0, completed.returncode, completed.stderr)
+            self.assertIn("~ manifest.json:run_id:", completed.stdout)
+            self.assertIn("- governance_contacts.csv", completed.stdout)
+            report = json.loads(output.read_text(encoding="utf-8"))
+            self.assertEqual({"changed": 1, "removed": 1}, report["counts"])
+
+            missing = subprocess.run(
+                [sys.executable, str(MODULE_PATH), "--old", str(Path(tmp) / "absent"),
+                 "--output", str(output)],
+                cwd=ROOT,
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+            self.assertEqual(2, missing.returncode)
+            self.assertIn("not a directory", missing.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
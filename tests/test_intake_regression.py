@@ -0,0 +1,194 @@
+import importlib.util
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+MODULE_PATH = ROOT / "scripts" / "intake_regression.py"
+SPEC = importlib.util.spec_from_file_location("intake_regression_under_test", MODULE_PATH)
+assert SPEC is not None and SPEC.loader is not None
+REGRESSION = importlib.util.module_from_spec(SPEC)
+SPEC.loader.exec_module(REGRESSION)
+
+
+def _git(repo: Path, *args: str) -> str:
+    completed = subprocess.run(
+        ["git", "-C", str(repo), *args], check=True, capture_output=True, text=True
+    )
+    return completed.stdout.strip()
+
+
+def _baseline_repo(tmp: Path) -> Path:
+    repo = tmp / "repo"
+    shutil.copytree(
+        ROOT / "intake",
+        repo / "intake",
+        ignore=shutil.ignore_patterns("archive"),
+    )
+    _git(repo, "init", "-q")
+    _git(repo, "config", "user.email", "ci@example.invalid")
+    _git(repo, "config", "user.name", "ci")
+    _git(repo, "add", "intake")
+    _git(repo, "commit", "-q", "-m", "baseline intake")
+    return repo
+
+
+def _shift_gender_air(candidate: Path, point: float, ci: list[float]) -> None:
+    path = candidate / "metrics_uncertainty.json"
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    air = payload["fairness_uncertainty"]["gender"]["air"]
+    air["point"] = point
+    air["ci95"] = ci
+    path.write_text(json.dumps(payload), encoding="utf-8")
+
+
+class CompareTests(unittest.TestCase):
+    def test_tracked_intake_matches_itself_quickly(self) -> None:
+        started = time.perf_counter()
+        baseline = REGRESSION.snapshot_frame(REGRESSION.read_git_tree(ROOT, "HEAD"))
+        candidate = REGRESSION.snapshot_frame(REGRESSION.read_directory(ROOT / "intake"))
+        report = REGRESSION.compare(baseline, candidate, min_delta=0.01)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual({"unchanged"}, set(report["status"]))
+        self.assertFalse(report["material"].any())
+        for attribute, metric in (
+            ("gender", "air"),
+            ("race", "srg"),
+            ("gender", "selection_rate"),
+            ("certificate", "overall_quality_score"),
+        ):
+            rows = report[(report["attribute"] == attribute) & (report["metric"] == metric)]
+            self.assertFalse(rows.empty, (attribute, metric))
+        self.assertIn("historical", set(report["slice"]))
+        self.assertLess(elapsed, 1.0)
+
+    def test_ranking_puts_non_overlapping_intervals_first(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            repo = _baseline_repo(Path(tmp))
+            baseline = REGRESSION.snapshot_frame(REGRESSION.read_git_tree(repo, "HEAD"))
+            candidate_dir = Path(tmp) / "candidate"
+            shutil.copytree(repo / "intake", candidate_dir)
+            _shift_gender_air(candidate_dir, 0.5, [0.45, 0.55])
+            (candidate_dir / "certificates" / "synthetic_quality_certificate.json").unlink()
+            candidate = REGRESSION.snapshot_frame(REGRESSION.read_directory(candidate_dir))
+
+        report = REGRESSION.compare(baseline, candidate, min_delta=0.01)
+        material = report[report["material"]]
+        removed = material[material["status"] == "removed"]
+        self.assertEqual({"synthetic_quality_certificate"}, set(removed["pair"]))
+        # Removed metrics have no delta and rank ahead of every measured change.
+        first_change = material.iloc[len(removed)]
+        self.assertEqual(
+            ("gender", "overall", "air", "changed", False),
+            tuple(first_change[["attribute", "slice", "metric", "status", "ci_overlap"]]),
+        )
+        self.assertEqual(1 + len(removed), len(material))
+        self.assertEqual(list(REGRESSION.REPORT_COLUMNS), list(report.columns))
+
+    def test_point_only_metrics_use_min_delta(self) -> None:
+        columns = [*REGRESSION.KEY_COLUMNS, "value", "low", "high"]
+        nan = float("nan")
+        baseline = REGRESSION.pd.DataFrame(
+            [("certificate", "c", "", "", "", "a_score", 0.90, nan, nan),
+             ("certificate", "c", "", "", "", "b_score", 0.90, nan, nan)],
+            columns=columns,
+        )
+        candidate = baseline.copy()
+        candidate["value"] = [0.895, 0.85]
+        report = REGRESSION.compare(baseline, candidate, min_delta=0.01)
+        self.assertEqual(["b_score", "a_score"], report["metric"].tolist())
+        self.assertEqual([True, False], report["material"].tolist())
+
+    def test_metrics_long_rows_are_keyed_by_split_and_model(self) -> None:
+        header = "run_id,split,model_id,metric,group,value,lower_ci,upper_ci\n"
+        rows = [
+            f"r,{split},{model},selection_rate,gender:female,{value},{value - 0.01},{value + 0.01}"
+            for split, model, value in (
+                ("test", "native", 0.40),
+                ("test", "baseline", 0.45),
+                ("validation", "native", 0.41),
+            )
+        ]
+        baseline = REGRESSION.snapshot_frame(
+            {"metrics_long.csv": (header + "\n".join(rows) + "\n").encode("utf-8")}
+        )
+        rows[1] = rows[1].replace("0.45,0.44,0.46", "0.6,0.59,0.61")
+        candidate = REGRESSION.snapshot_frame(
+            {"metrics_long.csv": (header + "\n".join(rows) + "\n").encode("utf-8")}
+        )
+
+        self.assertEqual(3, len(baseline))
+        report = REGRESSION.compare(baseline, candidate, min_delta=0.01)
+        self.assertEqual(
+            [("test", "baseline", "changed")],
+            [
+                (row.split, row.model_id, row.status)
+                for row in report[report["material"]].itertuples(index=False)
+            ],
+        )
+        self.assertEqual(2, int((report["status"] == "unchanged").sum()))
+
+
+class CliTests(unittest.TestCase):
+    def _run(self, *args: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [sys.executable, str(MODULE_PATH), *args],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+
+    def test_anchor_pin_and_fail_on_change(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            repo = _baseline_repo(Path(tmp))
+            anchor = Path(tmp) / "anchor.json"
+            anchor.write_text(
+                json.dumps(
+                    {
+                        "consumer": {
+                            "intake_commit": _git(repo, "rev-parse", "HEAD"),
+                            "intake_tree_git_oid": _git(repo, "rev-parse", "HEAD:intake"),
+                        }
+                    }
+                ),
+                encoding="utf-8",
+            )
+            candidate = Path(tmp) / "candidate"
+            shutil.copytree(repo / "intake", candidate)
+            _shift_gender_air(candidate, 0.5, [0.45, 0.55])
+            outdir = Path(tmp) / "out"
+            common = ["--repo", str(repo), "--anchor", str(anchor), "--outdir", str(outdir)]
+
+            clean = self._run(*common, "--candidate", str(repo / "intake"), "--fail-on-change")
+            self.assertEqual(0, clean.returncode, clean.stderr)
+            self.assertIn("0 material change(s)", clean.stdout)
+
+            changed = self._run(*common, "--candidate", str(candidate), "--fail-on-change")
+            self.assertEqual(1, changed.returncode, changed.stderr)
+            self.assertIn("* gender/", changed.stdout)
+            summary = json.loads((outdir / "summary.json").read_text(encoding="utf-8"))
+            self.assertEqual(1, summary["material_changes"])
+
+            payload = json.loads(anchor.read_text(encoding="utf-8"))
+            payload["consumer"]["intake_tree_git_oid"] = "0" * 40
+            anchor.write_text(json.dumps(payload), encoding="utf-8")
+            pinned = self._run(*common, "--candidate", str(candidate))
+            self.assertEqual(2, pinned.returncode)
+            self.assertIn("anchor pins", pinned.stderr)
+
+    def test_missing_baseline_commit_is_parser_error(self) -> None:
+        completed = self._run("--baseline-rev", "0" * 40, "--outdir", "/nonexistent")
+        self.assertEqual(2, completed.returncode)
+        self.assertIn("not in this clone", completed.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import importlib.util
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+
+ROOT = Path(__file__).resolve().parents[1]
+MODULE_PATH = ROOT / "scripts" / "intersectional_slices.py"
+SPEC = importlib.util.spec_from_file_location("intersectional_slices_under_test", MODULE_PATH)
+assert SPEC is not None and SPEC.loader is not None
+SLICES = importlib.util.module_from_spec(SPEC)
+SPEC.loader.exec_module(SLICES)
+
+
+class IntersectionalSliceTests(unittest.TestCase):
+    def test_single_attribute_depth_reproduces_deterministic_sot_pairs(self) -> None:
+        selection = pd.read_csv(ROOT / "intake" / "selection_rates.csv")
+        race = selection[selection["attribute"] == "race"].rename(columns={"group": "race"})
+        uncertainty = json.loads(
+            (ROOT / "intake" / "metrics_uncertainty.json").read_text(encoding="utf-8")
+        )["fairness_uncertainty"]["race"]
+
+        result = SLICES.enumerate_intersections(race, ["race"], max_depth=1)
+
+        self.assertEqual(set(result["reference_group"]), {uncertainty["reference_group"]})
+        self.assertEqual(sorted(result["group"]), sorted(uncertainty["pairs"]))
+        for _, row in result.iterrows():
+            pair = uncertainty["pairs"][row["group"]]
+            with self.subTest(group=row["group"]):
+                self.assertAlmostEqual(row["air"], pair["air"]["point"], places=12)
+                self.assertAlmostEqual(row["air_ci_low"], pair["air"]["ci95"][0], places=12)
+                self.assertAlmostEqual(row["air_ci_high"], pair["air"]["ci95"][1], places=12)
+                self.assertAlmostEqual(row["srg_ci_low"], pair["srg"]["ci95"][0], places=12)
+                self.assertAlmostEqual(row["srg_ci_high"], pair["srg"]["ci95"][1], places=12)
+                self.assertAlmostEqual(row["p_value"], pair["air"]["p_value"], places=12)
+                self.assertAlmostEqual(
+                    row["selection_rate_ci_low"],
+                    pair["selection_rates"]["prot"]["ci95"][0],
+                    places=12,
+                )
+
+    def test_display_policy_prunes_during_enumeration_without_empty_cells(self) -> None:
+        cells = pd.DataFrame(
+            [
+                ("female", "black", "urban", 40, 100),
+                ("female", "white", "urban", 300, 600),
+                ("female", "white", "rural", 120, 400),
+                ("male", "black", "rural", 10, 20),
+                ("male", "white", "urban", 500, 800),
+                ("male", "white", "rural", 0, 0),
+            ],
+            columns=["gender", "race", "region", "selected", "n"],
+        )
+
+        result = SLICES.enumerate_intersections(
+            cells,
+            ["gender", "race", "region"],
+            max_depth=3,
+            min_group_n=150,
+            min_group_pct=0.0,
+        )
+
+        self.assertTrue((result["n"] >= 150).all())
+        self.assertTrue((result["ref_n"] >= 150).all())
+        groups = set(zip(result["attributes"], result["group"]))
+        # black (n=120) is pruned at depth 1, so no intersection below it exists.
+        self.assertFalse(any("black" in group for _attrs, group in groups))
+        self.assertIn(("gender|race|region", "female|white|rural"), groups)
+        # male|white|rural has no observations and must never be materialised.
+        self.assertNotIn("male|white|rural", set(result["group"]))
+        self.assertEqual(set(result["depth"]), {1, 2, 3})
+
+    def test_cli_writes_csv_and_table_outside_publication_includes(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            temp = Path(tmp)
+            cells = temp / "cells.csv"
+            pd.DataFrame(
+                {
+                    "gender": ["female", "female", "male", "male"],
+                    "race": ["black", "white", "black", "white"],
+                    "selected": [180, 400, 260, 520],
+                    "n": [400, 800, 450, 900],
+                }
+            ).to_csv(cells, index=False)
+            outdir = temp / "out"
+            completed = subprocess.run(
+                [
+                    sys.executable,
+                    str(MODULE_PATH),
+                    "--cells",
+                    str(cells),
+                    "--config",
+                    str(ROOT / "config" / "fairness_config.yaml"),
+                    "--outdir",
+                    str(outdir),
+                ],
+                check=False,
+                capture_output=True,
+                text=True,
+            )
+
+            self.assertEqual(0, completed.returncode, completed.stderr)
+            table = (outdir / "table_intersectional_air.tex").read_text(encoding="utf-8")
+            self.assertIn("female $\\times$ black", table)
+            written = pd.read_csv(outdir / "intersectional_slices.csv")
+            self.assertEqual(list(written.columns), list(SLICES._SLICE_COLUMNS))
+            self.assertEqual(written["depth"].max(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import importlib.util
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+MODULE_PATH = ROOT / "scripts" / "latex_passes.py"
+SPEC = importlib.util.spec_from_file_location("latex_passes_under_test", MODULE_PATH)
+assert SPEC is not None and SPEC.loader is not None
+PASSES = importlib.util.module_from_spec(SPEC)
+SPEC.loader.exec_module(PASSES)
+
+
+def _wrapped(line: str, width: int = 79) -> str:
+    return "\n".join(line[index : index + width] for index in range(0, len(line), width))
+
+
+class LogTests(unittest.TestCase):
+    def test_wrapped_warnings_are_recognised(self) -> None:
+        reference = (
+            "LaTeX Warning: Reference `sec:a-rather-long-label-name-for-wrapping-purposes' "
+            "on page 3 undefined on input line 42."
+        )
+        log = "\n".join(
+            [
+                "This is pdfTeX, Version 3.141592653",
+                _wrapped(reference),
+                "Package natbib Warning: Citation `cfpb2023' on page 4 undefined on input line 7.",
+                "LaTeX Warning: Label(s) may have changed. Rerun to get cross-references right.",
+                "Package rerunfilecheck Warning: File `main.out' has changed.",
+                "Output written on main.pdf (31 pages, 812345 bytes).",
+            ]
+        )
+        parsed = PASSES.parse_log(log)
+        self.assertEqual(
+            ["sec:a-rather-long-label-name-for-wrapping-purposes"],
+            parsed["undefined_references"],
+        )
+        self.assertEqual(["cfpb2023"], parsed["undefined_citations"])
+        self.assertEqual(["labels", "rerun_requested"], parsed["warnings"])
+        self.assertEqual(["main.out"], parsed["changed_files_reported"])
+        self.assertEqual((31, 812345), (parsed["pages"], parsed["pdf_bytes"]))
+
+
+class AuxAndRecorderTests(unittest.TestCase):
+    def test_aux_follows_included_aux_files(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "sections").mkdir()
+            (root / "main.aux").write_text(
+                "\\relax\n\\citation{a,b}\n\\@input{sections/intro.aux}\n"
+                "\\bibdata{bib/references}\n\\bibstyle{plainnat}\n",
+                encoding="utf-8",
+            )
+            (root / "sections" / "intro.aux").write_text(
+                "\\newlabel{sec:intro}{{1}{1}}\n\\bibcite{a}{1}\n\\citation{c}\n",
+                encoding="utf-8",
+            )
+            aux = PASSES.parse_aux(root / "main.aux")
+        self.assertEqual({"a", "b", "c"}, aux["citations"])
+        self.assertEqual({"sec:intro": "{1}{1}"}, aux["labels"])
+        self.assertEqual({"a": "1"}, aux["bibcites"])
+        self.assertEqual(("bib/references", "plainnat"), (aux["bibdata"], aux["bibstyle"]))
+        self.assertEqual(2, len(aux["files"]))
+
+    def test_recorder_paths_are_relative_and_reread_files_exclude_outputs(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp).resolve()
+            fls = PASSES.parse_fls(
+                "\n".join(
+                    [
+                        f"PWD {root}",
+                        "INPUT /usr/share/texmf/tex/latex/siunitx/siunitx.sty",
+                        "INPUT ./includes/metrics_macros.tex",
+                        f"INPUT {root}/figures/air.pdf",
+                        "OUTPUT main.aux",
+                        "OUTPUT main.out",
+                        "OUTPUT main.pdf",
+                        "OUTPUT main.log",
+                    ]
+                ),
+                root,
+            )
+        self.assertIn("includes/metrics_macros.tex", fls["inputs"])
+        self.assertIn("figures/air.pdf", fls["inputs"])
+        self.assertEqual(["main.aux", "main.out"], PASSES.reread_files(fls["outputs"]))
+
+    def test_pass_without_auxiliary_changes_needs_no_rerun(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "main.aux").write_text("\\newlabel{a}{{1}{1}}\n", encoding="utf-8")
+            (root / "main.log").write_text("Output written on main.pdf (1 page, 9 bytes).\n")
+            (root / "main.fls").write_text(f"PWD {root}\nINPUT main.aux\nOUTPUT main.aux\n")
+            before = PASSES.digests(root, ["main.aux"])
+            stable = PASSES.analyze_pass(root, "main", before=before)
+            self.assertFalse(stable["rerun"])
+            self.assertEqual([], stable["triggers"])
+
+            (root / "main.aux").write_text("\\newlabel{a}{{2}{1}}\n", encoding="utf-8")
+            changed = PASSES.analyze_pass(
+                root, "main", before=before, previous_aux=stable["aux"]
+            )
+            self.assertTrue(changed["rerun"])
+            self.assertEqual(["labels"], changed["triggers"])
+            self.assertEqual(["main.aux"], changed["changed_files"])
+
+    def test_cli_reports_finished_build(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "main.log").write_text("Output written on main.pdf (2 pages, 9 bytes).\n")
+            completed = subprocess.run(
+                [sys.executable, str(MODULE_PATH), "--root", str(root)],
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+            self.assertEqual(0, completed.returncode, completed.stderr)
+            self.assertEqual(2, json.loads(completed.stdout)["pages"])
+
+            missing = subprocess.run(
+                [sys.executable, str(MODULE_PATH), "--root", str(root / "absent")],
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+            self.assertEqual(2, missing.returncode)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import importlib.util
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+ROOT = Path(__file__).resolve().parents[1]
+MODULE_PATH = ROOT / "scripts" / "multiplicity.py"
+SPEC = importlib.util.spec_from_file_location("multiplicity_under_test", MODULE_PATH)
+assert SPEC is not None and SPEC.loader is not None
+MULTIPLICITY = importlib.util.module_from_spec(SPEC)
+SPEC.loader.exec_module(MULTIPLICITY)
+
+
+def _reference(p: np.ndarray, method: str) -> np.ndarray:
+    """Textbook single-family adjustment used as an oracle."""
+
+    m = len(p)
+    order = np.argsort(p)
+    ranked = p[order]
+    rank = np.arange(1, m + 1)
+    if method == "bonferroni":
+        adjusted = ranked * m
+    elif method == "holm":
+        adjusted = np.maximum.accumulate(ranked * (m - rank + 1))
+    elif method == "hochberg":
+        adjusted = np.minimum.accumulate((ranked * (m - rank + 1))[::-1])[::-1]
+    else:
+        scale = np.sum(1.0 / rank) if method == "by" else 1.0
+        adjusted = np.minimum.accumulate((ranked * m / rank * scale)[::-1])[::-1]
+    result = np.empty(m)
+    result[order] = np.minimum(adjusted, 1.0)
+    return result
+
+
+class MultiplicityTests(unittest.TestCase):
+    def test_grouped_adjustments_match_per_family_oracle(self) -> None:
+        rng = np.random.default_rng(20260718)
+        p_values = rng.uniform(size=2_000) ** 4
+        families = rng.integers(0, 37, size=2_000)
+        for method in MULTIPLICITY.METHODS:
+            adjusted = MULTIPLICITY.adjust_p_values(p_values, method, families)
+            expected = np.empty_like(p_values)
+            for family in np.unique(families):
+                mask = families == family
+                expected[mask] = _reference(p_values[mask], method)
+            with self.subTest(method=method):
+                np.testing.assert_allclose(adjusted, expected, rtol=1e-12, atol=0.0)
+
+    def test_tiny_p_values_keep_full_precision(self) -> None:
+        adjusted = MULTIPLICITY.adjust_p_values(
+            [5.925343298757943e-44, 0.2, 0.5], "holm", ["a", "b", "b"]
+        )
+        self.assertEqual(5.925343298757943e-44, adjusted[0])
+        np.testing.assert_allclose(adjusted[1:], [0.4, 0.5])
+
+    def test_shipped_adjusted_p_values_are_consistent(self) -> None:
+        uncertainty = json.loads(
+            (ROOT / "intake" / "metrics_uncertainty.json").read_text(encoding="utf-8")
+        )
+        slices = json.loads((ROOT / "intake" / "fairness_slices.json").read_text(encoding="utf-8"))
+
+        report = MULTIPLICITY.crosscheck_shipped_adjustments(uncertainty, slices)
+
+        self.assertEqual("consistent", report["status"], report["mismatches"])
+        self.assertEqual("holm", report["families"]["race.air"])
+
+        tampered = json.loads(json.dumps(uncertainty))
+        tampered["fairness_uncertainty"]["race"]["pairs"]["other"]["air"][
+            "p_value_adjusted"
+        ] = 0.04045
+        report = MULTIPLICITY.crosscheck_shipped_adjustments(tampered, slices)
+        self.assertEqual("mismatch", report["status"])
+        self.assertEqual(["other"], [item["member"] for item in report["mismatches"]])
+
+    def test_cli_adjusts_csv_families(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp) / "slices.csv"
+            output = Path(tmp) / "adjusted.csv"
+            pd.DataFrame(
+                {
+                    "attributes": ["race", "race", "race|gender", "race|gender"],
+                    "p_value": [0.01, 0.04, 0.03, 0.02],
+                }
+            ).to_csv(source, index=False)
+            completed = subprocess.run(
+                [
+                    sys.executable,
+                    str(MODULE_PATH),
+                    "adjust",
+                    "--input",
+                    str(source),
+                    "--output",
+                    str(output),
+                    "--family-column",
+                    "attributes",
+                    "--method",
+                    "benjamini_hochberg",
+                ],
+                check=False,
+                capture_output=True,
+                text=True,
+            )
+
+            self.assertEqual(0, completed.returncode, completed.stderr)
+            written = pd.read_csv(output)
+            np.testing.assert_allclose(written["p_value_bh"], [0.02, 0.04, 0.03, 0.03])
+
+    def test_rejects_out_of_range_p_values_and_unknown_methods(self) -> None:
+        with self.assertRaises(ValueError):
+            MULTIPLICITY.adjust_p_values([0.1, 1.5], "holm")
+        with self.assertRaises(ValueError):
+            MULTIPLICITY.adjust_p_values([0.1], "sidak")
+
+
+if __name__ == "__main__":
+    unittest.main()
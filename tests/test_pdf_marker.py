@@ -0,0 +1,242 @@
+import importlib.util
+import subprocess
+import tempfile
+import tracemalloc
+import unittest
+import zlib
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+MODULE_PATH = ROOT / "scripts" / "pdf_marker.py"
+SPEC = importlib.util.spec_from_file_location("pdf_marker_under_test", MODULE_PATH)
+assert SPEC is not None and SPEC.loader is not None
+MARKER = importlib.util.module_from_spec(SPEC)
+SPEC.loader.exec_module(MARKER)
+
+# Like a TeX font encoding, the codes shown are not the ASCII of the glyphs.
+_GLYPHS = {"D": "D", "E": "E", "M": "M", "O": "O", "/": "slash", "V": "V", "A": "A"}
+_GLYPHS.update({"L": "L", "U": "U", "T": "T", "I": "I", "N": "N", "Y": "Y"})
+_CODES = {char: code for code, char in enumerate(_GLYPHS, start=1)}
+_DIFFERENCES = "[1 " + " ".join(f"/{name}" for name in _GLYPHS.values()) + "]"
+
+
+def _encoded(word: str) -> str:
+    return "<" + "".join(f"{_CODES[char]:02X}" for char in word) + ">"
+
+
+def _marker_ops(font: str = "/F1") -> bytes:
+    # Words separated by positioning only, with a kern inside a word, as pdfTeX writes them.
+    return (
+        f"BT {font} 36 Tf 100 400 Td [{_encoded('DEMO')} -333 {_encoded('/')} -333 "
+        f"{_encoded('EVALUA')} 80 {_encoded('TION')} -333 {_encoded('ONLY')}] TJ ET\n"
+    ).encode("ascii")
+
+
+def _unicode_marker_ops() -> bytes:
+    codes = "".join(f"{0x0100 + ord(char):04X}" for char in "DEMO/EVALUATIONONLY")
+    return f"BT /F2 12 Tf 72 72 Td <{codes}> Tj ET\n".encode("ascii")
+
+
+_TO_UNICODE = (
+    b"/CIDInit /ProcSet findresource begin 12 dict begin begincmap\n"
+    b"1 begincodespacerange <0000> <FFFF> endcodespacerange\n"
+    b"1 beginbfrange <0120> <017F> <0020> endbfrange\n"
+    b"endcmap CMapName currentdict /CMap defineresource pop end end\n"
+)
+
+
+def _pdf(pages: list[bytes], *, object_streams: bool = False, form: bytes = b"") -> bytes:
+    """A small PDF with flate content streams, in the layout pdfTeX or older writers use."""
+
+    objects: dict[int, bytes] = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /LMRoman10-Bold /Encoding 4 0 R >>",
+        4: f"<< /Type /Encoding /Differences {_DIFFERENCES} >>".encode("ascii"),
+        5: b"<< /Type /Font /Subtype /Type0 /BaseFont /Sans /ToUnicode 6 0 R >>",
+    }
+    streams: dict[int, bytes] = {6: b"<< /Length %d >>\nstream\n" % len(_TO_UNICODE)}
+    streams[6] += _TO_UNICODE + b"\nendstream"
+    resources = "<< /Font << /F1 3 0 R /F2 5 0 R >> /XObject << /Fm1 7 0 R >> >>"
+    form_data = zlib.compress(form)
+    streams[7] = (
+        b"<< /Type /XObject /Subtype /Form /BBox [0 0 612 792] /Filter /FlateDecode "
+        b"/Length %d >>\nstream\n" % len(form_data)
+    ) + form_data + b"\nendstream"
+    kids = []
+    for index, content in enumerate(pages):
+        page, stream = 10 + 2 * index, 11 + 2 * index
+        kids.append(f"{page} 0 R")
+        objects[page] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {stream} 0 R >>"
+        ).encode("ascii")
+        data = content if content.startswith(b"CORRUPT") else zlib.compress(content)
+        streams[stream] = (
+            b"<< /Filter /FlateDecode /Length %d >>\nstream\n" % len(data)
+        ) + data + b"\nendstream"
+    objects[2] = (
+        f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} /Resources {resources} >>"
+    ).encode("ascii")
+
+    out = bytearray(b"%PDF-1.5\n%\xd0\xd4\xc5\xd8\n")
+    offsets: dict[int, tuple[int, ...]] = {}
+    for number, body in sorted(streams.items()):
+        offsets[number] = (1, len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    if not object_streams:
+        for number, body in sorted(objects.items()):
+            offsets[number] = (1, len(out))
+            out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+        size = max(offsets) + 1
+        xref = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % size
+        for number in range(1, size):
+            location = offsets.get(number)
+            out += b"%010d 00000 n \n" % location[1] if location else b"0000000000 65535 f \n"
+        out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref)
+        return bytes(out)
+
+    # pdfTeX 1.40 style: plain objects in a compressed object stream, then an xref stream.
+    container = max([*objects, *streams]) + 1
+    header, body = [], b""
+    for index, (number, value) in enumerate(sorted(objects.items())):
+        header.append(b"%d %d" % (number, len(body)))
+        offsets[number] = (2, container, index)
+        body += value + b"\n"
+    packed = b" ".join(header) + b"\n"
+    data = zlib.compress(packed + body)
+    offsets[container] = (1, len(out))
+    out += (
+        b"%d 0 obj\n<< /Type /ObjStm /N %d /First %d /Filter /FlateDecode /Length %d >>\n"
+        b"stream\n" % (container, len(objects), len(packed), len(data))
+    ) + data + b"\nendstream\nendobj\n"
+    xref_number = container + 1
+    offsets[xref_number] = (1, len(out))
+    rows, previous = b"", bytes(4)
+    for number in range(xref_number + 1):
+        kind, *fields = offsets.get(number, (0, 0, 0))
+        second, third = (fields + [0, 0])[:2]
+        row = bytes([kind]) + second.to_bytes(2, "big") + bytes([third])
+        # PNG "Up" predictor rows, as /Predictor 12 declares.
+        rows += b"\x02" + bytes((a - b) & 0xFF for a, b in zip(row, previous))
+        previous = row
+    data = zlib.compress(rows)
+    xref = len(out)
+    out += (
+        b"%d 0 obj\n<< /Type /XRef /Size %d /W [1 2 1] /Root 1 0 R /Filter /FlateDecode "
+        b"/DecodeParms << /Columns 4 /Predictor 12 >> /Length %d >>\nstream\n"
+        % (xref_number, xref_number + 1, len(data))
+    ) + data + b"\nendstream\nendobj\nstartxref\n%d\n%%%%EOF\n" % xref
+    return bytes(out)
+
+
+class PdfMarkerTests(unittest.TestCase):
+    def _write(self, tmp: str, data: bytes, name: str = "main.pdf") -> Path:
+        path = Path(tmp) / name
+        path.write_bytes(data)
+        return path
+
+    def test_stops_at_first_marked_page_without_inflating_later_pages(self) -> None:
+        title = f"BT /F1 12 Tf 72 700 Td {_encoded('DATE')} Tj ET\n".encode("ascii")
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf = self._write(tmp, _pdf([title, _marker_ops(), b"CORRUPT not flate"]))
+            self.assertNotIn(b"DEMO", pdf.read_bytes())
+
+            scan = MARKER.find_marker(pdf)
+
+            self.assertTrue(scan.found)
+            self.assertEqual(scan.page_count, 3)
+            self.assertEqual(scan.pages_checked, 2)
+            self.assertEqual(scan.marked_pages, (2,))
+            with self.assertRaisesRegex(MARKER.MarkerError, "corrupt FlateDecode"):
+                MARKER.find_marker(pdf, every_page=True)
+
+    def test_every_page_mode_reads_object_streams_forms_and_to_unicode(self) -> None:
+        pages = [
+            _marker_ops(),
+            b"q 1 0 0 1 0 0 cm /Fm1 Do Q\n",
+            _unicode_marker_ops(),
+            f"BT /F1 12 Tf {_encoded('DEMO')} Tj ET\n".encode("ascii"),
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            for object_streams in (False, True):
+                with self.subTest(object_streams=object_streams):
+                    pdf = self._write(
+                        tmp, _pdf(pages, object_streams=object_streams, form=_marker_ops())
+                    )
+
+                    scan = MARKER.find_marker(pdf, every_page=True)
+
+                    self.assertFalse(scan.found)
+                    self.assertEqual(scan.marked_pages, (1, 2, 3))
+                    self.assertEqual(scan.unmarked_pages, (4,))
+                    texts = MARKER.page_texts(pdf)
+                    self.assertIn("DEMO / EVALUATION ONLY", texts[0])
+                    self.assertIn("DEMO/EVALUATIONONLY", texts[2])
+
+    def test_content_stream_is_inflated_and_tokenized_incrementally(self) -> None:
+        filler = (b"% " + b"x" * 1000 + b"\n0 0 m 10 10 l S\n") * 8192
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf = self._write(tmp, _pdf([filler + _marker_ops()], object_streams=True))
+            del filler
+            tracemalloc.start()
+            try:
+                scan = MARKER.find_marker(pdf)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+        self.assertTrue(scan.found)
+        self.assertLess(peak, 2 * 1024 * 1024)
+
+    def test_reads_matplotlib_pdf_pages(self) -> None:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+        from matplotlib.backends.backend_pdf import PdfPages
+
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf = Path(tmp) / "figures.pdf"
+            with PdfPages(pdf) as pages:
+                for label in ("Selection rate", "DEMO / EVALUATION ONLY"):
+                    figure = plt.figure()
+                    figure.text(0.5, 0.5, label, rotation=35)
+                    pages.savefig(figure)
+                    plt.close(figure)
+
+            first = MARKER.find_marker(pdf)
+            every = MARKER.find_marker(pdf, every_page=True)
+
+        self.assertEqual((first.found, first.pages_checked), (True, 2))
+        self.assertEqual((every.found, every.unmarked_pages), (False, (1,)))
+
+    def test_unreadable_pdfs_fail_closed(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, data in (("text.pdf", b"not a PDF"), ("empty.pdf", b"")):
+                with self.subTest(name=name):
+                    with self.assertRaisesRegex(MARKER.MarkerError, "not a PDF"):
+                        MARKER.find_marker(self._write(tmp, data, name))
+            with self.assertRaisesRegex(MARKER.MarkerError, "unable to read"):
+                MARKER.find_marker(Path(tmp) / "missing.pdf")
+
+    def test_pdftotext_pages_split_on_form_feeds(self) -> None:
+        def fake_run(command, **kwargs):
+            self.assertEqual(command, ["pdftotext", "main.pdf", "-"])
+            stdout = "Title\n\f1 Introduction\nDEMO / EVALUATION\nONLY\n\f"
+            return subprocess.CompletedProcess(command, 0, stdout=stdout, stderr="")
+
+        self.assertEqual(
+            MARKER.pdftotext_marked_pages(Path("main.pdf"), run=fake_run), (2, (2,))
+        )
+
+    def test_cli_exit_status(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf = self._write(tmp, _pdf([_marker_ops(), b"0 0 m S\n"]))
+
+            self.assertEqual(MARKER.main([str(pdf)]), 0)
+            self.assertEqual(MARKER.main([str(pdf), "--every-page"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,7 @@
+import contextlib
+import importlib.util
+import io
+import json
 import subprocess
 import sys
 import tempfile
@@ -7,6 +11,10 @@ from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
 SCRIPT = ROOT / "scripts" / "gen_plots_from_intake.py"
+SPEC = importlib.util.spec_from_file_location("gen_plots_contract_under_test", SCRIPT)
+assert SPEC is not None and SPEC.loader is not None
+PLOTS = importlib.util.module_from_spec(SPEC)
+SPEC.loader.exec_module(PLOTS)
 
 
 class PlotGenerationContractTests(unittest.TestCase):
@@ -50,6 +58,314 @@ class PlotGenerationContractTests(unittest.TestCase):
             )
             self.assertEqual([], list(outdir.iterdir()))
 
+    def test_parallel_rendering_matches_serial_bytes_and_require_all(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            outputs = {}
+            for jobs in ("1", "3"):
+                outdir = Path(tmp) / f"jobs-{jobs}"
+                completed = subprocess.run(
+                    [
+                        sys.executable,
+                        str(SCRIPT),
+                        "--uncertainty",
+                        str(ROOT / "intake" / "metrics_uncertainty.json"),
+                        "--selection",
+                        str(ROOT / "intake" / "selection_rates.csv"),
+                        "--fairness-slices",
+                        str(ROOT / "intake" / "fairness_slices.json"),
+                        "--metrics",
+                        str(ROOT / "intake" / "metrics_long.csv"),
+                        "--outdir",
+                        str(outdir),
+                        "--require-all",
+                        "--jobs",
+                        jobs,
+                    ],
+                    check=False,
+                    capture_output=True,
+                    text=True,
+                )
+                self.assertEqual(0, completed.returncode, completed.stderr)
+                outputs[jobs] = {path.name: path.read_bytes() for path in outdir.glob("*.pdf")}
+
+            self.assertEqual(
+                ["air_summary.pdf", "gender_air_slices.pdf", "selection_rates.pdf"],
+                sorted(outputs["3"]),
+            )
+            self.assertEqual(outputs["1"], outputs["3"])
+
+    def test_cache_restores_fresh_figures_and_rekeys_changed_inputs(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            temp = Path(tmp)
+            outdir = temp / "figures"
+            cache = temp / "cache"
+            slices = temp / "fairness_slices.json"
+            slices.write_bytes((ROOT / "intake" / "fairness_slices.json").read_bytes())
+
+            def _run() -> None:
+                completed = subprocess.run(
+                    [
+                        sys.executable,
+                        str(SCRIPT),
+                        "--uncertainty",
+                        str(ROOT / "intake" / "metrics_uncertainty.json"),
+                        "--fairness-slices",
+                        str(slices),
+                        "--outdir",
+                        str(outdir),
+                        "--cache-dir",
+                        str(cache),
+                        "--require-all",
+                    ],
+                    check=False,
+                    capture_output=True,
+                    text=True,
+                )
+                self.assertEqual(0, completed.returncode, completed.stderr)
+
+            _run()
+            self.assertEqual(3, len(list(cache.glob("*.pdf"))))
+            fresh = {path.name: path.read_bytes() for path in outdir.glob("*.pdf")}
+            for name, payload in fresh.items():
+                self.assertEqual((ROOT / "figures" / name).read_bytes(), payload)
+            stamps = {path.name: path.stat().st_mtime_ns for path in outdir.glob("*.pdf")}
+
+            (outdir / "air_summary.pdf").write_bytes(b"stale")
+            _run()
+            self.assertEqual(fresh["air_summary.pdf"], (outdir / "air_summary.pdf").read_bytes())
+            for name in ("gender_air_slices.pdf", "selection_rates.pdf"):
+                self.assertEqual(stamps[name], (outdir / name).stat().st_mtime_ns)
+
+            payload = json.loads(slices.read_text(encoding="utf-8"))
+            payload["air_threshold"] = 0.75
+            slices.write_text(json.dumps(payload), encoding="utf-8")
+            _run()
+            self.assertEqual(4, len(list(cache.glob("*.pdf"))))
+            self.assertNotEqual(
+                fresh["gender_air_slices.pdf"], (outdir / "gender_air_slices.pdf").read_bytes()
+            )
+            self.assertEqual(
+                stamps["selection_rates.pdf"], (outdir / "selection_rates.pdf").stat().st_mtime_ns
+            )
+
+
+class DensePdfOutputTests(unittest.TestCase):
+    def _dense_figure(self):
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+        import numpy as np
+
+        # Noisy per-run trace: path simplification cannot shrink it.
+        rng = np.random.default_rng(7)
+        x = np.linspace(0.0, 1.0, 20_000)
+        fig, ax = plt.subplots(figsize=(4.0, 3.0))
+        ax.plot(x, np.cumsum(rng.normal(size=x.size)), linewidth=0.5)
+        ax.plot([0.0, 1.0], [0.0, 0.0], color="red")
+        ax.set_title("Dense trend")
+        return fig, plt
+
+    def _save(self, outdir: Path, name: str, rasterize_above: int) -> dict:
+        fig, plt = self._dense_figure()
+        path = outdir / name
+        original = dict(PLOTS._PDF_OUTPUT)
+        PLOTS._PDF_OUTPUT["rasterize_above"] = rasterize_above
+        try:
+            PLOTS._save_pdf(fig, path)
+        finally:
+            PLOTS._PDF_OUTPUT.update(original)
+            plt.close(fig)
+        return PLOTS._pdf_size_report(path)
+
+    def test_dense_artists_are_rasterized_and_text_stays_type42(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            outdir = Path(tmp)
+            vector = self._save(outdir, "vector.pdf", 0)
+            compact = self._save(outdir, "compact.pdf", 5000)
+            again = self._save(outdir, "again.pdf", 5000)
+
+            self.assertEqual(0, vector["raster_images"])
+            self.assertEqual(1, compact["raster_images"])
+            self.assertLess(compact["bytes"], vector["bytes"])
+            self.assertEqual(0, compact["type3_fonts"])
+            self.assertIn(b"/CIDFontType2", (outdir / "compact.pdf").read_bytes())
+            self.assertEqual(
+                (outdir / "compact.pdf").read_bytes(), (outdir / "again.pdf").read_bytes()
+            )
+            self.assertEqual(compact["objects"], again["objects"])
+
+
+def _write_history_certificates(directory: Path, epochs: int, trials: int) -> None:
+    import numpy as np
+
+    rng = np.random.default_rng(11)
+    steps = np.arange(epochs)
+    for branch in ("intrinsic", "amplification"):
+        generator = 2.0 * np.exp(-steps / 4000.0) + rng.normal(0.0, 0.05, epochs)
+        discriminator = 1.0 + rng.normal(0.0, 0.05, epochs)
+        (directory / f"training_convergence_certificate_{branch}.json").write_text(
+            json.dumps(
+                {
+                    "branch_mode": branch,
+                    "certificate_hash": "0" * 64,
+                    "convergence_metrics": {
+                        "history": [
+                            {"epoch": int(epoch), "generator_loss": g, "discriminator_loss": d}
+                            for epoch, g, d in zip(steps, generator, discriminator)
+                        ]
+                    },
+                }
+            ),
+            encoding="utf-8",
+        )
+        (directory / f"hyperparameter_tuning_certificate_{branch}.json").write_text(
+            json.dumps(
+                {
+                    "branch_mode": branch,
+                    "direction": "minimize",
+                    "trials": [
+                        {"trial": index, "value": float(value), "duration_seconds": 1.5}
+                        for index, value in enumerate(rng.uniform(0.1, 1.0, trials))
+                    ],
+                }
+            ),
+            encoding="utf-8",
+        )
+
+
+class HistoryFigureTests(unittest.TestCase):
+    def test_lttb_keeps_endpoints_budget_and_spikes(self) -> None:
+        import numpy as np
+
+        x = np.arange(10_000, dtype=float)
+        y = np.zeros_like(x)
+        y[4321] = 50.0
+        small_x, small_y = PLOTS._lttb(x, y, 100)
+
+        self.assertEqual(100, small_x.size)
+        self.assertEqual((0.0, 9999.0), (small_x[0], small_x[-1]))
+        self.assertTrue(np.all(np.diff(small_x) > 0))
+        self.assertIn(4321.0, small_x.tolist())
+        self.assertEqual(50.0, small_y.max())
+        unchanged_x, _ = PLOTS._lttb(x[:50], y[:50], 100)
+        self.assertEqual(50, unchanged_x.size)
+        with self.assertRaises(ValueError):
+            PLOTS._lttb(x, y, 2)
+
+    def test_histories_are_extracted_per_branch_and_downsampled(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = Path(tmp)
+            _write_history_certificates(directory, epochs=20_000, trials=300)
+            histories = PLOTS._training_histories(directory, 400)
+            trajectories = PLOTS._tuning_trajectories(directory, 400)
+
+        self.assertEqual(["intrinsic", "amplification"], list(histories))
+        labels = [entry["label"] for entry in histories["intrinsic"]]
+        self.assertEqual(["discriminator_loss", "generator_loss"], labels)
+        for entry in histories["amplification"]:
+            self.assertEqual(400, len(entry["x"]))
+            self.assertEqual((0.0, 19_999.0), (entry["x"][0], entry["x"][-1]))
+
+        trajectory = trajectories["intrinsic"]
+        self.assertEqual("value", trajectory["label"])
+        self.assertEqual(300, len(trajectory["x"]))
+        self.assertEqual(min(trajectory["y"]), trajectory["best_y"][-1])
+        self.assertEqual(sorted(trajectory["best_y"], reverse=True), trajectory["best_y"])
+
+    def test_only_known_history_keys_are_plotted(self) -> None:
+        payload = {
+            "calibration": {"bin_edges": [0.0, 0.25, 0.5, 0.75, 1.0]},
+            "group_selection_rates": [0.41, 0.52, 0.47],
+            "trials": [
+                {"trial": index, "learning_rate": 0.1 / (index + 1), "batch_size": 64}
+                for index in range(5)
+            ],
+            "convergence_metrics": {
+                "generator_loss": [2.0, 1.5, 1.2, 1.1],
+                "history": [
+                    {"epoch": index, "val_loss": 1.0 / (index + 1), "learning_rate": 0.01}
+                    for index in range(4)
+                ],
+            },
+        }
+
+        series = PLOTS._certificate_series(payload)
+
+        self.assertEqual(
+            ["convergence_metrics.generator_loss", "convergence_metrics.history.val_loss"],
+            sorted(series),
+        )
+
+    def test_tuning_certificate_without_objective_is_skipped(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = Path(tmp)
+            (directory / "hyperparameter_tuning_certificate_intrinsic.json").write_text(
+                json.dumps(
+                    {
+                        "branch_mode": "intrinsic",
+                        "trials": [
+                            {"trial": index, "learning_rate": 0.1, "train_loss": 1.0 + index}
+                            for index in range(5)
+                        ],
+                    }
+                ),
+                encoding="utf-8",
+            )
+            with contextlib.redirect_stdout(io.StringIO()) as stdout:
+                trajectories = PLOTS._tuning_trajectories(directory, 100)
+
+        self.assertEqual({}, trajectories)
+        self.assertIn("No objective field", stdout.getvalue())
+        self.assertIn("intrinsic", stdout.getvalue())
+
+    def test_cli_renders_compact_history_figures_and_drops_stale_ones(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            temp = Path(tmp)
+            certificates = temp / "certificates"
+            certificates.mkdir()
+            _write_history_certificates(certificates, epochs=20_000, trials=300)
+            outdir = temp / "figures"
+
+            def _run(*extra: str) -> subprocess.CompletedProcess:
+                return subprocess.run(
+                    [
+                        sys.executable,
+                        str(SCRIPT),
+                        "--outdir",
+                        str(outdir),
+                        "--certificates",
+                        str(certificates),
+                        *extra,
+                    ],
+                    cwd=ROOT,
+                    capture_output=True,
+                    text=True,
+                    check=False,
+                )
+
+            completed = _run("--require-all", "--history-points", "300")
+            self.assertEqual(0, completed.returncode, completed.stderr)
+            for name in ("training_convergence.pdf", "tuning_trajectory.pdf"):
+                report = PLOTS._pdf_size_report(outdir / name)
+                self.assertLess(report["bytes"], 60_000, name)
+                self.assertEqual(0, report["raster_images"], name)
+                self.assertIn(name, completed.stdout)
+
+            completed = _run("--backend", "pgf")
+            self.assertEqual(0, completed.returncode, completed.stderr)
+            tex = (outdir / "tuning_trajectory.tex").read_text(encoding="utf-8")
+            self.assertIn("const plot", tex)
+            self.assertEqual(4, tex.count("\\addplot+"))
+            self.assertEqual(4, len(list(outdir.glob("training_convergence_*.dat"))))
+
+            for path in certificates.glob("training_convergence_certificate_*.json"):
+                path.write_text(json.dumps({"convergence_metrics": None}), encoding="utf-8")
+            completed = _run()
+            self.assertEqual(0, completed.returncode, completed.stderr)
+            self.assertFalse((outdir / "training_convergence.pdf").exists())
+            self.assertTrue((outdir / "tuning_trajectory.pdf").is_file())
+
 
 if __name__ == "__main__":
     unittest.main()
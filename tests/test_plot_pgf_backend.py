@@ -0,0 +1,191 @@
+import importlib.util
+import json
+import re
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+
+ROOT = Path(__file__).resolve().parents[1]
+SCRIPT = ROOT / "scripts" / "gen_plots_from_intake.py"
+SPEC = importlib.util.spec_from_file_location("gen_plots_from_intake_under_test", SCRIPT)
+assert SPEC is not None and SPEC.loader is not None
+PLOTS = importlib.util.module_from_spec(SPEC)
+SPEC.loader.exec_module(PLOTS)
+
+
+def _load(name: str) -> dict:
+    return json.loads((ROOT / "intake" / name).read_text(encoding="utf-8"))
+
+
+def _braced_items(tex: str, key: str) -> list[str]:
+    """Return the ``{a},{b}`` items of ``key={...}`` with pgf escapes undone."""
+
+    start = tex.index(key + "={") + len(key) + 2
+    depth, items, current = 1, [], ""
+    for char in tex[start:]:
+        if char == "{":
+            depth += 1
+            if depth == 2:
+                continue
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                break
+            if depth == 1:
+                items.append(current)
+                current = ""
+                continue
+        if depth >= 2:
+            current += char
+    return [item.replace("\\\\", "\n").replace("\\_", "_") for item in items]
+
+
+def _option(tex: str, key: str) -> float:
+    match = re.search(rf"\b{key}=([-0-9.e]+)", tex)
+    assert match is not None, key
+    return float(match.group(1))
+
+
+def _render_matplotlib(generator, *inputs):
+    captured = []
+    with mock.patch.object(PLOTS, "_save_pdf", lambda fig, _path: captured.append(fig)):
+        generator(*inputs, Path("unused.pdf"))
+    assert len(captured) == 1
+    return captured[0]
+
+
+def _errorbar_extents(ax, axis: int) -> tuple[np.ndarray, np.ndarray]:
+    segments = ax.collections[0].get_segments()
+    return (
+        np.array([segment[:, axis].min() for segment in segments]),
+        np.array([segment[:, axis].max() for segment in segments]),
+    )
+
+
+class PgfBackendEquivalenceTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        PLOTS._maybe_set_style()
+
+    def _assert_vertical_errorbar_equivalent(self, fig, tex_path: Path) -> None:
+        ax = fig.axes[0]
+        tex = tex_path.read_text(encoding="utf-8")
+        table = pd.read_csv(tex_path.with_suffix(".dat"), sep=" ")
+        marker = ax.lines[0]
+
+        np.testing.assert_array_equal(np.asarray(marker.get_xdata(), dtype=float), table["x"])
+        np.testing.assert_allclose(marker.get_ydata(), table["value"], rtol=1e-15)
+        low, high = _errorbar_extents(ax, 1)
+        np.testing.assert_allclose(low, table["value"] - table["err_minus"], rtol=1e-12)
+        np.testing.assert_allclose(high, table["value"] + table["err_plus"], rtol=1e-12)
+        self.assertEqual(ax.get_ylim(), (_option(tex, "ymin"), _option(tex, "ymax")))
+        self.assertEqual(
+            [label.get_text() for label in ax.get_xticklabels()], _braced_items(tex, "xticklabels")
+        )
+        self.assertEqual([ax.get_ylabel()], re.findall(r"ylabel=\{([^}]*)\}", tex))
+        threshold = [line for line in ax.lines if line.get_linestyle() == "--"][0]
+        coordinates = re.search(r"coordinates \{\(([^,]+),([^)]+)\)", tex)
+        assert coordinates is not None
+        self.assertEqual(threshold.get_ydata()[0], float(coordinates.group(2)))
+        legend = [text.get_text() for text in ax.get_legend().get_texts()]
+        self.assertEqual(legend, re.findall(r"\\addlegendentry\{([^}]*)\}", tex))
+        width, height = fig.get_size_inches()
+        self.assertAlmostEqual(width, float(re.search(r"width=([0-9.]+)in", tex).group(1)))
+        self.assertAlmostEqual(height, float(re.search(r"height=([0-9.]+)in", tex).group(1)))
+
+    def test_gender_air_slices_matches_matplotlib_figure(self) -> None:
+        slices = _load("fairness_slices.json")
+        fig = _render_matplotlib(PLOTS._generate_gender_air_slices_fig, slices)
+        with tempfile.TemporaryDirectory() as tmp:
+            out = Path(tmp) / "gender_air_slices.tex"
+            PLOTS._pgf_gender_air_slices_fig(slices, out)
+            self._assert_vertical_errorbar_equivalent(fig, out)
+
+    def test_air_summary_matches_matplotlib_figure_with_race_displayed(self) -> None:
+        uncertainty = _load("metrics_uncertainty.json")
+        uncertainty["fairness_uncertainty"]["race"]["display_in_main_pdf"] = True
+        metrics_long = pd.read_csv(ROOT / "intake" / "metrics_long.csv")
+        for generator, writer, inputs in (
+            (
+                PLOTS._generate_air_fig_from_uncertainty,
+                PLOTS._pgf_air_fig_from_uncertainty,
+                (uncertainty,),
+            ),
+            (PLOTS._generate_air_fig, PLOTS._pgf_air_fig, (metrics_long,)),
+        ):
+            with self.subTest(generator=generator.__name__), tempfile.TemporaryDirectory() as tmp:
+                fig = _render_matplotlib(generator, *inputs)
+                out = Path(tmp) / "air_summary.tex"
+                writer(*inputs, out)
+                self._assert_vertical_errorbar_equivalent(fig, out)
+
+    def test_selection_rates_panels_share_matplotlib_categories(self) -> None:
+        uncertainty = _load("metrics_uncertainty.json")
+        uncertainty["fairness_uncertainty"]["race"]["display_in_main_pdf"] = True
+        fig = _render_matplotlib(PLOTS._generate_selection_rates_fig_from_uncertainty, uncertainty)
+        with tempfile.TemporaryDirectory() as tmp:
+            out = Path(tmp) / "selection_rates.tex"
+            PLOTS._pgf_selection_rates_fig_from_uncertainty(uncertainty, out)
+            tex = out.read_text(encoding="utf-8")
+
+            titles = re.findall(r"title=\{([^}]*)\}", tex)
+            self.assertEqual([ax.get_title() for ax in fig.axes], titles)
+            self.assertEqual(len(fig.axes), tex.count("\\nextgroupplot"))
+            categories = _braced_items(tex, "yticklabels")
+            for ax in fig.axes:
+                attr = ax.get_title().lower()
+                table = pd.read_csv(Path(tmp) / f"selection_rates_{attr}.dat", sep=" ")
+                marker = ax.lines[0]
+                with self.subTest(panel=attr):
+                    self.assertEqual((0.0, 1.0), ax.get_xlim())
+                    np.testing.assert_allclose(marker.get_xdata(), table["value"], rtol=1e-15)
+                    np.testing.assert_array_equal(
+                        ax.yaxis.convert_units(marker.get_ydata()), table["y"]
+                    )
+                    low, high = _errorbar_extents(ax, 0)
+                    np.testing.assert_allclose(low, table["value"] - table["err_minus"], rtol=1e-12)
+                    np.testing.assert_allclose(high, table["value"] + table["err_plus"], rtol=1e-12)
+            mapping = fig.axes[0].yaxis.get_units()._mapping
+            self.assertEqual(list(mapping), categories)
+
+    def test_cli_pgf_backend_runs_without_matplotlib(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            outdir = Path(tmp) / "pgf"
+            outdir.mkdir()
+            (outdir / "air_summary_stale.dat").write_text("stale", encoding="utf-8")
+            blocker = (
+                "import runpy, sys; sys.modules['matplotlib'] = None; "
+                f"sys.argv = [{str(SCRIPT)!r}, '--backend', 'pgf', '--outdir', {str(outdir)!r}, "
+                "'--require-all']; runpy.run_path(sys.argv[0], run_name='__main__')"
+            )
+            completed = subprocess.run(
+                [sys.executable, "-c", blocker],
+                cwd=ROOT,
+                check=False,
+                capture_output=True,
+                text=True,
+            )
+
+            self.assertEqual(0, completed.returncode, completed.stderr)
+            self.assertEqual(
+                [
+                    "air_summary.dat",
+                    "air_summary.tex",
+                    "gender_air_slices.dat",
+                    "gender_air_slices.tex",
+                    "selection_rates.tex",
+                    "selection_rates_gender.dat",
+                ],
+                sorted(path.name for path in outdir.iterdir()),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
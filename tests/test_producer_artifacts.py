@@ -0,0 +1,275 @@
+import asyncio
+import importlib.util
+import io
+import random
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = ROOT / "scripts"
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+
+def _load(name: str):
+    spec = importlib.util.spec_from_file_location(f"{name}_under_test", SCRIPTS_DIR / f"{name}.py")
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+PRODUCER = _load("producer_artifacts")
+FAKE = _load("fake_github_api")
+
+REPO = "equilens-labs/fl-bsa"
+HEAD = "c" * 40
+BUNDLE = PRODUCER.BUNDLE_FILENAMES[PRODUCER.PRIMARY_ARTIFACT]
+NIGHTLY = PRODUCER.IntakeRequest(REPO, "wp-evidence-nightly.yml", "main")
+FAST = PRODUCER.PollPolicy(attempts=5, initial=1.0, factor=2.0, maximum=3.0, deadline=60.0)
+
+
+def _bundle_bytes() -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("manifest.json", '{"bundle": "v4"}')
+    return buffer.getvalue()
+
+
+class ProducerArtifactTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.api = FAKE.FakeGitHubAPI(repo=REPO, token="secret")
+        await self.api.start()
+        self.pool = PRODUCER.HttpPool(limit=2)
+        self.client = PRODUCER.GitHubClient(self.pool, api_url=self.api.url, token="secret")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output = Path(self.tmp.name) / "wp-bundle"
+        self.sleeps: list[float] = []
+        self.messages: list[str] = []
+
+    async def asyncTearDown(self) -> None:
+        await self.pool.close()
+        await self.api.close()
+        self.tmp.cleanup()
+
+    async def _sleep(self, delay: float) -> None:
+        self.sleeps.append(delay)
+
+    async def _fetch(self, request=NIGHTLY, policy=FAST) -> dict[str, str]:
+        return await PRODUCER.fetch_intake(
+            self.client,
+            request,
+            self.output,
+            policy=policy,
+            sleep=self._sleep,
+            rng=random.Random(0),
+            log=self.messages.append,
+        )
+
+    def _nightly_run(self, run_id: int = 7001, **kwargs) -> None:
+        self.api.add_run(run_id, head_sha=HEAD, **kwargs)
+
+    def _bundle(self, run_id: int = 7001, name: str = "wp-intake-bundle-v4-1", **kwargs):
+        data = FAKE.artifact_zip(BUNDLE, _bundle_bytes())
+        return self.api.add_artifact(run_id, name, data, **kwargs)
+
+    async def test_discovers_latest_run_and_unpacks_the_exact_bundle(self) -> None:
+        self._nightly_run(7000)
+        self._nightly_run(7001)
+        self.api.add_run(7002, head_sha=HEAD, statuses=["in_progress"])
+        self._bundle(7001)
+
+        selection = await self._fetch()
+
+        self.assertEqual(selection["SELECTED_PRODUCER_RUN_ID"], "7001")
+        self.assertEqual(selection["SELECTED_PRODUCER_ARTIFACT"], "wp-intake-bundle-v4-1")
+        self.assertEqual(selection["SELECTED_PRODUCER_HEAD_SHA"], HEAD)
+        self.assertEqual(sorted(path.name for path in self.output.iterdir()), [BUNDLE])
+        with zipfile.ZipFile(self.output / BUNDLE) as bundle:
+            self.assertEqual(bundle.namelist(), ["manifest.json"])
+        # The storage redirect must not carry the API token.
+        self.assertEqual(self.api.blob_authorization, [""])
+        self.assertEqual(self.api.connections, 1)
+
+    async def test_polls_pending_run_with_backoff_and_conditional_requests(self) -> None:
+        self._nightly_run(statuses=["queued", "in_progress", "in_progress", "completed"])
+        self._bundle()
+        request = NIGHTLY._replace(
+            run_id="7001", artifact="wp-intake-bundle-v4-1", event_name="repository_dispatch"
+        )
+
+        await self._fetch(request)
+
+        self.assertEqual(len(self.sleeps), 3)
+        for delay, ceiling in zip(self.sleeps, (1.0, 2.0, 3.0)):
+            self.assertGreaterEqual(delay, ceiling / 2)
+            self.assertLessEqual(delay, ceiling)
+        # The repeated in_progress poll is a 304 answered from the ETag cache.
+        self.assertEqual(self.api.requests["run"], 4)
+        self.assertEqual(self.api.not_modified, 1)
+        self.assertEqual(self.client.etags.hits, 1)
+        self.assertIn("Producer run 7001 is queued", self.messages[0])
+
+    async def test_pending_run_fails_after_bounded_wait(self) -> None:
+        self._nightly_run(statuses=["in_progress"])
+        request = NIGHTLY._replace(
+            run_id="7001", artifact="wp-intake-bundle-v4-1", event_name="repository_dispatch"
+        )
+
+        with self.assertRaisesRegex(PRODUCER.ProducerError, "1-minute bounded wait"):
+            await self._fetch(request)
+
+        self.assertEqual(self.api.requests["run"], FAST.attempts)
+        self.assertLessEqual(sum(self.sleeps), FAST.deadline)
+
+    async def test_lists_every_artifact_page_concurrently(self) -> None:
+        self._nightly_run()
+        for index in range(230):
+            self.api.add_artifact(7001, f"coverage-{index}", b"x")
+        self._bundle()
+
+        pool = PRODUCER.HttpPool(limit=4)
+        try:
+            client = PRODUCER.GitHubClient(pool, api_url=self.api.url, token="secret")
+            listing = await client.get_all(f"repos/{REPO}/actions/runs/7001/artifacts", "artifacts")
+        finally:
+            await pool.close()
+
+        self.assertEqual(len(listing), 231)
+        self.assertEqual(self.api.requests["artifacts"], 3)
+        self.assertEqual(len({item["id"] for item in listing}), 231)
+
+    async def test_release_run_head_must_match_peeled_tag(self) -> None:
+        branch = f"release/v1.2.3-{HEAD[:8]}"
+        request = PRODUCER.IntakeRequest(
+            REPO,
+            "release-evidence.yml",
+            branch,
+            artifact="wp-intake-bundle-v4-1",
+            event_name="repository_dispatch",
+            run_id="7001",
+        )
+        self.api.add_run(
+            7001,
+            workflow="release-evidence.yml",
+            branch=branch,
+            head_sha=HEAD,
+            event="workflow_dispatch",
+        )
+        self._bundle()
+
+        self.api.add_tag("v1.2.3", HEAD, annotated=2)
+        selection = await self._fetch(request)
+        self.assertEqual(selection["SELECTED_PRODUCER_BRANCH"], branch)
+        self.assertEqual(self.api.requests["tag"], 2)
+
+        self.api.add_tag("v1.2.3", "d" * 40)
+        with self.assertRaisesRegex(PRODUCER.ProducerError, "resolves to d{40}, not run head"):
+            await self._fetch(request)
+
+    async def test_artifact_selection_fails_closed(self) -> None:
+        cases = (
+            ("duplicate", "duplicate wp-intake-bundle-v4-1 artifacts"),
+            ("missing", "wp-intake-bundle-v4-1 is not present"),
+            ("expired", "is expired"),
+            ("stale", "predates or cannot be bound"),
+            ("digest", "do not match API identity"),
+        )
+        for run_id, (case, message) in enumerate(cases, start=7001):
+            with self.subTest(case=case):
+                self._nightly_run(run_id)
+                if case == "duplicate":
+                    self._bundle(run_id)
+                    self._bundle(run_id)
+                elif case == "expired":
+                    self._bundle(run_id, expired=True)
+                elif case == "stale":
+                    self._bundle(run_id, created_at="2025-12-31T23:59:59Z")
+                elif case == "digest":
+                    artifact = self._bundle(run_id)
+                    self.api.blobs[artifact["id"]] = bytes(artifact["size_in_bytes"])
+                request = NIGHTLY._replace(
+                    run_id=str(run_id),
+                    artifact="wp-intake-bundle-v4-1",
+                    event_name="repository_dispatch",
+                )
+                with self.assertRaisesRegex(PRODUCER.ProducerError, message):
+                    await self._fetch(request)
+        self.assertFalse(self.output.exists() and any(self.output.iterdir()))
+
+    async def test_rejects_unqualified_primary_artifact_on_rerun(self) -> None:
+        self._nightly_run(run_attempt=2)
+        self._bundle(name="wp-intake-bundle-v4")
+        request = NIGHTLY._replace(
+            run_id="7001", artifact="wp-intake-bundle-v4", event_name="repository_dispatch"
+        )
+
+        with self.assertRaisesRegex(PRODUCER.ProducerError, "attempt 2 requires"):
+            await self._fetch(request)
+
+    async def test_failed_artifact_listing_uses_the_workflow_message(self) -> None:
+        self._nightly_run()
+        del self.api.artifacts[7001]  # the listing answers 404
+        request = NIGHTLY._replace(
+            run_id="7001", artifact="wp-intake-bundle-v4-1", event_name="repository_dispatch"
+        )
+
+        with self.assertRaisesRegex(
+            PRODUCER.ProducerError,
+            f"Unable to list artifacts for {REPO} run 7001; check token scopes",
+        ):
+            await self._fetch(request)
+
+    async def test_malformed_chunk_size_is_a_producer_error(self) -> None:
+        async def serve(reader, writer) -> None:
+            await reader.readuntil(b"\r\n\r\n")
+            writer.write(b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\nzz\r\n")
+            await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(serve, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            with self.assertRaisesRegex(PRODUCER.ProducerError, "malformed HTTP chunk size"):
+                await self.pool.request(f"http://127.0.0.1:{port}/", {})
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    async def test_missing_token_is_reported_as_http_error(self) -> None:
+        self._nightly_run()
+        client = PRODUCER.GitHubClient(self.pool, api_url=self.api.url)
+
+        with self.assertRaisesRegex(PRODUCER.ProducerError, "HTTP 401 Bad credentials"):
+            await PRODUCER.latest_successful_run(client, NIGHTLY)
+
+
+class ProducerRequestTests(unittest.TestCase):
+    def test_request_allow_lists(self) -> None:
+        cases = (
+            (NIGHTLY._replace(repo="someone/else"), "Unsupported producer_repo"),
+            (NIGHTLY._replace(branch="dev"), "Unapproved producer workflow/branch pair"),
+            (NIGHTLY._replace(event_name="repository_dispatch"), "must select an exact"),
+            (NIGHTLY._replace(artifact="wp-intake-bundle-v4-01"), "Malformed run-attempt"),
+            (NIGHTLY._replace(artifact="coverage"), "Unsupported artifact_name"),
+        )
+        for request, message in cases:
+            with self.subTest(message=message):
+                with self.assertRaisesRegex(PRODUCER.ProducerError, message):
+                    PRODUCER.validate_request(request)
+
+    def test_backoff_stays_within_jitter_bounds(self) -> None:
+        policy = PRODUCER.PollPolicy()
+        delays = list(PRODUCER.backoff_delays(policy, random.Random(1)))
+
+        self.assertEqual(len(delays), policy.attempts - 1)
+        self.assertTrue(all(policy.initial / 2 <= delay <= policy.maximum for delay in delays))
+        self.assertGreater(delays[-1], policy.maximum / 2 - 1e-9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -303,6 +303,28 @@ print(json.dumps(fixture))
             ):
                 PUBLICATION._assert_pdf_marker(pdf, "pdftotext")
 
+    def test_pdf_marker_check_needs_no_pdftotext(self) -> None:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for label in ("DEMO / EVALUATION ONLY", "Selection rate"):
+                pdf = Path(tmp) / "candidate.pdf"
+                figure = plt.figure()
+                figure.text(0.5, 0.5, label)
+                figure.savefig(pdf)
+                plt.close(figure)
+                with self.subTest(label=label):
+                    if label == "Selection rate":
+                        with self.assertRaisesRegex(
+                            PUBLICATION.AnchorError, "missing DEMO / EVALUATION ONLY"
+                        ):
+                            PUBLICATION._assert_pdf_marker(pdf, "missing-pdftotext")
+                    else:
+                        PUBLICATION._assert_pdf_marker(pdf, "missing-pdftotext")
+
     def test_source_checkout_must_be_exact_head_and_clean(self) -> None:
         with tempfile.TemporaryDirectory() as tmp:
             repo = Path(tmp) / "repo"
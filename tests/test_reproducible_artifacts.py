@@ -1,6 +1,7 @@
 import hashlib
 import importlib.util
 import subprocess
+import sys
 import tempfile
 import unittest
 import zipfile
@@ -9,6 +10,7 @@ from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
 MODULE_PATH = ROOT / "scripts" / "package_arxiv_source.py"
+sys.path.insert(0, str(MODULE_PATH.parent))
 SPEC = importlib.util.spec_from_file_location("package_arxiv_source_under_test", MODULE_PATH)
 assert SPEC is not None and SPEC.loader is not None
 PACKAGE = importlib.util.module_from_spec(SPEC)
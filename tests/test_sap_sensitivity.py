@@ -0,0 +1,172 @@
+import importlib.util
+import json
+import re
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+ROOT = Path(__file__).resolve().parents[1]
+MODULE_PATH = ROOT / "scripts" / "sap_sensitivity.py"
+SPEC = importlib.util.spec_from_file_location("sap_sensitivity_under_test", MODULE_PATH)
+assert SPEC is not None and SPEC.loader is not None
+SENSITIVITY = importlib.util.module_from_spec(SPEC)
+SPEC.loader.exec_module(SENSITIVITY)
+
+
+def _load(name: str) -> dict:
+    return json.loads((ROOT / "intake" / name).read_text(encoding="utf-8"))
+
+
+class SapSensitivityTests(unittest.TestCase):
+    def test_recomputed_intervals_match_shipped_ci_at_reviewed_alpha(self) -> None:
+        uncertainty = _load("metrics_uncertainty.json")
+        surface = SENSITIVITY.collect_air_surface(uncertainty, {})
+        gender = surface[surface["label"] == "gender:female"]
+        upper = uncertainty["fairness_uncertainty"]["gender"]["air"]["ci95"][1]
+
+        result = SENSITIVITY.sweep_air(
+            gender, np.array([upper - 1e-9, upper + 1e-9]), np.array([0.05])
+        )
+
+        self.assertEqual([0, 1], result["ci_confirmed_violations"].tolist())
+        self.assertEqual([1, 1], result["point_violations"].tolist())
+
+    def test_sweep_covers_every_pair_and_slice_at_sap_threshold(self) -> None:
+        surface = SENSITIVITY.collect_air_surface(
+            _load("metrics_uncertainty.json"), _load("fairness_slices.json")
+        )
+        self.assertEqual(
+            [
+                "gender:female",
+                "race:asian",
+                "race:hispanic",
+                "race:other",
+                "race:white",
+                "slice:historical",
+                "slice:amplification",
+                "slice:intrinsic",
+            ],
+            surface["label"].tolist(),
+        )
+
+        result = SENSITIVITY.sweep_air(
+            surface, SENSITIVITY.parse_grid("0.5:1.0:0.05"), SENSITIVITY.parse_grid("0.01,0.05")
+        )
+
+        self.assertEqual(22, len(result))
+        at_sap = result[np.isclose(result["air_min"], 0.80)]
+        # Gender main pair plus the historical and amplification slices fall below 0.80.
+        self.assertEqual({3}, set(at_sap["point_violations"]))
+        self.assertTrue((result["ci_confirmed_violations"] <= result["point_violations"]).all())
+
+    def test_cli_writes_table_heatmap_and_marks_reviewed_thresholds(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            outdir = Path(tmp) / "out"
+            completed = subprocess.run(
+                [
+                    sys.executable,
+                    str(MODULE_PATH),
+                    "--uncertainty",
+                    str(ROOT / "intake" / "metrics_uncertainty.json"),
+                    "--slices",
+                    str(ROOT / "intake" / "fairness_slices.json"),
+                    "--metrics",
+                    str(ROOT / "intake" / "metrics_long.csv"),
+                    "--sap",
+                    str(ROOT / "config" / "sap.yaml"),
+                    "--air-min",
+                    "0.75,0.85",
+                    "--outdir",
+                    str(outdir),
+                ],
+                check=False,
+                capture_output=True,
+                text=True,
+            )
+
+            self.assertEqual(0, completed.returncode, completed.stderr)
+            air = pd.read_csv(outdir / "sap_sensitivity_air.csv")
+            self.assertEqual([0.75, 0.8, 0.85], sorted(air["air_min"].unique().tolist()))
+            self.assertEqual(3, int(air["is_sap_threshold"].sum()))
+            gaps = pd.read_csv(outdir / "sap_sensitivity_gaps.csv")
+            self.assertEqual({"tpr_gap", "fpr_gap", "ece"}, set(gaps["metric"]))
+            table = (outdir / "table_sap_sensitivity.tex").read_text(encoding="utf-8")
+            self.assertIn("Point violations", table)
+            self.assertIn("CI-confirmed violations", table)
+            # Paper rule first (gender only on the tracked intake), then CI-confirmed per alpha.
+            self.assertIn("\\textbf{0.8} (SAP) & 1 & ", table)
+            self.assertTrue((outdir / "sap_sensitivity_air.pdf").read_bytes().startswith(b"%PDF"))
+
+    def test_paper_rule_count_at_sap_threshold_matches_macro(self) -> None:
+        macros = ROOT / "scripts" / "gen_tex_macros_from_metrics.py"
+        slices = ROOT / "intake" / "fairness_slices.json"
+        with tempfile.TemporaryDirectory() as tmp:
+            for display_race in (False, True):
+                with self.subTest(display_race=display_race):
+                    uncertainty = _load("metrics_uncertainty.json")
+                    race = uncertainty["fairness_uncertainty"]["race"]
+                    race["display_in_main_pdf"] = display_race
+                    race["pairs"][race["worst_case_pair"]]["air"]["point"] = 0.70
+                    path = Path(tmp) / "metrics_uncertainty.json"
+                    path.write_text(json.dumps(uncertainty), encoding="utf-8")
+                    outdir = Path(tmp) / f"macros-{display_race}"
+                    completed = subprocess.run(
+                        [
+                            sys.executable,
+                            str(macros),
+                            "--uncertainty",
+                            str(path),
+                            "--slices",
+                            str(slices),
+                            "--outdir",
+                            str(outdir),
+                        ],
+                        cwd=ROOT,
+                        check=False,
+                        capture_output=True,
+                        text=True,
+                    )
+                    self.assertEqual(0, completed.returncode, completed.stderr)
+                    text = (outdir / "metrics_macros.tex").read_text(encoding="utf-8")
+                    macro = re.search(r"\\NumAIRViolations\}\{(\d+)\}", text)
+                    assert macro is not None
+
+                    surface = SENSITIVITY.collect_air_surface(uncertainty, _load(slices.name))
+                    result = SENSITIVITY.sweep_air(
+                        surface, np.array([0.80]), np.array([0.05])
+                    )
+
+                    self.assertEqual(
+                        [int(macro.group(1))], result["paper_violations"].tolist()
+                    )
+                    self.assertEqual([1 + display_race], result["paper_violations"].tolist())
+
+    def test_cli_reports_unreadable_inputs(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            bad = Path(tmp) / "sap.yaml"
+            bad.write_text("thresholds: [unclosed\n", encoding="utf-8")
+            completed = subprocess.run(
+                [sys.executable, str(MODULE_PATH), "--sap", str(bad), "--outdir", tmp],
+                cwd=ROOT,
+                check=False,
+                capture_output=True,
+                text=True,
+            )
+
+        self.assertEqual(2, completed.returncode)
+        self.assertIn(f"unable to read {bad}", completed.stderr)
+
+    def test_grid_specification_rejects_malformed_ranges(self) -> None:
+        for spec in ("0.9:0.8:0.01", "0.7:0.9:0", "a,b", ""):
+            with self.subTest(spec=spec), self.assertRaises(ValueError):
+                SENSITIVITY.parse_grid(spec)
+
+
+if __name__ == "__main__":
+    unittest.main()
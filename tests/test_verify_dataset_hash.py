@@ -0,0 +1,109 @@
+import importlib.util
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+MODULE_PATH = ROOT / "scripts" / "verify_dataset_hash.py"
+SPEC = importlib.util.spec_from_file_location("verify_dataset_hash_under_test", MODULE_PATH)
+assert SPEC is not None and SPEC.loader is not None
+VERIFY = importlib.util.module_from_spec(SPEC)
+SPEC.loader.exec_module(VERIFY)
+
+
+def _write_fixture(path: Path, rows: int = 3_000) -> None:
+    """Dataset whose columns change inferred dtype between chunks."""
+
+    rng = random.Random(20260718)
+    lines = ["id,count,amount,flag,name,mixed,empty"]
+    for index in range(rows):
+        count = "" if index == rows - 500 else str(rng.randint(0, 99))
+        amount = f"{rng.random() * 100:.3f}" if index % 7 else "12"
+        flag = "" if index == rows - 1_200 else rng.choice(["True", "False"])
+        name = rng.choice(['"Smith, J"', "café", '"multi\nline"', "plain"])
+        mixed = "x" if index >= rows - 100 else str(rng.randint(0, 9))
+        lines.append(",".join([str(index), count, amount, flag, name, mixed, ""]))
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def _manifest(path: Path, digest: str) -> None:
+    payload = {
+        "canonical_input_sha256": digest,
+        "dataset_hash": f"sha256:{digest}",
+        "dataset_hash_canonicalization": (
+            "CSV parsed with pandas.read_csv and re-serialized with "
+            "DataFrame.to_csv(index=False) as UTF-8"
+        ),
+    }
+    path.write_text(json.dumps(payload), encoding="utf-8")
+
+
+class VerifyDatasetHashTests(unittest.TestCase):
+    def test_streaming_digest_equals_full_frame_for_every_chunk_size(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            dataset = Path(tmp) / "original_data.csv"
+            _write_fixture(dataset)
+            full = VERIFY.canonical_sha256_full(dataset)
+
+            for chunksize in (97, 499, 1_000, 2_999, 3_000, 10_000):
+                with self.subTest(chunksize=chunksize):
+                    result = VERIFY.canonical_sha256_stream(dataset, chunksize=chunksize)
+                    self.assertEqual(full, result["sha256"])
+                    self.assertEqual(3_000, result["rows"])
+                    if chunksize >= 3_000:
+                        self.assertEqual(1, result["passes"])
+                    else:
+                        self.assertEqual(2, result["passes"])
+                        self.assertIn("count", result["recast_columns"])
+
+    def test_common_dtype_follows_full_frame_promotion(self) -> None:
+        self.assertEqual("float64", VERIFY.common_dtype(["int64", "float64"]).name)
+        self.assertEqual("object", VERIFY.common_dtype(["bool", "object"]).name)
+        self.assertEqual("object", VERIFY.common_dtype(["int64", "bool"]).name)
+        self.assertEqual("int64", VERIFY.common_dtype(["int64", "int64"]).name)
+
+    def test_shipped_manifest_digests_agree(self) -> None:
+        manifest = json.loads((ROOT / "intake" / "manifest.json").read_text(encoding="utf-8"))
+
+        digests = VERIFY.expected_digests(manifest)
+
+        self.assertEqual({"canonical_input_sha256", "dataset_hash"}, set(digests))
+        self.assertEqual(1, len(set(digests.values())))
+
+    def test_cli_compares_against_manifest_digests(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            dataset = Path(tmp) / "original_data.csv"
+            _write_fixture(dataset, rows=600)
+            manifest = Path(tmp) / "manifest.json"
+            _manifest(manifest, VERIFY.canonical_sha256_full(dataset))
+            command = [
+                sys.executable,
+                str(MODULE_PATH),
+                "--input",
+                str(dataset),
+                "--manifest",
+                str(manifest),
+                "--chunksize",
+                "64",
+                "--full-frame",
+            ]
+
+            completed = subprocess.run(command, check=False, capture_output=True, text=True)
+            self.assertEqual(0, completed.returncode, completed.stderr)
+            report = json.loads(completed.stdout)
+            self.assertEqual("match", report["status"])
+            self.assertTrue(report["matches"]["full_frame"])
+
+            _manifest(manifest, "0" * 64)
+            completed = subprocess.run(command, check=False, capture_output=True, text=True)
+            self.assertEqual(1, completed.returncode)
+            self.assertEqual("mismatch", json.loads(completed.stdout)["status"])
+
+
+if __name__ == "__main__":
+    unittest.main()